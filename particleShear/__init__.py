@@ -9,18 +9,21 @@ Package written by Thomas Braschler (thomas.braschler@gmail.com)
 """
 
 __all__ = ["Force_register","StressTensorEvaluation","Graphical_output_configuration","neighbor_relation",
+           "Neighbor_cell_list","Particle_state_arrays","Contact_table","Contact_geometry_cache",
+           "Time_step_controller",
            "Point","PointLeesEdwards",
            "Circle","CircleBasicElasticity",
            "CircleFrictionElasticity","CircleMass","CircleMassNeighbors",
            "CanvasPoints","CanvasPointsBasicElasticity","CanvasPointsBasicElasticityLeesEdwards",
            "CanvasPointsFrictionElasticityLeesEdwards","CanvasPointsMass","CanvasPointsShear","CanvasPointsNeighbors",
            "elastic_force_law_plateau","elastic_force_law","PlateauConfiguration","distance_transform_plateau",
+           "INTEGRATOR_EULER","INTEGRATOR_VELOCITY_VERLET",
            "Sphere","SphereLeesEdwards","SphereFriction","SphereFrictionLeesEdwards",
            "Ensemble",
            "EnsembleFriction",
            "r_estimate","EnsembleLeesEdwards","EnsembleFrictionLeesEdwards",
-           "particle_shear_model_parameters",
-           "neighbor_relation_linkable",
+           "particle_shear_model_parameters","Ghost_image_table",
+           "neighbor_relation_linkable","Bond_table",
            "CanvasPointsLinkable", "SphereLinkable", "SphereLinkableAdjustableInterfaceStrength",
            "EnsembleLinkable", "EnsembleCompactParticles",
            "EnsembleCompactParticlesAdjustableInterfaceStrength",
@@ -35,8 +38,10 @@ __all__ = ["Force_register","StressTensorEvaluation","Graphical_output_configura
            "Simulation_interlocking_rheology",
            "EvaluationHandler",
            "EvaluationHandlerPlotter",
+           "Stress_history","History_view","LockInDemodulator",
            "doParticleShearSimulation",
-           "doParticleShearSimulationSeries"
+           "doParticleShearSimulationSeries",
+           "doMultipleTimeStepBenchmark"
            ]
 
 
@@ -2,6 +2,7 @@ from tkinter import *
 import math
 from .Force_register import Force_register
 from .Graphical_output_configuration import Graphical_output_configuration
+from .Particle_state_arrays import Particle_state_arrays
 
 
 class CanvasPoints():
@@ -37,6 +38,9 @@ class CanvasPoints():
         """`particleShear.Graphical_output_configuration` to set options how the spheres and their neighboring relations
         are displayed"""
         self.set_graphical_output_configuration(self.graphical_output_configuration) # To propagate it also to the spheres
+        self.state_arrays = False
+        """Optional `particleShear.Particle_state_arrays` holding the state of the spheres in contiguous arrays;
+        False if not used. See `particleShear.CanvasPoints.enable_state_arrays`"""
 
 
 
@@ -62,6 +66,51 @@ class CanvasPoints():
                 theSphere.initiate_drawing()
 
 
+    def enable_state_arrays(self):
+        """Move the state of the spheres into a `particleShear.Particle_state_arrays` backend
+
+        The spheres in `particleShear.CanvasPoints.sphereList` become thin views into the arrays, which
+        are available as `particleShear.CanvasPoints.state_arrays`. If the sphere list has changed since the
+        backend was enabled, the backend is rebuilt.\n
+        This method is defined in class `particleShear.CanvasPoints`"""
+        if self.state_arrays:
+            if self.state_arrays.represents(self.sphereList):
+                return self.state_arrays
+            self.disable_state_arrays()
+        self.state_arrays = Particle_state_arrays(self.sphereList)
+        self.state_arrays.attach()
+        return self.state_arrays
+
+    def disable_state_arrays(self):
+        """Give the spheres back their own state and drop the `particleShear.CanvasPoints.state_arrays` backend
+
+        This method is defined in class `particleShear.CanvasPoints`"""
+        if self.state_arrays:
+            self.state_arrays.detach()
+        self.state_arrays = False
+
+    def current_state_arrays(self):
+        """Return the `particleShear.CanvasPoints.state_arrays` backend if it is enabled and represents the current
+        `particleShear.CanvasPoints.sphereList`, False otherwise
+
+        This method is defined in class `particleShear.CanvasPoints`"""
+        if self.state_arrays and self.state_arrays.represents(self.sphereList):
+            return self.state_arrays
+        return False
+
+    def state_sequence(self, field):
+        """Return the per-sphere values of the quantity field, in the order of the
+        `particleShear.CanvasPoints.sphereList`
+
+        This is the array of the `particleShear.CanvasPoints.state_arrays` backend if it is current (no copy), or a
+        list gathered from the spheres otherwise.\n
+        This method is defined in class `particleShear.CanvasPoints`"""
+        state = self.current_state_arrays()
+        if state:
+            return getattr(state, field)
+        return [getattr(theSphere, field) for theSphere in self.sphereList]
+
+
     # For recording incoming force reported by the spheres
 
 
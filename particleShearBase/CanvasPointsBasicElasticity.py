@@ -4,6 +4,31 @@ import math
 from .Force_register import Force_register
 from .Graphical_output_configuration import Graphical_output_configuration
 from .CanvasPointsShear import CanvasPointsShear
+from .CircleBasicElasticity import CircleBasicElasticity
+from .Contact_table import Contact_table
+
+INTEGRATOR_EULER = "euler"
+"""Integrator of `particleShear.CanvasPointsBasicElasticity.mechanical_simulation_step`: semi-implicit Euler, the speed
+is updated from the forces, then the position from the new speed"""
+INTEGRATOR_VELOCITY_VERLET = "velocity_verlet"
+"""Integrator of `particleShear.CanvasPointsBasicElasticity.mechanical_simulation_step`: velocity Verlet, see
+`particleShear.CanvasPointsBasicElasticity.set_integrator`"""
+
+FIRE_N_MIN = 5
+"""Number of steps with positive power before the FIRE time step may grow (see
+`particleShear.CanvasPointsBasicElasticity.fire_relaxation`)"""
+FIRE_F_INC = 1.1
+"""Growth factor of the FIRE time step"""
+FIRE_F_DEC = 0.5
+"""Reduction factor of the FIRE time step when the power becomes negative"""
+FIRE_DT_MIN = 0.02
+"""Smallest FIRE time step, relative to the initial time step (Guenole, J., W. G. Noehring, A. Vaid, F. Houlle,
+Z. Xie, A. Prakash and E. Bitzek, Assessment and optimization of the fast inertial relaxation engine (FIRE) for
+energy minimization in atomistic simulations and its implementation in LAMMPS. Comput Mater Sci, 2020. 175: p. 109584)"""
+FIRE_ALPHA_START = 0.1
+"""Initial velocity mixing coefficient of FIRE"""
+FIRE_F_ALPHA = 0.99
+"""Decay factor of the FIRE velocity mixing coefficient"""
 
 
 
@@ -42,6 +67,51 @@ class CanvasPointsBasicElasticity(CanvasPointsShear):
 
         super(CanvasPointsBasicElasticity,self).__init__(size_x=size_x,size_y=size_y,theCanvas=theCanvas,doDrawing=doDrawing,m=m)
 
+        self.use_contact_kernels = False
+        """Whether to calculate the contact forces with the batched kernels operating on the
+        `particleShear.CanvasPointsBasicElasticity.contact_table` (see
+        `particleShear.CanvasPointsBasicElasticity.central_force_kernel`) rather than sphere by sphere"""
+        self.contact_table = Contact_table()
+        """The `particleShear.Contact_table` used by the batched force kernels"""
+
+        self.verlet_skin = 0
+        """Skin distance of the Verlet neighbor list; 0 to disable the Verlet list.
+
+        See `particleShear.CanvasPointsBasicElasticity.set_verlet_skin`"""
+        self.verlet_rebuild_count = 0
+        """Number of times the Verlet candidate list has been (re)built"""
+        self.verlet_candidates = []
+        """For each sphere, the indices of the spheres closer than the sum of radii plus the skin at the last build"""
+        self.verlet_reference_positions = []
+        """Positions [x,y] of the spheres at the last build of the Verlet list"""
+        self.verlet_reference_shear = 0
+        """Shear at the last build of the Verlet list"""
+        self.verlet_reference_spheres = []
+        """Sphere ids at the last build of the Verlet list, to detect changes to the sphere list"""
+
+        self.integrator = INTEGRATOR_EULER
+        """Integrator used by `particleShear.CanvasPointsBasicElasticity.mechanical_simulation_step`; see
+        `particleShear.CanvasPointsBasicElasticity.set_integrator`"""
+        self.velocity_verlet_offsets = []
+        """For each sphere, the [x-speed, y-speed, rotation rate] added by the velocity Verlet prediction at the end of
+        the last step, to be replaced by the half step with the new forces"""
+        self.velocity_verlet_spheres = []
+        """Sphere ids at the last velocity Verlet step"""
+        self.velocity_verlet_dt = 0
+        """Time step of the last velocity Verlet step"""
+        self.velocity_verlet_t = 0
+        """Time at the end of the last velocity Verlet step"""
+
+        self.time_step_controller = False
+        """If set to a `particleShear.Time_step_controller`, the time step of
+        `particleShear.CanvasPointsBasicElasticity.mechanical_simulation_step` is chosen by the controller rather than
+        given by the dt argument"""
+
+        self.measure_residual_force = False
+        """Whether `particleShear.CanvasPointsBasicElasticity.mechanical_simulation_step` stores the largest net force
+        acting on a mobile sphere in `particleShear.CanvasPointsBasicElasticity.residual_force`"""
+        self.residual_force = 0
+        """Largest net force acting on a mobile sphere at the last step measured, in mg*micrometer/s^2 per m of depth"""
 
 
 
@@ -96,6 +166,126 @@ class CanvasPointsBasicElasticity(CanvasPointsShear):
             self.sphereList[sphereIndex].central_viscous_force_from_neighbors(self.nu)
 
 
+    def central_force_kernel(self):
+        """Calculate and apply the central elastic and viscous forces for all the contacts in one batched pass.
+
+        This is equivalent to `particleShear.CanvasPointsBasicElasticity.elastic_force_from_neighbors` followed by
+        `particleShear.CanvasPointsBasicElasticity.central_viscous_force_from_neighbors`, but operates on the pair arrays
+        of the `particleShear.CanvasPointsBasicElasticity.contact_table`, which needs to be built beforehand. Each
+        contact is evaluated once, with the periodic geometry and relative speed taken from
+        `particleShear.Contact_table.evaluate_geometry`, and the force and
+        its reaction are accumulated into per-sphere force arrays that are added to the spheres (or to the
+        `particleShear.CanvasPoints.state_arrays`, if enabled) at the end. The elastic force law is the current
+        `particleShear.CircleBasicElasticity.call_back_elastic_force_law` (so the plateau law is honored), called with
+        the `particleShear.CircleBasicElasticity.central_repulsion_coefficient` of the sphere the force acts on.
+        The forces are recorded via `particleShear.CanvasPointsMass.record_pair_force`.\n
+        Permanent links, one-sided relations, and ensembles whose spheres do not share the same boundary conditions are
+        handled by the sphere methods, unless the permanent links are treated by a bond kernel (see
+        `particleShear.CanvasPointsBasicElasticity.bond_kernel_handles`).\n
+        This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
+
+        table = self.contact_table
+        spheres = self.sphereList
+
+        if not table.uniform:
+            self.elastic_force_from_neighbors()
+            self.central_viscous_force_from_neighbors()
+            return
+
+        if not table.geometry_evaluated:
+            table.evaluate_geometry(self.state_sequence("x"), self.state_sequence("y"),
+                                    self.state_sequence("xspeed"), self.state_sequence("yspeed"))
+        r = self.state_sequence("r")
+        repulsion = [theSphere.central_repulsion_coefficient for theSphere in spheres]
+
+        xforce = [0.0] * len(spheres)
+        yforce = [0.0] * len(spheres)
+
+        force_law = CircleBasicElasticity.call_back_elastic_force_law
+        k = self.k
+        nu = self.nu
+
+        index_i = table.index_i
+        index_j = table.index_j
+        permanent = table.permanent
+        distance = table.distance
+        normal_x = table.normal_x
+        normal_y = table.normal_y
+        vx_rel = table.vx_rel
+        vy_rel = table.vy_rel
+        crosses_boundary = table.crosses_boundary
+
+        for row in range(len(index_i)):
+            i = index_i[row]
+            j = index_j[row]
+
+            if permanent[row]:
+                if self.bond_kernel_handles(spheres[i], spheres[j]):
+                    continue
+                spheres[i].elastic_force(spheres[j], k)
+                spheres[i].central_viscous_force(spheres[j], nu)
+                spheres[j].elastic_force(spheres[i], k)
+                spheres[j].central_viscous_force(spheres[i], nu)
+                continue
+
+            d = distance[row]
+            n_x = normal_x[row]
+            n_y = normal_y[row]
+
+            # Viscous force, same magnitude seen from both spheres
+            force_i = nu * (vx_rel[row] * n_x + vy_rel[row] * n_y)
+            force_j = force_i
+
+            d0 = r[i] + r[j]
+            if d < d0:
+                elastic_i = force_law(d, d0, k, repulsion[i])
+                if repulsion[j] == repulsion[i]:
+                    elastic_j = elastic_i
+                else:
+                    elastic_j = force_law(d, d0, k, repulsion[j])
+                force_i = force_i + elastic_i
+                force_j = force_j + elastic_j
+
+            xforce[i] = xforce[i] + force_i * n_x
+            yforce[i] = yforce[i] + force_i * n_y
+            xforce[j] = xforce[j] - force_j * n_x
+            yforce[j] = yforce[j] - force_j * n_y
+
+            self.record_pair_force(spheres[i], spheres[j], [force_i * n_x, force_i * n_y], crosses_boundary[row])
+            self.record_pair_force(spheres[j], spheres[i], [-force_j * n_x, -force_j * n_y], crosses_boundary[row])
+
+        for sphereIndex, theNeighbor in table.one_sided:
+            spheres[sphereIndex].elastic_force(theNeighbor.theSphere, k)
+            spheres[sphereIndex].central_viscous_force(theNeighbor.theSphere, nu)
+
+        self.add_forces(xforce, yforce)
+
+    def bond_kernel_handles(self, theSphere, otherSphere):
+        """Return whether the permanent link between the two spheres is treated by a dedicated bond kernel, in which case
+        the contact kernels skip it
+
+        Always False here; see `particleShear.CanvasPointsLinkable.bond_kernel_handles`.\n
+        This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
+        return False
+
+    def add_forces(self, xforce, yforce):
+        """Add the force components given as per-sphere lists to the net forces acting on the spheres
+
+        Writes directly to the `particleShear.CanvasPoints.state_arrays` if enabled.\n
+        This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
+        state = self.current_state_arrays()
+        if state:
+            state_xforce = state.xforce
+            state_yforce = state.yforce
+            for sphereIndex in range(len(xforce)):
+                state_xforce[sphereIndex] = state_xforce[sphereIndex] + xforce[sphereIndex]
+                state_yforce[sphereIndex] = state_yforce[sphereIndex] + yforce[sphereIndex]
+        else:
+            for sphereIndex in range(len(xforce)):
+                theSphere = self.sphereList[sphereIndex]
+                theSphere.xforce = theSphere.xforce + xforce[sphereIndex]
+                theSphere.yforce = theSphere.yforce + yforce[sphereIndex]
+
     def mechanical_simulation_step(self, cool_factor=0.97, dt=1):
         """ Perform full mechanical simulation step.
 
@@ -105,13 +295,18 @@ class CanvasPointsBasicElasticity(CanvasPointsShear):
             acceleration, rotational acceleration, linear and rotational movement, including Lees-Edwards boundary
             conditions and adaption to change of shear rate
             The step can also include cooling (translational and rotational) by cool_factor.
-            Forces are registered in the `particleShear.CanvasPointsMass.force_register`\n
+            Forces are registered in the `particleShear.CanvasPointsMass.force_register`. If a
+            `particleShear.CanvasPointsBasicElasticity.time_step_controller` is set, it chooses the time step once the
+            forces are known, and dt is ignored.\n
             This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
 
         self.mechanical_simulation_step_calculate_forces()
         self.record_total_particle_forces()
-        self.mechanical_simulation_step_calculate_acceleration(cool_factor=cool_factor,dt=dt)
-        self.mechanical_simulation_step_calculate_movement(dt=dt)
+        if self.time_step_controller:
+            dt = self.time_step_controller.next_dt(self)
+        if self.measure_residual_force:
+            self.residual_force = self.max_residual_force()
+        self.mechanical_simulation_step_integrate(cool_factor=cool_factor,dt=dt)
 
 
 
@@ -121,10 +316,22 @@ class CanvasPointsBasicElasticity(CanvasPointsShear):
         This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
         self.reset_force_register()
         self.test_neighbor_relation()
-        self.elastic_force_from_neighbors()
-        self.central_viscous_force_from_neighbors()
+        self.open_geometry_cache()
+        if self.use_contact_kernels:
+            self.contact_table.build(self.sphereList)
+            self.central_force_kernel()
+        else:
+            self.elastic_force_from_neighbors()
+            self.central_viscous_force_from_neighbors()
+
 
 
+    def open_geometry_cache(self):
+        """Called once the neighbor relations of a force calculation are established, before the forces are
+        evaluated. Nothing to do here; see `particleShear.CanvasPointsBasicElasticityLeesEdwards.open_geometry_cache`
+
+        This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
+        pass
 
     def mechanical_simulation_step_calculate_acceleration(self,cool_factor=0.97,dt=1):
         """Calculate the accelerations resulting from the forces
@@ -134,6 +341,109 @@ class CanvasPointsBasicElasticity(CanvasPointsShear):
         self.cool(cool_factor)
 
 
+    def mechanical_simulation_step_integrate(self,cool_factor=0.97,dt=1):
+        """Advance the speeds and positions over dt from the forces just calculated, with the
+        `particleShear.CanvasPointsBasicElasticity.integrator`: acceleration, then movement (Euler), or half kick,
+        movement and predicted second half kick (velocity Verlet, see
+        `particleShear.CanvasPointsBasicElasticity.set_integrator`)
+
+        This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
+        if self.integrator == INTEGRATOR_VELOCITY_VERLET:
+            offsets = self.velocity_verlet_acceleration(cool_factor=cool_factor,dt=dt)
+            self.mechanical_simulation_step_calculate_movement(dt=dt)
+            self.velocity_verlet_predict(offsets, dt)
+            return
+        self.mechanical_simulation_step_calculate_acceleration(cool_factor=cool_factor,dt=dt)
+        self.mechanical_simulation_step_calculate_movement(dt=dt)
+
+    def set_integrator(self, integrator=INTEGRATOR_EULER):
+        """Choose the integrator of `particleShear.CanvasPointsBasicElasticity.mechanical_simulation_step` and
+        `particleShear.CanvasPointsBasicElasticity.mechanical_simulation_step_integrate`
+
+        With `INTEGRATOR_EULER` (default), the speeds are updated from the forces, then the positions from the new
+        speeds. With `INTEGRATOR_VELOCITY_VERLET`, each step is split into a half kick with the forces of the previous
+        positions, the movement (drift) with the half-step speeds, and a second half kick with the forces of the new
+        positions, both for the translation and the rotation. The tangential springs
+        (`particleShear.neighbor_relation.friction_position`) are advanced during the drift with the half-step speeds,
+        consistently with the positions.\n
+        The second half kick needs the forces at the new positions, which are only calculated at the beginning of the
+        next step; in the meantime, the speeds are predicted with the forces of the old positions, so that the viscous
+        and tangential forces see speeds synchronized with the positions, and the prediction is replaced by the half
+        kick with the new forces at the next step (see `particleShear.CanvasPointsBasicElasticity.velocity_verlet_acceleration`).
+        Cooling (relative to the shear flow), the speeds imposed on the boundary spheres and the Lees-Edwards boundary
+        conditions apply as for the Euler integrator.\n
+        This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
+        self.integrator = integrator
+        self.velocity_verlet_offsets = []
+        self.velocity_verlet_spheres = []
+
+    def velocity_verlet_acceleration(self, cool_factor=0.97, dt=1):
+        """Apply the half kicks of a velocity Verlet step from the forces just calculated; return the predicted
+        changes of speed for the second half kick, [x-speed, y-speed, rotation rate] for each sphere
+
+        If the previous step was a velocity Verlet step, its prediction is replaced by the half kick with the current
+        forces, so that the speeds are updated by the forces over (previous dt + dt)/2; otherwise, the speeds are taken
+        to be synchronized with the positions and only the half kick over dt/2 is applied. The acceleration itself is
+        done by `particleShear.CanvasPointsBasicElasticity.mechanical_simulation_step_calculate_acceleration`, including
+        the cooling.\n
+        This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
+        offsets = []
+        for theSphere in self.sphereList:
+            inertia = getattr(theSphere, "inertia", 0)
+            torque = 0
+            if inertia:
+                torque = theSphere.torque * dt / 2 / inertia
+            offsets.append([theSphere.xforce * dt / 2 / theSphere.m, theSphere.yforce * dt / 2 / theSphere.m, torque])
+
+        kick_dt = dt / 2
+        if self.velocity_verlet_valid():
+            kick_dt = (self.velocity_verlet_dt + dt) / 2
+            for sphereIndex in range(len(self.sphereList)):
+                theSphere = self.sphereList[sphereIndex]
+                offset = self.velocity_verlet_offsets[sphereIndex]
+                theSphere.xspeed = theSphere.xspeed - offset[0]
+                theSphere.yspeed = theSphere.yspeed - offset[1]
+                if offset[2]:
+                    theSphere.omega = theSphere.omega - offset[2]
+
+        self.mechanical_simulation_step_calculate_acceleration(cool_factor=cool_factor, dt=kick_dt)
+        return offsets
+
+    def velocity_verlet_predict(self, offsets, dt=1):
+        """Predict the speeds at the end of a velocity Verlet step from the forces of the step, and keep the predicted
+        changes of speed to be replaced at the next step
+
+        This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
+        for sphereIndex in range(len(self.sphereList)):
+            theSphere = self.sphereList[sphereIndex]
+            offset = offsets[sphereIndex]
+            if self.canMove(theSphere):
+                theSphere.xspeed = theSphere.xspeed + offset[0]
+                theSphere.yspeed = theSphere.yspeed + offset[1]
+            else:
+                # The speed of the boundary spheres is imposed, only their rotation is integrated
+                offset[0] = 0
+                offset[1] = 0
+            if offset[2]:
+                theSphere.omega = theSphere.omega + offset[2]
+        self.velocity_verlet_offsets = offsets
+        self.velocity_verlet_spheres = [id(theSphere) for theSphere in self.sphereList]
+        self.velocity_verlet_dt = dt
+        self.velocity_verlet_t = self.t
+
+    def velocity_verlet_valid(self):
+        """Check whether the speeds still hold the prediction of the last velocity Verlet step
+
+        This is the case if the last step was a velocity Verlet step on the same spheres. Changes made to the
+        speeds in the meantime (for instance `particleShear.CanvasPoints.correct_linear_drift`) are kept.\n
+        This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
+        if self.velocity_verlet_t != self.t or len(self.velocity_verlet_spheres) != len(self.sphereList):
+            return False
+        for sphereIndex in range(len(self.sphereList)):
+            if id(self.sphereList[sphereIndex]) != self.velocity_verlet_spheres[sphereIndex]:
+                return False
+        return True
+
     def mechanical_simulation_step_calculate_movement(self,dt=1):
         """ Calculate the displacement resulting from the sphere movement
 
@@ -146,17 +456,203 @@ class CanvasPointsBasicElasticity(CanvasPointsShear):
 
 
 
-    def mechanical_relaxation(self,N=1000,cool_factor=0.97,dt=1,theTk=False,StressTensorEvaluator=False):
-        """N times repeated `particleShear.CanvasPointsBasicElasticity.mechanical_simulation_step` with graphical
-        update
+    def mechanical_relaxation(self,N=1000,cool_factor=0.97,dt=1,theTk=False,StressTensorEvaluator=False,
+                              max_force=False,max_kinetic_energy=False,check_every=10):
+        """Up to N times repeated `particleShear.CanvasPointsBasicElasticity.mechanical_simulation_step` with graphical
+        update; return the number of steps done
 
+        If max_force and/or max_kinetic_energy are given, the relaxation is checked every check_every steps and stops
+        early once the largest net force on a mobile sphere
+        (see `particleShear.CanvasPointsBasicElasticity.max_residual_force`) is below max_force and the kinetic energy
+        (see `particleShear.CanvasPointsBasicElasticity.peculiar_kinetic_energy`) is below max_kinetic_energy. Without
+        tolerances, exactly N steps are done.\n
         This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
+        check = (max_force is not False) or (max_kinetic_energy is not False)
+        check_every = max(1, int(check_every))
         for i in range(N):
+            check_step = check and ((i + 1) % check_every == 0 or i == N - 1)
+            if check_step and max_force is not False:
+                self.measure_residual_force = True
             self.mechanical_simulation_step(cool_factor,dt)
+            self.measure_residual_force = False
             if self.doDrawing:
                 theTk.update()
             if(StressTensorEvaluator):
                 self.evaluate_stress_tensors(StressTensorEvaluator)
+            if check_step:
+                if max_force is not False and self.residual_force > max_force:
+                    continue
+                if max_kinetic_energy is not False and self.peculiar_kinetic_energy() > max_kinetic_energy:
+                    continue
+                return i + 1
+        return N
+
+    def fire_relaxation(self,N=1000,dt=1,dt_max=False,theTk=False,max_force=False,max_kinetic_energy=False,
+                        check_every=10,friction_off=False,dt_min=False):
+        """Relax the ensemble with the FIRE minimizer for up to N steps; return the number of steps done
+
+        FIRE (Fast Inertial Relaxation Engine; Bitzek, E., P. Koskinen, F. Gaehler, M. Moseler and P. Gumbsch,
+        Structural relaxation made simple. Phys Rev Lett, 2006. 97(17): p. 170201) uses the forces of
+        `particleShear.CanvasPointsBasicElasticity.mechanical_simulation_step_calculate_forces` and the usual
+        acceleration and movement, but steers the velocities of the mobile spheres towards the direction of the forces
+        and adapts the time step: as long as the power F*v is positive, the time step grows up to dt_max (10*dt by
+        default); as soon as it is negative, the spheres are stopped and the time step is reduced, down to dt_min
+        (FIRE_DT_MIN times dt by default). The velocities are taken relative to the local speed of the shear flow, so
+        that Lees-Edwards boundaries under shear are supported; the rotation is steered by the torques in the same
+        way.\n
+        The stop criteria max_force, max_kinetic_energy and check_every are those of
+        `particleShear.CanvasPointsBasicElasticity.mechanical_relaxation`. With friction_off, the relaxation is done
+        with the friction coefficient mu set to 0 (restored afterwards).\n
+        This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
+        if dt_max is False or dt_max < dt:
+            dt_max = 10 * dt
+        if dt_min is False or dt_min > dt:
+            dt_min = FIRE_DT_MIN * dt
+        old_mu = getattr(self, "mu", 0)
+        if friction_off:
+            self.mu = 0
+
+        check = (max_force is not False) or (max_kinetic_energy is not False)
+        check_every = max(1, int(check_every))
+        alpha = FIRE_ALPHA_START
+        positive_steps = 0
+        steps = N
+
+        for i in range(N):
+            self.mechanical_simulation_step_calculate_forces()
+            self.record_total_particle_forces()
+
+            movable = [theSphere for theSphere in self.sphereList if self.canMove(theSphere)]
+            forces = [[theSphere.xforce, theSphere.yforce, getattr(theSphere, "torque", 0)] for theSphere in movable]
+            self.mechanical_simulation_step_calculate_acceleration(cool_factor=1, dt=dt)
+
+            power = 0
+            speed_norm = 0
+            force_norm = 0
+            omega_norm = 0
+            torque_norm = 0
+            for ind in range(len(movable)):
+                theSphere = movable[ind]
+                force = forces[ind]
+                xspeed = theSphere.xspeed - (theSphere.y - self.size_y / 2) * self.shear_rate
+                power = power + force[0] * xspeed + force[1] * theSphere.yspeed
+                speed_norm = speed_norm + xspeed * xspeed + theSphere.yspeed * theSphere.yspeed
+                force_norm = force_norm + force[0] * force[0] + force[1] * force[1]
+                if getattr(theSphere, "inertia", 0):
+                    power = power + force[2] * theSphere.omega
+                    omega_norm = omega_norm + theSphere.omega * theSphere.omega
+                    torque_norm = torque_norm + force[2] * force[2]
+
+            if power > 0:
+                # Steer the velocities towards the forces
+                speed_factor = 0
+                if force_norm > 0:
+                    speed_factor = alpha * math.sqrt(speed_norm / force_norm)
+                omega_factor = 0
+                if torque_norm > 0:
+                    omega_factor = alpha * math.sqrt(omega_norm / torque_norm)
+                for ind in range(len(movable)):
+                    theSphere = movable[ind]
+                    force = forces[ind]
+                    flow = (theSphere.y - self.size_y / 2) * self.shear_rate
+                    theSphere.xspeed = flow + (1 - alpha) * (theSphere.xspeed - flow) + speed_factor * force[0]
+                    theSphere.yspeed = (1 - alpha) * theSphere.yspeed + speed_factor * force[1]
+                    if getattr(theSphere, "inertia", 0):
+                        theSphere.omega = (1 - alpha) * theSphere.omega + omega_factor * force[2]
+                positive_steps = positive_steps + 1
+            else:
+                # Overshoot: stop the spheres relative to the shear flow
+                for theSphere in movable:
+                    theSphere.xspeed = (theSphere.y - self.size_y / 2) * self.shear_rate
+                    theSphere.yspeed = 0
+                    if getattr(theSphere, "inertia", 0):
+                        theSphere.omega = 0
+
+            self.mechanical_simulation_step_calculate_movement(dt=dt)
+            if self.doDrawing:
+                theTk.update()
+
+            if power > 0:
+                if positive_steps > FIRE_N_MIN:
+                    dt = min(dt * FIRE_F_INC, dt_max)
+                    alpha = alpha * FIRE_F_ALPHA
+            else:
+                dt = max(dt * FIRE_F_DEC, dt_min)
+                alpha = FIRE_ALPHA_START
+                positive_steps = 0
+
+            if check and ((i + 1) % check_every == 0 or i == N - 1):
+                self.residual_force = 0
+                for force in forces:
+                    self.residual_force = max(self.residual_force, math.sqrt(force[0] * force[0] + force[1] * force[1]))
+                if max_force is not False and self.residual_force > max_force:
+                    continue
+                if max_kinetic_energy is not False and self.peculiar_kinetic_energy() > max_kinetic_energy:
+                    continue
+                steps = i + 1
+                break
+
+        if friction_off:
+            self.mu = old_mu
+        return steps
+
+    def max_residual_force(self):
+        """Return the largest norm of the net force acting on a mobile sphere, once the forces of the step have been
+        calculated
+
+        This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
+        max_force = 0
+        for theSphere in self.sphereList:
+            if self.canMove(theSphere):
+                max_force = max(max_force, math.sqrt(theSphere.xforce * theSphere.xforce +
+                                                     theSphere.yforce * theSphere.yforce))
+        return max_force
+
+    def peculiar_kinetic_energy(self):
+        """Return the total kinetic energy of the mobile spheres, in mg*micrometer^2/s^2 per m of depth
+
+        The translational part is taken relative to the local speed of the shear flow (as in
+        `particleShear.PointLeesEdwards.cool`); the rotational part is included for spheres with a moment of inertia.\n
+        This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
+        energy = 0
+        for theSphere in self.sphereList:
+            if self.canMove(theSphere):
+                xspeed = theSphere.xspeed - (theSphere.y - self.size_y / 2) * self.shear_rate
+                energy = energy + theSphere.m * (xspeed * xspeed + theSphere.yspeed * theSphere.yspeed) / 2
+                inertia = getattr(theSphere, "inertia", 0)
+                if inertia:
+                    energy = energy + inertia * theSphere.omega * theSphere.omega / 2
+        return energy
+
+    def interaction_constants(self):
+        """Return the spring and viscosity constants [k, nu] of the stiffest interaction between two spheres, for the
+        relative movement of their centers along the direction of the force
+
+        This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
+        return [self.k, self.nu]
+
+    def critical_time_step(self):
+        """Return the largest time step for which the integration of the stiffest interaction between two of the
+        lightest spheres is stable, from the material parameters
+
+        With the constants [k, nu] of `particleShear.CanvasPointsBasicElasticity.interaction_constants` and the reduced
+        mass m_min/2 of two of the lightest spheres, the angular frequency is w=sqrt(2*k/m_min) and the damping ratio
+        z=nu/(2*sqrt(k*m_min/2)). The semi-implicit Euler step is stable for dt<2*(sqrt(1+z^2)-z)/w. A sphere touching
+        several others oscillates faster than a single pair, so the time step to be used is a fraction of this limit
+        (see `particleShear.Time_step_controller.set_bounds`).\n
+        This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
+        constants = self.interaction_constants()
+        k = constants[0]
+        nu = constants[1]
+        m_min = min([theSphere.m for theSphere in self.sphereList])
+        reduced_mass = m_min / 2
+        if k <= 0:
+            if nu <= 0:
+                return math.inf
+            return 2 * reduced_mass / nu
+        omega = math.sqrt(k / reduced_mass)
+        z = nu / (2 * math.sqrt(k * reduced_mass))
+        return 2 * (math.sqrt(1 + z * z) - z) / omega
 
     def set_central_repulsion_coefficient(self,central_repulsion_coefficient=0):
         """Transmit the `particleShear.CanvasPointsBasicElasticity.central_repulsion_coefficient` to the spheres.
@@ -165,3 +661,95 @@ class CanvasPointsBasicElasticity(CanvasPointsShear):
         self.central_repulsion_coefficient=central_repulsion_coefficient
         for theSphere in self.sphereList:
             theSphere.central_repulsion_coefficient=central_repulsion_coefficient
+
+    def set_verlet_skin(self, verlet_skin=0):
+        """Set the skin of the Verlet neighbor list
+
+        If verlet_skin>0, `particleShear.CanvasPointsBasicElasticity.test_neighbor_relation` keeps a list of candidate
+        pairs closer than the sum of their radii plus verlet_skin, and only tests these candidate pairs at each step.
+        The candidate list is rebuilt once the spheres may have moved enough to bring a new pair into contact
+        (see `particleShear.CanvasPointsBasicElasticity.verlet_list_needs_rebuild`); the number of rebuilds is counted
+        in `particleShear.CanvasPointsBasicElasticity.verlet_rebuild_count`.\n
+        This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
+        self.verlet_skin = verlet_skin
+        self.verlet_candidates = []
+        self.verlet_reference_spheres = []
+
+    def test_neighbor_relation(self):
+        """Instruct every sphere to test establish its geometric (and possibly permanent) neighbors.
+
+        If `particleShear.CanvasPointsBasicElasticity.verlet_skin` is 0, this is the parent method
+        `particleShear.CanvasPointsNeighbors.test_neighbor_relation`. Otherwise, only the candidate pairs of the Verlet
+        list (and the current neighbors) are tested, after rebuilding the Verlet list if needed.\n
+        This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
+        if self.verlet_skin <= 0:
+            super(CanvasPointsBasicElasticity, self).test_neighbor_relation()
+            return
+
+        if self.verlet_list_needs_rebuild():
+            self.build_verlet_list()
+
+        self.test_neighbor_relation_from_candidates(self.verlet_candidates)
+
+    def verlet_list_needs_rebuild(self):
+        """Check whether the Verlet candidate list needs to be rebuilt
+
+        This is the case if the sphere list has changed, or if the largest displacement of a sphere since the last build
+        exceeds half the skin. The displacement is evaluated modulo the periodic Lees-Edwards wrap, using
+        `particleShear.PointLeesEdwards.lee_edwards_closest_to_zero`; the change of the shear since the last build,
+        which displaces the periodic images across the y-boundary by size_y times the shear change, is added to the
+        relative displacement of the pairs.\n
+        This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
+        if len(self.verlet_reference_spheres) != len(self.sphereList):
+            return True
+
+        max_displacement = 0
+        shear_displacement = 0
+        for sphereIndex in range(len(self.sphereList)):
+            theSphere = self.sphereList[sphereIndex]
+            if id(theSphere) != self.verlet_reference_spheres[sphereIndex]:
+                return True
+            reference = self.verlet_reference_positions[sphereIndex]
+            delta_x = theSphere.x - reference[0]
+            delta_y = theSphere.y - reference[1]
+            if getattr(theSphere, "use_lees_edwards", False):
+                delta = theSphere.lee_edwards_closest_to_zero(delta_x, delta_y)
+                delta_x = delta[0]
+                delta_y = delta[1]
+                shear_displacement = max(shear_displacement,
+                                         abs(theSphere.shear - self.verlet_reference_shear) * theSphere.size_y)
+            max_displacement = max(max_displacement, math.sqrt(delta_x * delta_x + delta_y * delta_y))
+
+        # Two spheres moving towards each other by max_displacement each can approach by twice this amount
+        return 2 * max_displacement + shear_displacement > self.verlet_skin
+
+    def build_verlet_list(self):
+        """Build the Verlet candidate list
+
+        For each sphere, store the indices of the spheres closer than the sum of the radii plus
+        `particleShear.CanvasPointsBasicElasticity.verlet_skin`. The pairs are pre-selected by means of the
+        `particleShear.CanvasPointsNeighbors.cell_list` if possible.\n
+        This method is defined in class `particleShear.CanvasPointsBasicElasticity`"""
+        use_cells = self.use_cell_list and self.cell_list.build(self.sphereList,
+                                                                2 * self.max_radius() + self.verlet_skin,
+                                                                self.size_x, self.size_y)
+        self.verlet_candidates = []
+        for sphereIndex in range(len(self.sphereList)):
+            theSphere = self.sphereList[sphereIndex]
+            if use_cells:
+                pre_selection = self.cell_list.candidates(sphereIndex, getattr(theSphere, "shear", 0))
+            else:
+                pre_selection = range(len(self.sphereList))
+            candidates = []
+            for sphereIndex2 in pre_selection:
+                if sphereIndex2 != sphereIndex:
+                    theSphere2 = self.sphereList[sphereIndex2]
+                    if theSphere.d(theSphere2) < theSphere.r + theSphere2.r + self.verlet_skin:
+                        candidates.append(sphereIndex2)
+            self.verlet_candidates.append(candidates)
+
+        self.verlet_reference_positions = [[theSphere.x, theSphere.y] for theSphere in self.sphereList]
+        self.verlet_reference_spheres = [id(theSphere) for theSphere in self.sphereList]
+        if len(self.sphereList) > 0:
+            self.verlet_reference_shear = getattr(self.sphereList[0], "shear", 0)
+        self.verlet_rebuild_count = self.verlet_rebuild_count + 1
@@ -4,6 +4,7 @@ import math
 from .Force_register import Force_register
 from .Graphical_output_configuration import Graphical_output_configuration
 from .CanvasPointsBasicElasticity import CanvasPointsBasicElasticity
+from .Contact_geometry_cache import Contact_geometry_cache
 
 
 
@@ -18,6 +19,18 @@ class CanvasPointsBasicElasticityLeesEdwards(CanvasPointsBasicElasticity):
         super(CanvasPointsBasicElasticityLeesEdwards,self).__init__(size_x=size_x,size_y=size_y,
                                                                     theCanvas=theCanvas,doDrawing=doDrawing,k=k,nu=nu,m=m)
 
+        self.use_geometry_cache = False
+        """Whether the sphere methods read the contact geometry (relative vector, distance, normal vector, crossing
+        of the periodic boundary) from the step-scoped `particleShear.CanvasPointsBasicElasticityLeesEdwards.geometry_cache`
+        rather than evaluating the periodic transformation at every call.
+
+        The cache is opened once the neighbor relations of a force calculation are established, and closed when a new
+        force calculation starts, when the spheres move or when the shear changes. Positions set by hand between a
+        force calculation and the movement of the spheres are not seen by the cache."""
+        self.geometry_cache = Contact_geometry_cache()
+        """The `particleShear.Contact_geometry_cache` used if
+        `particleShear.CanvasPointsBasicElasticityLeesEdwards.use_geometry_cache` is set"""
+
 
 
     def particle_info(self):
@@ -31,6 +44,7 @@ class CanvasPointsBasicElasticityLeesEdwards(CanvasPointsBasicElasticity):
         `particleShear.CanvasPointsBasicElasticityLeesEdwards.setShearInSpheres`
 
         This method is defined in class `particleShear.CanvasPointsBasicElasticityLeesEdwards`"""
+        self.geometry_cache.close()
         self.shear=theShear
         self.setShearInSpheres()
 
@@ -86,6 +100,31 @@ class CanvasPointsBasicElasticityLeesEdwards(CanvasPointsBasicElasticity):
             theSphere.shear_rate = self.shear_rate
 
 
+    def open_geometry_cache(self):
+        """Open the `particleShear.CanvasPointsBasicElasticityLeesEdwards.geometry_cache` for the current positions of
+        the spheres if `particleShear.CanvasPointsBasicElasticityLeesEdwards.use_geometry_cache` is set
+
+        This method is defined in class `particleShear.CanvasPointsBasicElasticityLeesEdwards`"""
+        if self.use_geometry_cache:
+            self.geometry_cache.open(self.sphereList)
+        else:
+            self.geometry_cache.detach()
+
+    def reset_force_register(self):
+        """Empty the `particleShear.CanvasPointsMass.force_register` and close the geometry cache of the previous
+        force calculation
+
+        This method is defined in class `particleShear.CanvasPointsBasicElasticityLeesEdwards`"""
+        self.geometry_cache.close()
+        super(CanvasPointsBasicElasticityLeesEdwards,self).reset_force_register()
+
+    def move(self, dt=1):
+        """Close the geometry cache and move the spheres during a time period dt (in s)
+
+        This method is defined in class `particleShear.CanvasPointsBasicElasticityLeesEdwards`"""
+        self.geometry_cache.close()
+        super(CanvasPointsBasicElasticityLeesEdwards,self).move(dt)
+
     def record_individual_internal_force(self,target,source,force_vector):
         """Record individual force in the central `particleShear.CanvasPointsMass.force_register`.
 
@@ -93,15 +132,13 @@ class CanvasPointsBasicElasticityLeesEdwards(CanvasPointsBasicElasticity):
         concerned is situated across a Lees-Edwards boundary (periodicity), the function counts this
         as external rather than internal force.\n
          This method is defined in class `particleShear.CanvasPointsBasicElasticityLeesEdwards`"""
+        if not self.record_forces:
+            return
         if not self.canMove(target):
             return
         if self.canMove(source):
             # Consider only physical pairs
-            physical_distance = target.d_euclidian(source)
-
-            simulation_distance = target.d(source)
-
-            if physical_distance == simulation_distance:
+            if not target.crosses_periodic_boundary(source):
                 self.force_register.record_individual_internal_force(target,source,force_vector)
             else:
 
@@ -110,6 +147,37 @@ class CanvasPointsBasicElasticityLeesEdwards(CanvasPointsBasicElasticity):
             self.force_register.record_external_force(target,force_vector)
 
 
+    def record_pair_force(self, target, source, force_vector, crosses_boundary=False):
+        """Record a force calculated for a contact pair by a batched force kernel.
+
+        Same as `particleShear.CanvasPointsBasicElasticityLeesEdwards.record_individual_internal_force`, but
+        uses the crosses_boundary flag provided by the kernel instead of comparing the euclidian and periodic
+        distances of the pair.\n
+        This method is defined in class `particleShear.CanvasPointsBasicElasticityLeesEdwards`"""
+        if not self.record_forces:
+            return
+        if not self.canMove(target):
+            return
+        if self.canMove(source) and not crosses_boundary:
+            self.force_register.record_individual_internal_force(target, source, force_vector)
+        else:
+            self.force_register.record_external_force(target, force_vector)
+
+    def record_pair_torque(self, target, source, moment, crosses_boundary=False):
+        """Record a torque calculated for a contact pair by a batched force kernel.
+
+        Same as `particleShear.CanvasPointsBasicElasticityLeesEdwards.record_individual_internal_torque`, but
+        uses the crosses_boundary flag provided by the kernel.\n
+        This method is defined in class `particleShear.CanvasPointsBasicElasticityLeesEdwards`"""
+        if not self.record_forces:
+            return
+        if not self.canMove(target):
+            return
+        if self.canMove(source) and not crosses_boundary:
+            self.force_register.record_individual_internal_torque(target, source, moment)
+        else:
+            self.force_register.record_external_torque(target, moment)
+
     def record_individual_internal_torque(self,target,source,moment):
         """Record individual torque in the central `particleShear.CanvasPointsMass.force_register`.
 
@@ -117,15 +185,13 @@ class CanvasPointsBasicElasticityLeesEdwards(CanvasPointsBasicElasticity):
         concerned is situated across a Lees-Edwards boundary (periodicity), the function counts this
         as external rather than internal torque.\n
          This method is defined in class `particleShear.CanvasPointsBasicElasticityLeesEdwards`"""
+        if not self.record_forces:
+            return
         if not self.canMove(target):
             return
         if self.canMove(source):
             # Consider only physical pairs
-            physical_distance = target.d_euclidian(source)
-
-            simulation_distance = target.d(source)
-
-            if physical_distance == simulation_distance:
+            if not target.crosses_periodic_boundary(source):
                 self.force_register.record_individual_internal_torque(target,source,moment)
             else:
 
@@ -3,6 +3,9 @@ import random
 import math
 from .CanvasPointsBasicElasticityLeesEdwards import CanvasPointsBasicElasticityLeesEdwards
 from .Force_register import Force_register
+from .CircleBasicElasticity import CircleBasicElasticity
+from .Contact_table import INTERFACE_STICK, INTERFACE_SLIP
+from .CanvasPointsBasicElasticity import INTEGRATOR_EULER
 
 class CanvasPointsFrictionElasticityLeesEdwards(CanvasPointsBasicElasticityLeesEdwards):
     """Canvas for placing `particleShear.CircleFrictionElasticity` objects (referred to as spheres).
@@ -40,6 +43,14 @@ class CanvasPointsFrictionElasticityLeesEdwards(CanvasPointsBasicElasticityLeesE
         """`nu_t` Central viscosity force constant in (mg/s)/m of depth."""
         self.mu=mu
         """`mu` Friction coefficient"""
+        self.single_pass_forces = False
+        """Whether to calculate all contact forces in a single pass over the unique contact pairs
+        (`particleShear.CanvasPointsFrictionElasticityLeesEdwards.pair_force_kernel`) rather than by the sphere
+        methods or the separate contact kernels"""
+        self.respa_substeps = 1
+        """Number of sub-steps of the stiff interactions per step of
+        `particleShear.CanvasPointsFrictionElasticityLeesEdwards.mechanical_simulation_step`; 1 for a single time step,
+        see `particleShear.CanvasPointsFrictionElasticityLeesEdwards.set_respa_substeps`"""
 
     def particle_info(self):
         return "CanvaPointsFrictionElasticityLeesEdwards: Lees Edwards boundary conditions and stick-and-slip type friction"
@@ -72,6 +83,307 @@ class CanvasPointsFrictionElasticityLeesEdwards(CanvasPointsBasicElasticityLeesE
         for sphereIndex in range(len(self.sphereList)):
             self.sphereList[sphereIndex].tangential_force_from_neighbors(self.nu_t,self.mu,self.k,self.k_t)
 
+    def tangential_force_kernel(self):
+        """Calculate and apply the tangential (friction) forces for all the contacts in one batched pass.
+
+        This is the counterpart of `particleShear.CanvasPointsFrictionElasticityLeesEdwards.tangential_force_from_neighbors`
+        operating on the pair arrays of the `particleShear.CanvasPointsBasicElasticity.contact_table`, which needs to
+        be built beforehand. The interface state of each contact is read into the integer codes
+        `particleShear.Contact_table.interface_code` and the friction position arrays
+        `particleShear.Contact_table.friction_position_ij` and `particleShear.Contact_table.friction_position_ji`.
+        As in `particleShear.CircleFrictionElasticity.tangential_force`, the contact is evaluated from the point of view
+        of both spheres in turn (lower index first), each with its own friction position: the adherence force (viscous
+        and elastic part) is capped by mu times the central elastic force (Coulomb criterion), which decides between
+        stick and slip, slipping interfaces losing their friction position on both sides. The mean of the two forces
+        is then applied at once, with the compensating torques of
+        `particleShear.CircleFrictionElasticity.distribute_tangential_couple`, so that linear and angular momentum are
+        conserved exactly, and the new interface state is written back to both neighbor relations of the pair.\n
+        Permanent links, one-sided relations, and ensembles whose spheres do not share the same boundary conditions are
+        handled by the sphere methods, unless the permanent links are treated by a bond kernel (see
+        `particleShear.CanvasPointsBasicElasticity.bond_kernel_handles`).\n
+        This method is defined in class `particleShear.CanvasPointsFrictionElasticityLeesEdwards`"""
+
+        table = self.contact_table
+        spheres = self.sphereList
+
+        if not table.uniform:
+            self.tangential_force_from_neighbors()
+            return
+
+        if not table.geometry_evaluated:
+            table.evaluate_geometry(self.state_sequence("x"), self.state_sequence("y"),
+                                    self.state_sequence("xspeed"), self.state_sequence("yspeed"))
+        table.read_contact_state()
+
+        r = self.state_sequence("r")
+        omega = self.state_sequence("omega")
+        repulsion = [theSphere.central_repulsion_coefficient for theSphere in spheres]
+
+        xforce = [0.0] * len(spheres)
+        yforce = [0.0] * len(spheres)
+        torque = [0.0] * len(spheres)
+
+        force_law = CircleBasicElasticity.call_back_elastic_force_law
+        k = self.k
+        k_t = self.k_t
+        nu_t = self.nu_t
+        mu = self.mu
+
+        index_i = table.index_i
+        index_j = table.index_j
+        permanent = table.permanent
+        distance = table.distance
+        normal_x = table.normal_x
+        normal_y = table.normal_y
+        vx_rel = table.vx_rel
+        vy_rel = table.vy_rel
+        crosses_boundary = table.crosses_boundary
+        interface_code = table.interface_code
+        friction_position_ij = table.friction_position_ij
+        friction_position_ji = table.friction_position_ji
+
+        updated_rows = []
+
+        for row in range(len(index_i)):
+            i = index_i[row]
+            j = index_j[row]
+
+            if permanent[row]:
+                if self.bond_kernel_handles(spheres[i], spheres[j]):
+                    continue
+                spheres[i].tangential_force(spheres[j], nu_t, mu, k, k_t)
+                spheres[j].tangential_force(spheres[i], nu_t, mu, k, k_t)
+                continue
+
+            d = distance[row]
+            d0 = r[i] + r[j]
+            if d >= d0:
+                continue
+
+            # Tangential vector, counter-clockwise with respect to the normal pointing from i to j
+            t_x = -normal_y[row]
+            t_y = normal_x[row]
+            viscous_force = nu_t * (vx_rel[row] * t_x + vy_rel[row] * t_y - (r[i] * omega[i] + r[j] * omega[j]))
+
+            # Point of view of sphere i
+            total_adherence_force = viscous_force + k_t * friction_position_ij[row]
+            friction_force = abs(force_law(d, d0, k, repulsion[i]) * mu)
+            if abs(total_adherence_force) <= friction_force:
+                force_i = total_adherence_force
+            else:
+                friction_position_ij[row] = 0
+                friction_position_ji[row] = 0
+                force_i = friction_force if total_adherence_force >= 0 else -friction_force
+
+            # Point of view of sphere j: same tangential speed, opposite tangential vector
+            total_adherence_force = viscous_force + k_t * friction_position_ji[row]
+            if repulsion[j] != repulsion[i]:
+                friction_force = abs(force_law(d, d0, k, repulsion[j]) * mu)
+            if abs(total_adherence_force) <= friction_force:
+                interface_code[row] = INTERFACE_STICK
+                force_j = total_adherence_force
+            else:
+                interface_code[row] = INTERFACE_SLIP
+                friction_position_ij[row] = 0
+                friction_position_ji[row] = 0
+                force_j = friction_force if total_adherence_force >= 0 else -friction_force
+            updated_rows.append(row)
+
+            # Force on sphere i along the tangential vector (the force on j is opposite)
+            force = (force_i + force_j) / 2
+            force_x = force * t_x
+            force_y = force * t_y
+            torque_i = d * force * r[i] / d0
+            torque_j = d * force * r[j] / d0
+
+            xforce[i] = xforce[i] + force_x
+            yforce[i] = yforce[i] + force_y
+            xforce[j] = xforce[j] - force_x
+            yforce[j] = yforce[j] - force_y
+            torque[i] = torque[i] + torque_i
+            torque[j] = torque[j] + torque_j
+
+            self.record_pair_force(spheres[i], spheres[j], [force_x, force_y], crosses_boundary[row])
+            self.record_pair_force(spheres[j], spheres[i], [-force_x, -force_y], crosses_boundary[row])
+            self.record_pair_torque(spheres[i], spheres[j], torque_i, crosses_boundary[row])
+            self.record_pair_torque(spheres[j], spheres[i], torque_j, crosses_boundary[row])
+
+        table.write_contact_state(updated_rows)
+
+        for sphereIndex, theNeighbor in table.one_sided:
+            spheres[sphereIndex].tangential_force(theNeighbor.theSphere, nu_t, mu, k, k_t)
+
+        self.add_forces(xforce, yforce)
+        self.add_torques(torque)
+
+    def pair_force_kernel(self):
+        """Calculate and apply the central and tangential forces of all contacts in a single pass over the unique pairs
+
+        The contributions of `particleShear.CanvasPointsBasicElasticity.central_force_kernel` (central elastic and
+        viscous force) and `particleShear.CanvasPointsFrictionElasticityLeesEdwards.tangential_force_kernel`
+        (stick-and-slip friction) are calculated together for every pair of the
+        `particleShear.CanvasPointsBasicElasticity.contact_table`, which needs to be built beforehand. The geometry is
+        evaluated once, the central elastic force also serves as the friction limit, and the total force on each
+        sphere of the pair is applied and recorded in one go, together with the torques.
+        The results are the same as with the separate kernels.\n
+        Permanent links, one-sided relations, and ensembles whose spheres do not share the same boundary conditions are
+        handled by the sphere methods, unless the permanent links are treated by a bond kernel (see
+        `particleShear.CanvasPointsBasicElasticity.bond_kernel_handles`).\n
+        This method is defined in class `particleShear.CanvasPointsFrictionElasticityLeesEdwards`"""
+
+        table = self.contact_table
+        spheres = self.sphereList
+
+        if not table.uniform:
+            self.elastic_force_from_neighbors()
+            self.central_viscous_force_from_neighbors()
+            self.tangential_force_from_neighbors()
+            return
+
+        if not table.geometry_evaluated:
+            table.evaluate_geometry(self.state_sequence("x"), self.state_sequence("y"),
+                                    self.state_sequence("xspeed"), self.state_sequence("yspeed"))
+        table.read_contact_state()
+
+        r = self.state_sequence("r")
+        omega = self.state_sequence("omega")
+        repulsion = [theSphere.central_repulsion_coefficient for theSphere in spheres]
+
+        xforce = [0.0] * len(spheres)
+        yforce = [0.0] * len(spheres)
+        torque = [0.0] * len(spheres)
+
+        force_law = CircleBasicElasticity.call_back_elastic_force_law
+        k = self.k
+        nu = self.nu
+        k_t = self.k_t
+        nu_t = self.nu_t
+        mu = self.mu
+
+        index_i = table.index_i
+        index_j = table.index_j
+        permanent = table.permanent
+        distance = table.distance
+        normal_x = table.normal_x
+        normal_y = table.normal_y
+        vx_rel = table.vx_rel
+        vy_rel = table.vy_rel
+        crosses_boundary = table.crosses_boundary
+        interface_code = table.interface_code
+        friction_position_ij = table.friction_position_ij
+        friction_position_ji = table.friction_position_ji
+
+        updated_rows = []
+
+        for row in range(len(index_i)):
+            i = index_i[row]
+            j = index_j[row]
+
+            if permanent[row]:
+                if self.bond_kernel_handles(spheres[i], spheres[j]):
+                    continue
+                for theSphere, otherSphere in [(spheres[i], spheres[j]), (spheres[j], spheres[i])]:
+                    theSphere.elastic_force(otherSphere, k)
+                    theSphere.central_viscous_force(otherSphere, nu)
+                for theSphere, otherSphere in [(spheres[i], spheres[j]), (spheres[j], spheres[i])]:
+                    theSphere.tangential_force(otherSphere, nu_t, mu, k, k_t)
+                continue
+
+            d = distance[row]
+            n_x = normal_x[row]
+            n_y = normal_y[row]
+            d0 = r[i] + r[j]
+
+            # Central force along n, on sphere i (force_i) and on sphere j (-force_j)
+            force_i = nu * (vx_rel[row] * n_x + vy_rel[row] * n_y)
+            force_j = force_i
+
+            if d < d0:
+                elastic_i = force_law(d, d0, k, repulsion[i])
+                if repulsion[j] == repulsion[i]:
+                    elastic_j = elastic_i
+                else:
+                    elastic_j = force_law(d, d0, k, repulsion[j])
+                force_i = force_i + elastic_i
+                force_j = force_j + elastic_j
+
+                # Tangential force along t, on sphere i (the force on j is opposite)
+                t_x = -n_y
+                t_y = n_x
+                viscous_force = nu_t * (vx_rel[row] * t_x + vy_rel[row] * t_y - (r[i] * omega[i] + r[j] * omega[j]))
+
+                total_adherence_force = viscous_force + k_t * friction_position_ij[row]
+                friction_force = abs(elastic_i * mu)
+                if abs(total_adherence_force) <= friction_force:
+                    tangential_i = total_adherence_force
+                else:
+                    friction_position_ij[row] = 0
+                    friction_position_ji[row] = 0
+                    tangential_i = friction_force if total_adherence_force >= 0 else -friction_force
+
+                total_adherence_force = viscous_force + k_t * friction_position_ji[row]
+                friction_force = abs(elastic_j * mu)
+                if abs(total_adherence_force) <= friction_force:
+                    interface_code[row] = INTERFACE_STICK
+                    tangential_j = total_adherence_force
+                else:
+                    interface_code[row] = INTERFACE_SLIP
+                    friction_position_ij[row] = 0
+                    friction_position_ji[row] = 0
+                    tangential_j = friction_force if total_adherence_force >= 0 else -friction_force
+                updated_rows.append(row)
+
+                tangential = (tangential_i + tangential_j) / 2
+                torque_i = d * tangential * r[i] / d0
+                torque_j = d * tangential * r[j] / d0
+                torque[i] = torque[i] + torque_i
+                torque[j] = torque[j] + torque_j
+                self.record_pair_torque(spheres[i], spheres[j], torque_i, crosses_boundary[row])
+                self.record_pair_torque(spheres[j], spheres[i], torque_j, crosses_boundary[row])
+
+                force_x_i = force_i * n_x + tangential * t_x
+                force_y_i = force_i * n_y + tangential * t_y
+                force_x_j = -force_j * n_x - tangential * t_x
+                force_y_j = -force_j * n_y - tangential * t_y
+            else:
+                force_x_i = force_i * n_x
+                force_y_i = force_i * n_y
+                force_x_j = -force_j * n_x
+                force_y_j = -force_j * n_y
+
+            xforce[i] = xforce[i] + force_x_i
+            yforce[i] = yforce[i] + force_y_i
+            xforce[j] = xforce[j] + force_x_j
+            yforce[j] = yforce[j] + force_y_j
+
+            self.record_pair_force(spheres[i], spheres[j], [force_x_i, force_y_i], crosses_boundary[row])
+            self.record_pair_force(spheres[j], spheres[i], [force_x_j, force_y_j], crosses_boundary[row])
+
+        table.write_contact_state(updated_rows)
+
+        for sphereIndex, theNeighbor in table.one_sided:
+            spheres[sphereIndex].elastic_force(theNeighbor.theSphere, k)
+            spheres[sphereIndex].central_viscous_force(theNeighbor.theSphere, nu)
+            spheres[sphereIndex].tangential_force(theNeighbor.theSphere, nu_t, mu, k, k_t)
+
+        self.add_forces(xforce, yforce)
+        self.add_torques(torque)
+
+    def add_torques(self, torque):
+        """Add the torques given as a per-sphere list to the net torques acting on the spheres
+
+        Writes directly to the `particleShear.CanvasPoints.state_arrays` if enabled.\n
+        This method is defined in class `particleShear.CanvasPointsFrictionElasticityLeesEdwards`"""
+        state = self.current_state_arrays()
+        if state:
+            state_torque = state.torque
+            for sphereIndex in range(len(torque)):
+                state_torque[sphereIndex] = state_torque[sphereIndex] + torque[sphereIndex]
+        else:
+            for sphereIndex in range(len(torque)):
+                theSphere = self.sphereList[sphereIndex]
+                theSphere.torque = theSphere.torque + torque[sphereIndex]
+
     def do_rotational_acceleration(self, dt):
         """Have the spheres calculate their rotational acceleration from the tangential forces.
 
@@ -82,13 +394,105 @@ class CanvasPointsFrictionElasticityLeesEdwards(CanvasPointsBasicElasticityLeesE
         for theSphere in self.sphereList:
             theSphere.do_rotational_acceleration(dt)
 
+    def interaction_constants(self):
+        """Return the spring and viscosity constants [k, nu] of the stiffest interaction between two spheres, for the
+        relative movement of their centers along the direction of the force
+
+        The tangential force also turns the spheres: for two equal disks, the tangential displacement of the contact
+        point responds three times as much to a force as the distance of the centers, so the tangential constants
+        count three times.\n
+        This method is defined in class `particleShear.CanvasPointsFrictionElasticityLeesEdwards`"""
+        constants = super(CanvasPointsFrictionElasticityLeesEdwards, self).interaction_constants()
+        return [max(constants[0], 3 * self.k_t), max(constants[1], 3 * self.nu_t)]
+
+
+    def set_respa_substeps(self, substeps=1):
+        """Choose the number of sub-steps of the stiff interactions per step (multiple time step integration)
+
+        With substeps>1, the interactions provided by
+        `particleShear.CanvasPointsFrictionElasticityLeesEdwards.respa_fast_forces` are integrated with the time step
+        dt/substeps, while the neighbor detection, the friction, the other (soft) forces and the recording of the
+        forces for the stress evaluation remain at the time step dt of the step. This follows the impulse form of the
+        r-RESPA scheme (Tuckerman, Berne and Martyna, J Chem Phys 97, 1990 (1992)): the speeds are first updated over dt
+        by the soft forces, then substeps times by the stiff forces over dt/substeps followed by the movement over
+        dt/substeps, the stiff forces being re-evaluated at each sub-step. The stiff forces are part of the forces
+        calculated at the beginning of the step, from which they are subtracted for the update by the soft forces.
+        The cooling is applied once at the end of the step, to the speeds updated by all forces.\n
+        There are no stiff interactions at this level, so the step is then the usual one; see
+        `particleShear.CanvasPointsLinkable.respa_fast_forces`. The multiple time step integration applies with the
+        Euler integrator only.\n
+        This method is defined in class `particleShear.CanvasPointsFrictionElasticityLeesEdwards`"""
+        self.respa_substeps = max(1, int(substeps))
+
+    def respa_fast_forces(self):
+        """Return the forces and torques of the stiff interactions at the current positions as per-sphere lists
+        [xforce, yforce, torque], or False if there are none to sub-cycle
+
+        The forces are not applied to the spheres nor recorded. Always False here.\n
+        This method is defined in class `particleShear.CanvasPointsFrictionElasticityLeesEdwards`"""
+        return False
+
+    def respa_kick(self, xforce, yforce, torque, dt):
+        """Change the speeds of the spheres by the given per-sphere forces and torques acting during dt
+
+        The speeds of the immobile spheres are imposed, so only their rotation changes.\n
+        This method is defined in class `particleShear.CanvasPointsFrictionElasticityLeesEdwards`"""
+        for sphereIndex in range(len(self.sphereList)):
+            theSphere = self.sphereList[sphereIndex]
+            if self.canMove(theSphere):
+                theSphere.xspeed = theSphere.xspeed + xforce[sphereIndex] * dt / theSphere.m
+                theSphere.yspeed = theSphere.yspeed + yforce[sphereIndex] * dt / theSphere.m
+            inertia = getattr(theSphere, "inertia", 0)
+            if inertia:
+                theSphere.omega = theSphere.omega + torque[sphereIndex] * dt / inertia
+
+    def mechanical_simulation_step_integrate(self, cool_factor=0.97, dt=1):
+        """Advance the speeds and positions over dt from the forces just calculated
+
+        As `particleShear.CanvasPointsBasicElasticity.mechanical_simulation_step_integrate`, with the stiff interactions
+        sub-cycled if `particleShear.CanvasPointsFrictionElasticityLeesEdwards.respa_substeps` is larger than 1 (see
+        `particleShear.CanvasPointsFrictionElasticityLeesEdwards.set_respa_substeps`).\n
+        This method is defined in class `particleShear.CanvasPointsFrictionElasticityLeesEdwards`"""
+        fast_forces = False
+        if self.respa_substeps > 1 and self.integrator == INTEGRATOR_EULER:
+            fast_forces = self.respa_fast_forces()
+        if fast_forces is False:
+            super(CanvasPointsFrictionElasticityLeesEdwards, self).mechanical_simulation_step_integrate(
+                cool_factor=cool_factor, dt=dt)
+            return
+
+        # Update by the soft forces over dt: the stiff ones are taken out of the forces just calculated. Cooling is left
+        # to the end of the step, as the stiff forces are large and mostly balanced by the soft ones, so that cooling
+        # only the soft update would leave a large net change of speed
+        self.respa_kick([-value for value in fast_forces[0]], [-value for value in fast_forces[1]],
+                        [-value for value in fast_forces[2]], dt)
+        self.mechanical_simulation_step_calculate_acceleration(cool_factor=1, dt=dt)
+
+        substep_dt = dt / self.respa_substeps
+        for substep in range(self.respa_substeps):
+            if substep > 0:
+                fast_forces = self.respa_fast_forces()
+            self.respa_kick(fast_forces[0], fast_forces[1], fast_forces[2], substep_dt)
+            self.mechanical_simulation_step_calculate_movement(dt=substep_dt)
+        self.cool(cool_factor)
 
     def mechanical_simulation_step_calculate_forces(self,dt=1):
+        if self.single_pass_forces:
+            self.reset_force_register()
+            self.test_neighbor_relation()
+            self.open_geometry_cache()
+            self.contact_table.build(self.sphereList)
+            self.pair_force_kernel()
+            return
         super(CanvasPointsFrictionElasticityLeesEdwards,self).mechanical_simulation_step_calculate_forces()
-        self.tangential_force_from_neighbors()
+        if self.use_contact_kernels:
+            self.tangential_force_kernel()
+        else:
+            self.tangential_force_from_neighbors()
 
     def record_total_particle_forces(self):
-
+        if not self.record_forces:
+            return
         super(CanvasPointsFrictionElasticityLeesEdwards,self).record_total_particle_forces()
 
         for theSphere in self.sphereList:
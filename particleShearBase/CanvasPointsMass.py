@@ -29,6 +29,11 @@ class CanvasPointsMass(CanvasPoints):
         self.force_register = Force_register()
         """The `particleShear.Force_register` to store the forces acting on the particles"""
 
+        self.record_forces = True
+        """Whether the forces of the current step are recorded in the `particleShear.CanvasPointsMass.force_register`.
+        Set to False for steps whose stress is not evaluated; the forces still act on the spheres, but the recording
+        methods return immediately"""
+
         self.m=m
         """The mass (identical) for each of the spheres"""
 
@@ -39,8 +44,21 @@ class CanvasPointsMass(CanvasPoints):
     def reset_force_register(self):
         """Empty the `particleShear.CanvasPointsMass.force_register`
 
+        The spheres of the `particleShear.CanvasPoints.sphereList` keep the first slots of the register, the others
+        are released (see `particleShear.Force_register.number_spheres`).\n
         This method is defined in class `particleShear.CanvasPointsMass`"""
-        self.force_register.reset_force_register()
+        self.force_register.reset_force_register(self.sphereList)
+
+    def set_stress_accumulation(self, accumulate_stress=True):
+        """Switch the `particleShear.CanvasPointsMass.force_register` to or from accumulation mode
+
+        In accumulation mode, the forces and torques recorded during a step are summed directly into the running
+        stress tensors of the register instead of being stored individually (see
+        `particleShear.Force_register.accumulate_stress`). The register is emptied.\n
+        This method is defined in class `particleShear.CanvasPointsMass`"""
+        self.force_register.accumulate_stress = accumulate_stress
+        self.force_register.reset_accumulated_stress()
+        self.reset_force_register()
 
     def record_individual_internal_force(self,target,source,force_vector):
         """Record a force in the `particleShear.CanvasPointsMass.force_register`.
@@ -50,6 +68,8 @@ class CanvasPointsMass(CanvasPoints):
         external forces acting from immobilized boundary spheres and re-reroutes the call to
         `particleShear.CanvasPointsMass.record_external_force`.\n
         This method is defined in class `particleShear.CanvasPointsMass`"""
+        if not self.record_forces:
+            return
         if not self.canMove(target): # Sphere moved by boundary conditions with unknown force
             return
         if self.canMove(source):  # running internal spheres moving freely
@@ -57,6 +77,23 @@ class CanvasPointsMass(CanvasPoints):
         else:
             self.record_external_force(target, force_vector)
 
+    def record_pair_force(self, target, source, force_vector, crosses_boundary=False):
+        """Record a force calculated for a contact pair by a batched force kernel.
+
+        The kernels know whether the contact crosses a periodic boundary, which allows subclasses to avoid
+        re-evaluating the geometry of the pair. Here, this is simply
+        `particleShear.CanvasPointsMass.record_individual_internal_force`.\n
+        This method is defined in class `particleShear.CanvasPointsMass`"""
+        self.record_individual_internal_force(target, source, force_vector)
+
+    def record_pair_torque(self, target, source, moment, crosses_boundary=False):
+        """Record a torque calculated for a contact pair by a batched force kernel.
+
+        Counterpart of `particleShear.CanvasPointsMass.record_pair_force` for torques; here, this is simply
+        `particleShear.CanvasPointsMass.record_individual_internal_torque`.\n
+        This method is defined in class `particleShear.CanvasPointsMass`"""
+        self.record_individual_internal_torque(target, source, moment)
+
     def record_individual_internal_torque(self, target, source, moment):
         """Record a torque in the `particleShear.CanvasPointsMass.force_register`.
 
@@ -65,6 +102,8 @@ class CanvasPointsMass(CanvasPoints):
         external torques acting from immobilized boundary spheres and re-reroutes the call to
         `particleShear.CanvasPointsMass.record_external_torque`.\n
         This method is defined in class `particleShear.CanvasPointsMass`"""
+        if not self.record_forces:
+            return
 
         if not self.canMove(target):  # Sphere moved by boundary conditions with unknown force
             return
@@ -75,6 +114,8 @@ class CanvasPointsMass(CanvasPoints):
 
 
     def record_total_particle_forces(self):
+        if not self.record_forces:
+            return
         for theSphere in self.sphereList:
             force_vector = [theSphere.xforce, theSphere.yforce]
             self.record_total_particle_force(theSphere,force_vector)
@@ -87,6 +128,8 @@ class CanvasPointsMass(CanvasPoints):
            Only forces resulting in actual motion (i.e. acting on mobile
            spheres, see `particleShear.CanvasPoints.canMove`) are accounted for.\n
            This method is defined in class `particleShear.CanvasPointsMass`"""
+        if not self.record_forces:
+            return
         if not self.canMove(target):
             return
         self.force_register.record_total_particle_force(target,force_vector)
@@ -97,6 +140,8 @@ class CanvasPointsMass(CanvasPoints):
             Only forces resulting in actual motion (i.e. acting on mobile
             spheres, see `particleShear.CanvasPoints.canMove`) are accounted for.\n
             This method is defined in class `particleShear.CanvasPointsMass`"""
+        if not self.record_forces:
+            return
         if not self.canMove(target):
             return
         self.force_register.record_external_force(target, force_vector)
@@ -107,6 +152,8 @@ class CanvasPointsMass(CanvasPoints):
         Only torques resulting in actual motion (i.e. acting on mobile
         spheres, see `particleShear.CanvasPoints.canMove`) are accounted for.\n
         This method is defined in class `particleShear.CanvasPointsMass`"""
+        if not self.record_forces:
+            return
 
         if not self.canMove(target):
             return
@@ -118,6 +165,8 @@ class CanvasPointsMass(CanvasPoints):
             Only forces resulting in actual motion (i.e. acting on mobile
             spheres, see `particleShear.CanvasPoints.canMove`) are accounted for.\n
             This method is defined in class `particleShear.CanvasPointsMass`"""
+        if not self.record_forces:
+            return
         if not self.canMove(target):
             return
 
@@ -4,6 +4,7 @@ import math
 from .Force_register import Force_register
 from .Graphical_output_configuration import Graphical_output_configuration
 from .CanvasPointsMass import CanvasPointsMass
+from .Neighbor_cell_list import Neighbor_cell_list
 
 
 class CanvasPointsNeighbors(CanvasPointsMass):
@@ -15,6 +16,12 @@ class CanvasPointsNeighbors(CanvasPointsMass):
 
         super(CanvasPointsNeighbors,self).__init__(size_x=size_x,size_y=size_y,theCanvas=theCanvas,doDrawing=doDrawing,m=m)
 
+        self.use_cell_list = True
+        """Whether to use a `particleShear.Neighbor_cell_list` for finding the candidate neighbors rather than
+        testing all pairs of spheres"""
+
+        self.cell_list = Neighbor_cell_list()
+        """The `particleShear.Neighbor_cell_list` used for contact detection"""
 
 
 
@@ -25,7 +32,50 @@ class CanvasPointsNeighbors(CanvasPointsMass):
         """Instruct every sphere to test establish its geometric (and possibly permanent) neighbors.
 
         This function calls `particleShear.CircleMassNeighbors.test_neighbor_relation` on each member of the
-        `particleShear.CanvasPoints.sphereList`.\n
+        `particleShear.CanvasPoints.sphereList`. If `particleShear.CanvasPointsNeighbors.use_cell_list` is set,
+        only the spheres in adjacent cells of the `particleShear.CanvasPointsNeighbors.cell_list` and the spheres
+        already listed as neighbors (this includes permanent links) are tested, in the order of the
+        `particleShear.CanvasPoints.sphereList`. This gives the same neighbor lists as
+        `particleShear.CanvasPointsNeighbors.test_neighbor_relation_all_pairs`, but in linear rather than
+        quadratic time.\n
+         This method is defined in class `particleShear.CanvasPointsNeighbors`"""
+
+        if not self.use_cell_list or not self.cell_list.build(self.sphereList, 2 * self.max_radius(),
+                                                              self.size_x, self.size_y):
+            self.test_neighbor_relation_all_pairs()
+            return
+
+        self.test_neighbor_relation_from_candidates(
+            [self.cell_list.candidates(sphereIndex, getattr(self.sphereList[sphereIndex], "shear", 0))
+             for sphereIndex in range(len(self.sphereList))])
+
+    def test_neighbor_relation_from_candidates(self, candidate_lists):
+        """Instruct every sphere to test the given candidate spheres as well as its current neighbors.
+
+        candidate_lists holds, for each sphere in `particleShear.CanvasPoints.sphereList`, a list of indices of
+        candidate spheres. The spheres already listed as neighbors are always tested as well, such that relations
+        to spheres that have moved away are updated (or kept, for permanent links). The candidates are tested in
+        increasing index order, as in `particleShear.CanvasPointsNeighbors.test_neighbor_relation_all_pairs`\n
+         This method is defined in class `particleShear.CanvasPointsNeighbors`"""
+
+        sphere_index = self.sphere_index_map()
+
+        for sphereIndex in range(len(self.sphereList)):
+            theSphere = self.sphereList[sphereIndex]
+            candidates = set(candidate_lists[sphereIndex])
+            for theNeighbor in theSphere.neighbors:
+                neighborIndex = sphere_index.get(id(theNeighbor.theSphere))
+                if neighborIndex is not None:
+                    candidates.add(neighborIndex)
+            candidates.discard(sphereIndex)
+            for sphereIndex2 in sorted(candidates):
+                theSphere.test_neighbor_relation(self.sphereList[sphereIndex2])
+
+    def test_neighbor_relation_all_pairs(self):
+        """Instruct every sphere to test all other spheres as potential neighbors.
+
+        This is the quadratic reference implementation of
+        `particleShear.CanvasPointsNeighbors.test_neighbor_relation`\n
          This method is defined in class `particleShear.CanvasPointsNeighbors`"""
         for sphereIndex in range(len(self.sphereList)):
             for sphereIndex2 in range(len(self.sphereList)):
@@ -35,10 +85,22 @@ class CanvasPointsNeighbors(CanvasPointsMass):
                         self.sphereList[sphereIndex2]
                     )
 
+    def max_radius(self):
+        """Return the largest radius among the spheres in `particleShear.CanvasPoints.sphereList`
 
+         This method is defined in class `particleShear.CanvasPointsNeighbors`"""
+        r_max = 0
+        for theSphere in self.sphereList:
+            if theSphere.r > r_max:
+                r_max = theSphere.r
+        return r_max
 
+    def sphere_index_map(self):
+        """Return a dictionary mapping the id of each sphere to its index in `particleShear.CanvasPoints.sphereList`
 
-
-
-
+         This method is defined in class `particleShear.CanvasPointsNeighbors`"""
+        sphere_index = {}
+        for sphereIndex in range(len(self.sphereList)):
+            sphere_index[id(self.sphereList[sphereIndex])] = sphereIndex
+        return sphere_index
 
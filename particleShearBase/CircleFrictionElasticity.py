@@ -327,14 +327,8 @@ class CircleFrictionElasticity(CircleBasicElasticity):
         pos=theSphere.coordinates()
         r=pos[2]
         if d < r + self.r:
-            found = FALSE
-            foundNeighborIndex = -1
-            for theNeighborIndex in range(len(self.neighbors)):
-                theNeighbor = self.neighbors[theNeighborIndex]
-                if (theSphere == theNeighbor.theSphere):
-                    foundNeighborIndex = theNeighborIndex
-                    found = TRUE
-            if not found:
+            foundNeighborIndex = self.findNeighborIndex(theSphere)
+            if foundNeighborIndex < 0:
                 print("Problem with neighbors, found touching sphere not in neighbors list")
             else:
 
@@ -22,6 +22,9 @@ class CircleMassNeighbors(CircleMass):
 
         self.neighbors = []
         """The list of neighbors, of class `particleShear.neighbor_relation` (or subclass)"""
+        self.neighbor_index = {}
+        """Position of each relation in `particleShear.CircleMassNeighbors.neighbors`, by key of the partner sphere
+        (see `particleShear.CircleMassNeighbors.neighbor_key`)"""
 
         super(CircleMassNeighbors,self).__init__(color,x,y,diameter,m=m, theCanvas=theCanvas, doDrawing=doDrawing,
                                                  force_register=force_register,use_lees_edwards=use_lees_edwards)
@@ -145,19 +148,14 @@ class CircleMassNeighbors(CircleMass):
 
 
         # Regardless of the distance, first check whether we find the sphere in the neighbors list
-        found = FALSE
-        foundNeighborIndex=-1
-        for theNeighborIndex in range(len(self.neighbors)):
-            theNeighbor = self.neighbors[theNeighborIndex]
-            if (theSphere == theNeighbor.theSphere):
-                foundNeighborIndex = theNeighborIndex
-                found = TRUE
+        foundNeighborIndex = self.findNeighborIndex(theSphere)
+        found = foundNeighborIndex >= 0
 
         if not is_neighbor: #If the sphere is not a neighbor (anymore)
             if found: #It was previously a neighbor, but no more, so delete it from the neighbors list
                 if self.doDrawing:
                     self.deleteNeighborDrawing()
-                del self.neighbors[foundNeighborIndex]
+                self.remove_neighbor(foundNeighborIndex)
                 if self.doDrawing:
                     self.initiateNeighborDrawing()
         if is_neighbor:
@@ -165,19 +163,67 @@ class CircleMassNeighbors(CircleMass):
                 info = neighbor_relation(0,"stick",theSphere)
                 if self.doDrawing:
                     self.deleteNeighborDrawing()
-                self.neighbors.append(info)
+                self.add_neighbor(info)
                 if self.doDrawing:
                     self.initiateNeighborDrawing()
 
 
 
     def findNeighborIndex(self, theSphere):
-        """Return whether theSphere is among the currently listed `particleShear.CircleMassNeighbors.neighbors`"""
+        """Return the position of theSphere in the currently listed `particleShear.CircleMassNeighbors.neighbors`,
+        -1 if it is not a neighbor
+
+        The lookup goes through the `particleShear.CircleMassNeighbors.neighbor_index`, which is rebuilt if the
+        neighbor list has been modified without going through `particleShear.CircleMassNeighbors.add_neighbor` and
+        `particleShear.CircleMassNeighbors.remove_neighbor`.\n
+        This method is defined in class `particleShear.CircleMassNeighbors`"""
+        key = self.neighbor_key(theSphere)
+        foundNeighborIndex = self.neighbor_index.get(key, -1)
+        if foundNeighborIndex >= 0:
+            if foundNeighborIndex < len(self.neighbors) and \
+                    self.relation_key(self.neighbors[foundNeighborIndex]) == key:
+                return foundNeighborIndex
+        elif len(self.neighbor_index) == len(self.neighbors):
+            return -1
+        self.rebuild_neighbor_index()
+        return self.neighbor_index.get(key, -1)
+
+    def neighbor_key(self, theSphere):
+        """Return the key identifying theSphere in the `particleShear.CircleMassNeighbors.neighbor_index`
+
+        This is the sphere object itself here (hashed by identity).\n
+        This method is defined in class `particleShear.CircleMassNeighbors`"""
+        return theSphere
+
+    def relation_key(self, theNeighbor):
+        """Return the key of the partner sphere of the neighbor relation theNeighbor, consistent with
+        `particleShear.CircleMassNeighbors.neighbor_key`
+
+        This method is defined in class `particleShear.CircleMassNeighbors`"""
+        return theNeighbor.theSphere
 
-        foundNeighborIndex = -1
+    def rebuild_neighbor_index(self):
+        """Rebuild the `particleShear.CircleMassNeighbors.neighbor_index` from the list of neighbors
+
+        This method is defined in class `particleShear.CircleMassNeighbors`"""
+        self.neighbor_index = {}
         for theNeighborIndex in range(len(self.neighbors)):
-            theNeighbor = self.neighbors[theNeighborIndex]
-            if (theSphere == theNeighbor.theSphere):
-                foundNeighborIndex = theNeighborIndex
+            self.neighbor_index[self.relation_key(self.neighbors[theNeighborIndex])] = theNeighborIndex
 
-        return foundNeighborIndex
\ No newline at end of file
+    def add_neighbor(self, theNeighbor):
+        """Append the neighbor relation theNeighbor to the list of neighbors and index it
+
+        This method is defined in class `particleShear.CircleMassNeighbors`"""
+        self.neighbor_index[self.relation_key(theNeighbor)] = len(self.neighbors)
+        self.neighbors.append(theNeighbor)
+
+    def remove_neighbor(self, foundNeighborIndex):
+        """Remove the neighbor relation at position foundNeighborIndex from the list of neighbors
+
+        The order of the remaining neighbors is preserved, so that the relations following the removed one move up
+        by one position in the index.\n
+        This method is defined in class `particleShear.CircleMassNeighbors`"""
+        del self.neighbor_index[self.relation_key(self.neighbors[foundNeighborIndex])]
+        del self.neighbors[foundNeighborIndex]
+        for theNeighborIndex in range(foundNeighborIndex, len(self.neighbors)):
+            self.neighbor_index[self.relation_key(self.neighbors[theNeighborIndex])] = theNeighborIndex
@@ -0,0 +1,138 @@
+import math
+import random
+
+
+class Contact_geometry_cache():
+    """Step-scoped cache of the contact geometry between the spheres of a canvas under Lees-Edwards boundary
+    conditions.
+
+    During a force calculation, the sphere methods evaluate the minimum-image vector to a neighbor many times for
+    the same pair (through `particleShear.PointLeesEdwards.d` and `particleShear.PointLeesEdwards.n` in the elastic,
+    viscous and tangential force methods, in `particleShear.CircleFrictionElasticity.distribute_tangential_couple`
+    and in the recording of the forces), each time running the periodic wrapping of
+    `particleShear.PointLeesEdwards.lee_edwards_closest_to_zero`. While the cache is open, the first such evaluation
+    of a pair stores the delta vector, the distance, the normal unit vector and whether the contact crosses a periodic
+    boundary, and all further evaluations read the stored values.\n
+    The stored values are valid only as long as the spheres do not move and the shear does not change: the canvas
+    opens the cache once the neighbor relations of a step are established and closes it before the spheres move (see
+    `particleShear.CanvasPointsBasicElasticityLeesEdwards.use_geometry_cache`).\n
+    Sub-package particleShearBase"""
+
+    def __init__(self):
+        """Initialize a closed, empty cache"""
+        self.active = False
+        """Whether the cache is open, i.e. whether the spheres read their geometry from it"""
+        self.entries = {}
+        """Dictionary mapping (index of sphere, index of other sphere) to the tuple
+        (delta vector, distance, normal vector, crosses periodic boundary)"""
+        self.sphereList = []
+        """The spheres indexed by the cache"""
+        self.sphere_index = {}
+        """Index of each sphere in `particleShear.Contact_geometry_cache.sphereList`, by id of the sphere"""
+        self.uniform = False
+        """Whether all indexed spheres share the same boundary conditions, such that the geometry seen from the
+        second sphere of a pair can be obtained by inverting the geometry seen from the first"""
+
+    def __len__(self):
+        return len(self.entries)
+
+    def open(self, sphereList):
+        """Empty the cache, index the given spheres and have them read their geometry from the cache
+
+        This method is defined in class `particleShear.Contact_geometry_cache`"""
+        if not self.represents(sphereList):
+            self.detach()
+            self.sphereList = list(sphereList)
+            self.sphere_index = {}
+            for sphereIndex in range(len(self.sphereList)):
+                self.sphere_index[id(self.sphereList[sphereIndex])] = sphereIndex
+        for theSphere in self.sphereList:
+            theSphere.geometry_cache = self
+        self.uniform = self.shared_boundary_conditions()
+        self.entries = {}
+        self.active = True
+
+    def close(self):
+        """Empty the cache and have the spheres evaluate their geometry directly again
+
+        This method is defined in class `particleShear.Contact_geometry_cache`"""
+        self.active = False
+        self.entries = {}
+
+    def detach(self):
+        """Close the cache and release the spheres indexed so far
+
+        This method is defined in class `particleShear.Contact_geometry_cache`"""
+        self.close()
+        for theSphere in self.sphereList:
+            if getattr(theSphere, "geometry_cache", False) is self:
+                theSphere.geometry_cache = False
+        self.sphereList = []
+        self.sphere_index = {}
+
+    def represents(self, sphereList):
+        """Return whether the cache indexes exactly the spheres of sphereList, in the same order
+
+        This method is defined in class `particleShear.Contact_geometry_cache`"""
+        if len(sphereList) != len(self.sphereList):
+            return False
+        for ind in range(len(sphereList)):
+            if sphereList[ind] is not self.sphereList[ind]:
+                return False
+        return True
+
+    def shared_boundary_conditions(self):
+        """Return whether all indexed spheres use the same Lees-Edwards boundary conditions
+
+        This method is defined in class `particleShear.Contact_geometry_cache`"""
+        if len(self.sphereList) == 0:
+            return True
+        first = self.sphereList[0]
+        for theSphere in self.sphereList:
+            if not getattr(theSphere, "use_lees_edwards", False):
+                return False
+            if (theSphere.size_x != first.size_x or theSphere.size_y != first.size_y or
+                    theSphere.shear != first.shear):
+                return False
+        return True
+
+    def lookup(self, theSphere, otherSphere):
+        """Return the tuple (delta vector, distance, normal vector, crosses periodic boundary) from theSphere to
+        otherSphere
+
+        The geometry is evaluated on first request during the step and read from the cache afterwards. If one of
+        the spheres is not indexed by the cache (for instance, a periodic replicate), the geometry is evaluated but not
+        stored.\n
+        This method is defined in class `particleShear.Contact_geometry_cache`"""
+        i = self.sphere_index.get(id(theSphere))
+        j = self.sphere_index.get(id(otherSphere))
+        if i is None or j is None:
+            return self.evaluate(theSphere, otherSphere)
+        entry = self.entries.get((i, j))
+        if entry is None:
+            entry = self.evaluate(theSphere, otherSphere)
+            self.entries[(i, j)] = entry
+            if self.uniform:
+                delta = entry[0]
+                # The inverted vector is the one the periodic wrapping gives from otherSphere unless it lies exactly
+                # on the lower border of the wrapping interval
+                if delta[0] > -theSphere.size_x / 2 and delta[1] > -theSphere.size_y / 2:
+                    self.entries[(j, i)] = ([-delta[0], -delta[1]], entry[1], [-entry[2][0], -entry[2][1]], entry[3])
+        return entry
+
+    def evaluate(self, theSphere, otherSphere):
+        """Evaluate the geometry from theSphere to otherSphere, as
+        `particleShear.PointLeesEdwards.lee_edwards_relative_vector`, `particleShear.PointLeesEdwards.d` and
+        `particleShear.PointLeesEdwards.n` do without cache
+
+        This method is defined in class `particleShear.Contact_geometry_cache`"""
+        pos = otherSphere.coordinates()
+        delta = theSphere.lee_edwards_closest_to_zero(pos[0] - theSphere.x, pos[1] - theSphere.y)
+        d = math.sqrt(delta[0] * delta[0] + delta[1] * delta[1])
+        if d > 0:
+            normal = [delta[0] / d, delta[1] / d]
+        else:
+            angle = random.random() * 2 * math.pi
+            normal = [math.cos(angle), math.sin(angle)]
+        crosses_boundary = theSphere.d_euclidian(otherSphere) != d
+        return (delta, d, normal, crosses_boundary)
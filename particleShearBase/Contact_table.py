@@ -0,0 +1,257 @@
+import math
+import random
+
+INTERFACE_STICK = 0
+"""Integer code of frictionally locked interfaces in `particleShear.Contact_table.interface_code`"""
+INTERFACE_SLIP = 1
+"""Integer code of slipping interfaces in `particleShear.Contact_table.interface_code`"""
+INTERFACE_PERMANENT = 2
+"""Integer code of permanent links in `particleShear.Contact_table.interface_code`"""
+
+interface_codes = {"stick": INTERFACE_STICK, "slip": INTERFACE_SLIP, "permanent": INTERFACE_PERMANENT}
+"""Conversion of the interface_type strings of `particleShear.neighbor_relation` to integer codes"""
+interface_types = ["stick", "slip", "permanent"]
+"""Conversion of the integer interface codes to the interface_type strings of `particleShear.neighbor_relation`"""
+
+
+class Contact_table():
+    """Table of the contacts between the spheres of a canvas, in the form of pair arrays.
+
+    The neighbor relations (see `particleShear.neighbor_relation`) are held by each sphere in its own
+    `particleShear.CircleMassNeighbors.neighbors` list, so that every contact appears twice, once from each side. For
+    batched force calculation, the contact table collects each contact once, as a pair of indices i<j into the
+    `particleShear.CanvasPoints.sphereList` together with the two neighbor relation objects.
+    Relations for which this is not possible (partner not in the sphere list, or not listing the sphere in return) are
+    collected separately in `particleShear.Contact_table.one_sided` for treatment by the sphere methods.\n
+    The table also holds the geometry parameters of the periodic boundary conditions, provided they are the same for all
+    spheres, and per-pair arrays with the contact geometry (`particleShear.Contact_table.evaluate_geometry`) and the
+    frictional state of the interfaces (`particleShear.Contact_table.read_contact_state`).\n
+    Sub-package particleShearBase"""
+
+    def __init__(self):
+        """Initialize an empty contact table"""
+        self.index_i = []
+        """Index of the first sphere of each contact pair"""
+        self.index_j = []
+        """Index of the second sphere of each contact pair (index_j > index_i)"""
+        self.relation_ij = []
+        """The `particleShear.neighbor_relation` of sphere i describing its contact with sphere j"""
+        self.relation_ji = []
+        """The `particleShear.neighbor_relation` of sphere j describing its contact with sphere i"""
+        self.permanent = []
+        """Boolean flag for each pair indicating a permanent link (see `particleShear.neighbor_relation_linkable`)"""
+        self.one_sided = []
+        """List of (sphere index, `particleShear.neighbor_relation`) entries that do not form a two-sided pair"""
+        self.distance = []
+        """Center-center distance of each pair, under the periodic boundary conditions"""
+        self.normal_x = []
+        """x-component of the unit vector pointing from sphere i to sphere j"""
+        self.normal_y = []
+        """y-component of the unit vector pointing from sphere i to sphere j"""
+        self.vx_rel = []
+        """x-component of the speed of sphere j relative to sphere i, including the Lees-Edwards correction"""
+        self.vy_rel = []
+        """y-component of the speed of sphere j relative to sphere i"""
+        self.crosses_boundary = []
+        """Boolean flag for each pair indicating that the contact is established across a periodic boundary"""
+        self.geometry_evaluated = False
+        """Whether the geometry arrays have been evaluated since the last build"""
+        self.interface_code = []
+        """Integer code of the interface state of each pair (INTERFACE_STICK, INTERFACE_SLIP or INTERFACE_PERMANENT)"""
+        self.friction_position_ij = []
+        """Friction position of each pair as stored by sphere i (see `particleShear.neighbor_relation.friction_position`)"""
+        self.friction_position_ji = []
+        """Friction position of each pair as stored by sphere j. The two copies are integrated separately by the
+        spheres (see `particleShear.CircleFrictionElasticity.move`) and may differ slightly"""
+        self.uniform = True
+        """Whether all spheres share the same boundary condition parameters"""
+        self.use_lees_edwards = False
+        """Whether the spheres use Lees-Edwards boundary conditions (see `particleShear.PointLeesEdwards`)"""
+        self.size_x = 0
+        """Width of the periodic simulation area"""
+        self.size_y = 0
+        """Height of the periodic simulation area"""
+        self.shear = 0
+        """Current shear of the Lees-Edwards boundary conditions"""
+        self.shear_rate = 0
+        """Current shear rate of the Lees-Edwards boundary conditions"""
+
+    def __len__(self):
+        return len(self.index_i)
+
+    def build(self, sphereList):
+        """Collect the contact pairs from the neighbor lists of the spheres
+
+        This method is defined in class `particleShear.Contact_table`"""
+        self.index_i = []
+        self.index_j = []
+        self.relation_ij = []
+        self.relation_ji = []
+        self.permanent = []
+        self.one_sided = []
+        self.geometry_evaluated = False
+
+        self.read_boundary_parameters(sphereList)
+
+        sphere_index = {}
+        for sphereIndex in range(len(sphereList)):
+            sphere_index[id(sphereList[sphereIndex])] = sphereIndex
+
+        pending = {}
+        for sphereIndex in range(len(sphereList)):
+            for theNeighbor in sphereList[sphereIndex].neighbors:
+                neighborIndex = sphere_index.get(id(theNeighbor.theSphere))
+                if neighborIndex is None or neighborIndex == sphereIndex:
+                    self.one_sided.append((sphereIndex, theNeighbor))
+                elif neighborIndex > sphereIndex:
+                    pending[(sphereIndex, neighborIndex)] = len(self.index_i)
+                    self.index_i.append(sphereIndex)
+                    self.index_j.append(neighborIndex)
+                    self.relation_ij.append(theNeighbor)
+                    self.relation_ji.append(None)
+                else:
+                    row = pending.pop((neighborIndex, sphereIndex), None)
+                    if row is None:
+                        self.one_sided.append((sphereIndex, theNeighbor))
+                    else:
+                        self.relation_ji[row] = theNeighbor
+
+        # Pairs listed from one side only
+        if len(pending) > 0:
+            for row in sorted(pending.values(), reverse=True):
+                self.one_sided.append((self.index_i[row], self.relation_ij[row]))
+                del self.index_i[row]
+                del self.index_j[row]
+                del self.relation_ij[row]
+                del self.relation_ji[row]
+
+        self.permanent = [self.relation_ij[row].interface_type == "permanent" or
+                          self.relation_ji[row].interface_type == "permanent" for row in range(len(self.index_i))]
+
+    def evaluate_geometry(self, x, y, xspeed, yspeed):
+        """Evaluate the distance, normal vector, relative speed and boundary crossing of all pairs
+
+        The positions and speeds are given as per-sphere sequences (lists or arrays). The periodic transformation is
+        the same as in `particleShear.PointLeesEdwards.lee_edwards_closest_to_zero` and
+        `particleShear.PointLeesEdwards.lee_edwards_relative_speed`. For coinciding centers, a random normal vector
+        is chosen as in `particleShear.Point.n`.\n
+        This method is defined in class `particleShear.Contact_table`"""
+
+        n_pairs = len(self.index_i)
+        distance = [0.0] * n_pairs
+        normal_x = [0.0] * n_pairs
+        normal_y = [0.0] * n_pairs
+        vx_rel = [0.0] * n_pairs
+        vy_rel = [0.0] * n_pairs
+        crosses_boundary = [False] * n_pairs
+
+        periodic = self.use_lees_edwards
+        size_x = self.size_x
+        size_y = self.size_y
+        shear_shift = self.size_y * self.shear
+        shear_speed = self.size_y * self.shear_rate
+
+        index_i = self.index_i
+        index_j = self.index_j
+
+        for row in range(n_pairs):
+            i = index_i[row]
+            j = index_j[row]
+
+            delta_x = x[j] - x[i]
+            delta_y = y[j] - y[i]
+            delta_vx = xspeed[j] - xspeed[i]
+            crosses = False
+
+            if periodic:
+                while delta_y >= size_y / 2:
+                    delta_y = delta_y - size_y
+                    delta_x = delta_x - shear_shift
+                    delta_vx = delta_vx - shear_speed
+                    crosses = True
+                while delta_y < -size_y / 2:
+                    delta_y = delta_y + size_y
+                    delta_x = delta_x + shear_shift
+                    delta_vx = delta_vx + shear_speed
+                    crosses = True
+                while delta_x >= size_x / 2:
+                    delta_x = delta_x - size_x
+                    crosses = True
+                while delta_x < -size_x / 2:
+                    delta_x = delta_x + size_x
+                    crosses = True
+
+            d = math.sqrt(delta_x * delta_x + delta_y * delta_y)
+            if d > 0:
+                normal_x[row] = delta_x / d
+                normal_y[row] = delta_y / d
+            else:
+                angle = random.random() * 2 * math.pi
+                normal_x[row] = math.cos(angle)
+                normal_y[row] = math.sin(angle)
+
+            distance[row] = d
+            vx_rel[row] = delta_vx
+            vy_rel[row] = yspeed[j] - yspeed[i]
+            crosses_boundary[row] = crosses
+
+        self.distance = distance
+        self.normal_x = normal_x
+        self.normal_y = normal_y
+        self.vx_rel = vx_rel
+        self.vy_rel = vy_rel
+        self.crosses_boundary = crosses_boundary
+        self.geometry_evaluated = True
+
+    def read_contact_state(self):
+        """Read the interface state of all pairs into `particleShear.Contact_table.interface_code`,
+        `particleShear.Contact_table.friction_position_ij` and `particleShear.Contact_table.friction_position_ji`
+
+        The interface code is taken from the relation of sphere i.\n
+        This method is defined in class `particleShear.Contact_table`"""
+        self.interface_code = [interface_codes[theRelation.interface_type] for theRelation in self.relation_ij]
+        self.friction_position_ij = [theRelation.friction_position for theRelation in self.relation_ij]
+        self.friction_position_ji = [theRelation.friction_position for theRelation in self.relation_ji]
+
+    def write_contact_state(self, rows=None):
+        """Write the interface state of the given pairs (default: all pairs) back to the neighbor relations
+
+        This method is defined in class `particleShear.Contact_table`"""
+        if rows is None:
+            rows = range(len(self.index_i))
+        interface_code = self.interface_code
+        friction_position_ij = self.friction_position_ij
+        friction_position_ji = self.friction_position_ji
+        relation_ij = self.relation_ij
+        relation_ji = self.relation_ji
+        for row in rows:
+            interface_type = interface_types[interface_code[row]]
+            relation_ij[row].interface_type = interface_type
+            relation_ij[row].friction_position = friction_position_ij[row]
+            relation_ji[row].interface_type = interface_type
+            relation_ji[row].friction_position = friction_position_ji[row]
+
+    def read_boundary_parameters(self, sphereList):
+        """Read the boundary condition parameters from the spheres and check that they are shared by all spheres
+
+        Sets `particleShear.Contact_table.uniform` to False if this is not the case.\n
+        This method is defined in class `particleShear.Contact_table`"""
+        self.uniform = True
+        if len(sphereList) == 0:
+            return
+        first = sphereList[0]
+        self.use_lees_edwards = getattr(first, "use_lees_edwards", False)
+        if self.use_lees_edwards:
+            self.size_x = first.size_x
+            self.size_y = first.size_y
+            self.shear = first.shear
+            self.shear_rate = first.shear_rate
+        for theSphere in sphereList:
+            if getattr(theSphere, "use_lees_edwards", False) != self.use_lees_edwards:
+                self.uniform = False
+                return
+            if self.use_lees_edwards:
+                if (theSphere.size_x != self.size_x or theSphere.size_y != self.size_y or
+                        theSphere.shear != self.shear or theSphere.shear_rate != self.shear_rate):
+                    self.uniform = False
+                    return
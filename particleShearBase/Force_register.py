@@ -1,4 +1,11 @@
 import math
+from array import array
+
+FORCE_INTERNAL = 0
+"""Kind of the rows of `particleShear.Force_register` holding an internal pairwise force or torque"""
+FORCE_EXTERNAL = 1
+"""Kind of the rows of `particleShear.Force_register` holding a force or torque acting from the outside"""
+
 
 class Force_register():
     """Provide accounting of the forces acting on the particles.
@@ -6,40 +13,207 @@ class Force_register():
     Detailed accounting of the forces acting on the particles allows to calculate the relevant
     average stress tensors at each simulation time point by means of the
      `particleShear.StressTensorEvaluation` class.\n
+     The register is columnar: the spheres are numbered on their first appearance
+     (see `particleShear.Force_register.index_of`), the spheres of the canvas keeping their numbers from one step to
+     the next (see `particleShear.Force_register.number_spheres`), and the forces are stored as rows of preallocated arrays (of type
+     `array.array`) holding the target index, the source index, the force components and the kind of the row
+     (FORCE_INTERNAL or FORCE_EXTERNAL). Torques are stored likewise. The net force and the net torque of each sphere
+     are held in arrays addressed by the sphere index. Resetting the register only resets the fill counters.\n
+     The lists of the former row-based register (`particleShear.Force_register.pair_register` and so on) are still
+     available as read-only views assembled from the arrays.\n
+     In accumulation mode (`particleShear.Force_register.accumulate_stress`), the pairwise and external forces and
+     torques are summed into running stress tensors as they are recorded by the force kernels and sphere methods,
+     and no rows are stored.\n
      Sub-package particleShearBase"""
 
-    def __init__(self):
+    def __init__(self, capacity=64):
         """Initialize the force register
-        Provide default empty intance variables"""
-        self.pair_register=[]
-        """ Hold the elementary internal pairwise forces"""
-        self.internal_moment_register = []
-        """ Hold the fully internally generated torques"""
-        self.total_particle_force_register=[]
-        """ Hold the single total forces acting single particles"""
-        self.external_force_register=[]
-        """Hold single forces acting from the outside (across the canvas boudnary) on the particles"""
-        self.external_moment_register = []
-        """Hold single torques acting from the outside (across the canvas boudnary) on the particles"""
-        self.unbalanced_moment_register = []
-        """Hold the net torque moments causing rotational acceleration"""
-
-    def reset_force_register(self):
+        Provide default empty intance variables
+
+        - **parameters**\n
+            `capacity` Number of rows to preallocate; the arrays grow as needed"""
+
+        self.spheres = []
+        """The spheres numbered by the register, in order of their first appearance"""
+        self.sphere_index = {}
+        """Index of each sphere in `particleShear.Force_register.spheres`, by id of the sphere"""
+
+        self.force_target = array('l', [0] * capacity)
+        """Index of the sphere on which the force of each row acts"""
+        self.force_source = array('l', [0] * capacity)
+        """Index of the sphere from which the force of each row originates; -1 for external forces"""
+        self.force_x = array('d', [0.0] * capacity)
+        """x-component of the force of each row"""
+        self.force_y = array('d', [0.0] * capacity)
+        """y-component of the force of each row"""
+        self.force_kind = array('b', [0] * capacity)
+        """Kind of each row, FORCE_INTERNAL (pairwise force between internal spheres) or FORCE_EXTERNAL"""
+        self.force_count = 0
+        """Number of force rows in use"""
+
+        self.moment_target = array('l', [0] * capacity)
+        """Index of the sphere on which the torque of each row acts"""
+        self.moment_source = array('l', [0] * capacity)
+        """Index of the sphere which has helped generate the torque of each row; -1 for external torques"""
+        self.moment_value = array('d', [0.0] * capacity)
+        """Torque of each row"""
+        self.moment_kind = array('b', [0] * capacity)
+        """Kind of each row, FORCE_INTERNAL or FORCE_EXTERNAL"""
+        self.moment_count = 0
+        """Number of torque rows in use"""
+
+        self.total_force_x = array('d')
+        """x-component of the net force of each sphere, by sphere index"""
+        self.total_force_y = array('d')
+        """y-component of the net force of each sphere, by sphere index"""
+        self.total_force_stamp = array('l')
+        """Generation at which the net force of each sphere was last recorded"""
+        self.total_force_order = array('l', [0] * capacity)
+        """Indices of the spheres with a recorded net force, in order of recording"""
+        self.total_force_count = 0
+        """Number of spheres with a recorded net force"""
+
+        self.unbalanced_moment = array('d')
+        """Net torque of each sphere, by sphere index"""
+        self.unbalanced_moment_stamp = array('l')
+        """Generation at which the net torque of each sphere was last recorded"""
+        self.unbalanced_moment_order = array('l', [0] * capacity)
+        """Indices of the spheres with a recorded net torque, in order of recording"""
+        self.unbalanced_moment_count = 0
+        """Number of spheres with a recorded net torque"""
+
+        self.generation = 1
+        """Counter incremented at each reset; per-sphere entries with an older stamp are void"""
+
+        self.accumulate_stress = False
+        """Accumulation mode: if True, the pairwise and external forces and torques are not stored as rows, but
+        directly summed into the running tensors below as they are recorded (see
+        `particleShear.Force_register.accumulate_internal_force`). The net forces and torques of the spheres are
+        still stored per sphere. Leave False to keep the individual rows, for instance for debugging"""
+        self.reset_accumulated_stress()
+
+    def reset_force_register(self, sphereList=False):
         """Reset the force register to its original state
 
+        Only the fill counters are reset, the arrays are kept for reuse. The spheres are numbered anew (see
+        `particleShear.Force_register.number_spheres`), such that spheres no longer in use do not keep their slots.\n
+        - **parameters**\n
+            `sphereList` The spheres of the canvas, typically `particleShear.CanvasPoints.sphereList`, which then
+            keep the first slots; False to release all slots\n
         This method is defined in class `particleShear.Force_register`"""
 
-        self.pair_register = []
+        self.number_spheres(sphereList)
+        self.force_count = 0
+        self.moment_count = 0
+        self.total_force_count = 0
+        self.unbalanced_moment_count = 0
+        self.generation = self.generation + 1
+        if self.accumulate_stress:
+            self.reset_accumulated_stress()
 
-        self.total_particle_force_register = []  #
+    def reset_accumulated_stress(self):
+        """Set the running sums of the accumulation mode to zero
 
-        self.external_force_register = []
+        This method is defined in class `particleShear.Force_register`"""
+        self.stress_LW_sum = [[0, 0], [0, 0]]
+        """Running Love-Weber sum of force[i]*1e-12*(target-source)[j]*1e-6/2 over the internal pairwise forces,
+        not yet divided by the area"""
+        self.pair_force_sum = [0, 0]
+        """Running sum of the internal pairwise forces (vanishes for properly paired forces)"""
+        self.pair_force_abs_sum = 0
+        """Running sum of abs(fx+fy) over the internal pairwise forces"""
+        self.pair_force_count = 0
+        """Number of internal pairwise forces accumulated"""
+        self.external_force_sum = [0, 0]
+        """Running sum of the external forces"""
+        self.external_force_moment_sum = [[0, 0], [0, 0]]
+        """Running sum of force[i]*position[j] over the external forces"""
+        self.external_force_count = 0
+        """Number of external forces accumulated"""
+        self.internal_moment_sum = 0
+        """Running sum of the internal torques"""
+        self.external_moment_sum = 0
+        """Running sum of the external torques"""
+
+    def number_spheres(self, sphereList=False):
+        """Give the first slots of the register to the spheres of sphereList, in this order, and release the slots of
+        any other sphere
+
+        The slots are kept as they are if the spheres of sphereList already hold the first slots, which is the case
+        from one step to the next. Other spheres recorded afterwards, such as boundary replicates, are numbered
+        again on their next appearance. With sphereList False, all slots are released.\n
+        This method is defined in class `particleShear.Force_register`"""
+        if sphereList is False:
+            sphereList = []
+        n = len(sphereList)
+        spheres = self.spheres
+        same_spheres = len(spheres) >= n
+        if same_spheres:
+            for index in range(n):
+                if spheres[index] is not sphereList[index]:
+                    same_spheres = False
+                    break
+        if same_spheres:
+            if len(spheres) == n:
+                return
+            for theSphere in spheres[n:]:
+                del self.sphere_index[id(theSphere)]
+            del spheres[n:]
+        else:
+            self.spheres = list(sphereList)
+            self.sphere_index = {}
+            for index in range(n):
+                self.sphere_index[id(sphereList[index])] = index
+        # Per-sphere entries; their stamps are older than the next generation, so the values left are void
+        for column in [self.total_force_x, self.total_force_y, self.total_force_stamp, self.unbalanced_moment,
+                       self.unbalanced_moment_stamp]:
+            if len(column) > n:
+                del column[n:]
+            else:
+                column.extend(array(column.typecode, [0] * (n - len(column))))
+
+    def index_of(self, theSphere):
+        """Return the index of theSphere in the register, numbering it if seen for the first time
 
-        self.unbalanced_moment_register=[]
+        This method is defined in class `particleShear.Force_register`"""
+        index = self.sphere_index.get(id(theSphere))
+        if index is None:
+            index = len(self.spheres)
+            self.sphere_index[id(theSphere)] = index
+            self.spheres.append(theSphere)
+            self.total_force_x.append(0.0)
+            self.total_force_y.append(0.0)
+            self.total_force_stamp.append(0)
+            self.unbalanced_moment.append(0.0)
+            self.unbalanced_moment_stamp.append(0)
+        return index
+
+    def add_force_row(self, target, source, force_vector, kind):
+        """Append a force row
 
-        self.internal_moment_register=[]
+        This method is defined in class `particleShear.Force_register`"""
+        row = self.force_count
+        if row == len(self.force_kind):
+            grow(row, self.force_target, self.force_source, self.force_x, self.force_y, self.force_kind)
+        self.force_target[row] = self.index_of(target)
+        self.force_source[row] = -1 if source is None else self.index_of(source)
+        self.force_x[row] = force_vector[0]
+        self.force_y[row] = force_vector[1]
+        self.force_kind[row] = kind
+        self.force_count = row + 1
+
+    def add_moment_row(self, target, source, moment, kind):
+        """Append a torque row
 
-        self.external_moment_register = []
+        This method is defined in class `particleShear.Force_register`"""
+        row = self.moment_count
+        if row == len(self.moment_kind):
+            grow(row, self.moment_target, self.moment_source, self.moment_value, self.moment_kind)
+        self.moment_target[row] = self.index_of(target)
+        self.moment_source[row] = -1 if source is None else self.index_of(source)
+        self.moment_value[row] = moment
+        self.moment_kind[row] = kind
+        self.moment_count = row + 1
 
     def record_individual_internal_force(self,target,source,force_vector):
         """Record an individual internal force.
@@ -51,39 +225,70 @@ class Force_register():
          this function does not check for the presence of such a homologous entry, this needs to be done in the code
          invoking this method.\n
          This method is defined in class `particleShear.Force_register`"""
-        self.pair_register.append([target,source,force_vector])
+        if self.accumulate_stress:
+            self.accumulate_internal_force(target, source, force_vector)
+        else:
+            self.add_force_row(target, source, force_vector, FORCE_INTERNAL)
+
+    def accumulate_internal_force(self, target, source, force_vector):
+        """Add the contribution of an internal pairwise force to the running sums of the accumulation mode
+
+        The Love-Weber term has the same expression as in
+        `particleShear.StressTensorEvaluation.evaluate_force_stress_tensors`, but the branch vector is taken from the
+        positions of the spheres when the force is recorded, whereas the evaluation of stored rows uses the positions
+        at the time of the evaluation. Both agree if the stress is evaluated before the spheres move, as in the
+        simulation step. The branch vector is the difference of the centers: internal forces never act across a
+        periodic boundary, since such forces are recorded as external
+        (see `particleShear.CanvasPointsBasicElasticityLeesEdwards.record_individual_internal_force`).\n
+        This method is defined in class `particleShear.Force_register`"""
+        stress = self.stress_LW_sum
+        delta_x = [target.x - source.x, target.y - source.y]
+        for i in range(2):
+            for j in range(2):
+                stress[i][j] = stress[i][j] + force_vector[i] * 1e-12 * delta_x[j] * 1e-6 / 2
+        self.pair_force_sum[0] = self.pair_force_sum[0] + force_vector[0]
+        self.pair_force_sum[1] = self.pair_force_sum[1] + force_vector[1]
+        self.pair_force_abs_sum = self.pair_force_abs_sum + abs(force_vector[0] + force_vector[1])
+        self.pair_force_count = self.pair_force_count + 1
 
     def record_total_particle_force(self,target,force_vector):
         """Record a net total particle force
 
-        As there should be only one net particle force for each particle, the method first looks
-        for an entry corresponding to target. If such an entry is found, the force is updated, otherwise a new
-        entry is created
+        As there should be only one net particle force for each particle, a force recorded earlier for the same
+        target is replaced. The entry is found directly by the index of the target.
 
          Method defined in class `particleShear.Force_register`"""
 
-        # First, look whether there is already an entry
-
-        found_index = -1
-
-        for ind in range(len(self.total_particle_force_register)):
-            if self.total_particle_force_register[ind][0]==target:
-                found_index=ind
-
-        # If there is an entry, update it
-        if(found_index>=0):
-            self.total_particle_force_register[found_index][1]=force_vector
-        else: # else add one
-            self.total_particle_force_register.append([target,force_vector])
+        index = self.index_of(target)
+        if self.total_force_stamp[index] != self.generation:
+            self.total_force_stamp[index] = self.generation
+            if self.total_force_count == len(self.total_force_order):
+                grow(self.total_force_count, self.total_force_order)
+            self.total_force_order[self.total_force_count] = index
+            self.total_force_count = self.total_force_count + 1
+        self.total_force_x[index] = force_vector[0]
+        self.total_force_y[index] = force_vector[1]
 
     def record_external_force(self, target, force_vector):
         """ Add an external force
 
         External forces are coming from either outside the area under examination or from that is not free to move
          (see `particleShear.CanvasPointsShear.canMove`)\n
+         In accumulation mode, the moment of the force is summed with the position of the target when the force is
+         recorded; the evaluation of stored rows uses the position at the time of the evaluation instead (see
+         `particleShear.Force_register.accumulate_internal_force`).\n
          Method defined in class `particleShear.Force_register`"""
 
-        self.external_force_register.append ([target, force_vector])
+        if self.accumulate_stress:
+            moment = self.external_force_moment_sum
+            position = [target.x, target.y]
+            for i in range(2):
+                self.external_force_sum[i] = self.external_force_sum[i] + force_vector[i]
+                for j in range(2):
+                    moment[i][j] = moment[i][j] + force_vector[i] * position[j]
+            self.external_force_count = self.external_force_count + 1
+        else:
+            self.add_force_row(target, None, force_vector, FORCE_EXTERNAL)
 
     def record_external_torque(self, target, moment):
         """ Add an external torque
@@ -92,7 +297,10 @@ class Force_register():
          (see `particleShear.CanvasPointsShear.canMove`)\n
          Method defined in class `particleShear.Force_register`"""
 
-        self.external_moment_register.append ([target, moment])
+        if self.accumulate_stress:
+            self.external_moment_sum = self.external_moment_sum + moment
+        else:
+            self.add_moment_row(target, None, moment, FORCE_EXTERNAL)
 
 
     def record_individual_internal_torque(self,target,source,moment):
@@ -107,31 +315,91 @@ class Force_register():
          this function does not check for the presence of such a homologous entry, this needs to be done in the code
          invoking this method.\n
          This method is defined in class `particleShear.Force_register`"""
-        self.internal_moment_register.append([target,source,moment])
+        if self.accumulate_stress:
+            self.internal_moment_sum = self.internal_moment_sum + moment
+        else:
+            self.add_moment_row(target, source, moment, FORCE_INTERNAL)
 
 
     def record_unbalanced_moment(self,target,moment):
         """ Add net torque on a sphere
 
-        As there should be only one net particle torque for each particle, the method first looks
-        for an entry corresponding to target. If such an entry is found, the force is updated, otherwise a new
-        entry is created
+        As there should be only one net particle torque for each particle, a torque recorded earlier for the same
+        target is replaced. The entry is found directly by the index of the target.
 
         Method defined in class `particleShear.Force_register`"""
 
-        found_index = -1
-
-        for ind in range(len(self.unbalanced_moment_register)):
-            if self.unbalanced_moment_register[ind][0] == target:
-                found_index = ind
-
-        # If there is an entry, update it
-        if (found_index >= 0):
-            self.unbalanced_moment_register[found_index][1] = moment
-        else:  # else add one
-            self.unbalanced_moment_register.append([target, moment])
-
+        index = self.index_of(target)
+        if self.unbalanced_moment_stamp[index] != self.generation:
+            self.unbalanced_moment_stamp[index] = self.generation
+            if self.unbalanced_moment_count == len(self.unbalanced_moment_order):
+                grow(self.unbalanced_moment_count, self.unbalanced_moment_order)
+            self.unbalanced_moment_order[self.unbalanced_moment_count] = index
+            self.unbalanced_moment_count = self.unbalanced_moment_count + 1
+        self.unbalanced_moment[index] = moment
 
+    def force_rows(self, kind):
+        """Return the rows of the given kind (FORCE_INTERNAL or FORCE_EXTERNAL) of the force table
 
+        This method is defined in class `particleShear.Force_register`"""
+        force_kind = self.force_kind
+        return [row for row in range(self.force_count) if force_kind[row] == kind]
 
+    def moment_rows(self, kind):
+        """Return the rows of the given kind (FORCE_INTERNAL or FORCE_EXTERNAL) of the torque table
 
+        This method is defined in class `particleShear.Force_register`"""
+        moment_kind = self.moment_kind
+        return [row for row in range(self.moment_count) if moment_kind[row] == kind]
+
+    @property
+    def pair_register(self):
+        """ The elementary internal pairwise forces, as a list of [target, source, [fx, fy]] entries (read-only view)"""
+        spheres = self.spheres
+        return [[spheres[self.force_target[row]], spheres[self.force_source[row]],
+                 [self.force_x[row], self.force_y[row]]] for row in self.force_rows(FORCE_INTERNAL)]
+
+    @property
+    def external_force_register(self):
+        """Single forces acting from the outside (across the canvas boundary) on the particles, as a list of
+        [target, [fx, fy]] entries (read-only view)"""
+        spheres = self.spheres
+        return [[spheres[self.force_target[row]], [self.force_x[row], self.force_y[row]]]
+                for row in self.force_rows(FORCE_EXTERNAL)]
+
+    @property
+    def internal_moment_register(self):
+        """ The fully internally generated torques, as a list of [target, source, moment] entries (read-only view)"""
+        spheres = self.spheres
+        return [[spheres[self.moment_target[row]], spheres[self.moment_source[row]], self.moment_value[row]]
+                for row in self.moment_rows(FORCE_INTERNAL)]
+
+    @property
+    def external_moment_register(self):
+        """Single torques acting from the outside (across the canvas boundary) on the particles, as a list of
+        [target, moment] entries (read-only view)"""
+        spheres = self.spheres
+        return [[spheres[self.moment_target[row]], self.moment_value[row]] for row in self.moment_rows(FORCE_EXTERNAL)]
+
+    @property
+    def total_particle_force_register(self):
+        """ The single total forces acting single particles, as a list of [target, [fx, fy]] entries (read-only
+        view)"""
+        spheres = self.spheres
+        return [[spheres[index], [self.total_force_x[index], self.total_force_y[index]]]
+                for index in self.total_force_order[0:self.total_force_count]]
+
+    @property
+    def unbalanced_moment_register(self):
+        """The net torque moments causing rotational acceleration, as a list of [target, moment] entries (read-only
+        view)"""
+        spheres = self.spheres
+        return [[spheres[index], self.unbalanced_moment[index]]
+                for index in self.unbalanced_moment_order[0:self.unbalanced_moment_count]]
+
+
+def grow(length, *columns):
+    """Double the length (at least to 16) of the given arrays, which currently hold length elements each"""
+    extension = max(length, 16)
+    for column in columns:
+        column.extend(array(column.typecode, [0] * extension))
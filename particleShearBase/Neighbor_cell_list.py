@@ -0,0 +1,143 @@
+import math
+
+
+class Neighbor_cell_list():
+    """Spatial hashing of the spheres into a grid of cells to find candidate contacts in linear time.
+
+    The simulation area is divided into nx times ny cells whose size is at least the given cutoff distance
+    (typically twice the largest sphere radius). Two spheres closer than the cutoff are then necessarily located
+    in the same or in adjacent cells, such that only the 3 x 3 block of cells around each sphere needs to be
+    examined instead of the entire `particleShear.CanvasPoints.sphereList`.\n
+    For spheres using Lees-Edwards boundary conditions (see `particleShear.PointLeesEdwards`), the grid is periodic.
+    The cell rows across the y-boundary are shifted by shear*size_y in x-direction, in the same way as the periodic
+    images generated by `particleShear.PointLeesEdwards.lee_edwards_closest_to_zero`.\n
+    Sub-package particleShearBase"""
+
+    def __init__(self):
+        """Initialize the cell list
+
+        Provide default empty instance variables; the grid is set up by
+        `particleShear.Neighbor_cell_list.build`"""
+        self.nx = 0
+        """Number of cells in x-direction"""
+        self.ny = 0
+        """Number of cells in y-direction"""
+        self.cell_size_x = 0
+        """Width of a cell"""
+        self.cell_size_y = 0
+        """Height of a cell"""
+        self.size_x = 0
+        """Width of the gridded area"""
+        self.size_y = 0
+        """Height of the gridded area"""
+        self.periodic = False
+        """Whether the grid is periodic (Lees-Edwards boundary conditions) or not"""
+        self.cells = {}
+        """Dictionary mapping (column, row) tuples to the list of sphere indices in the cell"""
+        self.sphere_cell = []
+        """For each sphere index, the (column, row, x, y) tuple of its cell and gridded position"""
+
+    def build(self, sphereList, cutoff, size_x, size_y):
+        """Sort the spheres into cells of at least the size cutoff.
+
+        The grid is periodic if all the spheres use Lees-Edwards boundary conditions and share the same
+        simulation area; otherwise, the grid covers the area size_x times size_y and spheres outside of this area
+        are attributed to the closest border cells. Returns False if the grid cannot usefully be built (in which case
+        the caller should revert to testing all pairs), True otherwise.\n
+        This method is defined in class `particleShear.Neighbor_cell_list`"""
+
+        self.cells = {}
+        self.sphere_cell = []
+
+        if len(sphereList) == 0 or cutoff <= 0:
+            return False
+
+        self.periodic = True
+        for theSphere in sphereList:
+            if not getattr(theSphere, "use_lees_edwards", False):
+                self.periodic = False
+                break
+
+        if self.periodic:
+            size_x = sphereList[0].size_x
+            size_y = sphereList[0].size_y
+            for theSphere in sphereList:
+                if theSphere.size_x != size_x or theSphere.size_y != size_y:
+                    return False
+
+        self.size_x = size_x
+        self.size_y = size_y
+
+        self.nx = int(size_x // cutoff)
+        self.ny = int(size_y // cutoff)
+
+        if self.periodic:
+            # With fewer than 3 cells in a direction, the 3 x 3 block would contain the same cell several times
+            # and the sheared images could wrap onto themselves; it is then not worth using a grid
+            if self.nx < 3 or self.ny < 3:
+                return False
+        else:
+            self.nx = max(self.nx, 1)
+            self.ny = max(self.ny, 1)
+
+        self.cell_size_x = size_x / self.nx
+        self.cell_size_y = size_y / self.ny
+
+        for sphereIndex in range(len(sphereList)):
+            theSphere = sphereList[sphereIndex]
+            x = theSphere.x
+            y = theSphere.y
+            if self.periodic:
+                if x < 0 or x >= size_x or y < 0 or y >= size_y:
+                    pos = theSphere.lee_edwards_positive(x, y)
+                    x = pos[0]
+                    y = pos[1]
+            column = min(max(int(math.floor(x / self.cell_size_x)), 0), self.nx - 1)
+            row = min(max(int(math.floor(y / self.cell_size_y)), 0), self.ny - 1)
+            self.sphere_cell.append((column, row, x, y))
+            key = (column, row)
+            if key in self.cells:
+                self.cells[key].append(sphereIndex)
+            else:
+                self.cells[key] = [sphereIndex]
+
+        return True
+
+    def candidates(self, sphereIndex, shear=0):
+        """Return the list of sphere indices in the cells adjacent to the sphere with the given index
+
+        The list contains sphereIndex itself. For periodic grids, the rows across the y-boundary are searched
+        around the x-position shifted by shear*size_y, which is where the Lees-Edwards periodic images of the
+        neighbors are located.\n
+        This method is defined in class `particleShear.Neighbor_cell_list`"""
+
+        column, row, x, y = self.sphere_cell[sphereIndex]
+
+        found = []
+
+        for delta_row in (-1, 0, 1):
+            the_row = row + delta_row
+            the_column = column
+            if self.periodic:
+                if the_row < 0 or the_row >= self.ny:
+                    if the_row < 0:
+                        the_row = the_row + self.ny
+                        shifted_x = x + self.size_y * shear
+                    else:
+                        the_row = the_row - self.ny
+                        shifted_x = x - self.size_y * shear
+                    the_column = int(math.floor(shifted_x / self.cell_size_x)) % self.nx
+            elif the_row < 0 or the_row >= self.ny:
+                continue
+
+            for delta_column in (-1, 0, 1):
+                current_column = the_column + delta_column
+                if self.periodic:
+                    current_column = current_column % self.nx
+                elif current_column < 0 or current_column >= self.nx:
+                    continue
+                key = (current_column, the_row)
+                if key in self.cells:
+                    found.extend(self.cells[key])
+
+        return found
@@ -0,0 +1,109 @@
+from array import array
+
+
+class Particle_state_arrays():
+    """Structure-of-arrays storage of the mechanical state of the spheres of a canvas.
+
+    The positions, radii, masses, moments of inertia, speeds, rotation angles and the accumulated forces and torques of
+    all the spheres in a `particleShear.CanvasPoints.sphereList` are held in contiguous float64 arrays (of type
+    `array.array`, typecode 'd'), one array per quantity and indexed by the position of the sphere in the list.
+    Batched kernels can thus loop over the arrays directly, without going through the attribute lookup of the deep
+    sphere class hierarchy; the arrays expose the buffer protocol and can be wrapped without copy by array libraries.\n
+    Once attached (see `particleShear.Particle_state_arrays.attach`), the sphere objects become thin views: reading or
+    writing, for instance, theSphere.x reads or writes the corresponding element of
+    `particleShear.Particle_state_arrays.x`, such that all sphere-based code continues to work unchanged.\n
+    Sub-package particleShearBase"""
+
+    fields = ["x", "y", "r", "m", "inertia", "xspeed", "yspeed", "omega", "phi", "xforce", "yforce", "torque"]
+    """The quantities held in the arrays. Spheres lacking some of the quantities (for instance spheres without
+    rotation) get a 0 entry in the corresponding arrays, which is not linked to the sphere"""
+
+    _view_classes = {}
+
+    def __init__(self, sphereList):
+        """Initialize the arrays from the current state of the spheres
+
+        - **parameters**\n
+            `sphereList` The list of spheres, typically `particleShear.CanvasPoints.sphereList`"""
+        self.sphereList = list(sphereList)
+        """The spheres represented, in array order"""
+        for field in self.fields:
+            setattr(self, field, array('d', [getattr(theSphere, field, 0) for theSphere in self.sphereList]))
+        self.attached = False
+        """Whether the spheres are currently views into the arrays"""
+
+    def __len__(self):
+        return len(self.sphereList)
+
+    def represents(self, sphereList):
+        """Return whether the arrays represent exactly the spheres of sphereList, in the same order
+
+        This method is defined in class `particleShear.Particle_state_arrays`"""
+        if len(sphereList) != len(self.sphereList):
+            return False
+        for ind in range(len(sphereList)):
+            if sphereList[ind] is not self.sphereList[ind]:
+                return False
+        return True
+
+    def attach(self):
+        """Turn the spheres into views of the arrays
+
+        The current values are copied into the arrays, and the class of each sphere is replaced by a subclass
+        overriding the array-backed quantities by properties reading and writing the arrays.\n
+        This method is defined in class `particleShear.Particle_state_arrays`"""
+        if self.attached:
+            return
+        for ind in range(len(self.sphereList)):
+            theSphere = self.sphereList[ind]
+            linked_fields = []
+            for field in self.fields:
+                if field in theSphere.__dict__:
+                    getattr(self, field)[ind] = theSphere.__dict__[field]
+                    del theSphere.__dict__[field]
+                    linked_fields.append(field)
+            theSphere._state_arrays = self
+            theSphere._state_index = ind
+            theSphere.__class__ = state_array_view_class(theSphere.__class__, linked_fields)
+        self.attached = True
+
+    def detach(self):
+        """Turn the spheres back into independent objects holding their own state
+
+        This method is defined in class `particleShear.Particle_state_arrays`"""
+        if not self.attached:
+            return
+        for ind in range(len(self.sphereList)):
+            theSphere = self.sphereList[ind]
+            view_class = theSphere.__class__
+            theSphere.__class__ = view_class.state_array_base_class
+            for field in view_class.state_array_fields:
+                theSphere.__dict__[field] = getattr(self, field)[ind]
+            del theSphere._state_arrays
+            del theSphere._state_index
+        self.attached = False
+
+
+def state_array_property(field):
+    """Return a property reading and writing the element of the array field of the
+     `particleShear.Particle_state_arrays` attached to a sphere"""
+
+    def getter(self):
+        return getattr(self._state_arrays, field)[self._state_index]
+
+    def setter(self, value):
+        getattr(self._state_arrays, field)[self._state_index] = value
+
+    return property(getter, setter, doc="Array-backed " + field)
+
+
+def state_array_view_class(base_class, fields):
+    """Return (and cache) the subclass of base_class in which the given fields are array-backed properties"""
+    key = (base_class, tuple(fields))
+    if key not in Particle_state_arrays._view_classes:
+        namespace = {"state_array_base_class": base_class, "state_array_fields": tuple(fields),
+                     "__module__": base_class.__module__}
+        for field in fields:
+            namespace[field] = state_array_property(field)
+        Particle_state_arrays._view_classes[key] = type(base_class.__name__, (base_class,), namespace)
+    return Particle_state_arrays._view_classes[key]
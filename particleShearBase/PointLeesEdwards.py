@@ -42,6 +42,9 @@ class PointLeesEdwards(Point):
         """Current applied shear (relative, so dimension-less)"""
         self.shear_rate=shear_rate
         """Current shear rate (relative, so 1/s)"""
+        self.geometry_cache=False
+        """`particleShear.Contact_geometry_cache` of the canvas holding the sphere, False if none. While the cache is
+        open, the relative vector, distance, normal vector and boundary crossing to other spheres are read from it"""
 
 
 
@@ -189,8 +192,11 @@ class PointLeesEdwards(Point):
 
         This is achieved by applying
         `particleShear.PointLeesEdwards.lee_edwards_closest_to_zero` to the actual delta x and delta y vector.\n
+        If the `particleShear.PointLeesEdwards.geometry_cache` is open, the vector is read from the cache.\n
         This method is defined in class `particleShear.PointLeesEdwards`.
          """
+        if self.geometry_cache is not False and self.geometry_cache.active:
+            return list(self.geometry_cache.lookup(self, theSphere)[0])
         pos = theSphere.coordinates()
         x = pos[0]
         y = pos[1]
@@ -206,10 +212,13 @@ class PointLeesEdwards(Point):
         among periodic repetitions, as evaluated as the absolute length of the delta vector returned by
         `particleShear.PointLeesEdwards.lee_edwards_relative_vector`.
         If `particleShear.PointLeesEdwards.use_lees_edwards` is False, the parent method
-        `particleShear.Point.d` of class `particleShear.Point` is used instead.\n
+        `particleShear.Point.d` of class `particleShear.Point` is used instead.
+        If the `particleShear.PointLeesEdwards.geometry_cache` is open, the distance is read from the cache.\n
         This method is defined in class `particleShear.PointLeesEdwards`."""
         if not self.use_lees_edwards:
             return super(PointLeesEdwards,self).d(theSphere)
+        if self.geometry_cache is not False and self.geometry_cache.active:
+            return self.geometry_cache.lookup(self, theSphere)[1]
 
         newDelta = self.lee_edwards_relative_vector(theSphere)
         return math.sqrt(newDelta[0] * newDelta[0] + newDelta[1] * newDelta[1])
@@ -223,13 +232,17 @@ class PointLeesEdwards(Point):
         Uses `particleShear.PointLeesEdwards.lee_edwards_relative_vector` to determine the shortest distance among the
         peridic representations under the Lees-Edwards boundary conditions.
         If `particleShear.PointLeesEdwards.use_lees_edwards` is False, the parent method
-        `particleShear.Point.n` of class `particleShear.Point` is used instead.\n
+        `particleShear.Point.n` of class `particleShear.Point` is used instead.
+        If the `particleShear.PointLeesEdwards.geometry_cache` is open, the vector is read from the cache; for
+        coinciding centers, the random direction is then drawn only once per step.\n
         This method is defined in class `particleShear.PointLeesEdwards`.
         """
 
 
         if not self.use_lees_edwards:
             return super(PointLeesEdwards,self).n(theSphere)
+        if self.geometry_cache is not False and self.geometry_cache.active:
+            return list(self.geometry_cache.lookup(self, theSphere)[2])
 
         d = self.d(theSphere)
         if d > 0:
@@ -240,6 +253,18 @@ class PointLeesEdwards(Point):
             return [math.cos(angle), math.sin(angle)]
 
 
+    def crosses_periodic_boundary(self, theSphere):
+        """Return whether the shortest connection to another sphere crosses a periodic boundary, that is, whether the
+        euclidian distance `particleShear.Point.d_euclidian` differs from the distance
+        `particleShear.PointLeesEdwards.d` under the boundary conditions.
+
+        If the `particleShear.PointLeesEdwards.geometry_cache` is open, the result is read from the cache.\n
+        This method is defined in class `particleShear.PointLeesEdwards`."""
+        if self.use_lees_edwards and self.geometry_cache is not False and self.geometry_cache.active:
+            return self.geometry_cache.lookup(self, theSphere)[3]
+        return self.d_euclidian(theSphere) != self.d(theSphere)
+
+
     def transmit_lees_edwards_parameters(self,theSphere):
         """Transmit the parameters pertaining to the Lees-Edwards boundary conditions to another sphere (that is,
         object deriving from `particleShear.PointLeesEdwards`).
@@ -1,5 +1,8 @@
 from .Force_register import Force_register
+from .Force_register import FORCE_INTERNAL
+from .Force_register import FORCE_EXTERNAL
 from .Graphical_output_configuration import Graphical_output_configuration
+from operator import mul
 
 
 class StressTensorEvaluation():
@@ -115,7 +118,8 @@ class StressTensorEvaluation():
 
         The `particleShear.StressTensorEvaluation.stress_tensor_LW` is evaluated from the internal
         forces acting between pairs of spheres. This information is stored in the
-        `particleShear.Force_register.pair_register` field of the `particleShear.Force_register`.
+        `particleShear.Force_register.pair_register` field of the `particleShear.Force_register` (the arrays of the
+        register are read directly).
         The sign convention is such that if the spheres are excerting
          each repulsive forces on each other, positive normal (diagonal) elements result in
          `particleShear.StressTensorEvaluation.stress_tensor_LW`. Since repulsion arises if the ensemble is compressed,
@@ -164,6 +168,10 @@ class StressTensorEvaluation():
          shear and frequencies, the simulation will not take into account a large part of the inertial forces, whereas
          a rheological measurement would, at least before correction for inertia.
 
+        If the register is in accumulation mode (`particleShear.Force_register.accumulate_stress`), the
+        Love-Weber and external force terms are taken from the running sums formed while the forces were recorded,
+        and no individual rows are walked (the boundary forces are then not drawn).
+
         `particleShear.StressTensorEvaluation.stress_tensor_linear_acceleration`
          is set equal to  `particleShear.StressTensorEvaluation.stress_tensor_unbalanced_forces`
          since we neglect gravity here
@@ -174,75 +182,60 @@ class StressTensorEvaluation():
         self.stress_tensor_linear_acceleration = [[0, 0], [0, 0]]
         self.stress_tensor_with_external_forces = [[0, 0], [0, 0]]
 
-        for pair in force_register.pair_register:
-            target=pair[0]
-
-            source=pair[1]
-
-            force=pair[2]
-
-            delta_x = [target.x-source.x, target.y-source.y]
-
-
-
-            for i in range(2):
-                for j in range(2):
-                    self.stress_tensor_LW[i][j] = self.stress_tensor_LW[i][j] + force[i]*1e-12 * delta_x[j] * 1e-6 / 2
-
-        for i in range(2):
-            for j in range(2):
-                self.stress_tensor_LW[i][j] = self.stress_tensor_LW[i][j]/(self.size_x*1e-6)/(self.size_y*1e-6)
-
-        for single in force_register.total_particle_force_register:
-            target = single[0]
-            force = single[1]
-            delta_x = [target.x-self.size_x/2 , target.y-self.size_y/2 ]
-
-
-
-            for i in range(2):
-                for j in range(2):
-                    self.stress_tensor_unbalanced_forces[i][j] = self.stress_tensor_unbalanced_forces[i][j] + force[i]*1e-12 * delta_x[j] * 1e-6
-
-        for i in range(2):
-            for j in range(2):
-                self.stress_tensor_unbalanced_forces[i][j] = self.stress_tensor_unbalanced_forces[i][j]/(self.size_x*1e-6)/(self.size_y*1e-6)
-
-
+        area = (self.size_x*1e-6)*(self.size_y*1e-6)
+        center_x = self.size_x/2
+        center_y = self.size_y/2
+
+        spheres = force_register.spheres
+        # Positions of the spheres by register index, gathered once
+        x = [theSphere.x for theSphere in spheres]
+        y = [theSphere.y for theSphere in spheres]
+
+        if force_register.accumulate_stress:
+            # Accumulation mode: the pairwise sums were formed while the forces were recorded
+            stress_LW = force_register.stress_LW_sum
+        else:
+            rows = force_register.force_rows(FORCE_INTERNAL)
+            targets = [force_register.force_target[row] for row in rows]
+            sources = [force_register.force_source[row] for row in rows]
+            force = [[force_register.force_x[row] for row in rows], [force_register.force_y[row] for row in rows]]
+            delta_x = [[x[t]-x[s] for t, s in zip(targets, sources)], [y[t]-y[s] for t, s in zip(targets, sources)]]
+            stress_LW = tensor_sum(force, delta_x, 1e-12*1e-6/2)
+        self.stress_tensor_LW = [[stress_LW[i][j]/area for j in range(2)] for i in range(2)]
+
+        indices = force_register.total_force_order[0:force_register.total_force_count]
+        force = [[force_register.total_force_x[index] for index in indices],
+                 [force_register.total_force_y[index] for index in indices]]
+        delta_x = [[x[index]-center_x for index in indices], [y[index]-center_y for index in indices]]
+        self.stress_tensor_unbalanced_forces = tensor_sum(force, delta_x, 1e-12*1e-6/area)
 
         if self.theCanvas:
             for theLine in self.toDeleteList:
                 self.theCanvas.delete(theLine)
 
-
-
-        for external_force in force_register.external_force_register:
-            target = external_force[0]
-            force = external_force[1]
-
-            r = [target.x-self.size_x/2, target.y-self.size_y/2]
+        if force_register.accumulate_stress:
+            # -sum(force[i]*(x[j]-center[j])), from the running sums of force[i] and force[i]*x[j]
+            center = [center_x, center_y]
+            self.stress_tensor_with_external_forces = \
+                [[-(force_register.external_force_moment_sum[i][j]
+                    - force_register.external_force_sum[i]*center[j])*1e-12*1e-6/area for j in range(2)]
+                 for i in range(2)]
+        else:
+            rows = force_register.force_rows(FORCE_EXTERNAL)
+            targets = [force_register.force_target[row] for row in rows]
+            force = [[force_register.force_x[row] for row in rows], [force_register.force_y[row] for row in rows]]
+            r = [[x[target]-center_x for target in targets], [y[target]-center_y for target in targets]]
+            self.stress_tensor_with_external_forces = tensor_sum(force, r, -1e-12*1e-6/area)
 
             if self.theCanvas and self.graphical_output_configuration.draw_boundary_forces:
-                self.toDeleteList.append(
-                    self.theCanvas.create_line(target.x,target.y,target.x+force[0]*1000,target.y+force[1]*1000,fill="darkorchid"))
-
-            for i in range(2):
-                for j in range(2):
-                    self.stress_tensor_with_external_forces[i][j] = self.stress_tensor_with_external_forces[i][j]\
-                                                                    -force[i]*1e-12 * r[j] * 1e-6
-
-
-
-        for i in range(2):
-            for j in range(2):
-                self.stress_tensor_with_external_forces[i][j] = \
-                    self.stress_tensor_with_external_forces[i][j]/(self.size_x*1e-6)/(self.size_y*1e-6)
+                for target, force_x, force_y in zip(targets, force[0], force[1]):
+                    self.toDeleteList.append(
+                        self.theCanvas.create_line(x[target], y[target], x[target]+force_x*1000,
+                                                   y[target]+force_y*1000, fill="darkorchid"))
 
-
-        for i in range(2):
-            for j in range(2):
-                # These are synonyms as we do not include gravity
-                self.stress_tensor_linear_acceleration[i][j]=self.stress_tensor_unbalanced_forces[i][j]
+        # These are synonyms as we do not include gravity
+        self.stress_tensor_linear_acceleration = [[self.stress_tensor_unbalanced_forces[i][j] for j in range(2)]
+                                                  for i in range(2)]
 
     def evaluate_spin_kinetic_energy_stress_tensor(self,theSphereList):
         """Evaluate the stress tensor associated with the centrifugal forces arising by rotation of the
@@ -263,21 +256,12 @@ class StressTensorEvaluation():
 
 
 
-        self.stress_tensor_spin_kinetic_energy = [[0, 0], [0, 0]]
-
-        for theSphere in theSphereList:
-            # The moment of inertia is in mg*micrometers^2, but we need it in kg*m^2 here. The
-            # unit conversion factor is therefore 10^(-18)
-
-            moment_of_inertia = theSphere.inertia * 1e-18
-            K = theSphere.omega *theSphere.omega / 2 * moment_of_inertia
-            for i in range(2):
-                self.stress_tensor_spin_kinetic_energy[i][i] = self.stress_tensor_spin_kinetic_energy[i][i] - K
+        # The moment of inertia is in mg*micrometers^2, but we need it in kg*m^2 here. The
+        # unit conversion factor is therefore 10^(-18)
+        K = sum([theSphere.omega*theSphere.omega*theSphere.inertia for theSphere in theSphereList]) / 2 * 1e-18
         # Now, with respect to the sampling volume
-        for i in range(2):
-            for j in range(2):
-                self.stress_tensor_spin_kinetic_energy[i][j] = self.stress_tensor_spin_kinetic_energy[i][j] \
-                                                               / (self.size_x * 1e-6) / (self.size_y * 1e-6)
+        area = (self.size_x*1e-6)*(self.size_y*1e-6)
+        self.stress_tensor_spin_kinetic_energy = [[-K/area, 0], [0, -K/area]]
 
 
     def evaluate_unbalanced_torque_stress_tensor(self,force_register):
@@ -304,15 +288,10 @@ class StressTensorEvaluation():
         # For the torque, this is further multiplied by micrometers, so that makes
         # micrometers^2/mg/s-2/m of depth
 
-        for unbalanced_torque in force_register.unbalanced_moment_register:
-            M = unbalanced_torque[1]*1e-18
-            self.stress_tensor_unbalanced_torque[0][1]=self.stress_tensor_unbalanced_torque[0][1]-M/2
-            self.stress_tensor_unbalanced_torque[1][0] =self.stress_tensor_unbalanced_torque[1][0]+M/2
-            # Now, with respect to the sampling volume
-        for i in range(2):
-            for j in range(2):
-                self.stress_tensor_unbalanced_torque[i][j] = self.stress_tensor_unbalanced_torque[i][j] \
-                                                               / (self.size_x * 1e-6) / (self.size_y * 1e-6)
+        indices = force_register.unbalanced_moment_order[0:force_register.unbalanced_moment_count]
+        M = sum([force_register.unbalanced_moment[index] for index in indices])*1e-18
+        # Now, with respect to the sampling volume
+        self.stress_tensor_unbalanced_torque = torque_tensor(M, (self.size_x*1e-6)*(self.size_y*1e-6))
 
     def evaluate_internal_torque_stress_tensor(self,force_register):
         """Evaluate the stress tensor associated with internal unbalanced torques acting on the particle
@@ -338,15 +317,12 @@ class StressTensorEvaluation():
         # For the torque, this is further multiplied by micrometers, so that makes
         # micrometers^2/mg/s-2/m of depth
 
-        for internal_torque in force_register.internal_moment_register:
-            M = internal_torque[2]*1e-18
-            self.stress_tensor_internal_torque[0][1]=self.stress_tensor_internal_torque[0][1]-M/2
-            self.stress_tensor_internal_torque[1][0] =self.stress_tensor_internal_torque[1][0]+M/2
-            # Now, with respect to the sampling volume
-        for i in range(2):
-            for j in range(2):
-                self.stress_tensor_internal_torque[i][j] = self.stress_tensor_internal_torque[i][j] \
-                                                               / (self.size_x * 1e-6) / (self.size_y * 1e-6)
+        if force_register.accumulate_stress:
+            M = force_register.internal_moment_sum*1e-18
+        else:
+            M = sum([force_register.moment_value[row] for row in force_register.moment_rows(FORCE_INTERNAL)])*1e-18
+        # Now, with respect to the sampling volume
+        self.stress_tensor_internal_torque = torque_tensor(M, (self.size_x*1e-6)*(self.size_y*1e-6))
 
     def evaluate_rotational_stress_tensors(self,force_register,theSphereList):
         """Evaluate the rotational stress tensors
@@ -385,31 +361,20 @@ class StressTensorEvaluation():
 
         Method defined in `particleShear.StressTensorEvaluation`"""
 
-        self.stress_tensor_linear_acceleration_otsuki = [[0, 0], [0, 0]]
-
-
-        for theSphere in theSphereList:
-            # Units: forces are in N
-            # the mass is in mg
-            # the length scales are in micrometer
-            # so here to kgm/s one needs to multiply by 10^-12
-            px=(theSphere.xspeed-shear_rate*(theSphere.y-self.size_y/2))*theSphere.m*1e-12
-            py=theSphere.yspeed*theSphere.m*1e-12
-            p=[px,py]
-
-            for i in range(2):
-                for j in range(2):
-                    # Eq. 15 of Otsuki, M. and H. Hayakawa, Discontinuous change of shear modulus for frictional
-                    # jammed granular materials. Phys Rev E, 2017. 95(6-1): p. 062902.
-                    # This doesn't seem to be quite right as it doesn't seem to involve acceleration
-                    self.stress_tensor_linear_acceleration_otsuki[i][j] = self.stress_tensor_linear_acceleration_otsuki[i][j]-\
-                                                                   p[i]*p[j]/theSphere.m*1e6
-
-
-        for i in range(2):
-            for j in range(2):
-                self.stress_tensor_linear_acceleration_otsuki[i][j] = \
-                    self.stress_tensor_linear_acceleration_otsuki[i][j]/(self.size_x*1e-6)/(self.size_y*1e-6)
+        # Units: forces are in N
+        # the mass is in mg
+        # the length scales are in micrometer
+        # so here to kgm/s one needs to multiply by 10^-12
+        # Eq. 15 of Otsuki, M. and H. Hayakawa, Discontinuous change of shear modulus for frictional
+        # jammed granular materials. Phys Rev E, 2017. 95(6-1): p. 062902.
+        # This doesn't seem to be quite right as it doesn't seem to involve acceleration
+        # With p[i]=v[i]*m*1e-12, the terms p[i]*p[j]/m*1e6 are summed as m*v[i]*v[j]*1e-18
+        m = [theSphere.m for theSphere in theSphereList]
+        v = [[theSphere.xspeed-shear_rate*(theSphere.y-self.size_y/2) for theSphere in theSphereList],
+             [theSphere.yspeed for theSphere in theSphereList]]
+        mv = [[m_k*v_k for m_k, v_k in zip(m, v[i])] for i in range(2)]
+        self.stress_tensor_linear_acceleration_otsuki = \
+            tensor_sum(mv, v, -1e-12*1e-12*1e6/((self.size_x*1e-6)*(self.size_y*1e-6)))
 
 
     def evaluate_stress_tensors(self,force_register,theSphereList,shear_rate):
@@ -478,13 +443,13 @@ class StressTensorEvaluation():
         return (-self.stress_tensor_with_external_forces[0][1])
 
 
+def tensor_sum(first, second, factor):
+    """Return the 2x2 tensor factor*sum(first[i][k]*second[j][k]) over k
 
+    first and second hold two columns (x- and y-components) of equal length each"""
+    return [[sum(map(mul, first[i], second[j]))*factor for j in range(2)] for i in range(2)]
 
 
-
-
-
-
-
-
-
+def torque_tensor(M, area):
+    """Return the asymmetric 2x2 stress tensor of a net torque M acting on the given area"""
+    return [[0, -M/2/area], [M/2/area, 0]]
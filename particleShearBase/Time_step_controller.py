@@ -0,0 +1,185 @@
+import math
+
+
+class Time_step_controller():
+    """Adaptive choice of the time step of a `particleShear.CanvasPointsBasicElasticity` or derived canvas.
+
+    Rather than a fixed time step chosen in advance from the model parameters, the controller adjusts the time step to
+    the current dynamics, by way of three criteria evaluated once the forces of a step are calculated:\n
+    - the overlap change: an upper bound of the change of the overlap of two touching spheres during a step, relative
+      to the smallest radius. It is estimated as dt*(2*v+|shear_rate|*2*r_max)/r_min, v being the largest speed of a
+      mobile sphere relative to the shear flow; the second term accounts for the relative speed imposed by the shear
+      flow between neighbors.\n
+    - the force rate: the relative change of the largest net force on a mobile sphere
+      (`particleShear.CanvasPointsBasicElasticity.max_residual_force`) per step, relative to the largest of the last two
+      values.\n
+    - the energy drift: the change of the kinetic energy of the mobile spheres relative to the shear flow between two
+      steps, less the work done by the forces in the meantime (trapezoidal rule, see
+      `particleShear.Time_step_controller.energy_and_power`), per step and relative to the kinetic energy. The exact
+      motion conserves this balance; the error of the integration grows as dt^2. Cooling (cool_factor<1) removes
+      energy without work and so counts as drift.\n
+    Each criterion enabled is compared to its target value; the time step is scaled by the smallest ratio of target to
+    measurement (square root thereof for the energy drift), within the bounds of reduction_factor and growth_factor per
+    adjustment and of dt_min and dt_max. The criteria are evaluated every check_every calls (per step for 1, or per
+    block of steps); in between, the time step stays constant. The bounds can be derived from the material parameters
+    of the canvas with `particleShear.Time_step_controller.set_bounds`.\n
+    Sub-package particleShearBase"""
+
+    def __init__(self, dt, dt_min=False, dt_max=False, max_overlap_change=0.01, max_force_change=False,
+                 check_every=1, growth_factor=1.2, reduction_factor=0.5, max_energy_drift=False):
+        """Initialize the controller
+
+        - **parameters**\n
+            `dt` Initial time step\n
+            `dt_min` Smallest time step allowed; dt/100 by default\n
+            `dt_max` Largest time step allowed; 10*dt by default\n
+            `max_overlap_change` Target upper bound of the overlap change per step, relative to the smallest radius;
+            False to disable this criterion\n
+            `max_force_change` Target relative change of the largest net force per step; False to disable this
+            criterion\n
+            `check_every` Number of steps between two evaluations of the criteria\n
+            `growth_factor` Largest increase of the time step per adjustment\n
+            `reduction_factor` Largest decrease of the time step per adjustment\n
+            `max_energy_drift` Target energy drift per step, relative to the kinetic energy; False to disable this
+            criterion"""
+        self.dt = dt
+        """Current time step"""
+        self.dt_min = dt_min
+        """Smallest time step allowed"""
+        if dt_min is False:
+            self.dt_min = dt / 100
+        self.dt_max = dt_max
+        """Largest time step allowed"""
+        if dt_max is False:
+            self.dt_max = 10 * dt
+        self.max_overlap_change = max_overlap_change
+        """Target upper bound of the overlap change per step, relative to the smallest radius"""
+        self.max_force_change = max_force_change
+        """Target relative change of the largest net force per step"""
+        self.max_energy_drift = max_energy_drift
+        """Target energy drift per step, relative to the kinetic energy"""
+        self.check_every = max(1, int(check_every))
+        """Number of steps between two evaluations of the criteria"""
+        self.growth_factor = growth_factor
+        """Largest increase of the time step per adjustment"""
+        self.reduction_factor = reduction_factor
+        """Largest decrease of the time step per adjustment"""
+        self.calls = 0
+        """Number of calls to `particleShear.Time_step_controller.next_dt`"""
+        self.last_force = False
+        """Largest net force at the last evaluation"""
+        self.last_force_call = 0
+        """Call at which `particleShear.Time_step_controller.last_force` was measured"""
+        self.last_energy = False
+        """[kinetic energy, power of the forces] at the last call"""
+        self.energy_error = 0
+        """Sum of the energy changes less the work of the forces since the last evaluation"""
+        self.energy_scale = 0
+        """Largest kinetic energy since the last evaluation"""
+        self.energy_steps = 0
+        """Number of steps summed in `particleShear.Time_step_controller.energy_error`"""
+        self.adjustments = 0
+        """Number of changes of the time step"""
+
+    def set_bounds(self, theCanvas, fraction=0.3, dynamic_range=100):
+        """Set dt_max to fraction of the stability limit of theCanvas, dt_min to dt_max/dynamic_range, and bring the
+        current time step within these bounds
+
+        The stability limit is `particleShear.CanvasPointsBasicElasticity.critical_time_step`, from the masses of the
+        spheres and the spring and viscosity constants of the stiffest interaction. The fraction accounts for the
+        spheres touching several neighbors, which oscillate faster than an isolated pair.\n
+        This method is defined in class `particleShear.Time_step_controller`"""
+        self.dt_max = fraction * theCanvas.critical_time_step()
+        self.dt_min = self.dt_max / dynamic_range
+        self.dt = min(self.dt_max, max(self.dt_min, self.dt))
+
+    def overlap_change(self, theCanvas, dt):
+        """Return the upper bound of the overlap change during a step dt, relative to the smallest radius
+
+        This method is defined in class `particleShear.Time_step_controller`"""
+        max_speed = 0
+        r_min = 0
+        r_max = 0
+        for theSphere in theCanvas.sphereList:
+            if r_min == 0 or theSphere.r < r_min:
+                r_min = theSphere.r
+            r_max = max(r_max, theSphere.r)
+            if theCanvas.canMove(theSphere):
+                xspeed = theSphere.xspeed - (theSphere.y - theCanvas.size_y / 2) * theCanvas.shear_rate
+                max_speed = max(max_speed, math.sqrt(xspeed * xspeed + theSphere.yspeed * theSphere.yspeed))
+        if r_min <= 0:
+            return 0
+        return dt * (2 * max_speed + abs(theCanvas.shear_rate) * 2 * r_max) / r_min
+
+    def energy_and_power(self, theCanvas):
+        """Return [kinetic energy, power] of the mobile spheres, relative to the shear flow, for the forces just
+        calculated
+
+        The speeds are taken relative to the shear flow, the x-speed less (y-size_y/2)*shear_rate and the rotation rate
+        plus shear_rate/2, as these are kept when the shear rate changes
+        (`particleShear.CanvasPointsBasicElasticityLeesEdwards.adjust_sphere_speed_to_shear_rate_change`). Besides the
+        forces and torques, the power includes the change of the relative x-speed as the spheres move across the shear
+        flow, -m*shear_rate*xspeed*yspeed.\n
+        This method is defined in class `particleShear.Time_step_controller`"""
+        energy = 0
+        power = 0
+        shear_rate = theCanvas.shear_rate
+        for theSphere in theCanvas.sphereList:
+            if theCanvas.canMove(theSphere):
+                xspeed = theSphere.xspeed - (theSphere.y - theCanvas.size_y / 2) * shear_rate
+                yspeed = theSphere.yspeed
+                energy = energy + theSphere.m * (xspeed * xspeed + yspeed * yspeed) / 2
+                power = power + theSphere.xforce * xspeed + theSphere.yforce * yspeed - \
+                        theSphere.m * shear_rate * xspeed * yspeed
+                inertia = getattr(theSphere, "inertia", 0)
+                if inertia:
+                    omega = theSphere.omega + shear_rate / 2
+                    energy = energy + inertia * omega * omega / 2
+                    power = power + theSphere.torque * omega
+        return [energy, power]
+
+    def next_dt(self, theCanvas):
+        """Return the time step for the current step of theCanvas, whose forces have just been calculated
+
+        This method is defined in class `particleShear.Time_step_controller`"""
+        self.calls = self.calls + 1
+        if self.max_energy_drift is not False:
+            # The energy balance is followed at every step, the time step of the last step being self.dt
+            energy = self.energy_and_power(theCanvas)
+            if self.last_energy is not False:
+                self.energy_error = self.energy_error + energy[0] - self.last_energy[0] - \
+                                    self.dt * (self.last_energy[1] + energy[1]) / 2
+                self.energy_scale = max(self.energy_scale, energy[0], self.last_energy[0])
+                self.energy_steps = self.energy_steps + 1
+            self.last_energy = energy
+        if (self.calls - 1) % self.check_every != 0:
+            return self.dt
+
+        ratio = self.growth_factor
+        if self.max_overlap_change is not False:
+            change = self.overlap_change(theCanvas, self.dt)
+            if change > 0:
+                ratio = min(ratio, self.max_overlap_change / change)
+        if self.max_force_change is not False:
+            force = theCanvas.max_residual_force()
+            if self.last_force is not False and max(force, self.last_force) > 0:
+                change = abs(force - self.last_force) / max(force, self.last_force) / (self.calls - self.last_force_call)
+                if change > 0:
+                    ratio = min(ratio, self.max_force_change / change)
+            self.last_force = force
+            self.last_force_call = self.calls
+        if self.max_energy_drift is not False and self.energy_steps > 0:
+            if self.energy_scale > 0:
+                drift = abs(self.energy_error) / self.energy_scale / self.energy_steps
+                if drift > 0:
+                    ratio = min(ratio, math.sqrt(self.max_energy_drift / drift))
+            self.energy_error = 0
+            self.energy_scale = 0
+            self.energy_steps = 0
+
+        dt = self.dt * max(self.reduction_factor, ratio)
+        dt = min(self.dt_max, max(self.dt_min, dt))
+        if dt != self.dt:
+            self.adjustments = self.adjustments + 1
+        self.dt = dt
+        return dt
@@ -8,12 +8,15 @@ Module written by Thomas Braschler (thomas.braschler@gmail.com)
 """
 
 __all__ = ["Force_register","StressTensorEvaluation","Graphical_output_configuration","neighbor_relation",
+           "Neighbor_cell_list","Particle_state_arrays","Contact_table","Contact_geometry_cache",
+           "Time_step_controller",
            "Point","PointLeesEdwards",
            "Circle","CircleBasicElasticity",
            "CircleFrictionElasticity","CircleMass","CircleMassNeighbors",
            "CanvasPoints","CanvasPointsBasicElasticity","CanvasPointsBasicElasticityLeesEdwards",
            "CanvasPointsFrictionElasticityLeesEdwards","CanvasPointsMass","CanvasPointsShear","CanvasPointsNeighbors",
-           "elastic_force_law_plateau","elastic_force_law","PlateauConfiguration","distance_transform_plateau"]
+           "elastic_force_law_plateau","elastic_force_law","PlateauConfiguration","distance_transform_plateau",
+           "INTEGRATOR_EULER","INTEGRATOR_VELOCITY_VERLET"]
 
 
 
@@ -22,6 +25,11 @@ from .Force_register import Force_register
 from .StressTensorEvaluation import StressTensorEvaluation
 from .Graphical_output_configuration import Graphical_output_configuration
 from .neighbor_relation import neighbor_relation
+from .Neighbor_cell_list import Neighbor_cell_list
+from .Particle_state_arrays import Particle_state_arrays
+from .Contact_table import Contact_table
+from .Contact_geometry_cache import Contact_geometry_cache
+from .Time_step_controller import Time_step_controller
 
 
 
@@ -52,6 +60,11 @@ from .CircleBasicElasticity import elastic_force_law_plateau
 from .CircleBasicElasticity import PlateauConfiguration
 from .CircleBasicElasticity import distance_transform_plateau
 
+# Integrators
+
+from .CanvasPointsBasicElasticity import INTEGRATOR_EULER
+from .CanvasPointsBasicElasticity import INTEGRATOR_VELOCITY_VERLET
+
 
 
 
@@ -0,0 +1,156 @@
+from array import array
+from particleShearBase import Contact_table
+
+
+class Bond_table(Contact_table):
+    """Table of the permanent links (bonds) between the spheres of a canvas.
+
+    Permanent links are described by two `particleShear.neighbor_relation_linkable` objects, one in the neighbor list
+    of each of the two linked spheres. The bond table holds each link once, as a row with the indices i<j of the two
+    spheres in the `particleShear.CanvasPoints.sphereList`, the two relation objects, the equilibrium distance and the
+    per-side strength ratios of the link (see `particleShear.SphereLinkable.permanent_link_ratios`).
+    Rows are found through a dictionary, so that establishing and cutting a link are O(1) operations (a cut row is
+    replaced by the last row). The geometry arrays and boundary condition handling are inherited from
+    `particleShear.Contact_table`.\n
+    The friction positions stay in the relation objects, since the spheres integrate them separately for the two
+    sides of the link (see `particleShear.CircleFrictionElasticity.move`).\n
+    Sub-package particleShearLinkableObjects"""
+
+    def __init__(self, sphereList=()):
+        """Initialize the bond table for the given spheres, collecting their current permanent links
+
+        - **parameters**\n
+            `sphereList` The list of spheres, typically `particleShear.CanvasPoints.sphereList`"""
+        super(Bond_table, self).__init__()
+        self.equilibrium_distance = array('d')
+        """Equilibrium distance of each link"""
+        self.ratios_i = []
+        """Strength ratios of each link as seen by sphere i (see `particleShear.SphereLinkable.permanent_link_ratios`)"""
+        self.ratios_j = []
+        """Strength ratios of each link as seen by sphere j"""
+        self.sphereList = []
+        """The spheres indexed by the table"""
+        self.sphere_index = {}
+        """Index of each sphere in `particleShear.Bond_table.sphereList`, by id of the sphere"""
+        self.rows = {}
+        """Row of each link, by (sphere index i, sphere index j)"""
+        self.build(sphereList)
+
+    def build(self, sphereList):
+        """Collect the permanent links from the neighbor lists of the spheres
+
+        Only links present on both sides are taken into account.\n
+        This method is defined in class `particleShear.Bond_table`"""
+        self.sphereList = list(sphereList)
+        self.sphere_index = {}
+        for sphereIndex in range(len(self.sphereList)):
+            self.sphere_index[id(self.sphereList[sphereIndex])] = sphereIndex
+
+        self.index_i = []
+        self.index_j = []
+        self.relation_ij = []
+        self.relation_ji = []
+        self.permanent = []
+        self.one_sided = []
+        self.equilibrium_distance = array('d')
+        self.ratios_i = []
+        self.ratios_j = []
+        self.rows = {}
+        self.geometry_evaluated = False
+
+        for theSphere in self.sphereList:
+            for theNeighbor in theSphere.neighbors:
+                if theNeighbor.interface_type == "permanent":
+                    self.establish(theSphere, theNeighbor.theSphere)
+
+    def represents(self, sphereList):
+        """Return whether the table indexes exactly the spheres of sphereList, in the same order
+
+        This method is defined in class `particleShear.Bond_table`"""
+        if len(sphereList) != len(self.sphereList):
+            return False
+        for ind in range(len(sphereList)):
+            if sphereList[ind] is not self.sphereList[ind]:
+                return False
+        return True
+
+    def find(self, theSphere, otherSphere):
+        """Return the row of the link between the two spheres, or -1 if there is no such link in the table
+
+        This method is defined in class `particleShear.Bond_table`"""
+        i = self.sphere_index.get(id(theSphere))
+        j = self.sphere_index.get(id(otherSphere))
+        if i is None or j is None:
+            return -1
+        if i > j:
+            i, j = j, i
+        return self.rows.get((i, j), -1)
+
+    def establish(self, theSphere, otherSphere):
+        """Add (or update) the link between the two spheres, as currently described by their neighbor relations
+
+        Nothing is added if one of the spheres is not indexed by the table or if the link is not permanent on both
+        sides.\n
+        This method is defined in class `particleShear.Bond_table`"""
+        i = self.sphere_index.get(id(theSphere))
+        j = self.sphere_index.get(id(otherSphere))
+        if i is None or j is None or i == j:
+            return
+        if i > j:
+            i, j = j, i
+            theSphere, otherSphere = otherSphere, theSphere
+
+        relation_ij = relation_of(theSphere, otherSphere)
+        relation_ji = relation_of(otherSphere, theSphere)
+        if relation_ij is None or relation_ji is None:
+            return
+        if relation_ij.interface_type != "permanent" or relation_ji.interface_type != "permanent":
+            return
+
+        row = self.rows.get((i, j))
+        if row is None:
+            row = len(self.index_i)
+            self.rows[(i, j)] = row
+            self.index_i.append(i)
+            self.index_j.append(j)
+            self.relation_ij.append(relation_ij)
+            self.relation_ji.append(relation_ji)
+            self.permanent.append(True)
+            self.equilibrium_distance.append(relation_ij.equilibrium_distance)
+            self.ratios_i.append(theSphere.permanent_link_ratios())
+            self.ratios_j.append(otherSphere.permanent_link_ratios())
+        else:
+            self.relation_ij[row] = relation_ij
+            self.relation_ji[row] = relation_ji
+            self.equilibrium_distance[row] = relation_ij.equilibrium_distance
+            self.ratios_i[row] = theSphere.permanent_link_ratios()
+            self.ratios_j[row] = otherSphere.permanent_link_ratios()
+        self.geometry_evaluated = False
+
+    def cut(self, theSphere, otherSphere):
+        """Remove the link between the two spheres from the table, if present
+
+        This method is defined in class `particleShear.Bond_table`"""
+        row = self.find(theSphere, otherSphere)
+        if row < 0:
+            return
+        del self.rows[(self.index_i[row], self.index_j[row])]
+
+        last = len(self.index_i) - 1
+        if row != last:
+            self.rows[(self.index_i[last], self.index_j[last])] = row
+            for field in [self.index_i, self.index_j, self.relation_ij, self.relation_ji, self.permanent,
+                          self.equilibrium_distance, self.ratios_i, self.ratios_j]:
+                field[row] = field[last]
+        for field in [self.index_i, self.index_j, self.relation_ij, self.relation_ji, self.permanent,
+                      self.equilibrium_distance, self.ratios_i, self.ratios_j]:
+            field.pop()
+        self.geometry_evaluated = False
+
+
+def relation_of(theSphere, otherSphere):
+    """Return the neighbor relation of theSphere describing its link with otherSphere, None if there is none"""
+    foundNeighborIndex = theSphere.findNeighborIndex(otherSphere)
+    if foundNeighborIndex < 0:
+        return None
+    return theSphere.neighbors[foundNeighborIndex]
@@ -3,6 +3,10 @@ import random
 import math
 
 from particleShearBase import CanvasPointsFrictionElasticityLeesEdwards
+from particleShearBase import CircleBasicElasticity
+from particleShearBase import INTEGRATOR_EULER
+from .SphereLinkable import SphereLinkable
+from .Bond_table import Bond_table
 
 def dotProduct2(a,b):
     """Helper function for the scalar product of vectors of length 2"""
@@ -38,6 +42,20 @@ class CanvasPointsLinkable (CanvasPointsFrictionElasticityLeesEdwards):
             size_x, size_y, theCanvas=theCanvas, doDrawing=doDrawing,
                  k=k, nu=nu,m=m,k_t=k_t,nu_t=nu_t,mu=mu)
 
+        self.bond_table = False
+        """Optional `particleShear.Bond_table` holding the permanent links, see
+        `particleShear.CanvasPointsLinkable.enable_bond_table`"""
+
+        self.implicit_bonds = False
+        """Whether the spring and damper terms of the permanent links are integrated semi-implicitly, see
+        `particleShear.CanvasPointsLinkable.set_implicit_bonds`"""
+        self.implicit_bond_tolerance = 1e-8
+        """Relative residual at which the conjugate gradient solver of the semi-implicit bond update stops"""
+        self.implicit_bond_max_iterations = 200
+        """Largest number of conjugate gradient iterations of the semi-implicit bond update"""
+        self.implicit_bond_iterations = 0
+        """Number of conjugate gradient iterations of the last semi-implicit bond update"""
+
 
     def particle_info(self):
         """Provide short description of particle type of inclusion into output file
@@ -46,6 +64,459 @@ class CanvasPointsLinkable (CanvasPointsFrictionElasticityLeesEdwards):
         return "CanvasPointsLinkable: Frictional spheres with possible permanent links, Lees Edwards boundary"
 
 
+    def enable_bond_table(self):
+        """Collect the permanent links into a `particleShear.Bond_table` kept up to date by the spheres
+
+        When the contact kernels are also enabled (`particleShear.CanvasPointsBasicElasticity.use_contact_kernels` or
+        `particleShear.CanvasPointsFrictionElasticityLeesEdwards.single_pass_forces`), the forces of the permanent
+        links are then calculated by `particleShear.CanvasPointsLinkable.permanent_link_kernel`.\n
+        Method defined in `particleShear.CanvasPointsLinkable` """
+        self.disable_bond_table()
+        self.bond_table = Bond_table(self.sphereList)
+        for theSphere in self.sphereList:
+            theSphere.bond_table = self.bond_table
+
+    def disable_bond_table(self):
+        """Stop using the `particleShear.CanvasPointsLinkable.bond_table`
+
+        Method defined in `particleShear.CanvasPointsLinkable` """
+        if self.bond_table is not False:
+            for theSphere in self.bond_table.sphereList:
+                theSphere.bond_table = False
+        self.bond_table = False
+
+    def current_bond_table(self):
+        """Return the `particleShear.CanvasPointsLinkable.bond_table` if it is enabled and indexes the current
+        `particleShear.CanvasPoints.sphereList`, False otherwise
+
+        Method defined in `particleShear.CanvasPointsLinkable` """
+        if self.bond_table is not False and self.bond_table.represents(self.sphereList):
+            return self.bond_table
+        return False
+
+    def bond_kernel_handles(self, theSphere, otherSphere):
+        """Return whether the permanent link between the two spheres is treated by
+        `particleShear.CanvasPointsLinkable.permanent_link_kernel`
+
+        This is the case only if the bond table indexes the current spheres (see
+        `particleShear.CanvasPointsLinkable.current_bond_table`); otherwise the kernel does not run, and the links are
+        left to the sphere methods.\n
+        Method defined in `particleShear.CanvasPointsLinkable` """
+        if not (self.use_contact_kernels or self.single_pass_forces):
+            return False
+        table = self.current_bond_table()
+        if table is False:
+            return False
+        return table.find(theSphere, otherSphere) >= 0
+
+    def mechanical_simulation_step_calculate_forces(self, dt=1):
+        super(CanvasPointsLinkable, self).mechanical_simulation_step_calculate_forces()
+        if (self.use_contact_kernels or self.single_pass_forces) and self.current_bond_table() is not False:
+            self.permanent_link_kernel()
+
+    def permanent_link_kernel(self):
+        """Calculate and apply the forces of all permanent links in one batched pass over the
+        `particleShear.CanvasPointsLinkable.bond_table`
+
+        The forces and torques are those of `particleShear.CanvasPointsLinkable.permanent_link_forces`, recorded link
+        by link in the force register. If the spheres do not share the same boundary conditions, nothing is done here
+        since the contact kernels then use the sphere methods for all neighbors.\n
+        Method defined in `particleShear.CanvasPointsLinkable` """
+        forces = self.permanent_link_forces(record=True)
+        if forces is False:
+            # The contact kernels then fall back to the sphere methods, which include the permanent links
+            return
+        self.add_forces(forces[0], forces[1])
+        self.add_torques(forces[2])
+
+    def permanent_link_forces(self, record=False):
+        """Return the forces and torques of all permanent links at the current positions and speeds, as per-sphere
+        lists [xforce, yforce, torque], from one pass over the `particleShear.CanvasPointsLinkable.bond_table`
+
+        For each link, this is equivalent to the sphere methods for permanent neighbors, evaluated from both sides:
+        the central elastic force (tensile law `particleShear.SphereLinkable.call_back_elastic_force_law_tensile`
+        beyond the equilibrium distance, the repulsive law
+        `particleShear.CircleBasicElasticity.call_back_elastic_force_law` below), the central viscous force, and the
+        tangential elastic and viscous forces without friction limit, each scaled by the strength ratios of the
+        respective sphere (`particleShear.SphereLinkable.permanent_link_ratios`). The tangential couple is distributed
+        as in `particleShear.CircleFrictionElasticity.distribute_tangential_couple`.\n
+        The forces are not applied to the spheres; with record, they are recorded in the force register. Returns
+        False if the spheres do not share the same boundary conditions.\n
+        Method defined in `particleShear.CanvasPointsLinkable` """
+
+        table = self.bond_table
+        spheres = self.sphereList
+
+        table.read_boundary_parameters(spheres)
+        if not table.uniform:
+            return False
+        table.evaluate_geometry(self.state_sequence("x"), self.state_sequence("y"),
+                                self.state_sequence("xspeed"), self.state_sequence("yspeed"))
+
+        r = self.state_sequence("r")
+        omega = self.state_sequence("omega")
+        repulsion = [theSphere.central_repulsion_coefficient for theSphere in spheres]
+
+        xforce = [0.0] * len(spheres)
+        yforce = [0.0] * len(spheres)
+        torque = [0.0] * len(spheres)
+
+        tensile_law = SphereLinkable.call_back_elastic_force_law_tensile
+        force_law = CircleBasicElasticity.call_back_elastic_force_law
+        k = self.k
+        nu = self.nu
+        k_t = self.k_t
+        nu_t = self.nu_t
+
+        index_i = table.index_i
+        index_j = table.index_j
+        relation_ij = table.relation_ij
+        relation_ji = table.relation_ji
+        equilibrium_distance = table.equilibrium_distance
+        ratios_i = table.ratios_i
+        ratios_j = table.ratios_j
+        distance = table.distance
+        normal_x = table.normal_x
+        normal_y = table.normal_y
+        vx_rel = table.vx_rel
+        vy_rel = table.vy_rel
+        crosses_boundary = table.crosses_boundary
+
+        for row in range(len(index_i)):
+            i = index_i[row]
+            j = index_j[row]
+            d = distance[row]
+            n_x = normal_x[row]
+            n_y = normal_y[row]
+            d_eq = equilibrium_distance[row]
+            ratio_i = ratios_i[row]
+            ratio_j = ratios_j[row]
+
+            # Central force
+            if d >= d_eq:
+                elastic_i = tensile_law(d, d_eq, k)
+                elastic_j = elastic_i
+            else:
+                elastic_i = force_law(d, d_eq, k, repulsion[i])
+                if repulsion[j] == repulsion[i]:
+                    elastic_j = elastic_i
+                else:
+                    elastic_j = force_law(d, d_eq, k, repulsion[j])
+            viscous = nu * (vx_rel[row] * n_x + vy_rel[row] * n_y)
+            force_i = elastic_i * ratio_i[0] + viscous * ratio_i[1]
+            force_j = elastic_j * ratio_j[0] + viscous * ratio_j[1]
+
+            xforce[i] = xforce[i] + force_i * n_x
+            yforce[i] = yforce[i] + force_i * n_y
+            xforce[j] = xforce[j] - force_j * n_x
+            yforce[j] = yforce[j] - force_j * n_y
+
+            if record:
+                self.record_pair_force(spheres[i], spheres[j], [force_i * n_x, force_i * n_y],
+                                       crosses_boundary[row])
+                self.record_pair_force(spheres[j], spheres[i], [-force_j * n_x, -force_j * n_y],
+                                       crosses_boundary[row])
+
+            # Tangential force, the viscous part acting only when the spheres touch
+            t_x = -n_y
+            t_y = n_x
+            d0 = r[i] + r[j]
+            if d < d0:
+                viscous = nu_t * (vx_rel[row] * t_x + vy_rel[row] * t_y - (r[i] * omega[i] + r[j] * omega[j]))
+            else:
+                viscous = 0
+            force = (viscous * ratio_i[3] + k_t * relation_ij[row].friction_position * ratio_i[2] +
+                     viscous * ratio_j[3] + k_t * relation_ji[row].friction_position * ratio_j[2]) / 2
+
+            force_x = force * t_x
+            force_y = force * t_y
+            torque_i = d * force * r[i] / d0
+            torque_j = d * force * r[j] / d0
+
+            xforce[i] = xforce[i] + force_x
+            yforce[i] = yforce[i] + force_y
+            xforce[j] = xforce[j] - force_x
+            yforce[j] = yforce[j] - force_y
+            torque[i] = torque[i] + torque_i
+            torque[j] = torque[j] + torque_j
+
+            if record:
+                self.record_pair_force(spheres[i], spheres[j], [force_x, force_y], crosses_boundary[row])
+                self.record_pair_force(spheres[j], spheres[i], [-force_x, -force_y], crosses_boundary[row])
+                self.record_pair_torque(spheres[i], spheres[j], torque_i, crosses_boundary[row])
+                self.record_pair_torque(spheres[j], spheres[i], torque_j, crosses_boundary[row])
+
+        return [xforce, yforce, torque]
+
+    def set_respa_substeps(self, substeps=1):
+        """Choose the number of sub-steps of the forces of the permanent links per step
+
+        See `particleShear.CanvasPointsFrictionElasticityLeesEdwards.set_respa_substeps` and
+        `particleShear.CanvasPointsLinkable.respa_fast_forces`. The `particleShear.CanvasPointsLinkable.bond_table` is
+        enabled if needed.\n
+        Method defined in `particleShear.CanvasPointsLinkable` """
+        super(CanvasPointsLinkable, self).set_respa_substeps(substeps)
+        if self.respa_substeps > 1 and self.current_bond_table() is False:
+            self.enable_bond_table()
+
+    def respa_fast_forces(self):
+        """Return the forces of the permanent links at the current positions and speeds, as per-sphere lists
+        [xforce, yforce, torque]
+
+        These are the central elastic and viscous forces and the tangential elastic and viscous forces of each link,
+        from `particleShear.CanvasPointsLinkable.permanent_link_forces`, not recorded. The dampers are sub-cycled with
+        the springs of the links: on the step of the other interactions, their forces would lag behind the speeds
+        changed by the springs during the sub-steps. Returns False, so that nothing is sub-cycled, if the
+        `particleShear.CanvasPointsLinkable.bond_table` is not current, the spheres do not share the same boundary
+        conditions, or the links are integrated semi-implicitly (`particleShear.CanvasPointsLinkable.implicit_bonds`).\n
+        Method defined in `particleShear.CanvasPointsLinkable` """
+        if self.current_bond_table() is False or self.implicit_bonds:
+            return False
+        return self.permanent_link_forces()
+
+    def interaction_constants(self):
+        """Return the spring and viscosity constants [k, nu] of the stiffest interaction between two spheres, for the
+        relative movement of their centers along the direction of the force
+
+        The permanent links are stiffer than the contacts by the strength ratios of the spheres
+        (`particleShear.SphereLinkable.permanent_link_ratios`). Sub-cycled with n sub-steps
+        (`particleShear.CanvasPointsLinkable.set_respa_substeps`), they limit the time step as links of spring constant
+        k/n^2 and viscosity constant nu/n; integrated semi-implicitly
+        (`particleShear.CanvasPointsLinkable.set_implicit_bonds`), they do not limit it.\n
+        Method defined in `particleShear.CanvasPointsLinkable` """
+        constants = super(CanvasPointsLinkable, self).interaction_constants()
+        if self.implicit_bonds and self.integrator == INTEGRATOR_EULER:
+            return constants
+        substeps = 1
+        if self.respa_substeps > 1 and self.integrator == INTEGRATOR_EULER:
+            substeps = self.respa_substeps
+        for theSphere in self.sphereList:
+            ratio = theSphere.permanent_link_ratios()
+            k = max(self.k * ratio[0], 3 * self.k_t * ratio[2]) / (substeps * substeps)
+            nu = max(self.nu * ratio[1], 3 * self.nu_t * ratio[3]) / substeps
+            constants = [max(constants[0], k), max(constants[1], nu)]
+        return constants
+
+    def set_implicit_bonds(self, implicit_bonds=True, tolerance=1e-8, max_iterations=200):
+        """Choose whether the spring and damper terms of the permanent links are integrated semi-implicitly
+
+        The stiff permanent links limit the stable time step of the explicit integration. With implicit_bonds, the
+        speeds are updated by a linearized backward Euler step for the central and tangential spring and damper terms
+        of the permanent links, the contacts remaining explicit (see
+        `particleShear.CanvasPointsLinkable.implicit_bond_update`). The `particleShear.CanvasPointsLinkable.bond_table`
+        is enabled if needed.\n
+        - **parameters**\n
+            `implicit_bonds` True to enable, False to return to the explicit integration\n
+            `tolerance` Relative residual at which the conjugate gradient solver stops\n
+            `max_iterations` Largest number of conjugate gradient iterations per step\n
+        Method defined in `particleShear.CanvasPointsLinkable` """
+        self.implicit_bonds = implicit_bonds
+        self.implicit_bond_tolerance = tolerance
+        self.implicit_bond_max_iterations = max_iterations
+        if implicit_bonds and self.current_bond_table() is False:
+            self.enable_bond_table()
+
+    def mechanical_simulation_step_calculate_acceleration(self, cool_factor=0.97, dt=1):
+        if self.implicit_bonds and self.integrator == INTEGRATOR_EULER:
+            self.implicit_bond_update(dt)
+        super(CanvasPointsLinkable, self).mechanical_simulation_step_calculate_acceleration(cool_factor=cool_factor,
+                                                                                            dt=dt)
+
+    def implicit_bond_update(self, dt=1):
+        """Correct the speeds for a linearized backward Euler step of the spring and damper terms of the permanent links,
+        before the acceleration by the forces just calculated
+
+        The forces of all interactions, including the permanent links, are first calculated explicitly as usual. For
+        each link, the central and the tangential force are then written F=F0+c*g, g being the relative speed (central,
+        respectively tangential including the rotation as in `particleShear.CircleFrictionElasticity.tangential_speed`)
+        and c=dt*k+nu the coefficient of the spring (which is extended by dt*g during the step) and of the damper, with
+        the strength ratios of the link averaged over the two spheres. Evaluating these terms with the speeds at the end
+        of the step rather than at its beginning gives, for the changes of speed du of all spheres, the sparse linear
+        system (M+dt*sum(c*b*b^T))*du=dt*(F0+dt*sum(k*g0*b)), M holding the masses and moments of inertia and b the
+        vector projecting the speeds of the two spheres onto g. The system is symmetric positive definite; it is solved
+        matrix-free by conjugate gradients with a diagonal preconditioner, in one pass over the links per iteration.
+        The small difference between the separation distance and the sum of radii in the distribution of the tangential
+        couple (see `particleShear.CircleFrictionElasticity.distribute_tangential_couple`) is neglected in the implicit
+        terms. The speeds of the immobile spheres are imposed and therefore not part of the system.\n
+        The speeds are corrected by du-dt*F/M, so that the usual acceleration step by the explicit forces F completes
+        the change of speed du, including cooling. The forces recorded in the force register thus remain those
+        calculated explicitly.\n
+        Nothing is done if the `particleShear.CanvasPointsLinkable.bond_table` is not current or the spheres do not
+        share the same boundary conditions.\n
+        Method defined in `particleShear.CanvasPointsLinkable` """
+        self.implicit_bond_iterations = 0
+        table = self.current_bond_table()
+        if table is False or len(table.index_i) == 0:
+            return
+        spheres = self.sphereList
+        table.read_boundary_parameters(spheres)
+        if not table.uniform:
+            return
+        table.evaluate_geometry(self.state_sequence("x"), self.state_sequence("y"),
+                                self.state_sequence("xspeed"), self.state_sequence("yspeed"))
+
+        n_spheres = len(spheres)
+        r = self.state_sequence("r")
+        omega = self.state_sequence("omega")
+        m = self.state_sequence("m")
+        inertia = self.state_sequence("inertia")
+        xforce = self.state_sequence("xforce")
+        yforce = self.state_sequence("yforce")
+        torque = self.state_sequence("torque")
+
+        # Free components of the changes of speed; the others are kept at 0
+        mobile = [1.0 if self.canMove(theSphere) else 0.0 for theSphere in spheres]
+        rotating = [1.0 if inertia[ind] > 0 else 0.0 for ind in range(n_spheres)]
+
+        index_i = table.index_i
+        index_j = table.index_j
+        ratios_i = table.ratios_i
+        ratios_j = table.ratios_j
+        distance = table.distance
+        normal_x = table.normal_x
+        normal_y = table.normal_y
+        vx_rel = table.vx_rel
+        vy_rel = table.vy_rel
+        n_links = len(index_i)
+
+        coefficient_central = [0.0] * n_links
+        coefficient_tangential = [0.0] * n_links
+        rhs_x = [0.0] * n_spheres
+        rhs_y = [0.0] * n_spheres
+        rhs_w = [0.0] * n_spheres
+        diagonal_x = [m[ind] for ind in range(n_spheres)]
+        diagonal_y = [m[ind] for ind in range(n_spheres)]
+        diagonal_w = [inertia[ind] for ind in range(n_spheres)]
+
+        for row in range(n_links):
+            i = index_i[row]
+            j = index_j[row]
+            n_x = normal_x[row]
+            n_y = normal_y[row]
+            ratio_i = ratios_i[row]
+            ratio_j = ratios_j[row]
+
+            k_central = self.k * (ratio_i[0] + ratio_j[0]) / 2
+            nu_central = self.nu * (ratio_i[1] + ratio_j[1]) / 2
+            k_tangential = self.k_t * (ratio_i[2] + ratio_j[2]) / 2
+            nu_tangential = 0
+            if distance[row] < r[i] + r[j]:
+                nu_tangential = self.nu_t * (ratio_i[3] + ratio_j[3]) / 2
+
+            c_n = dt * (dt * k_central + nu_central)
+            c_t = dt * (dt * k_tangential + nu_tangential)
+            coefficient_central[row] = c_n
+            coefficient_tangential[row] = c_t
+
+            # Extension of the springs during the step at the current speeds
+            g_n = vx_rel[row] * n_x + vy_rel[row] * n_y
+            g_t = -vx_rel[row] * n_y + vy_rel[row] * n_x - (r[i] * omega[i] + r[j] * omega[j])
+            f_n = dt * k_central * g_n
+            f_t = dt * k_tangential * g_t
+            rhs_x[i] = rhs_x[i] + f_n * n_x - f_t * n_y
+            rhs_y[i] = rhs_y[i] + f_n * n_y + f_t * n_x
+            rhs_x[j] = rhs_x[j] - f_n * n_x + f_t * n_y
+            rhs_y[j] = rhs_y[j] - f_n * n_y - f_t * n_x
+            rhs_w[i] = rhs_w[i] + f_t * r[i]
+            rhs_w[j] = rhs_w[j] + f_t * r[j]
+
+            diagonal_x[i] = diagonal_x[i] + c_n * n_x * n_x + c_t * n_y * n_y
+            diagonal_y[i] = diagonal_y[i] + c_n * n_y * n_y + c_t * n_x * n_x
+            diagonal_x[j] = diagonal_x[j] + c_n * n_x * n_x + c_t * n_y * n_y
+            diagonal_y[j] = diagonal_y[j] + c_n * n_y * n_y + c_t * n_x * n_x
+            diagonal_w[i] = diagonal_w[i] + c_t * r[i] * r[i]
+            diagonal_w[j] = diagonal_w[j] + c_t * r[j] * r[j]
+
+        for ind in range(n_spheres):
+            rhs_x[ind] = dt * (xforce[ind] + rhs_x[ind]) * mobile[ind]
+            rhs_y[ind] = dt * (yforce[ind] + rhs_y[ind]) * mobile[ind]
+            rhs_w[ind] = dt * (torque[ind] + rhs_w[ind]) * rotating[ind]
+
+        def product(u_x, u_y, u_w):
+            # (M+sum(c*b*b^T))*u, restricted to the free components
+            a_x = [m[ind] * u_x[ind] for ind in range(n_spheres)]
+            a_y = [m[ind] * u_y[ind] for ind in range(n_spheres)]
+            a_w = [inertia[ind] * u_w[ind] for ind in range(n_spheres)]
+            for row in range(n_links):
+                i = index_i[row]
+                j = index_j[row]
+                n_x = normal_x[row]
+                n_y = normal_y[row]
+                delta_x = u_x[j] - u_x[i]
+                delta_y = u_y[j] - u_y[i]
+                s_n = coefficient_central[row] * (delta_x * n_x + delta_y * n_y)
+                s_t = coefficient_tangential[row] * (-delta_x * n_y + delta_y * n_x - r[i] * u_w[i] - r[j] * u_w[j])
+                a_x[i] = a_x[i] - s_n * n_x + s_t * n_y
+                a_y[i] = a_y[i] - s_n * n_y - s_t * n_x
+                a_x[j] = a_x[j] + s_n * n_x - s_t * n_y
+                a_y[j] = a_y[j] + s_n * n_y + s_t * n_x
+                a_w[i] = a_w[i] - s_t * r[i]
+                a_w[j] = a_w[j] - s_t * r[j]
+            for ind in range(n_spheres):
+                a_x[ind] = a_x[ind] * mobile[ind]
+                a_y[ind] = a_y[ind] * mobile[ind]
+                a_w[ind] = a_w[ind] * rotating[ind]
+            return a_x, a_y, a_w
+
+        # Preconditioned conjugate gradients, starting from du=0
+        du_x = [0.0] * n_spheres
+        du_y = [0.0] * n_spheres
+        du_w = [0.0] * n_spheres
+        res_x = list(rhs_x)
+        res_y = list(rhs_y)
+        res_w = list(rhs_w)
+        inverse_x = [1 / diagonal_x[ind] if diagonal_x[ind] > 0 else 0 for ind in range(n_spheres)]
+        inverse_y = [1 / diagonal_y[ind] if diagonal_y[ind] > 0 else 0 for ind in range(n_spheres)]
+        inverse_w = [1 / diagonal_w[ind] if diagonal_w[ind] > 0 else 0 for ind in range(n_spheres)]
+        z_x = [res_x[ind] * inverse_x[ind] for ind in range(n_spheres)]
+        z_y = [res_y[ind] * inverse_y[ind] for ind in range(n_spheres)]
+        z_w = [res_w[ind] * inverse_w[ind] for ind in range(n_spheres)]
+        p_x = list(z_x)
+        p_y = list(z_y)
+        p_w = list(z_w)
+        rz = sum([res_x[ind] * z_x[ind] + res_y[ind] * z_y[ind] + res_w[ind] * z_w[ind] for ind in range(n_spheres)])
+        rhs_norm = math.sqrt(sum([rhs_x[ind] * rhs_x[ind] + rhs_y[ind] * rhs_y[ind] + rhs_w[ind] * rhs_w[ind]
+                                  for ind in range(n_spheres)]))
+        residual_norm = rhs_norm
+
+        while residual_norm > self.implicit_bond_tolerance * rhs_norm and \
+                self.implicit_bond_iterations < self.implicit_bond_max_iterations:
+            a_x, a_y, a_w = product(p_x, p_y, p_w)
+            pap = sum([p_x[ind] * a_x[ind] + p_y[ind] * a_y[ind] + p_w[ind] * a_w[ind] for ind in range(n_spheres)])
+            if pap <= 0:
+                break
+            alpha = rz / pap
+            for ind in range(n_spheres):
+                du_x[ind] = du_x[ind] + alpha * p_x[ind]
+                du_y[ind] = du_y[ind] + alpha * p_y[ind]
+                du_w[ind] = du_w[ind] + alpha * p_w[ind]
+                res_x[ind] = res_x[ind] - alpha * a_x[ind]
+                res_y[ind] = res_y[ind] - alpha * a_y[ind]
+                res_w[ind] = res_w[ind] - alpha * a_w[ind]
+                z_x[ind] = res_x[ind] * inverse_x[ind]
+                z_y[ind] = res_y[ind] * inverse_y[ind]
+                z_w[ind] = res_w[ind] * inverse_w[ind]
+            self.implicit_bond_iterations = self.implicit_bond_iterations + 1
+            rz_new = sum([res_x[ind] * z_x[ind] + res_y[ind] * z_y[ind] + res_w[ind] * z_w[ind]
+                          for ind in range(n_spheres)])
+            residual_norm = math.sqrt(sum([res_x[ind] * res_x[ind] + res_y[ind] * res_y[ind] +
+                                           res_w[ind] * res_w[ind] for ind in range(n_spheres)]))
+            beta = rz_new / rz if rz > 0 else 0
+            rz = rz_new
+            for ind in range(n_spheres):
+                p_x[ind] = z_x[ind] + beta * p_x[ind]
+                p_y[ind] = z_y[ind] + beta * p_y[ind]
+                p_w[ind] = z_w[ind] + beta * p_w[ind]
+
+        # The acceleration step adds dt*F/m with the explicit forces, so only the difference is applied here
+        for ind in range(n_spheres):
+            theSphere = spheres[ind]
+            if mobile[ind]:
+                theSphere.xspeed = theSphere.xspeed + du_x[ind] - xforce[ind] * dt / m[ind]
+                theSphere.yspeed = theSphere.yspeed + du_y[ind] - yforce[ind] * dt / m[ind]
+            if rotating[ind]:
+                theSphere.omega = theSphere.omega + du_w[ind] - torque[ind] * dt / inertia[ind]
+
     def makeAllLinksPermanent(self):
         """Link all currently touching spheres with permanent links
 
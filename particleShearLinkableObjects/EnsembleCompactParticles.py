@@ -119,12 +119,15 @@ class EnsembleCompactParticles (CanvasPointsLinkable):
 
 
 
-    def free_pre_equilibration(self,N=25):
+    def free_pre_equilibration(self,N=25,max_force=False,max_kinetic_energy=False,check_every=10):
+        # Each relaxation takes up to N steps; with max_force and/or max_kinetic_energy, it stops early once these
+        # tolerances are met (see CanvasPointsBasicElasticity.mechanical_relaxation). Returns the number of steps done
         print("Unconstrained pre-equilibration ... N=",N,"dt =",self.dt,"max dt = ",self.dt_max)
         self.applyingShear = False
         dt=self.dt_max
         N = N
         cool_factor=0.5
+        steps=0
 
 
         old_mu=self.mu
@@ -135,8 +138,9 @@ class EnsembleCompactParticles (CanvasPointsLinkable):
 
         while dt>self.dt:
 
-            self.mechanical_relaxation(dt=dt, theTk=self.theTkSimulation,
-                    N=N, cool_factor=cool_factor)
+            steps=steps+self.mechanical_relaxation(dt=dt, theTk=self.theTkSimulation,
+                    N=N, cool_factor=cool_factor, max_force=max_force, max_kinetic_energy=max_kinetic_energy,
+                    check_every=check_every)
             dt=dt/2
             cool_factor=(1+cool_factor)/2
             self.correct_linear_drift()
@@ -144,18 +148,46 @@ class EnsembleCompactParticles (CanvasPointsLinkable):
 
 
 
-        self.mechanical_relaxation(dt=dt, theTk=self.theTkSimulation,
-                    N=N, cool_factor=1)
+        steps=steps+self.mechanical_relaxation(dt=dt, theTk=self.theTkSimulation,
+                    N=N, cool_factor=1, max_force=max_force, max_kinetic_energy=max_kinetic_energy,
+                    check_every=check_every)
 
         self.mu = old_mu
 
         if self.mu>0:
             print("Initiate friction, mu=",self.mu)
 
-        self.mechanical_relaxation(dt=dt, theTk=self.theTkSimulation,
-                                   N=N, cool_factor=1)
+        steps=steps+self.mechanical_relaxation(dt=dt, theTk=self.theTkSimulation,
+                                   N=N, cool_factor=1, max_force=max_force, max_kinetic_energy=max_kinetic_energy,
+                                   check_every=check_every)
 
-        print("Done")
+        print("Done,",steps,"steps")
+        return steps
+
+
+    def fire_pre_equilibration(self,N=1000,max_force=False,max_kinetic_energy=False,check_every=10,
+                               friction_off_first=True):
+        # Alternative to free_pre_equilibration with the FIRE minimizer (CanvasPointsBasicElasticity.fire_relaxation),
+        # time step from dt up to dt_max; optionally first without friction. Returns the number of steps done
+        print("Unconstrained pre-equilibration by FIRE ... N=",N,"dt =",self.dt,"max dt = ",self.dt_max)
+        self.applyingShear = False
+        steps=0
+
+        if friction_off_first and self.mu>0:
+            print("Removing friction for initial equilibration")
+            steps=steps+self.fire_relaxation(N=N, dt=self.dt, dt_max=self.dt_max, theTk=self.theTkSimulation,
+                                             max_force=max_force, max_kinetic_energy=max_kinetic_energy,
+                                             check_every=check_every, friction_off=True)
+            self.correct_linear_drift()
+            print("Initiate friction, mu=",self.mu)
+
+        steps=steps+self.fire_relaxation(N=N, dt=self.dt, dt_max=self.dt_max, theTk=self.theTkSimulation,
+                                         max_force=max_force, max_kinetic_energy=max_kinetic_energy,
+                                         check_every=check_every)
+        self.correct_linear_drift()
+
+        print("Done,",steps,"steps")
+        return steps
 
 
     def angle_OK(self,angle):
@@ -423,7 +455,8 @@ def EnsembleCompactParticlesFromModelParameters(size_x=500,size_y=500,N=100,pack
                                                 relative_viscosity=0.01,central_repulsion_coefficient=0,anticipated_amplitude=0.1,
                                                 relative_transversal_link_strength=1,avoid_horizontal_angle_degree=0,
                                                 avoid_height_spanning_particles=False,doCutByTriangulation=True,doDrawing=True,
-                                                do_debug=False):
+                                                do_debug=False,use_fire_minimizer=False,implicit_bonds=False,
+                                                respa_substeps=1):
 
     
 
@@ -516,7 +549,24 @@ def EnsembleCompactParticlesFromModelParameters(size_x=500,size_y=500,N=100,pack
 
     theEnsemble.model=model
 
-    if do_pre_equilibration:
+    if do_pre_equilibration and use_fire_minimizer:
+
+        # FIRE minimization until the largest residual force corresponds to an indentation of 0.1% of the radius
+
+        theEnsemble.dt=final_dt
+        theEnsemble.dt_max=0.25*model.time_constant/bimodal_factor
+
+        N_step=5000
+
+        if(do_debug):
+            N_step=500
+
+        theEnsemble.fire_pre_equilibration(N=N_step, max_force=1e-3*model.k*model.r)
+
+        theEnsemble.dt = final_dt
+        theEnsemble.dt_max = dt_max
+
+    elif do_pre_equilibration:
 
         theEnsemble.dt=final_dt
 
@@ -590,8 +640,17 @@ def EnsembleCompactParticlesFromModelParameters(size_x=500,size_y=500,N=100,pack
         theEnsemble.dt_max = min(theEnsemble.dt*2,theEnsemble.dt_max)
         theEnsemble.dt = theEnsemble.dt
 
-        if relative_transversal_link_strength>5:
+        if implicit_bonds:
+            # The stiff permanent links are integrated semi-implicitly, so they do not limit the time step
+            theEnsemble.set_implicit_bonds()
+        elif relative_transversal_link_strength>5:
             theEnsemble.dt_max=theEnsemble.dt_max/2
+        if respa_substeps>1:
+            # The permanent links are sub-cycled, so the reduction of dt_max for the links is relaxed, but not beyond
+            # dt_max of the unlinked ensemble. The time step dt is the one of the contacts and the friction, the same
+            # as without links, and is kept
+            theEnsemble.set_respa_substeps(respa_substeps)
+            theEnsemble.dt_max = max(theEnsemble.dt, min(theEnsemble.dt_max*respa_substeps, dt_max))
 
 
         theEnsemble.free_pre_equilibration()
@@ -98,7 +98,8 @@ def EnsembleCompactParticlesAdjustableInterfaceStrengthFromModelParameters(size_
                                                 interface_reenforcement_central=1,interface_reenforcement_tangential=1,
                                                 keep_viscosity_coefficients_constant=True,cut_top_bottom=True,
                                                 doCutByTriangulation=True,remove_link_fraction=0,edge_fuzziness=0,doDrawing=True,
-                                                do_debug=False):
+                                                do_debug=False,use_fire_minimizer=False,implicit_bonds=False,
+                                                respa_substeps=1):
 
 
 
@@ -222,7 +223,19 @@ def EnsembleCompactParticlesAdjustableInterfaceStrengthFromModelParameters(size_
     if(do_debug):
         reduction_factor=10
 
-    if do_pre_equilibration:
+    if do_pre_equilibration and use_fire_minimizer:
+
+        # FIRE minimization until the largest residual force corresponds to an indentation of 0.1% of the radius
+
+        theEnsemble.dt=final_dt
+        theEnsemble.dt_max=0.25*model.time_constant/bimodal_factor
+
+        theEnsemble.fire_pre_equilibration(N=int(5000/reduction_factor), max_force=1e-3*model.k*model.r)
+
+        theEnsemble.dt = final_dt
+        theEnsemble.dt_max = dt_max
+
+    elif do_pre_equilibration:
 
         theEnsemble.dt=final_dt
 
@@ -310,11 +323,11 @@ def EnsembleCompactParticlesAdjustableInterfaceStrengthFromModelParameters(size_
         theEnsemble.dt_max = min(theEnsemble.dt*2,theEnsemble.dt_max)
         theEnsemble.dt = theEnsemble.dt
 
-        if relative_transversal_link_strength>5 :
+        if implicit_bonds:
+            # The stiff permanent links are integrated semi-implicitly, so they do not limit the time step
+            theEnsemble.set_implicit_bonds()
+        elif relative_transversal_link_strength>5 :
             theEnsemble.dt_max=theEnsemble.dt_max/2
-
-
-
         theEnsemble.free_pre_equilibration(N=int(300/reduction_factor))
         if anticipated_amplitude < 0.1:
             print("Extra equilibration for A<0.1")
@@ -362,6 +375,19 @@ def EnsembleCompactParticlesAdjustableInterfaceStrengthFromModelParameters(size_
             theEnsemble.mu = old_mu
             theEnsemble.free_pre_equilibration(N=int(200/reduction_factor))
 
+        if respa_substeps>1:
+            # The permanent links are sub-cycled from here on, once the ensemble is prepared as without sub-cycling.
+            # The time step above is set for the stiffness of the model, which is the stiffness of the links; with
+            # interface re-enforcement below 1, the contacts are softer by the permanent ratios, so the time step of
+            # the contacts and the friction grows with the square root of the smaller ratio, up to respa_substeps (the
+            # links keep at least their single rate time step). The reduction of dt_max for the links is relaxed, but
+            # not beyond dt_max of the unlinked ensemble scaled likewise
+            theEnsemble.set_respa_substeps(respa_substeps)
+            dt_factor=min(respa_substeps,math.sqrt(max(1,min(theEnsemble.permanent_ratio_central,
+                                                             theEnsemble.permanent_ratio_tangential))))
+            theEnsemble.dt=theEnsemble.dt*dt_factor
+            theEnsemble.dt_max = max(theEnsemble.dt, min(theEnsemble.dt_max*respa_substeps, dt_max*dt_factor))
+
     return theEnsemble
 
 
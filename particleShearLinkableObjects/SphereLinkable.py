@@ -32,6 +32,17 @@ class SphereLinkable(SphereFrictionLeesEdwards):
     def __init__(self, color, x, y, diameter, m=1,my_index=1, theCanvas=FALSE, doDrawing=FALSE,
                  force_register=Force_register(),size_x=500,size_y=500):
         super(SphereLinkable,self).__init__(color, x, y, diameter, m,my_index, theCanvas, doDrawing,force_register,size_x,size_y)
+        self.bond_table = False
+        """`particleShear.Bond_table` to be kept up to date when permanent links are established or cut, if any"""
+
+    def permanent_link_ratios(self):
+        """Return the strength ratios of the permanent links of this sphere relative to frictional contacts
+
+        The ratios are returned as a list [central elastic, central viscous, tangential elastic, tangential viscous],
+        all 1 for `particleShear.SphereLinkable`. They are used by the bond kernel
+        (`particleShear.CanvasPointsLinkable.permanent_link_kernel`).\n
+        This method is defined in class `particleShear.SphereLinkable`"""
+        return [1, 1, 1, 1]
 
 
     def cut_permanent_link(self,theSphere,do_backlink=True):
@@ -48,6 +59,8 @@ class SphereLinkable(SphereFrictionLeesEdwards):
                 # Link back from the neighbor
                 if do_backlink:
                     theNeighbor.theSphere.cut_permanent_link(self, do_backlink=False)
+                    if self.bond_table is not False:
+                        self.bond_table.cut(self, theSphere)
                 if self.doDrawing:
                     self.initiateNeighborDrawing()
 
@@ -63,6 +76,8 @@ class SphereLinkable(SphereFrictionLeesEdwards):
             # Link back from the neighbor
             if do_backlink:
                 theNeighbor.theSphere.establish_permanent_link(self,do_backlink=False)
+                if self.bond_table is not False:
+                    self.bond_table.establish(self, theSphere)
             if self.doDrawing:
 
                 self.initiateNeighborDrawing()
@@ -76,10 +91,12 @@ class SphereLinkable(SphereFrictionLeesEdwards):
 
             if self.doDrawing:
                 self.deleteNeighborDrawing()
-            self.neighbors.append(info)
+            self.add_neighbor(info)
 
             if do_backlink:
                 theSphere.establish_permanent_link(self,do_backlink=False)
+                if self.bond_table is not False:
+                    self.bond_table.establish(self, theSphere)
 
 
             if self.doDrawing:
@@ -107,20 +124,15 @@ class SphereLinkable(SphereFrictionLeesEdwards):
         r = pos[2]
         is_neighbor=(d < r + self.r)
         # Regardless of the distance, first check whether we find the sphere in the neighbors list
-        found = FALSE
-        foundNeighborIndex=-1
-        for theNeighborIndex in range(len(self.neighbors)):
-            theNeighbor = self.neighbors[theNeighborIndex]
-            if (theSphere.myindex == theNeighbor.myindex):
-                foundNeighborIndex = theNeighborIndex
-                found = TRUE
+        foundNeighborIndex = self.findNeighborIndex(theSphere)
+        found = foundNeighborIndex >= 0
 
         if not is_neighbor: #If the sphere is not a neighbor (anymore)
             if found: #It was previously a neighbor, but no more, so delete it from the neighbors list if possible
                 if not self.neighbors[foundNeighborIndex].interface_type=="permanent":
                     if self.doDrawing:
                         self.deleteNeighborDrawing()
-                    del self.neighbors[foundNeighborIndex]
+                    self.remove_neighbor(foundNeighborIndex)
                     if self.doDrawing:
                         self.initiateNeighborDrawing()
 
@@ -129,10 +141,23 @@ class SphereLinkable(SphereFrictionLeesEdwards):
                 info = neighbor_relation_linkable(0,"stick",theSphere)
                 if self.doDrawing:
                     self.deleteNeighborDrawing()
-                self.neighbors.append(info)
+                self.add_neighbor(info)
                 if self.doDrawing:
                     self.initiateNeighborDrawing()
 
+    def neighbor_key(self, theSphere):
+        """Return the key identifying theSphere among the neighbors: its myindex, which is unique in an ensemble
+
+        This method is defined in class `particleShear.SphereLinkable`"""
+        return theSphere.myindex
+
+    def relation_key(self, theNeighbor):
+        """Return the key of the partner sphere of the neighbor relation theNeighbor: the myindex recorded in the
+        relation
+
+        This method is defined in class `particleShear.SphereLinkable`"""
+        return theNeighbor.myindex
+
 
 
     def deleteNeighborDrawing(self):
@@ -278,14 +303,8 @@ class SphereLinkable(SphereFrictionLeesEdwards):
 
 
     def tangential_force_elastic_permanent(self, theSphere, k_t):
-        found = False
-        foundNeighborIndex = -1
-        for theNeighborIndex in range(len(self.neighbors)):
-            theNeighbor = self.neighbors[theNeighborIndex]
-            if (theSphere == theNeighbor.theSphere and theNeighbor.interface_type=="permanent"):
-                foundNeighborIndex = theNeighborIndex
-                found = TRUE
-        if not found:
+        foundNeighborIndex = self.findNeighborIndex(theSphere)
+        if foundNeighborIndex < 0 or self.neighbors[foundNeighborIndex].interface_type != "permanent":
             print("Problem with neighbors, found permanent touching sphere not in neighbors list")
         else:
 
@@ -29,6 +29,17 @@ class SphereLinkableAdjustableInterfaceStrength(SphereLinkable):
 
 
 
+    def permanent_link_ratios(self):
+        """Return the strength ratios of the permanent links of this sphere relative to frictional contacts
+
+        The elastic ratios are permanent_ratio_central and permanent_ratio_tangential; the viscous ratios are the
+        same unless keep_viscosity_coefficients_constant is set, in which case they are 1.\n
+        This method is defined in class `particleShear.SphereLinkableAdjustableInterfaceStrength`"""
+        if self.keep_viscosity_coefficients_constant:
+            return [self.permanent_ratio_central, 1, self.permanent_ratio_tangential, 1]
+        return [self.permanent_ratio_central, self.permanent_ratio_central,
+                self.permanent_ratio_tangential, self.permanent_ratio_tangential]
+
     def tangential_force_elastic_permanent(self, theSphere, k_t):
         #print("tangential_force_elastic_permanent", k_t,self.permanent_ratio_tangential)
         return super(SphereLinkableAdjustableInterfaceStrength,self).\
@@ -1,6 +1,6 @@
 """Provide geometrical simulation elements and canvas areas to place them"""
 
-__all__ = ["neighbor_relation_linkable",
+__all__ = ["neighbor_relation_linkable","Bond_table",
            "CanvasPointsLinkable","SphereLinkable","SphereLinkableAdjustableInterfaceStrength",
 "EnsembleLinkable","EnsembleCompactParticles",
 "EnsembleCompactParticlesAdjustableInterfaceStrength",
@@ -12,6 +12,7 @@ __all__ = ["neighbor_relation_linkable",
 
 # Basic tools
 from .neighbor_relation_linkable import neighbor_relation_linkable
+from .Bond_table import Bond_table
 
 
 # Geometrical elements
@@ -3,6 +3,7 @@ import random
 import math
 from .Sphere import Sphere
 from .SphereFriction import SphereFriction
+from .Ghost_image_table import Ghost_image_table
 from particleShearBase import Force_register
 from particleShearBase import Graphical_output_configuration
 from particleShearBase import CanvasPointsBasicElasticity
@@ -110,8 +111,10 @@ class Ensemble(CanvasPointsBasicElasticity):
                                                      random.randrange(0, size_y), r_sphere * 2,
                                                      adjust_m(m, r_sphere, r),
                                                      i,theCanvas, False,self))
+        self.ghost_images = Ghost_image_table(8 * N)
+        """The `particleShear.Ghost_image_table` describing the periodic replicates of the spheres near the boundary"""
         self.spheres_boundary = []
-        """List of the spheres on the boundary"""
+        """List of the spheres on the boundary, i.e. the replicates in use for the current step"""
 
         self.set_graphical_output_configuration(self.graphical_output_configuration) # To propagate it also to the spheres
 
@@ -137,16 +140,35 @@ class Ensemble(CanvasPointsBasicElasticity):
         they are able to move, and are not replicates to emulate periodic or other boundaries. In this class, the
         distinction between internal and external forces is made by using the instance variable `particleShear.Ensemble.record_type`
         which switches between internal and external depending on whether forces originating from internal spheres
-        or boundary replicates are considered.\n\n
+        or boundary replicates are considered. Forces originating from the replicates of the
+        `particleShear.Ensemble.ghost_images` are always external.\n\n
         Method defined in `particleShear.Ensemble`"""
+        if not self.record_forces:
+            return
 
         if not self.canMove(target):
             return
-        if self.record_type=="internal":
+        if self.record_type=="internal" and not self.ghost_images.is_ghost(source):
             super(Ensemble,self).record_individual_internal_force(target,source,force_vector)
         else: # running virtual boundary replicates, this is also external here
             self.record_external_force(target, force_vector)
 
+    def record_individual_internal_torque(self,target,source,moment):
+        """Record internal torque
+
+        Counterpart of `particleShear.Ensemble.record_individual_internal_force` for torques: torques originating from
+        the boundary replicates are recorded as external.\n\n
+        Method defined in `particleShear.Ensemble`"""
+        if not self.record_forces:
+            return
+
+        if not self.canMove(target):
+            return
+        if self.record_type=="internal" and not self.ghost_images.is_ghost(source):
+            super(Ensemble,self).record_individual_internal_torque(target,source,moment)
+        else:
+            self.record_external_torque(target, moment)
+
 
 
 
@@ -162,12 +184,79 @@ class Ensemble(CanvasPointsBasicElasticity):
 
         This function calls `particleShear.CircleMassNeighbors.test_neighbor_relation` on each member of the
         `particleShear.CanvasPoints.sphereList`. It does so not only on the actuale sphere list, but also on the
-        replicates used to emulate the boundary environment in this class.\n
+        replicates used to emulate the boundary environment in this class.
+        If `particleShear.CanvasPointsNeighbors.use_cell_list` is set, the real spheres and the replicates are sorted
+        into the same `particleShear.CanvasPointsNeighbors.cell_list`, such that each sphere is tested only against the
+        spheres and replicates in the adjacent cells.\n
         This method is defined in class `particleShear.Ensemble`"""
-        super(Ensemble,self).test_neighbor_relation()
-        for sphereIndex in range(len(self.sphereList)):
-             for sphereIndexBoundary in range(len(self.spheres_boundary)):
-                self.sphereList[sphereIndex].test_neighbor_relation(self.spheres_boundary[sphereIndexBoundary])
+
+        self.remove_inactive_ghost_neighbors()
+
+        n_spheres = len(self.sphereList)
+        if not self.use_cell_list or not self.cell_list.build(self.sphereList + self.spheres_boundary,
+                                                              2 * self.max_radius(), self.size_x, self.size_y):
+            super(Ensemble,self).test_neighbor_relation()
+            for sphereIndex in range(n_spheres):
+                 for sphereIndexBoundary in range(len(self.spheres_boundary)):
+                    self.test_ghost_neighbor_relation(self.sphereList[sphereIndex],
+                                                      self.spheres_boundary[sphereIndexBoundary])
+            return
+
+        candidate_lists = []
+        ghost_candidate_lists = []
+        for sphereIndex in range(n_spheres):
+            candidates = self.cell_list.candidates(sphereIndex)
+            candidate_lists.append([candidate for candidate in candidates if candidate < n_spheres])
+            ghost_candidate_lists.append([candidate - n_spheres for candidate in candidates
+                                          if candidate >= n_spheres])
+
+        if self.verlet_skin <= 0:
+            self.test_neighbor_relation_from_candidates(candidate_lists)
+        else:
+            super(Ensemble,self).test_neighbor_relation()
+
+        for sphereIndex in range(n_spheres):
+            theSphere = self.sphereList[sphereIndex]
+            # Replicates already listed as neighbors are tested again, such that they are dropped once apart
+            candidates = set(ghost_candidate_lists[sphereIndex])
+            for theNeighbor in theSphere.neighbors:
+                if self.ghost_images.is_active(theNeighbor.theSphere):
+                    candidates.add(self.ghost_images.entry_of[id(theNeighbor.theSphere)])
+            for ghostIndex in sorted(candidates):
+                self.test_ghost_neighbor_relation(theSphere, self.spheres_boundary[ghostIndex])
+
+    def test_ghost_neighbor_relation(self, theSphere, theGhost):
+        """Test whether a sphere and a boundary replicate are neighbors, from both sides
+
+        The replicate keeps the relation in return, such that the sphere methods find the backlink they expect for
+        frictional interfaces (see `particleShear.CircleFrictionElasticity.tangential_force`).\n
+        This method is defined in class `particleShear.Ensemble`"""
+        theSphere.test_neighbor_relation(theGhost)
+        theGhost.test_neighbor_relation(theSphere)
+
+    def remove_inactive_ghost_neighbors(self):
+        """Remove the neighbor relations of the spheres with partners that are neither spheres of the
+        `particleShear.CanvasPoints.sphereList` nor replicates in use
+
+        This concerns the replicates of the `particleShear.Ensemble.ghost_images` which are not needed anymore since
+        their source has moved away from the boundary; the neighbor lists of these replicates are emptied as well.\n
+        This method is defined in class `particleShear.Ensemble`"""
+        sphere_index = self.sphere_index_map()
+        for theGhost in self.ghost_images.pool.values():
+            if not self.ghost_images.is_active(theGhost) and len(theGhost.neighbors) > 0:
+                if theGhost.doDrawing:
+                    theGhost.deleteNeighborDrawing()
+                theGhost.neighbors = []
+                theGhost.rebuild_neighbor_index()
+        for theSphere in self.sphereList:
+            for foundNeighborIndex in reversed(range(len(theSphere.neighbors))):
+                partner = theSphere.neighbors[foundNeighborIndex].theSphere
+                if id(partner) not in sphere_index and not self.ghost_images.is_active(partner):
+                    if theSphere.doDrawing:
+                        theSphere.deleteNeighborDrawing()
+                    theSphere.remove_neighbor(foundNeighborIndex)
+                    if theSphere.doDrawing:
+                        theSphere.initiateNeighborDrawing()
 
 
     def elastic_force(self):
@@ -206,70 +295,15 @@ class Ensemble(CanvasPointsBasicElasticity):
          The function replicates spheres near the boundary to obtain virtual copies
          displaced by one positive or negative of the simulation area, in both x and y direction and also
          in corners by displacement in both x and y direction.
+         The replicates are described by the `particleShear.Ensemble.ghost_images`, which is updated in place (see
+         `particleShear.Ghost_image_table.update`); the replicates in use are listed in
+         `particleShear.Ensemble.spheres_boundary`.
 
 
          This method is defined in class `particleShear.Ensemble`"""
 
-        if self.doDrawing:
-
-            for theSphere in self.spheres_boundary:
-                theSphere.deleteDrawing()
-
-        max_index=0
-        for theSphere in self.sphereList:
-            if max_index<theSphere.myindex:
-                max_index=theSphere.myindex
-
-        self.spheres_boundary = []
-        index=max_index+1
-        for theSphere in self.sphereList:
-            pos = theSphere.coordinates()
-
-            left_edge = pos[0] - pos[2] <= self.r_max
-            right_edge = pos[0] + pos[2] >= self.size_x - self.r_max
-            upper_edge = pos[1] - pos[2] <= self.r_max
-            lower_edge = pos[1] + pos[2] >= self.size_y - self.r_max
-
-            if left_edge:
-                self.spheres_boundary.append(SphereFriction(
-                    "green", pos[0] + self.size_x, pos[1], 2 * pos[2],
-                    theSphere.m,index,self.theCanvas, self.doDrawing))
-                index=index+1
-                if upper_edge:
-                    self.spheres_boundary.append(SphereFriction(
-                        "green", pos[0] + self.size_x, pos[1] + self.size_y, 2 * pos[2],
-                        theSphere.m,index, self.theCanvas, self.doDrawing))
-                    index=index+1
-                if lower_edge:
-                    self.spheres_boundary.append(SphereFriction(
-                        "green", pos[0] + self.size_x, pos[1] - self.size_y, 2 * pos[2],
-                        theSphere.m,index, self.theCanvas, self.doDrawing))
-                    index=index+1
-            if right_edge:
-                self.spheres_boundary.append(SphereFriction(
-                    "green", pos[0] - self.size_x, pos[1], 2 * pos[2],
-                    theSphere.m,index, self.theCanvas, self.doDrawing))
-                index=index+1
-                if upper_edge:
-                    self.spheres_boundary.append(SphereFriction(
-                        "green", pos[0] - self.size_x, pos[1] + self.size_y, 2 * pos[2],
-                        theSphere.m,index,self.theCanvas, self.doDrawing))
-                    index=index+1
-                if lower_edge:
-                    self.spheres_boundary.append(SphereFriction(
-                        "green", pos[0] - self.size_x, pos[1] - self.size_y, 2 * pos[2],
-                        theSphere.m, index,self.theCanvas, self.doDrawing))
-                    index=index+1
-            if upper_edge:
-                self.spheres_boundary.append(SphereFriction(
-                    "green", pos[0], pos[1] + self.size_y, 2 * pos[2],
-                    theSphere.m,index, self.theCanvas, self.doDrawing))
-                index=index+1
-            if lower_edge:
-                self.spheres_boundary.append(SphereFriction(
-                    "green", pos[0], pos[1] - self.size_y, 2 * pos[2],
-                    theSphere.m,index, self.theCanvas, self.doDrawing))
-                index=index+1
+        self.spheres_boundary = self.ghost_images.update(self.sphereList, self.size_x, self.size_y, self.r_max,
+                                                         self.theCanvas, self.doDrawing)
 
 
     def mechanical_simulation_step_calculate_forces(self):
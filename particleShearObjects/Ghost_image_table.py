@@ -0,0 +1,178 @@
+from array import array
+from .SphereFriction import SphereFriction
+
+
+class Ghost_image_table():
+    """Table of the periodic images (ghosts) of the spheres near the boundaries of an `particleShear.Ensemble`.
+
+    Each image is described by an entry (source index, x offset, y offset): the index of the replicated sphere in the
+    `particleShear.CanvasPoints.sphereList` and the displacement of the image by one positive or negative multiple of
+    the size of the simulation area. The entries are held in preallocated arrays (of type `array.array`) and rewritten
+    in place at every step by `particleShear.Ghost_image_table.update`.\n
+    The sphere methods need an object to interact with, so each entry is represented by a
+    `particleShear.SphereFriction` replicate. The replicates are pooled by (source index, x offset, y offset) and
+    moved to the current position of their source at each step instead of being rebuilt; their identity is thus
+    stable and the neighbor relations of the real spheres with them persist from one step to the next.
+    Replicates not in use during a step are kept in the pool, but are inactive
+    (see `particleShear.Ghost_image_table.is_active`).\n
+    Class defined in subpackage particleShearObjects"""
+
+    def __init__(self, capacity=0):
+        """Initialize an empty table
+
+        - **parameters**\n
+            `capacity` Number of entries to preallocate; the arrays grow as needed"""
+        self.source_index = array('l', [0] * capacity)
+        """Index of the replicated sphere of each entry"""
+        self.offset_x = array('d', [0.0] * capacity)
+        """x-displacement of each image relative to its source"""
+        self.offset_y = array('d', [0.0] * capacity)
+        """y-displacement of each image relative to its source"""
+        self.count = 0
+        """Number of entries in use; the arrays may be longer"""
+        self.ghosts = []
+        """The replicate sphere of each entry in use"""
+        self.pool = {}
+        """All replicates created so far, by (source index, x offset, y offset)"""
+        self.entry_of = {}
+        """Entry of each active replicate, by id of the replicate"""
+        self.pooled = {}
+        """Key in `particleShear.Ghost_image_table.pool` of each replicate, by id of the replicate"""
+        self.sources = []
+        """The replicated spheres, as of the last update"""
+        self.next_index = 0
+        """Index (myindex) attributed to the next replicate created"""
+        self.drawn = set()
+        """Ids of the replicates in use, and thus drawn, before the current update"""
+
+    def __len__(self):
+        return self.count
+
+    def is_ghost(self, theSphere):
+        """Return whether theSphere is one of the replicates of the table
+
+        This method is defined in class `particleShear.Ghost_image_table`"""
+        return id(theSphere) in self.pooled
+
+    def is_active(self, theSphere):
+        """Return whether theSphere is a replicate in use for the current step
+
+        This method is defined in class `particleShear.Ghost_image_table`"""
+        return id(theSphere) in self.entry_of
+
+    def update(self, sphereList, size_x, size_y, margin, theCanvas=False, doDrawing=False):
+        """Rewrite the entries for the current positions of the spheres and return the list of replicates in use
+
+        A sphere is replicated across each boundary it approaches closer than margin (typically the largest sphere
+        radius), and across the corners if it is close to two boundaries, in the same order as the sphere list.\n
+        This method is defined in class `particleShear.Ghost_image_table`"""
+
+        if not self.represents(sphereList):
+            self.clear()
+            self.sources = list(sphereList)
+            self.next_index = 1 + max([getattr(theSphere, "myindex", 0) for theSphere in sphereList] + [0])
+
+        previous = self.ghosts
+        self.drawn = set([id(theGhost) for theGhost in previous])
+        self.count = 0
+        self.ghosts = []
+        self.entry_of = {}
+
+        for sourceIndex in range(len(sphereList)):
+            theSphere = sphereList[sourceIndex]
+            pos = theSphere.coordinates()
+
+            left_edge = pos[0] - pos[2] <= margin
+            right_edge = pos[0] + pos[2] >= size_x - margin
+            upper_edge = pos[1] - pos[2] <= margin
+            lower_edge = pos[1] + pos[2] >= size_y - margin
+
+            if left_edge:
+                self.add_entry(sourceIndex, theSphere, size_x, 0, theCanvas, doDrawing)
+                if upper_edge:
+                    self.add_entry(sourceIndex, theSphere, size_x, size_y, theCanvas, doDrawing)
+                if lower_edge:
+                    self.add_entry(sourceIndex, theSphere, size_x, -size_y, theCanvas, doDrawing)
+            if right_edge:
+                self.add_entry(sourceIndex, theSphere, -size_x, 0, theCanvas, doDrawing)
+                if upper_edge:
+                    self.add_entry(sourceIndex, theSphere, -size_x, size_y, theCanvas, doDrawing)
+                if lower_edge:
+                    self.add_entry(sourceIndex, theSphere, -size_x, -size_y, theCanvas, doDrawing)
+            if upper_edge:
+                self.add_entry(sourceIndex, theSphere, 0, size_y, theCanvas, doDrawing)
+            if lower_edge:
+                self.add_entry(sourceIndex, theSphere, 0, -size_y, theCanvas, doDrawing)
+
+        if doDrawing:
+            for theGhost in previous:
+                if not self.is_active(theGhost):
+                    theGhost.deleteDrawing()
+
+        return self.ghosts
+
+    def add_entry(self, sourceIndex, theSphere, offset_x, offset_y, theCanvas=False, doDrawing=False):
+        """Append the entry (sourceIndex, offset_x, offset_y) and place its replicate
+
+        This method is defined in class `particleShear.Ghost_image_table`"""
+        entry = self.count
+        if entry < len(self.source_index):
+            self.source_index[entry] = sourceIndex
+            self.offset_x[entry] = offset_x
+            self.offset_y[entry] = offset_y
+        else:
+            self.source_index.append(sourceIndex)
+            self.offset_x.append(offset_x)
+            self.offset_y.append(offset_y)
+        self.count = entry + 1
+
+        x = theSphere.x + offset_x
+        y = theSphere.y + offset_y
+        key = (sourceIndex, offset_x, offset_y)
+        theGhost = self.pool.get(key)
+        if theGhost is None:
+            theGhost = SphereFriction("green", x, y, 2 * theSphere.r, theSphere.m, self.next_index, theCanvas,
+                                      doDrawing)
+            self.next_index = self.next_index + 1
+            self.pool[key] = theGhost
+            self.pooled[id(theGhost)] = key
+        else:
+            if doDrawing and id(theGhost) in self.drawn:
+                # Shift the existing shapes rather than re-creating them
+                theGhost.theCanvas.move(theGhost.shape, x - theGhost.x, y - theGhost.y)
+                if theGhost.rotation_line:
+                    theGhost.theCanvas.move(theGhost.rotation_line, x - theGhost.x, y - theGhost.y)
+            theGhost.x = x
+            theGhost.y = y
+            theGhost.r = theSphere.r
+            theGhost.m = theSphere.m
+            if doDrawing and id(theGhost) not in self.drawn:
+                theGhost.initiate_drawing()
+
+        self.entry_of[id(theGhost)] = entry
+        self.ghosts.append(theGhost)
+        return theGhost
+
+    def clear(self):
+        """Drop all entries and replicates
+
+        This method is defined in class `particleShear.Ghost_image_table`"""
+        for theGhost in self.ghosts:
+            theGhost.deleteDrawing()
+        self.count = 0
+        self.ghosts = []
+        self.pool = {}
+        self.entry_of = {}
+        self.pooled = {}
+        self.sources = []
+
+    def represents(self, sphereList):
+        """Return whether the table replicates exactly the spheres of sphereList, in the same order
+
+        This method is defined in class `particleShear.Ghost_image_table`"""
+        if len(sphereList) != len(self.sources):
+            return False
+        for ind in range(len(sphereList)):
+            if sphereList[ind] is not self.sources[ind]:
+                return False
+        return True
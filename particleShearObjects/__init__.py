@@ -4,7 +4,7 @@ __all__ = ["Sphere","SphereLeesEdwards","SphereFriction","SphereFrictionLeesEdwa
            "Ensemble",
            "EnsembleFriction",
             "r_estimate","EnsembleLeesEdwards","EnsembleFrictionLeesEdwards",
-           "particle_shear_model_parameters","adjust_m"]
+           "particle_shear_model_parameters","Ghost_image_table","adjust_m"]
 
 
 
@@ -25,6 +25,7 @@ from .Ensemble import r_estimate
 from .Ensemble import adjust_m
 from .EnsembleLeesEdwards import EnsembleLeesEdwards
 from .EnsembleFrictionLeesEdwards import EnsembleFrictionLeesEdwards
+from .Ghost_image_table import Ghost_image_table
 
 
 
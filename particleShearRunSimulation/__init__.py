@@ -3,7 +3,8 @@
 
 __all__ = [
             "doParticleShearSimulation",
-"doParticleShearSimulationSeries"]
+"doParticleShearSimulationSeries",
+"doMultipleTimeStepBenchmark"]
 
 
 
@@ -14,4 +15,5 @@ __all__ = [
 
 # Simulation stuff
 from .doParticleShearSimulation import doParticleShearSimulation
-from .doParticleShearSimulationSeries import doParticleShearSimulationSeries
\ No newline at end of file
+from .doParticleShearSimulationSeries import doParticleShearSimulationSeries
+from .doMultipleTimeStepBenchmark import doMultipleTimeStepBenchmark
\ No newline at end of file
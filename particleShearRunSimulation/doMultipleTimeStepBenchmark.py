@@ -0,0 +1,54 @@
+import random
+import time
+from .doParticleShearSimulation import doParticleShearSimulation
+
+
+def doMultipleTimeStepBenchmark(root_folder="",respa_substeps=4,theAmplitude=0.1,theMu=0.5,cut_lines=2,
+                    Young_modulus_spheres=8000,N=30,packing_fraction=1.5,density=50,bimodal_factor=1.4,
+                    relative_viscosity=0.1,relative_transversal_link_strength=1,relative_frequency=0.025,
+                    interface_reenforcement_central=0.1,interface_reenforcement_tangential=0.1,
+                    pre_periods=1,periods=2,post_periods=1,cool_factor=0.5,seed=1):
+
+    # Compare G', G'' and the wall time of the same crosslinked simulation run with a single time step and with the
+    # forces of the permanent links sub-cycled (respa_substeps sub-steps per time step, see
+    # CanvasPointsFrictionElasticityLeesEdwards.set_respa_substeps). By default, the interfaces are 10 times softer
+    # than the permanent links (interface_reenforcement 0.1): the single rate time step is set for the links, while the
+    # sub-cycled run takes the time step of the softer contacts, sqrt(10) times larger (see
+    # EnsembleCompactParticlesAdjustableInterfaceStrengthFromModelParameters). With links as soft as the contacts
+    # (interface_reenforcement 1), both runs have the same time step and the sub-steps only add work. Both runs start
+    # from the same random seed and prepare the same ensemble, sub-cycling only from the oscillatory shear on; drawing
+    # and output files are off.
+    # Returns [[substeps, [G', G''], wall time in s]] for the single rate run and the multiple time step run
+
+    results=[]
+
+    for substeps in [1, respa_substeps]:
+        random.seed(seed)
+        start=time.time()
+        G=doParticleShearSimulation(root_folder, theAmplitude=theAmplitude, theMu=theMu, do_permanent_links=True,
+                        cut_lines=cut_lines, Young_modulus_spheres=Young_modulus_spheres,
+                        N=N, packing_fraction=packing_fraction, density=density, bimodal_factor=bimodal_factor,
+                        relative_viscosity=relative_viscosity,
+                        relative_transversal_link_strength=relative_transversal_link_strength,
+                        relative_frequency=relative_frequency,
+                        interface_reenforcement_central=interface_reenforcement_central,
+                        interface_reenforcement_tangential=interface_reenforcement_tangential,
+                        doDrawing=False, saveData=False, saveStressTensorData=False, plotStress=False,
+                        pre_periods=pre_periods, periods=periods, post_periods=post_periods,
+                        cool_factor=cool_factor, respa_substeps=substeps)
+        results.append([substeps, G, time.time()-start])
+
+    print("Sub-steps\tG'\tG''\tWall time [s]")
+    for result in results:
+        print(str(result[0])+"\t"+str(result[1][0])+"\t"+str(result[1][1])+"\t"+str(result[2]))
+
+    reference=results[0]
+    for result in results[1:]:
+        for index, name in [[0, "G'"], [1, "G''"]]:
+            if reference[1][index] != 0:
+                print("Relative difference of "+name+" with "+str(result[0])+" sub-steps:",
+                      (result[1][index]-reference[1][index])/reference[1][index])
+        if result[2] > 0:
+            print("Speed-up with "+str(result[0])+" sub-steps:", reference[2]/result[2])
+
+    return results
@@ -13,7 +13,8 @@ def doParticleShearSimulation(root_folder="",theAmplitude=0.2,theMu=0.01,do_perm
                     doCutByTriangulation=True,doDrawing=True,saveData=False,
                     saveStressTensorData=True,
                     plotStress=True,relative_y_scale_force = 1e8,
-                    pre_periods=2,periods=3,post_periods=1,cool_factor=0.5):
+                    pre_periods=2,periods=3,post_periods=1,cool_factor=0.5,respa_substeps=1,
+                    return_file_name=False):
 
 
     #if theAmplitude < 0.005:
@@ -50,6 +51,7 @@ def doParticleShearSimulation(root_folder="",theAmplitude=0.2,theMu=0.01,do_perm
                                   "\n\ttheSimulation.baseline_post_periods = " + str(post_periods)+ \
                                   "\n\ttheSimulation.saveOutputImages = " + str(saveOutputImages)+ \
                                   "\n\ttheSimulation.imageFileType = " + str(imageFileType) + \
+                                  "\n\ttheSimulation.respa_substeps = " + str(respa_substeps) + \
                                   "\n\ttheSimulation.runSimulation(periods="+str(periods)+", cool_factor="+\
                                   str(cool_factor)+")"
 
@@ -61,8 +63,15 @@ def doParticleShearSimulation(root_folder="",theAmplitude=0.2,theMu=0.01,do_perm
 
 
     theSimulation.saveStressTensorData=saveStressTensorData
+    theSimulation.respa_substeps=respa_substeps
 
-    return(theSimulation.runSimulation(periods=periods, cool_factor=cool_factor,plotStress=plotStress))
+    G=theSimulation.runSimulation(periods=periods, cool_factor=cool_factor,plotStress=plotStress)
+
+    # With return_file_name, return [G, name of the data file] (False if no data file was written)
+    if return_file_name:
+        return([G, theSimulation.output_file_name])
+
+    return(G)
 
 
 
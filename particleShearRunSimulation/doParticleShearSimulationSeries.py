@@ -1,4 +1,37 @@
 from .doParticleShearSimulation import doParticleShearSimulation
+import multiprocessing
+import random
+import traceback
+
+
+def runSeriesSimulation(run, capture_errors=False):
+
+    # Do one simulation of a series, run being [index, parameters, seed] with parameters the keyword arguments of
+    # doParticleShearSimulation plus the entries "repetition" and "run" (description of the run).
+    # With seed False, the random number generator is left as is; otherwise it is seeded with seed (None: from the
+    # operating system, as each worker process of a pool inherits the same state).
+    # Returns the row [parameters, G', G'', output file, error] of the table of results of
+    # doParticleShearSimulationSeries; error is False or, with capture_errors, the traceback of a failed run (G', G''
+    # and the output file are then False). Without capture_errors, the exception of a failed run propagates
+
+    index, parameters, seed = run
+    arguments = dict(parameters)
+    del arguments["repetition"]
+    del arguments["run"]
+
+    if seed is not False:
+        random.seed(seed)
+
+    if not capture_errors:
+        G, file_name = doParticleShearSimulation(return_file_name=True, **arguments)
+        return [parameters, G[0], G[1], file_name, False]
+
+    try:
+        G, file_name = doParticleShearSimulation(return_file_name=True, **arguments)
+    except Exception:
+        return [parameters, False, False, False, traceback.format_exc()]
+
+    return [parameters, G[0], G[1], file_name, False]
 
 
 def doParticleShearSimulationSeries(root_folder="",amplitudes=[0.2],mu=[0.01],cut_lines=5,Young_modulus_spheres=8000,
@@ -18,7 +51,61 @@ def doParticleShearSimulationSeries(root_folder="",amplitudes=[0.2],mu=[0.01],cu
                     remove_link_fraction=0,
                     edge_fuzziness=0,central_repulsion_coefficient=1,
                     doDrawing=True,saveData=False,saveStressTensorData=True,plotStress=True,
-                    pre_periods=2, periods=3, post_periods=1, cool_factor=0.5):
+                    pre_periods=2, periods=3, post_periods=1, cool_factor=0.5,
+                    workers=False, seed=False):
+
+    # With workers (number of processes) larger than 1, the simulations of the series run in parallel in a process
+    # pool, without drawing, stress plot or output images. With seed, the simulation of index i in the series starts
+    # from the random seed seed+i, in both cases; otherwise, the workers are seeded from the operating system.
+    # Returns the table of results, one row [parameters, G', G'', output file, error] per simulation (see
+    # runSeriesSimulation) in the order of the series, whatever the order of completion. In the process pool, a failed
+    # simulation is reported there and printed, and the series goes on; in a single process, its exception propagates
+    # as before.
+
+    parallel = workers is not False and workers > 1
+
+    if parallel:
+        doDrawing = False
+        plotStress = False
+        saveOutputImages = False
+
+    common_parameters = {"root_folder": root_folder, "Young_modulus_spheres": Young_modulus_spheres,
+                         "N": N, "packing_fraction": packing_fraction,
+                         "density": density,
+                         "bimodal_factor": bimodal_factor,
+                         "relative_viscosity": relative_viscosity,
+                         "relative_transversal_link_strength": relative_transversal_link_strength,
+                         "relative_frequency": relative_frequency,
+                         "avoid_horizontal_angle_degree": avoid_horizontal_angle_degree,
+                         "interface_reenforcement_central": interface_reenforcement_central,
+                         "interface_reenforcement_tangential": interface_reenforcement_tangential,
+                         "keep_viscosity_coefficients_constant": keep_viscosity_coefficients_constant,
+                         "avoid_height_spanning_particles": avoid_height_spanning_particles,
+                         "cut_top_bottom": cut_top_bottom,
+                         "saveOutputImages": saveOutputImages, "imageFileType": imageFileType,
+                         "remove_link_fraction": remove_link_fraction,
+                         "edge_fuzziness": edge_fuzziness,
+                         "central_repulsion_coefficient": central_repulsion_coefficient,
+                         "doCutByTriangulation": doCutByTriangulation,
+                         "doDrawing": doDrawing,
+                         "saveData": saveData,
+                         "saveStressTensorData": saveStressTensorData,
+                         "plotStress": plotStress,
+                         "pre_periods": pre_periods, "periods": periods, "post_periods": post_periods,
+                         "cool_factor": cool_factor}
+
+    runs = []
+
+    def add_run(repetition, description, theAmplitude, theMu, do_permanent_links, theCut_lines):
+        parameters = dict(common_parameters)
+        parameters.update({"repetition": repetition, "run": description, "theAmplitude": theAmplitude,
+                           "theMu": theMu, "do_permanent_links": do_permanent_links, "cut_lines": theCut_lines})
+        run_seed = False
+        if seed is not False:
+            run_seed = seed + len(runs)
+        elif parallel:
+            run_seed = None
+        runs.append([len(runs), parameters, run_seed])
 
     for i in range(N_repetitions):
         for theAmplitude in amplitudes:
@@ -27,120 +114,36 @@ def doParticleShearSimulationSeries(root_folder="",amplitudes=[0.2],mu=[0.01],cu
             for theMu in mu:
                 # Control: Bulk (this is the same as the biomaterial call, but cut_lines=0
                 if do_bulk_control:
-
-                    doParticleShearSimulation(root_folder,theAmplitude=theAmplitude,
-                        theMu=theMu,do_permanent_links=True,cut_lines=0,
-                        Young_modulus_spheres=Young_modulus_spheres,
-                        N=N,packing_fraction=packing_fraction,
-                        density=density,
-                        bimodal_factor=bimodal_factor,
-                        relative_viscosity=relative_viscosity,
-                        relative_transversal_link_strength=relative_transversal_link_strength,
-                        relative_frequency=relative_frequency,
-                        avoid_horizontal_angle_degree=avoid_horizontal_angle_degree,
-                        interface_reenforcement_central=interface_reenforcement_central,
-                        interface_reenforcement_tangential=interface_reenforcement_tangential,
-                        keep_viscosity_coefficients_constant=keep_viscosity_coefficients_constant,
-                        avoid_height_spanning_particles=avoid_height_spanning_particles,cut_top_bottom=cut_top_bottom,
-                        saveOutputImages=saveOutputImages,imageFileType =imageFileType,
-                        remove_link_fraction=remove_link_fraction,
-                        edge_fuzziness=edge_fuzziness,
-                        central_repulsion_coefficient=central_repulsion_coefficient,
-                        doCutByTriangulation=doCutByTriangulation,
-                        doDrawing=doDrawing,
-                        saveData=saveData,
-                        saveStressTensorData=saveStressTensorData,
-                        plotStress=plotStress,
-                        pre_periods=pre_periods,periods=periods,post_periods=post_periods,cool_factor=cool_factor)
-
-
-
+                    add_run(i, "bulk control", theAmplitude, theMu, True, 0)
 
                 # Actual biomaterial: crosslinked but cut into particles
-                doParticleShearSimulation(root_folder, theAmplitude=theAmplitude,
-                    theMu=theMu, do_permanent_links=True, cut_lines=cut_lines,
-                    Young_modulus_spheres=Young_modulus_spheres,
-                    N=N, packing_fraction=packing_fraction,
-                    density=density,
-                    bimodal_factor=bimodal_factor,
-                    relative_viscosity=relative_viscosity,
-                    relative_transversal_link_strength=relative_transversal_link_strength,
-                    relative_frequency=relative_frequency,
-                    avoid_horizontal_angle_degree=avoid_horizontal_angle_degree,
-                    interface_reenforcement_central=interface_reenforcement_central,
-                    interface_reenforcement_tangential=interface_reenforcement_tangential,
-                    keep_viscosity_coefficients_constant=keep_viscosity_coefficients_constant,
-                    avoid_height_spanning_particles=avoid_height_spanning_particles,
-                    cut_top_bottom=cut_top_bottom,
-                    saveOutputImages=saveOutputImages,imageFileType =imageFileType,
-                    remove_link_fraction=remove_link_fraction,
-                    edge_fuzziness=edge_fuzziness,
-                    central_repulsion_coefficient=central_repulsion_coefficient,
-                    doCutByTriangulation=doCutByTriangulation,
-                    doDrawing=doDrawing,
-                    saveData=saveData,
-                    saveStressTensorData=saveStressTensorData,
-                    plotStress=plotStress,
-                    pre_periods=pre_periods, periods=periods, post_periods=post_periods,
-                    cool_factor=cool_factor)
+                add_run(i, "biomaterial", theAmplitude, theMu, True, cut_lines)
 
                 # Control: uncrosslinked spheres only
                 if do_uncrosslinked_control:
-                    doParticleShearSimulation(root_folder, theAmplitude=theAmplitude,
-                        theMu=theMu, do_permanent_links=False, cut_lines=0,
-                        Young_modulus_spheres=Young_modulus_spheres,
-                        N=N, packing_fraction=packing_fraction,
-                        density=density,
-                        bimodal_factor=bimodal_factor,
-                        relative_viscosity=relative_viscosity,
-                        relative_transversal_link_strength=relative_transversal_link_strength,
-                        relative_frequency=relative_frequency,
-                        avoid_horizontal_angle_degree=avoid_horizontal_angle_degree,
-                        interface_reenforcement_central=interface_reenforcement_central,
-                        interface_reenforcement_tangential=interface_reenforcement_tangential,
-                        keep_viscosity_coefficients_constant=keep_viscosity_coefficients_constant,
-                        avoid_height_spanning_particles=avoid_height_spanning_particles,
-                        cut_top_bottom=cut_top_bottom,
-                        saveOutputImages=saveOutputImages,imageFileType =imageFileType,
-                        remove_link_fraction=remove_link_fraction,
-                        edge_fuzziness=edge_fuzziness,
-                        central_repulsion_coefficient=central_repulsion_coefficient,
-                        doCutByTriangulation=doCutByTriangulation,
-                        doDrawing=doDrawing,
-                        saveData=saveData,
-                        saveStressTensorData=saveStressTensorData,
-                        plotStress=plotStress,
-                        pre_periods=pre_periods, periods=periods, post_periods=post_periods,
-                        cool_factor=cool_factor)
-
+                    add_run(i, "uncrosslinked control", theAmplitude, theMu, False, 0)
 
                 # Control: non-frictional
                 if do_non_frictional_control:
-                    doParticleShearSimulation(root_folder, theAmplitude=theAmplitude,
-                        theMu=0, do_permanent_links=True, cut_lines=cut_lines,
-                        Young_modulus_spheres=Young_modulus_spheres,
-                        N=N, packing_fraction=packing_fraction,
-                        density=density,
-                        bimodal_factor=bimodal_factor,
-                        relative_viscosity=relative_viscosity,
-                        relative_transversal_link_strength=relative_transversal_link_strength,
-                        relative_frequency=relative_frequency,
-                        avoid_horizontal_angle_degree=avoid_horizontal_angle_degree,
-                        interface_reenforcement_central=interface_reenforcement_central,
-                        interface_reenforcement_tangential=interface_reenforcement_tangential,
-                        keep_viscosity_coefficients_constant=keep_viscosity_coefficients_constant,
-                        avoid_height_spanning_particles=avoid_height_spanning_particles,
-                        cut_top_bottom=cut_top_bottom,
-                        saveOutputImages=saveOutputImages,imageFileType =imageFileType,
-                        remove_link_fraction=remove_link_fraction,
-                        edge_fuzziness=edge_fuzziness,
-                        central_repulsion_coefficient=central_repulsion_coefficient,
-                        doCutByTriangulation=doCutByTriangulation,
-                        doDrawing=doDrawing,
-                        saveData=saveData,
-                        saveStressTensorData=saveStressTensorData,
-                        plotStress=plotStress,
-                        pre_periods=pre_periods, periods=periods, post_periods=post_periods,
-                        cool_factor=cool_factor)
+                    add_run(i, "non-frictional control", theAmplitude, 0, True, cut_lines)
+
+    if parallel:
+        # Rows collected in the order of submission, so that the table does not depend on the order of completion
+        pool = multiprocessing.Pool(processes=workers)
+        try:
+            pending = [pool.apply_async(runSeriesSimulation, (run, True)) for run in runs]
+            table = [result.get() for result in pending]
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        table = [runSeriesSimulation(run) for run in runs]
 
+    for index in range(len(table)):
+        row = table[index]
+        if row[4] is not False:
+            print("Simulation", index, "of the series (" + row[0]["run"] + ", repetition", row[0]["repetition"],
+                  ", amplitude", row[0]["theAmplitude"], ", mu", row[0]["theMu"], ") failed:")
+            print(row[4])
 
+    return table
@@ -1,17 +1,41 @@
 from particleShearBase import StressTensorEvaluation
 from particleShearBase import Force_register
+from particleShearBase.Force_register import FORCE_INTERNAL
+from .Stress_history import Stress_history
+from .Stress_history import TENSOR_NAMES
 import math
 
+
+def history_property(name):
+    """Return a read-only property giving the `particleShear.History_view` of the quantity name"""
+    return property(lambda self: self.history.view(name),
+                    doc="Recorded time course of " + name + " (read-only view of the history)")
+
+
 class EvaluationHandler():
-    def __init__(self):
-        self.strain = []
-        self.strain_rate = []
-        self.force = []
-        self.t = []
-        self.shear_stress=[]
+    def __init__(self, capacity=0, keep_history=True):
+        # Time course of t, strain, strain_rate, force, shear_stress, weight and of the stress tensors, available through
+        # the read-only views of the same names
+        self.history = Stress_history(capacity)
+        # If False, the samples are not stored in the history (only the first and the latest are kept), for instance
+        # when a lock-in demodulator is attached
+        self.keep_history = keep_history
+        self.first_sample = False # [t, strain, strain_rate, force, shear_stress, weight] of the first record
+        self.latest_sample = False # [t, strain, strain_rate, force, shear_stress, weight] of the latest record
+        self.latest_values = False # Values of the latest record given to the lock-in demodulator
+
+        # Optional LockInDemodulator fed with each record (see attach_lock_in)
+        self.lock_in = False
+
         self.Gprime=0
         self.viscosity=0
 
+        # Running sums over the recorded history for the G' and viscosity estimators
+        self.sum_strain=0
+        self.sum_strain_rate=0
+        self.sum_strain_stress=0
+        self.sum_strain_rate_stress=0
+
         self.xg=[0,0] # Center of gravity, in microns
         self.total_mass = 0 # Total mass present, in mg
         self.v_mean=[0,0] # Mean speed, in micrometers/s
@@ -22,21 +46,38 @@ class EvaluationHandler():
         self.theEvaluator=False
 
 
-        # Stress tensors to be stored
-
-        self.stress_tensor_LW = []
-        self.stress_tensor_linear_acceleration_otsuki = []
-        self.stress_tensor_with_external_forces = []
-        self.stress_tensor_linear_acceleration = []
-        self.stress_tensor_unbalanced_forces = []
-        self.stress_tensor_unbalanced_torque = []
-        self.stress_tensor_internal_torque = []
-        self.stress_tensor_spin_kinetic_energy = []
-        self.overall_stress_tensor = []
         self.overall_stress_tensor2 = []
 
-    def record(self, theEnsemble,theEvaluator=False):
-        self.t.append(theEnsemble.t)
+    t = history_property("t")
+    strain = history_property("strain")
+    strain_rate = history_property("strain_rate")
+    force = history_property("force")
+    shear_stress = history_property("shear_stress")
+    weight = history_property("weight")
+
+    # Stress tensors stored
+    stress_tensor_LW = history_property("stress_tensor_LW")
+    stress_tensor_linear_acceleration_otsuki = history_property("stress_tensor_linear_acceleration_otsuki")
+    stress_tensor_with_external_forces = history_property("stress_tensor_with_external_forces")
+    stress_tensor_linear_acceleration = history_property("stress_tensor_linear_acceleration")
+    stress_tensor_unbalanced_forces = history_property("stress_tensor_unbalanced_forces")
+    stress_tensor_unbalanced_torque = history_property("stress_tensor_unbalanced_torque")
+    stress_tensor_internal_torque = history_property("stress_tensor_internal_torque")
+    stress_tensor_spin_kinetic_energy = history_property("stress_tensor_spin_kinetic_energy")
+    overall_stress_tensor = history_property("overall_stress_tensor")
+
+    def reserve(self, capacity):
+        # Preallocate the history for the expected number of records
+        if self.keep_history:
+            self.history.reserve(capacity)
+
+    def attach_lock_in(self, theDemodulator):
+        # Feed each record to theDemodulator (LockInDemodulator, with the STRESS_CHANNELS)
+        self.lock_in = theDemodulator
+
+    def record(self, theEnsemble,theEvaluator=False,weight=1):
+        # weight: time interval represented by the sample, for variable time steps (see LockInDemodulator.add_sample)
+        t = theEnsemble.t
 
 
         if (not theEvaluator) and (not self.theEvaluator):
@@ -50,10 +91,15 @@ class EvaluationHandler():
         sum_x = 0
         sum_y = 0
         total = 0
-        for thePair in theEnsemble.force_register.pair_register:
-            sum_x = sum_x + thePair[2][0]
-            sum_y = sum_y + thePair[2][1]
-            total = total + abs(thePair[2][0]+thePair[2][1])
+        theRegister = theEnsemble.force_register
+        if theRegister.accumulate_stress:
+            sum_x = theRegister.pair_force_sum[0]
+            sum_y = theRegister.pair_force_sum[1]
+            total = theRegister.pair_force_abs_sum
+        for row in theRegister.force_rows(FORCE_INTERNAL):
+            sum_x = sum_x + theRegister.force_x[row]
+            sum_y = sum_y + theRegister.force_y[row]
+            total = total + abs(theRegister.force_x[row]+theRegister.force_y[row])
 
         if total > 0:
             if not (abs(sum_x)/total<1e-14 and abs(sum_y)/total < 1e-14):
@@ -95,55 +141,53 @@ class EvaluationHandler():
 
         #print("EvaluationHandler: overall stress tensor ",theEvaluator.overall_stress_tensor)
 
-        self.strain.append(theEnsemble.shear)
-        self.strain_rate.append(theEnsemble.shear_rate)
-
-
-        self.shear_stress.append(theEvaluator.evaluate_quasistatic_shear_stress()) # This is overall shear stress
+        strain = theEnsemble.shear
+        strain_rate = theEnsemble.shear_rate
 
+        shear_stress = theEvaluator.evaluate_quasistatic_shear_stress() # This is overall shear stress
 
-
-        self.force.append(theEvaluator.evaluate_externally_applied_shear_stress()) # This is shear stress as theoretically defined by average surface force on
+        force = theEvaluator.evaluate_externally_applied_shear_stress() # This is shear stress as theoretically defined by average surface force on
         # arbitrary sections.
 
-        # Stress tensors to be stored
-        self.stress_tensor_LW.append(theEvaluator.stress_tensor_LW)
-        self.stress_tensor_linear_acceleration_otsuki.append(theEvaluator.stress_tensor_linear_acceleration_otsuki)
-        self.stress_tensor_with_external_forces.append(theEvaluator.stress_tensor_with_external_forces)
-        self.stress_tensor_linear_acceleration.append(theEvaluator.stress_tensor_linear_acceleration)
-        self.stress_tensor_unbalanced_forces.append(theEvaluator.stress_tensor_unbalanced_forces)
-        self.stress_tensor_unbalanced_torque.append(theEvaluator.stress_tensor_unbalanced_torque)
-        self.stress_tensor_internal_torque.append(theEvaluator.stress_tensor_internal_torque)
-        self.stress_tensor_spin_kinetic_energy.append(theEvaluator.stress_tensor_spin_kinetic_energy)
-        self.overall_stress_tensor.append(theEvaluator.overall_stress_tensor)
-
-
-
-
-
-
-
-
-        sum_strain=0
-        sum_strain_rate=0
-
-        self.Gprime=0
-        self.viscosity=0
-
-        for index in range(len(self.t)):
-            sum_strain=sum_strain+self.strain[index]*self.strain[index]
-            sum_strain_rate=sum_strain_rate+self.strain_rate[index]*self.strain_rate[index]
-            self.Gprime=self.Gprime-self.strain[index]*self.shear_stress[index]
-            self.viscosity=self.viscosity-self.strain_rate[index]*self.shear_stress[index]
-
-        if sum_strain > 0:
-            self.Gprime=self.Gprime/sum_strain
-        if sum_strain_rate > 0:
-            self.viscosity=self.viscosity/sum_strain_rate
-
-
-
-
-
-
-
+        # Store the scalars and stress tensors
+        sample = [t, strain, strain_rate, force, shear_stress, weight]
+        tensors = [getattr(theEvaluator, name) for name in TENSOR_NAMES]
+        if not self.first_sample:
+            self.first_sample = sample
+        self.latest_sample = sample
+        if self.keep_history:
+            self.history.append(sample, tensors)
+
+        if self.lock_in:
+            values = [shear_stress, force]
+            for tensor in tensors:
+                values.extend([tensor[0][0], tensor[0][1], tensor[1][0], tensor[1][1]])
+            self.lock_in.add_sample(t, values, weight)
+            self.latest_values = values
+
+        self.update_running_sums(strain, strain_rate, shear_stress, weight)
+
+    def add_weight(self, weight):
+        # Add weight to the latest record, in the history, the running sums and the lock-in demodulator; for instance
+        # the second half of a trapezoidal weight, once the time of the next record is known
+        self.latest_sample[5] = self.latest_sample[5] + weight
+        if self.keep_history:
+            self.history.add_to_last("weight", weight)
+        if self.lock_in:
+            self.lock_in.add_weight(self.latest_sample[0], self.latest_values, weight)
+        self.update_running_sums(self.latest_sample[1], self.latest_sample[2], self.latest_sample[4], weight)
+
+    def update_running_sums(self, strain, strain_rate, shear_stress, weight):
+        # Update the running sums with the new point only, rather than summing over the whole history
+        self.sum_strain=self.sum_strain+strain*strain*weight
+        self.sum_strain_rate=self.sum_strain_rate+strain_rate*strain_rate*weight
+        self.sum_strain_stress=self.sum_strain_stress-strain*shear_stress*weight
+        self.sum_strain_rate_stress=self.sum_strain_rate_stress-strain_rate*shear_stress*weight
+
+        self.Gprime=self.sum_strain_stress
+        self.viscosity=self.sum_strain_rate_stress
+
+        if self.sum_strain > 0:
+            self.Gprime=self.Gprime/self.sum_strain
+        if self.sum_strain_rate > 0:
+            self.viscosity=self.viscosity/self.sum_strain_rate
@@ -16,16 +16,13 @@ class EvaluationHandlerPlotter(EvaluationHandler):
 
 
 
-    def record(self, theEnsemble,theEvaluator=False):
-        super(EvaluationHandlerPlotter, self).record(theEnsemble,theEvaluator)
+    def record(self, theEnsemble,theEvaluator=False,weight=1):
+        super(EvaluationHandlerPlotter, self).record(theEnsemble,theEvaluator,weight)
 
         if self.plotStress:
-            t = self.t[len(self.t) - 1]
-            strain = self.strain[len(self.strain) - 1]
-            force = self.force[len(self.force) - 1]
-            shear_stress = self.shear_stress[len(self.shear_stress) - 1]
+            t, strain, strain_rate, force, shear_stress = self.latest_sample[0:5]
 
-            self.plot(t, strain, force - self.force[0], shear_stress - self.shear_stress[0])
+            self.plot(t, strain, force - self.first_sample[3], shear_stress - self.first_sample[4])
 
 
 
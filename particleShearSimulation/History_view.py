@@ -0,0 +1,38 @@
+class History_view():
+    """Read-only sequence over the values of one quantity recorded in a `particleShear.Stress_history`.
+
+    The view supports len(), iteration, indexing (including negative indices) and slicing, like the lists formerly
+    kept by `particleShear.EvaluationHandler`. It always reflects the current content of the history. Stress tensors
+    are returned as new 2x2 nested lists.\n
+    Class defined in subpackage particleShearSimulation"""
+
+    def __init__(self, history, name):
+        """Initialize the view
+
+        - **parameters**\n
+            `history` The `particleShear.Stress_history`\n
+            `name` The name of the quantity (see SCALAR_NAMES and TENSOR_NAMES in module Stress_history)"""
+        self.history = history
+        """The underlying `particleShear.Stress_history`"""
+        self.name = name
+        """The name of the quantity viewed"""
+
+    def __len__(self):
+        return self.history.count
+
+    def __getitem__(self, index):
+        count = self.history.count
+        if isinstance(index, slice):
+            return [self.history.item(self.name, step) for step in range(*index.indices(count))]
+        if index < 0:
+            index = index + count
+        if index < 0 or index >= count:
+            raise IndexError("History_view index out of range")
+        return self.history.item(self.name, index)
+
+    def __iter__(self):
+        for step in range(self.history.count):
+            yield self.history.item(self.name, step)
+
+    def __repr__(self):
+        return repr(list(self))
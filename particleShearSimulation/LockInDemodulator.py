@@ -0,0 +1,260 @@
+from array import array
+from .Stress_history import TENSOR_NAMES
+import math
+
+STRESS_CHANNELS = ["shear_stress", "force"] + [name + "_" + str(i) + str(j)
+                                               for name in TENSOR_NAMES for i in range(2) for j in range(2)]
+"""Channels demodulated for an `particleShear.EvaluationHandler`: the internal shear stress, the shear stress from the
+external forces and each component of the stress tensors (for instance stress_tensor_LW_01)"""
+
+
+class LockInDemodulator():
+    """Online lock-in demodulation of stress signals recorded during an oscillatory shear experiment.
+
+    This is the streaming counterpart of `particleShear.OscillatoryShearExperiment.demodulation`: rather than keeping
+    the whole time course, the in-phase and quadrature sums and the sums over the baseline windows used for the
+    linear drift correction are updated as each sample arrives (see `particleShear.LockInDemodulator.add_sample`).
+    The memory needed is constant in the number of samples: a few sums per channel, plus two sums per channel and
+    period for the results of the individual periods.\n
+    With the reference signals ip(t) (in phase with the strain) and op(t) (in phase with the strain rate) and the drift
+    corrected stress y(t)-(t-t0)*c, the in-phase stress is the sum of (y(t)-(t-t0)*c)*ip(t) divided by the sum of
+    ip(t)^2. Since c is known only once the final baseline has been acquired, the sums of y*ip and (t-t0)*ip are
+    accumulated separately.\n
+    Class defined in subpackage particleShearSimulation"""
+
+    def __init__(self, f, amplitude, periods, baseline_pre_periods=0, baseline_post_periods=0,
+                 channels=STRESS_CHANNELS):
+        """Initialize the demodulator
+
+        - **parameters**\n
+            `f` Frequency of the oscillatory shear, in Hz\n
+            `amplitude` Strain amplitude\n
+            `periods` Number of periods of oscillatory shear\n
+            `baseline_pre_periods` Number of periods acquired without shear before the oscillatory shear\n
+            `baseline_post_periods` Number of periods acquired without shear after the oscillatory shear\n
+            `channels` Names of the signals demodulated; the samples provide one value per channel, in this order"""
+        self.f = f
+        """Frequency of the oscillatory shear, in Hz"""
+        self.amplitude = amplitude
+        """Strain amplitude"""
+        self.periods = periods
+        """Number of periods of oscillatory shear"""
+        self.baseline_pre_periods = baseline_pre_periods
+        """Number of periods acquired without shear before the oscillatory shear"""
+        self.baseline_post_periods = baseline_post_periods
+        """Number of periods acquired without shear after the oscillatory shear"""
+        self.channels = list(channels)
+        """Names of the signals demodulated"""
+        self.channel_index = {}
+        """Index of each channel, by name"""
+        for index in range(len(self.channels)):
+            self.channel_index[self.channels[index]] = index
+
+        # If we have more than one period available, do not use the first one for evaluation as there are transitory
+        # phenomena at the beginning
+        self.equilibration_periods = 0
+        """Number of initial periods of oscillatory shear excluded from the overall result"""
+        if self.periods >= 2:
+            self.equilibration_periods = 1
+
+        n = len(self.channels)
+        self.count = 0
+        """Number of samples received"""
+        self.first_t = 0
+        """Time of the first sample"""
+        self.first_value = array('d', [0.0] * n)
+        """Value of each channel at the first sample"""
+        self.last_t = 0
+        """Time of the last sample"""
+        self.last_value = array('d', [0.0] * n)
+        """Value of each channel at the last sample"""
+
+        # Baseline windows for the drift correction
+        self.pre_window_count = 0
+        """Number of samples (sum of the weights) in the baseline window before the oscillatory shear"""
+        self.pre_window_t = 0
+        """Sum of the times of the samples in the baseline window before the oscillatory shear"""
+        self.pre_window_value = array('d', [0.0] * n)
+        """Sum of the values of each channel in the baseline window before the oscillatory shear"""
+        self.post_window_count = 0
+        """Number of samples (sum of the weights) in the baseline window after the oscillatory shear"""
+        self.post_window_t = 0
+        """Sum of the times of the samples in the baseline window after the oscillatory shear"""
+        self.post_window_value = array('d', [0.0] * n)
+        """Sum of the values of each channel in the baseline window after the oscillatory shear"""
+
+        # Sums over the evaluation window, shared by all channels
+        self.sum_in_phase = 0
+        """Sum of ip^2"""
+        self.sum_out_of_phase = 0
+        """Sum of op^2"""
+        self.sum_t_in_phase = 0
+        """Sum of (t-t0)*ip"""
+        self.sum_t_out_of_phase = 0
+        """Sum of (t-t0)*op"""
+        # Sums over the evaluation window, by channel
+        self.stress_in_phase = array('d', [0.0] * n)
+        """Sum of y*ip for each channel"""
+        self.stress_out_of_phase = array('d', [0.0] * n)
+        """Sum of y*op for each channel"""
+
+        # The same sums for each period of oscillatory shear
+        self.period_sums = [[0, 0, 0, 0] for period in range(periods)]
+        """Sums of ip^2, op^2, (t-t0)*ip and (t-t0)*op for each period"""
+        self.period_stress_in_phase = [array('d', [0.0] * n) for period in range(periods)]
+        """Sum of y*ip for each period and channel"""
+        self.period_stress_out_of_phase = [array('d', [0.0] * n) for period in range(periods)]
+        """Sum of y*op for each period and channel"""
+
+    def in_phase_signal(self, t):
+        """Reference signal in phase with the strain, as `particleShear.OscillatoryShearExperiment.in_phase_signal`
+
+        This method is defined in class `particleShear.LockInDemodulator`"""
+        return math.sin((t * self.f - self.baseline_pre_periods) * math.pi * 2)
+
+    def out_of_phase_signal(self, t):
+        """Reference signal in phase with the strain rate, as
+        `particleShear.OscillatoryShearExperiment.out_of_phase_signal`
+
+        This method is defined in class `particleShear.LockInDemodulator`"""
+        return math.cos((t * self.f - self.baseline_pre_periods) * math.pi * 2)
+
+    def add_sample(self, t, values, weight=1):
+        """Update the sums with the sample of time t, values holding the value of each channel
+
+        Each term of the sums is multiplied by weight. With variable time steps, the weight is the time interval
+        represented by the sample, so that the sums approximate time integrals rather than sums over samples; with
+        evenly spaced samples the default weight of 1 gives the same results.\n
+        This method is defined in class `particleShear.LockInDemodulator`"""
+        n = len(self.channels)
+        if self.count == 0:
+            self.first_t = t
+            for index in range(n):
+                self.first_value[index] = values[index]
+        self.count = self.count + 1
+        self.last_t = t
+        for index in range(n):
+            self.last_value[index] = values[index]
+        self.add_weight(t, values, weight)
+
+    def add_weight(self, t, values, weight):
+        """Add weight to the terms of the sample of time t already given to
+        `particleShear.LockInDemodulator.add_sample`, values holding the value of each channel
+
+        The sums are linear in the weights, so that this is the same as having given the sample the sum of both
+        weights; this allows completing the weight of a sample once the time of the next sample is known.\n
+        This method is defined in class `particleShear.LockInDemodulator`"""
+        n = len(self.channels)
+        pre = self.baseline_pre_periods
+        post = self.baseline_post_periods
+        periods = self.periods
+        f = self.f
+
+        if pre > 0 and (2 * pre / f / 3) <= t < (pre / f):
+            self.pre_window_count = self.pre_window_count + weight
+            self.pre_window_t = self.pre_window_t + t * weight
+            for index in range(n):
+                self.pre_window_value[index] = self.pre_window_value[index] + values[index] * weight
+
+        if post > 0 and (pre + periods) / f < t <= (pre + periods + post / 3) / f:
+            self.post_window_count = self.post_window_count + weight
+            self.post_window_t = self.post_window_t + t * weight
+            for index in range(n):
+                self.post_window_value[index] = self.post_window_value[index] + values[index] * weight
+
+        if t < pre / f or t > (pre + periods) / f:
+            return
+
+        ip = self.in_phase_signal(t)
+        op = self.out_of_phase_signal(t)
+        dt = t - pre / f
+        if weight != 1:
+            ip_weighted = ip * weight
+            op_weighted = op * weight
+        else:
+            ip_weighted = ip
+            op_weighted = op
+
+        if t >= (pre + self.equilibration_periods) / f:
+            self.sum_in_phase = self.sum_in_phase + ip * ip_weighted
+            self.sum_out_of_phase = self.sum_out_of_phase + op * op_weighted
+            self.sum_t_in_phase = self.sum_t_in_phase + dt * ip_weighted
+            self.sum_t_out_of_phase = self.sum_t_out_of_phase + dt * op_weighted
+            for index in range(n):
+                self.stress_in_phase[index] = self.stress_in_phase[index] + values[index] * ip_weighted
+                self.stress_out_of_phase[index] = self.stress_out_of_phase[index] + values[index] * op_weighted
+
+        period = int(dt * f)
+        if period < periods:
+            sums = self.period_sums[period]
+            sums[0] = sums[0] + ip * ip_weighted
+            sums[1] = sums[1] + op * op_weighted
+            sums[2] = sums[2] + dt * ip_weighted
+            sums[3] = sums[3] + dt * op_weighted
+            stress_in_phase = self.period_stress_in_phase[period]
+            stress_out_of_phase = self.period_stress_out_of_phase[period]
+            for index in range(n):
+                stress_in_phase[index] = stress_in_phase[index] + values[index] * ip_weighted
+                stress_out_of_phase[index] = stress_out_of_phase[index] + values[index] * op_weighted
+
+    def linear_drift_coefficient(self, channel="shear_stress"):
+        """Return the linear drift coefficient of the channel, from the baseline windows (or the first and last
+        samples) available so far
+
+        This method is defined in class `particleShear.LockInDemodulator`"""
+        index = self.channel_index[channel]
+        firstStressForDelta = self.first_value[index]
+        firstTForDelta = self.first_t
+        lastStressForDelta = self.last_value[index]
+        lastTForDelta = self.last_t
+        if self.baseline_pre_periods > 0 and self.pre_window_count > 0:
+            firstStressForDelta = self.pre_window_value[index] / self.pre_window_count
+            firstTForDelta = self.pre_window_t / self.pre_window_count
+        if self.baseline_post_periods > 0 and self.post_window_count > 0:
+            lastStressForDelta = self.post_window_value[index] / self.post_window_count
+            lastTForDelta = self.post_window_t / self.post_window_count
+        if firstTForDelta == lastTForDelta:
+            return 0
+        return (lastStressForDelta - firstStressForDelta) / (firstTForDelta - lastTForDelta)
+
+    def demodulate(self, index, sums, stress_in_phase, stress_out_of_phase, linear_drift_coefficient):
+        """Return [in phase stress, out of phase stress, G', G''] from the given sums
+
+        This method is defined in class `particleShear.LockInDemodulator`"""
+        if sums[0] == 0 or sums[1] == 0:
+            return [0, 0, 0, 0]
+        in_phase = (stress_in_phase[index] - linear_drift_coefficient * sums[2]) / sums[0]
+        out_of_phase = (stress_out_of_phase[index] - linear_drift_coefficient * sums[3]) / sums[1]
+        return [in_phase, out_of_phase, in_phase / self.amplitude, out_of_phase / self.amplitude]
+
+    def result(self, channel="shear_stress"):
+        """Return the vector [in phase stress, out of phase stress, G', G''] of the channel, with linear drift
+        correction, as `particleShear.OscillatoryShearExperiment.demodulation` does for the full time course
+
+        This method is defined in class `particleShear.LockInDemodulator`"""
+        return self.demodulate(self.channel_index[channel],
+                               [self.sum_in_phase, self.sum_out_of_phase, self.sum_t_in_phase,
+                                self.sum_t_out_of_phase],
+                               self.stress_in_phase, self.stress_out_of_phase,
+                               self.linear_drift_coefficient(channel))
+
+    def period_result(self, period, channel="shear_stress", drift_correction=True):
+        """Return the vector [in phase stress, out of phase stress, G', G''] of the channel for a single period of
+        oscillatory shear (0 for the first), with the drift correction available so far unless drift_correction is
+        False
+
+        This method is defined in class `particleShear.LockInDemodulator`"""
+        linear_drift_coefficient = 0
+        if drift_correction:
+            linear_drift_coefficient = self.linear_drift_coefficient(channel)
+        return self.demodulate(self.channel_index[channel], self.period_sums[period],
+                               self.period_stress_in_phase[period], self.period_stress_out_of_phase[period],
+                               linear_drift_coefficient)
+
+    def completed_periods(self):
+        """Return the number of periods of oscillatory shear fully acquired so far
+
+        This method is defined in class `particleShear.LockInDemodulator`"""
+        if self.count == 0:
+            return 0
+        return max(0, min(self.periods, int((self.last_t - self.baseline_pre_periods / self.f) * self.f)))
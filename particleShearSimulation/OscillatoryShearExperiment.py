@@ -4,6 +4,7 @@ from particleShearObjects import *
 from particleShearLinkableObjects import *
 from .EvaluationHandlerPlotter import EvaluationHandlerPlotter
 from .EvaluationHandler import  EvaluationHandler
+from .LockInDemodulator import LockInDemodulator
 import math
 import io
 from PIL import Image
@@ -14,7 +15,8 @@ class OscillatoryShearExperiment():
     # The plotStress variable serves as a switch to enable/disable output plotting, while leaving everything else the same
     def __init__(self, theEnsemble,dt,f,amplitude,output_file,dt_max=0,TkSimulation=False,force_scale=1,theTkOutput=False,
                  imageOutputFolder=False,imageBaseFileName=False,imageFileType = "jpg",plotStress=True,
-                 saveStressTensorData=True):
+                 saveStressTensorData=True,record_every=1,samples_per_period=False,keep_history=True,
+                 convergence_tolerance=False,min_periods=3,time_step_controller=False):
         self.plotStress=plotStress
         print("OscillatoryShearExperiment: Plot stress graph:",self.plotStress)
         self.theEnsemble=theEnsemble
@@ -59,9 +61,50 @@ class OscillatoryShearExperiment():
 
         self.saveStressTensorData=saveStressTensorData
 
+        self.record_every=record_every # Record (and evaluate) the stress every record_every steps only
 
+        self.samples_per_period=samples_per_period # If set, overrides record_every to record about this many
+        # samples per period of the oscillatory shear
 
+        self.keep_history=keep_history # If False, the stress data is not kept sample by sample; the results are
+        # obtained from the online lock-in demodulator
 
+        self.lock_in=False # LockInDemodulator fed during the experiment
+
+        self.convergence_tolerance=convergence_tolerance # If set, adaptive mode: stop the oscillatory shear once
+        # G' and G'' of two successive periods differ by less than this fraction of |G*|; periods is then the maximum
+
+        self.min_periods=min_periods # Minimum number of periods of oscillatory shear in adaptive mode; at least 3,
+        # since the first period is excluded as transitory and two more periods are compared
+        if convergence_tolerance and min_periods<3:
+            raise ValueError("min_periods must be at least 3 with a convergence tolerance (the first period is "
+                             "transitory, and two more periods are compared), got "+str(min_periods))
+
+        self.periods_used=0 # Number of periods of oscillatory shear actually applied
+
+        self.steps_used=0 # Number of time steps of the oscillatory shear protocol, baselines included
+
+        self.relaxation_max_force=False # If set, the relaxation steps of the pre-equilibration stop early once the
+        # largest net force on a mobile sphere is below this value (see CanvasPointsBasicElasticity.mechanical_relaxation)
+
+        self.relaxation_max_kinetic_energy=False # Likewise for the kinetic energy of the mobile spheres
+
+        self.relaxation_check_every=10 # Number of steps between two checks of the relaxation tolerances
+
+        self.time_step_controller=time_step_controller # If set (Time_step_controller), the time step of the
+        # oscillatory shear is adapted at each step, and the demodulation weights the samples by the time they
+        # represent
+
+
+
+
+
+    def relax(self, dt, N, cool_factor):
+        # Relaxation with the tolerances of the experiment; returns the number of steps done
+        return self.theEnsemble.mechanical_relaxation(dt=dt, theTk=self.theTkSimulation, N=N, cool_factor=cool_factor,
+                                                      max_force=self.relaxation_max_force,
+                                                      max_kinetic_energy=self.relaxation_max_kinetic_energy,
+                                                      check_every=self.relaxation_check_every)
 
     def free_pre_equilibration(self):
 
@@ -71,19 +114,20 @@ class OscillatoryShearExperiment():
         dt=self.dt_max
         N = 10
         cool_factor=0.5
+        steps=0
         if self.theEnsemble.mu > 0:
             N=int(20 * (2 - math.log10(self.theEnsemble.mu)))
         while dt>self.dt:
             print("dt=", dt)
-            self.theEnsemble.mechanical_relaxation(dt=dt, theTk=self.theTkSimulation,
-                    N=N, cool_factor=cool_factor)
+            steps=steps+self.relax(dt, N, cool_factor)
             dt=dt/2
             cool_factor=(1+cool_factor)/2
             self.theEnsemble.correct_linear_drift()
         dt = self.dt
         print("dt=", dt)
-        self.theEnsemble.mechanical_relaxation(dt=dt, theTk=self.theTkSimulation,
-                    N=N, cool_factor=1)
+        steps=steps+self.relax(dt, N, 1)
+        print("Free pre-equilibration steps:",steps)
+        return steps
 
 
     def pre_equilibrate(self,  N=25,cool_factor=0.99):
@@ -93,18 +137,17 @@ class OscillatoryShearExperiment():
         self.theEnsemble.applyingShear = True
         dt = self.dt_max
         cf=0.5
+        steps=0
 
         while dt > self.dt:
             print("dt=", dt)
-            self.theEnsemble.mechanical_relaxation(dt=dt, theTk=self.theTkSimulation,
-                                                   N=int(N/2), cool_factor=cf)
+            steps=steps+self.relax(dt, int(N/2), cf)
             dt = dt / 2
             cf = (1 + cf) / 2
 
         dt = self.dt
         print("  Setting final dt=", dt)
-        self.theEnsemble.mechanical_relaxation(dt=dt, theTk=self.theTkSimulation,
-                                               N=N*2, cool_factor=0.98)
+        steps=steps+self.relax(dt, N*2, 0.98)
 
 
         for i in range(N):
@@ -113,6 +156,9 @@ class OscillatoryShearExperiment():
             self.theEnsemble.reset_force()
             if self.theEnsemble.doDrawing:
                 self.theTkSimulation.update()
+        steps=steps+N
+        print("  Pre-equilibration steps:",steps)
+        return steps
 
 
     def oscillatory_shear_experiment(self, cool_factor=1,N_pre_equilibration_fixed_boundaries=25):
@@ -163,7 +209,25 @@ class OscillatoryShearExperiment():
 
         N=int(Time_required/self.dt)
 
-        print("Start application shear protocol, total N=",N," steps")
+        adaptive=bool(self.time_step_controller)
+        dt=self.dt
+        if adaptive:
+            dt=self.time_step_controller.dt
+            N=int(Time_required/dt)
+
+        record_every = self.recording_interval()
+
+        self.plotter.keep_history=self.keep_history
+        self.plotter.reserve(int(N/record_every)+1)
+
+        self.lock_in=LockInDemodulator(self.f, self.amplitude, self.periods, self.baseline_pre_periods,
+                                       self.baseline_post_periods)
+        self.plotter.attach_lock_in(self.lock_in)
+
+        if adaptive:
+            print("Start application shear protocol, adaptive time step, initial estimate N=",N," steps")
+        else:
+            print("Start application shear protocol, total N=",N," steps")
 
         # plan to output 200 images in total
 
@@ -179,8 +243,22 @@ class OscillatoryShearExperiment():
         if self.imageOutputFolder:
             print("Saving image every ",image_N," steps")
 
-        for i in range(N):
-            if i>=(self.baseline_pre_periods/self.f/self.dt) and i<=((self.periods+self.baseline_pre_periods)/self.f/self.dt):
+        self.periods_used=self.periods
+
+        checked_periods=0
+
+        previous_record_t=False
+
+        i=0
+        while (not adaptive and i<N) or (adaptive and self.theEnsemble.t<Time_required):
+            if adaptive:
+                # The actual time stamps decide on the shear, as the steps are not evenly spaced
+                shearing=self.baseline_pre_periods/self.f<=self.theEnsemble.t<=\
+                         (self.periods+self.baseline_pre_periods)/self.f
+            else:
+                shearing=i>=(self.baseline_pre_periods/self.f/self.dt) and \
+                         i<=((self.periods+self.baseline_pre_periods)/self.f/self.dt)
+            if shearing:
                 self.theEnsemble.setShearRate(
                     self.amplitude * self.out_of_phase_signal(self.theEnsemble.t)* self.f * 2 * math.pi)
 
@@ -189,22 +267,50 @@ class OscillatoryShearExperiment():
             else:
                 self.theEnsemble.setShearRate(0)
 
+            # Steps between samples skip the force register bookkeeping and the stress evaluation
+            doRecord = (i % record_every == 0)
+            self.theEnsemble.record_forces = doRecord
+
             # Calculate forces, this registers individual forces in the force register
 
             self.theEnsemble.mechanical_simulation_step_calculate_forces()
 
-            # report net particles forces and moments in the force register
-            self.theEnsemble.record_total_particle_forces()
-
-
-            self.plotter.record(self.theEnsemble,self.theEvaluator)
-
-
-
-            # Do linear and rotational acceleration
-            self.theEnsemble.mechanical_simulation_step_calculate_acceleration(cool_factor=cool_factor, dt=self.dt)
-            # Do linear and rotation movememnt
-            self.theEnsemble.mechanical_simulation_step_calculate_movement(dt=self.dt)
+            if adaptive:
+                # The time step of every step is chosen from the forces just calculated
+                dt=self.time_step_controller.next_dt(self.theEnsemble)
+
+            if doRecord:
+                # report net particles forces and moments in the force register
+                self.theEnsemble.record_total_particle_forces()
+
+                if adaptive:
+                    # Trapezoidal rule: each sample is weighted by half the intervals to the previous and to the next
+                    # sample. The second half is added to the previous sample now that the interval is known; the
+                    # last sample keeps half the interval to the previous one only
+                    half_interval=0
+                    if previous_record_t is not False:
+                        half_interval=(self.theEnsemble.t-previous_record_t)/2
+                        self.plotter.add_weight(half_interval)
+                    self.plotter.record(self.theEnsemble,self.theEvaluator,half_interval)
+                    previous_record_t=self.theEnsemble.t
+                else:
+                    self.plotter.record(self.theEnsemble,self.theEvaluator)
+
+                if self.convergence_tolerance and self.lock_in.completed_periods()>checked_periods:
+                    checked_periods=self.lock_in.completed_periods()
+                    if checked_periods<self.periods and self.periods_converged(checked_periods):
+                        # Stop the oscillatory shear here, and continue with the post-baseline
+                        print("Converged after ",checked_periods," periods")
+                        self.periods_used=checked_periods
+                        self.periods=checked_periods
+                        self.lock_in.periods=checked_periods
+                        Time_required = (self.periods + self.baseline_pre_periods + self.baseline_post_periods) / self.f
+                        N=int(Time_required/self.dt)
+
+
+
+            # Do linear and rotational acceleration and movement
+            self.theEnsemble.mechanical_simulation_step_integrate(cool_factor=cool_factor, dt=dt)
             # reset forces for next round
             self.theEnsemble.reset_force()
 
@@ -218,11 +324,22 @@ class OscillatoryShearExperiment():
 
             imageCounter=imageCounter+1
 
+            i=i+1
 
-        print("overall", self.plotter.overall_stress_tensor[len(self.plotter.shear_stress) - 1])
+        self.theEnsemble.record_forces = True
 
+        self.steps_used=i
 
-        print("overall", self.plotter.overall_stress_tensor[0])
+        if adaptive:
+            print("Adaptive time step: ",i," steps, final dt=",dt,", ",self.time_step_controller.adjustments,
+                  " adjustments")
+
+
+        if self.keep_history:
+            print("overall", self.plotter.overall_stress_tensor[len(self.plotter.shear_stress) - 1])
+
+
+            print("overall", self.plotter.overall_stress_tensor[0])
 
         G=self.write_output_information_to_file()
 
@@ -237,6 +354,27 @@ class OscillatoryShearExperiment():
         return(G)
 
 
+    def periods_converged(self,completed_periods):
+        # Whether G' and G'' of the last two completed periods agree within the convergence tolerance, the first
+        # period being excluded as transitory. The drift correction is not applied, since the final baseline is not
+        # available yet
+        if completed_periods<self.min_periods:
+            return False
+        for channel in ["shear_stress","force"]:
+            G_last=self.lock_in.period_result(completed_periods-1,channel,drift_correction=False)
+            G_previous=self.lock_in.period_result(completed_periods-2,channel,drift_correction=False)
+            G_modulus=math.sqrt(G_last[2]*G_last[2]+G_last[3]*G_last[3])
+            if abs(G_last[2]-G_previous[2])>self.convergence_tolerance*G_modulus or \
+                    abs(G_last[3]-G_previous[3])>self.convergence_tolerance*G_modulus:
+                return False
+        return True
+
+    def recording_interval(self):
+        # Number of integration steps per recorded sample, from samples_per_period if set, else record_every
+        if self.samples_per_period:
+            return max(1, int(1 / self.f / self.dt / self.samples_per_period))
+        return max(1, int(self.record_every))
+
     def  save_canvas_image(self,index):
         if not self.imageOutputFolder or not self.theEnsemble.doDrawing or not self.theEnsemble.theCanvas:
             return
@@ -285,9 +423,12 @@ class OscillatoryShearExperiment():
 
 
     # Returns a vector of four elements: the demodulated stress (in phase), the demodulated stress (90 degress),
-    # G' and G''
-    def demodulation(self,t,shear_stress):
+    # G' and G''. If given, weights are the time intervals represented by the samples (variable time steps, see
+    # LockInDemodulator.add_sample); the sums then approximate time integrals
+    def demodulation(self,t,shear_stress,weights=False):
         t = t
+        if weights is False:
+            weights = [1] * len(t)
         in_phase = []
         out_of_phase = []
         sum_in_phase = 0
@@ -317,11 +458,14 @@ class OscillatoryShearExperiment():
             N = 0
             for i in range(len(t)):
                 if t[i] < (self.baseline_pre_periods / self.f) and t[i] >= (2 * self.baseline_pre_periods / self.f / 3):
-                    N = N + 1
-                    sum_stress = sum_stress + shear_stress[i]
-                    sum_t = sum_t + t[i]
-            firstStressForDelta = sum_stress / N
-            firstTForDelta = sum_t / N
+                    N = N + weights[i]
+                    sum_stress = sum_stress + shear_stress[i] * weights[i]
+                    sum_t = sum_t + t[i] * weights[i]
+            # With decimated recording, the window may hold no sample; the first sample is then used, as in
+            # LockInDemodulator.linear_drift_coefficient
+            if N > 0:
+                firstStressForDelta = sum_stress / N
+                firstTForDelta = sum_t / N
 
         if self.baseline_post_periods > 0:
             sum_stress = 0
@@ -330,13 +474,17 @@ class OscillatoryShearExperiment():
             for i in range(len(t)):
                 if t[i] > (self.baseline_pre_periods + self.periods) / self.f and t[i] <= \
                         (self.baseline_pre_periods + self.periods + self.baseline_post_periods / 3) / self.f:
-                    N = N + 1
-                    sum_stress = sum_stress + shear_stress[i]
-                    sum_t = sum_t + t[i]
-            lastStressForDelta = sum_stress / N
-            lastTForDelta = sum_t / N
+                    N = N + weights[i]
+                    sum_stress = sum_stress + shear_stress[i] * weights[i]
+                    sum_t = sum_t + t[i] * weights[i]
+            # Likewise, the last sample if the window holds none
+            if N > 0:
+                lastStressForDelta = sum_stress / N
+                lastTForDelta = sum_t / N
 
-        linear_drift_coefficient = (lastStressForDelta - firstStressForDelta) / (firstTForDelta - lastTForDelta)
+        linear_drift_coefficient = 0
+        if firstTForDelta != lastTForDelta:
+            linear_drift_coefficient = (lastStressForDelta - firstStressForDelta) / (firstTForDelta - lastTForDelta)
 
 
 
@@ -351,19 +499,22 @@ class OscillatoryShearExperiment():
             in_phase.append(ip)
             out_of_phase.append(op)
 
-            sum_in_phase = sum_in_phase + ip * ip
-            sum_out_of_phase = sum_out_of_phase + op * op
+            sum_in_phase = sum_in_phase + ip * ip * weights[i]
+            sum_out_of_phase = sum_out_of_phase + op * op * weights[i]
 
             stress_linear_drift_corrected = shear_stress[i] - (
                     t[i] - self.baseline_pre_periods / self.f) * linear_drift_coefficient
 
-            stress_in_phase = stress_in_phase + shear_stress[i] * ip
-            stress_out_of_phase = stress_out_of_phase + shear_stress[i] * op
+            stress_in_phase = stress_in_phase + shear_stress[i] * ip * weights[i]
+            stress_out_of_phase = stress_out_of_phase + shear_stress[i] * op * weights[i]
 
-            stress_in_phase_linear_drift_corrected = stress_in_phase_linear_drift_corrected + stress_linear_drift_corrected * ip
-            stress_out_of_phase_linear_drift_corrected = stress_out_of_phase_linear_drift_corrected + stress_linear_drift_corrected * op
+            stress_in_phase_linear_drift_corrected = stress_in_phase_linear_drift_corrected + stress_linear_drift_corrected * ip * weights[i]
+            stress_out_of_phase_linear_drift_corrected = stress_out_of_phase_linear_drift_corrected + stress_linear_drift_corrected * op * weights[i]
 
 
+        if sum_in_phase == 0 or sum_out_of_phase == 0:
+            return [0, 0, 0, 0]
+
         return [stress_in_phase_linear_drift_corrected / sum_in_phase,
                 stress_out_of_phase_linear_drift_corrected / sum_out_of_phase,
                 stress_in_phase_linear_drift_corrected / sum_in_phase / self.amplitude,
@@ -371,10 +522,19 @@ class OscillatoryShearExperiment():
 
 
     def evaluateStressAndG(self,useExternalForce=False):
+        if not self.keep_history:
+            # Only the online demodulation is available
+            if not useExternalForce:
+                return self.lock_in.result("shear_stress")
+            else:
+                return self.lock_in.result("force")
+        weights=False
+        if self.time_step_controller:
+            weights=self.plotter.weight
         if not useExternalForce:
-            return self.demodulation(self.plotter.t,self.plotter.shear_stress)
+            return self.demodulation(self.plotter.t,self.plotter.shear_stress,weights)
         else:
-            return self.demodulation(self.plotter.t, self.plotter.force)
+            return self.demodulation(self.plotter.t, self.plotter.force,weights)
 
 
 
@@ -545,6 +705,21 @@ class OscillatoryShearExperiment():
         file.write(str(self.dt))
         file.write("s\n")
 
+        file.write("Stress recorded every ")
+        file.write(str(self.recording_interval()))
+        file.write(" time steps\n")
+
+        if self.time_step_controller:
+            file.write("Adaptive time step, from ")
+            file.write(str(self.time_step_controller.dt_min))
+            file.write("s to ")
+            file.write(str(self.time_step_controller.dt_max))
+            file.write("s; maximum relative overlap change per step = ")
+            file.write(str(self.time_step_controller.max_overlap_change))
+            file.write(", maximum relative force change per step = ")
+            file.write(str(self.time_step_controller.max_force_change))
+            file.write("\n")
+
         file.write("Frequency = ")
         file.write(str(self.f))
         file.write("Hz\n")
@@ -591,6 +766,7 @@ class OscillatoryShearExperiment():
         print("G''(by surface force)=")
         print(str(G_external[3]))
         print("Pa\n")
+        print("Oscillatory shear periods used = ",self.periods_used)
 
         if not self.output_file:
             print("Not saving output to file (no data file configured)")
@@ -620,13 +796,37 @@ class OscillatoryShearExperiment():
         file.write("G''(by surface force)=")
         file.write(str(G_external[3]))
         file.write("Pa\n")
+        file.write("Oscillatory shear periods used = ")
+        file.write(str(self.periods_used))
+        file.write(" [-]\n")
+        file.write("Time steps used = ")
+        file.write(str(self.steps_used))
+        file.write(" [-]\n")
 
 
 
 
+        if self.lock_in:
+            file.write("\nPer period data (online demodulation)\n")
+            file.write("period\tG'\tG''\tG'(by surface force)\tG''(by surface force)")
+            for period in range(self.lock_in.completed_periods()):
+                G_period = self.lock_in.period_result(period, "shear_stress")
+                G_period_external = self.lock_in.period_result(period, "force")
+                file.write("\n" + str(period))
+                for value in [G_period[2], G_period[3], G_period_external[2], G_period_external[3]]:
+                    file.write("\t")
+                    file.write(str(value))
+            file.write("\n")
+
         file.write("\n\nDetailed stress tensor data\n")
 
-        if(not self.saveStressTensorData):
+        if not self.keep_history:
+
+            print("Stress data not kept sample by sample, saving summary data only to file")
+
+            file.write("\tStress data not kept sample by sample (keep_history=False)")
+
+        elif(not self.saveStressTensorData):
 
             print("Saving summary data only to file")
 
@@ -1,4 +1,5 @@
 from particleShearObjects import particle_shear_model_parameters
+from particleShearBase import Time_step_controller
 from .OscillatoryShearExperiment import OscillatoryShearExperiment
 import math
 from tkinter import *
@@ -43,6 +44,10 @@ class OscillatorySimulation():
 
         self.theExperiment = False # To hold the shear experiment done
 
+        self.periods_used = 0 # Number of periods of oscillatory shear applied in the last runSimulation
+
+        self.output_file_name = False # Name of the data file written by the last runSimulation, False if none
+
     # Here the ensemble needs to be initiated, but this needs to be done in the subclasses
     def initEnsemble(self):
         if not self.theTkSimulation and self.doDrawing:
@@ -61,6 +66,16 @@ class OscillatorySimulation():
 
         return self.root_folder + "/" + fname + str(fnum) + ".txt"
 
+    def open_output_file(self):
+        # Create the data file exclusively and return [file name, file]: with simulations running in parallel (see
+        # doParticleShearSimulationSeries), another process may create the file named by file_path in the meantime
+        while True:
+            fileName = self.file_path()
+            try:
+                return [fileName, open(fileName, "x")]
+            except FileExistsError:
+                pass
+
     def image_folder_path(self,fileName):
         folderName=fileName+"_images_folder"
         self.createFolder(folderName)
@@ -90,7 +105,15 @@ class OscillatorySimulation():
         return 1
 
 
-    def runSimulation(self,cool_factor=1,periods=2,plotStress=True):
+    def runSimulation(self,cool_factor=1,periods=2,plotStress=True,record_every=1,samples_per_period=False,
+                      convergence_tolerance=False,min_periods=3,adaptive_time_step=False):
+        # With convergence_tolerance set, periods is the maximum number of periods: the oscillatory shear stops once
+        # G' and G'' of two successive periods agree within convergence_tolerance (relative to |G*|), see
+        # OscillatoryShearExperiment.periods_converged, after at least min_periods periods (3 or more, since the
+        # first period is excluded as transitory). The number of periods used is in self.periods_used
+        # With adaptive_time_step, the time step of the oscillatory shear is chosen by a Time_step_controller, within
+        # bounds derived from the stability limit of the material parameters of the ensemble (see
+        # Time_step_controller.set_bounds) rather than from the time step of the ensemble
 
 
 
@@ -118,19 +141,26 @@ class OscillatorySimulation():
 
         fileName=self.file_path()
 
+        theFile=False
+        self.output_file_name=False
+        if self.saveData:
+            fileName, theFile = self.open_output_file()
+            self.output_file_name=fileName
+
         if self.saveOutputImages:
             self.imageOutputFolder = self.image_folder_path(fileName)
             self.imageBaseFileName = "image"
 
-        theFile=False
-        if self.saveData:
-            theFile = open(fileName, "w")
-
 
 
         self.write_information_on_simulation_to_file(theFile)
 
         print("Creating oscillatory shear experiment, dt = ",final_dt," max dt = ",self.theEnsemble.dt_max)
+        theController=False
+        if adaptive_time_step:
+            theController=Time_step_controller(final_dt)
+            theController.set_bounds(self.theEnsemble)
+            print("Adaptive time step between ",theController.dt_min," and ",theController.dt_max)
         theExperiment=OscillatoryShearExperiment(self.theEnsemble,final_dt,
                                          self.f,self.amplitude,theFile,force_scale=y_scale_force,
                                          TkSimulation=self.theEnsemble.theTkSimulation,dt_max=self.theEnsemble.dt_max,
@@ -138,7 +168,10 @@ class OscillatorySimulation():
                                          imageBaseFileName=self.imageBaseFileName,
                                          imageFileType=self.imageFileType,
                                          plotStress=plotStress,
-                                         saveStressTensorData=self.saveStressTensorData)
+                                         saveStressTensorData=self.saveStressTensorData,
+                                         record_every=record_every,samples_per_period=samples_per_period,
+                                         convergence_tolerance=convergence_tolerance,min_periods=min_periods,
+                                         time_step_controller=theController)
 
         theExperiment.periods=periods
         theExperiment.baseline_pre_periods=self.baseline_pre_periods
@@ -175,6 +208,8 @@ class OscillatorySimulation():
 
         self.theExperiment=theExperiment
 
+        self.periods_used=theExperiment.periods_used
+
         return(G)
 
 
@@ -38,6 +38,10 @@ class Simulation_dermal_filler_rheology(OscillatorySimulationFragmentation):
         self.relative_viscosity=relative_viscosity
         self.relative_transversal_link_strength=relative_transversal_link_strength
 
+        self.use_fire_minimizer=False # Pre-equilibrate with the FIRE minimizer rather than damped dynamics
+        self.implicit_bonds=False # Integrate the permanent links semi-implicitly, see CanvasPointsLinkable.set_implicit_bonds
+        self.respa_substeps=1 # Sub-steps of the forces of the permanent links per time step, see CanvasPointsLinkable.set_respa_substeps
+
         self.function_call = "Simulation_dermal_filler_rheology(root_folder=" + str(root_folder) + ",do_permanent_links=" + \
                              str(do_permanent_links) + ",cut_lines=" + str(cut_lines) + ",N=" + str(N) + \
                              ",packing_fraction=" + str(packing_fraction) + \
@@ -89,7 +93,8 @@ class Simulation_dermal_filler_rheology(OscillatorySimulationFragmentation):
             avoid_horizontal_angle_degree=self.avoid_horizontal_angle_degree,
             avoid_height_spanning_particles=self.avoid_height_spanning_particles,
             doCutByTriangulation=self.doCutByTriangulation,doDrawing=self.doDrawing,
-            do_debug=do_debug)
+            do_debug=do_debug,use_fire_minimizer=self.use_fire_minimizer,
+            implicit_bonds=self.implicit_bonds,respa_substeps=self.respa_substeps)
 
         self.dt=self.theEnsemble.dt
         self.dt_max = self.theEnsemble.dt_max
@@ -104,7 +104,8 @@ class Simulation_interlocking_rheology(Simulation_dermal_filler_rheology):
             remove_link_fraction=self.remove_link_fraction,
             edge_fuzziness=self.edge_fuzziness,
             doDrawing=self.doDrawing,
-            do_debug=do_debug
+            do_debug=do_debug,use_fire_minimizer=self.use_fire_minimizer,
+            implicit_bonds=self.implicit_bonds,respa_substeps=self.respa_substeps
             )
 
         self.dt=self.theEnsemble.dt
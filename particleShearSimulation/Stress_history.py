@@ -0,0 +1,104 @@
+from array import array
+from .History_view import History_view
+
+SCALAR_NAMES = ["t", "strain", "strain_rate", "force", "shear_stress", "weight"]
+"""Names of the scalar quantities recorded at each step by `particleShear.Stress_history`; weight is the time interval
+represented by the sample for the demodulation (see `particleShear.LockInDemodulator.add_sample`)"""
+TENSOR_NAMES = ["stress_tensor_LW", "stress_tensor_linear_acceleration_otsuki", "stress_tensor_with_external_forces",
+                "stress_tensor_linear_acceleration", "stress_tensor_unbalanced_forces",
+                "stress_tensor_unbalanced_torque", "stress_tensor_internal_torque",
+                "stress_tensor_spin_kinetic_energy", "overall_stress_tensor"]
+"""Names of the 2x2 stress tensors recorded at each step by `particleShear.Stress_history`, in order of storage"""
+
+
+class Stress_history():
+    """Preallocated store of the time course of the stress and strain data recorded by
+    `particleShear.EvaluationHandler`.
+
+    Each scalar quantity (see SCALAR_NAMES) is held in an array of type `array.array`, and the nine 2x2 stress
+    tensors of all steps (see TENSOR_NAMES) are held in a single flat array, as a block of dimensions (steps, 9, 2, 2).
+    The arrays are preallocated for an expected number of steps (see `particleShear.Stress_history.reserve`) and
+    double in size when exceeded.\n
+    The recorded data is read through `particleShear.History_view` sequences
+    (see `particleShear.Stress_history.view`).\n
+    Class defined in subpackage particleShearSimulation"""
+
+    def __init__(self, capacity=0):
+        """Initialize an empty history
+
+        - **parameters**\n
+            `capacity` Number of steps to preallocate"""
+        self.count = 0
+        """Number of steps recorded"""
+        self.capacity = 0
+        """Number of steps the arrays can hold"""
+        self.scalars = {}
+        """Array of each scalar quantity, by name"""
+        for name in SCALAR_NAMES:
+            self.scalars[name] = array('d')
+        self.tensors = array('d')
+        """The stress tensors of all steps, flattened in the order (step, tensor, row, column)"""
+        self.tensor_index = {}
+        """Position of each stress tensor among the tensors of a step, by name"""
+        for index in range(len(TENSOR_NAMES)):
+            self.tensor_index[TENSOR_NAMES[index]] = index
+        self.reserve(capacity)
+
+    def __len__(self):
+        return self.count
+
+    def reserve(self, capacity):
+        """Extend the arrays to hold at least capacity steps
+
+        This method is defined in class `particleShear.Stress_history`"""
+        if capacity <= self.capacity:
+            return
+        extension = capacity - self.capacity
+        for name in SCALAR_NAMES:
+            self.scalars[name].extend(array('d', [0.0]) * extension)
+        self.tensors.extend(array('d', [0.0]) * (extension * 4 * len(TENSOR_NAMES)))
+        self.capacity = capacity
+
+    def append(self, scalars, tensors):
+        """Record a step
+
+        - **parameters**\n
+            `scalars` The values of the scalar quantities, in the order of SCALAR_NAMES\n
+            `tensors` The 2x2 stress tensors (nested lists), in the order of TENSOR_NAMES
+
+        This method is defined in class `particleShear.Stress_history`"""
+        step = self.count
+        if step == self.capacity:
+            self.reserve(max(2 * self.capacity, 16))
+        for name, value in zip(SCALAR_NAMES, scalars):
+            self.scalars[name][step] = value
+        base = step * 4 * len(TENSOR_NAMES)
+        for tensor in tensors:
+            self.tensors[base] = tensor[0][0]
+            self.tensors[base + 1] = tensor[0][1]
+            self.tensors[base + 2] = tensor[1][0]
+            self.tensors[base + 3] = tensor[1][1]
+            base = base + 4
+        self.count = step + 1
+
+    def add_to_last(self, name, value):
+        """Add value to the scalar quantity name of the last step recorded
+
+        This method is defined in class `particleShear.Stress_history`"""
+        self.scalars[name][self.count - 1] = self.scalars[name][self.count - 1] + value
+
+    def item(self, name, step):
+        """Return the value of the quantity name at the given step (a new 2x2 nested list for the stress tensors)
+
+        This method is defined in class `particleShear.Stress_history`"""
+        if name in self.scalars:
+            return self.scalars[name][step]
+        base = (step * len(TENSOR_NAMES) + self.tensor_index[name]) * 4
+        tensors = self.tensors
+        return [[tensors[base], tensors[base + 1]], [tensors[base + 2], tensors[base + 3]]]
+
+    def view(self, name):
+        """Return a read-only sequence (`particleShear.History_view`) over the recorded values of the quantity name
+
+        This method is defined in class `particleShear.Stress_history`"""
+        return History_view(self, name)
@@ -7,7 +7,8 @@ __all__ = [
 "OscillatorySimulationFragmentation","Simulation_dermal_filler_rheology",
 "Simulation_interlocking_rheology",
 "EvaluationHandler",
-"EvaluationHandlerPlotter"]
+"EvaluationHandlerPlotter",
+"Stress_history","History_view","LockInDemodulator"]
 
 
 
@@ -27,6 +28,9 @@ from .Simulation_interlocking_rheology import Simulation_interlocking_rheology
 # To evaluate the stress tensors
 from .EvaluationHandler import EvaluationHandler
 from .EvaluationHandlerPlotter import EvaluationHandlerPlotter
+from .Stress_history import Stress_history
+from .History_view import History_view
+from .LockInDemodulator import LockInDemodulator
 
 
 
@@ -5,7 +5,17 @@ __all__ = ["TestoneSphereFreeOneSphereBoundary","TestSimulationCrosslinkedShear"
            "TestSimulationFreeSpheres","TestSimulationFreeSpheresShear",
            "TestSingleSphereLinear","TestSingleSphereRotation",
            "TestTwoSpheresCentral","TesttwoSpheresGeneral",
-           "TestTwoSpheresLeesEdwards","TestTwoSpheresTangential"]
+           "TestTwoSpheresLeesEdwards","TestTwoSpheresTangential",
+           "TestNeighborCellList","TestParticleStateArrays",
+           "TestContactKernels","TestBondTable",
+           "TestNeighborIndex","TestGeometryCache",
+           "TestGhostImages","TestForceRegister","TestStressAccumulation",
+           "TestStressTensorEvaluation","TestEvaluationHandler",
+           "TestStressHistory","TestRecordingDecimation",
+           "TestLockInDemodulator","TestConvergenceTermination",
+           "TestRelaxationTolerance","TestFireRelaxation",
+           "TestVelocityVerlet","TestTimeStepController","TestImplicitBonds",
+           "TestMultipleTimeStep","TestSimulationSeries"]
 
 
 
@@ -20,7 +30,28 @@ from .test_twoSpheresCentral import TestTwoSpheresCentral
 from .test_twoSpheresGeneral import TesttwoSpheresGeneral
 from .test_twoSpheresLeesEdwards import TestTwoSpheresLeesEdwards
 from .test_twoSpheresTangential import TestTwoSpheresTangential
-
+from .test_neighborCellList import TestNeighborCellList
+from .test_particleStateArrays import TestParticleStateArrays
+from .test_contactKernels import TestContactKernels
+from .test_bondTable import TestBondTable
+from .test_neighborIndex import TestNeighborIndex
+from .test_geometryCache import TestGeometryCache
+from .test_ghostImages import TestGhostImages
+from .test_forceRegister import TestForceRegister
+from .test_stressAccumulation import TestStressAccumulation
+from .test_stressTensorEvaluation import TestStressTensorEvaluation
+from .test_evaluationHandler import TestEvaluationHandler
+from .test_stressHistory import TestStressHistory
+from .test_recordingDecimation import TestRecordingDecimation
+from .test_lockInDemodulator import TestLockInDemodulator
+from .test_convergenceTermination import TestConvergenceTermination
+from .test_relaxationTolerance import TestRelaxationTolerance
+from .test_fireRelaxation import TestFireRelaxation
+from .test_velocityVerlet import TestVelocityVerlet
+from .test_timeStepController import TestTimeStepController
+from .test_implicitBonds import TestImplicitBonds
+from .test_multipleTimeStep import TestMultipleTimeStep
+from .test_simulationSeries import TestSimulationSeries
 
 
 
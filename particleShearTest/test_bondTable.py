@@ -0,0 +1,134 @@
+import unittest
+from particleShear import *
+import random
+
+
+
+class TestBondTable(unittest.TestCase):
+
+    def setUp(self):
+
+        self.size_x = 500
+        self.size_y = 500
+
+        self.theEnsembles = []
+
+        # Two identical crosslinked ensembles with adjustable link strength; the first one uses the bond table
+        for use_bond_table in [True, False]:
+            random.seed(29)
+            theEnsemble = EnsembleCompactParticlesAdjustableInterfaceStrength(
+                self.size_x, self.size_y, 80, 0.95, False, False, k=1, nu=0.5, k_t=1, nu_t=0.5, mu=0.5,
+                permanent_ratio_central=2, permanent_ratio_tangential=0.5, keep_viscosity_coefficients_constant=False)
+            theEnsemble.mechanical_relaxation(5, cool_factor=0.5, dt=0.2)
+            theEnsemble.test_neighbor_relation()
+            if use_bond_table:
+                theEnsemble.enable_bond_table()
+            for theSphere in theEnsemble.sphereList[0:40]:
+                for theNeighbor in theSphere.neighbors:
+                    theSphere.establish_permanent_link(theNeighbor.theSphere)
+            theEnsemble.applyingShear = True
+            theEnsemble.setShear(0.21)
+            theEnsemble.setShearRate(0.05)
+            theEnsemble.use_contact_kernels = use_bond_table
+            self.theEnsembles.append(theEnsemble)
+
+    def assertClose(self, a, b, scale):
+        self.assertLess(abs(a - b), 1e-9 * scale)
+
+    def permanent_pairs(self, theEnsemble):
+        pairs = set()
+        for theSphere in theEnsemble.sphereList:
+            for theNeighbor in theSphere.neighbors:
+                if theNeighbor.interface_type == "permanent":
+                    pairs.add((min(theSphere.myindex, theNeighbor.myindex), max(theSphere.myindex, theNeighbor.myindex)))
+        return pairs
+
+    def table_pairs(self, table):
+        return set([(table.index_i[row], table.index_j[row]) for row in range(len(table))])
+
+    def test_establish_and_cut(self):
+
+        theEnsemble = self.theEnsembles[0]
+        table = theEnsemble.bond_table
+        self.assertGreater(len(table), 0)
+        self.assertEqual(self.table_pairs(table), self.permanent_pairs(theEnsemble))
+
+        theEnsemble.cutLine([250, 250], 0.3)
+        self.assertEqual(self.table_pairs(table), self.permanent_pairs(theEnsemble))
+        for row in range(len(table)):
+            self.assertEqual(table.find(theEnsemble.sphereList[table.index_j[row]],
+                                        theEnsemble.sphereList[table.index_i[row]]), row)
+
+        theEnsemble.makeAllLinksPermanent()
+        self.assertEqual(self.table_pairs(table), self.permanent_pairs(theEnsemble))
+
+    def test_same_forces(self):
+
+        for theEnsemble in self.theEnsembles:
+            theEnsemble.mechanical_simulation_step_calculate_forces()
+
+        scale = max([abs(theSphere.xforce) + abs(theSphere.yforce) for theSphere in self.theEnsembles[1].sphereList])
+        for ind in range(len(self.theEnsembles[0].sphereList)):
+            sphere_kernel = self.theEnsembles[0].sphereList[ind]
+            sphere_reference = self.theEnsembles[1].sphereList[ind]
+            self.assertClose(sphere_kernel.xforce, sphere_reference.xforce, scale)
+            self.assertClose(sphere_kernel.yforce, sphere_reference.yforce, scale)
+            self.assertClose(sphere_kernel.torque, sphere_reference.torque, scale * sphere_reference.r)
+
+    def test_single_pass_forces(self):
+
+        self.theEnsembles[0].use_contact_kernels = False
+        self.theEnsembles[0].single_pass_forces = True
+        self.test_same_forces()
+
+    def test_stale_bond_table(self):
+
+        # A linked pair, then a sphere added and linked once the bond table is built: the table no longer indexes the
+        # spheres, so all permanent links are left to the sphere methods
+        theEnsembles = []
+        for use_bond_table in [True, False]:
+            theEnsemble = EnsembleLinkable(500, 500, 0, 0.8, False, False, k=1, nu=0.1, k_t=1, nu_t=0.1, mu=0.5)
+            for x, y in [[150, 250], [265, 250], [150, 365]]:
+                theEnsemble.sphereList.append(SphereLinkable("GREY", x, y, 60, m=1,
+                                                             my_index=len(theEnsemble.sphereList), theCanvas=False,
+                                                             doDrawing=False, force_register=theEnsemble,
+                                                             size_x=theEnsemble.size_x, size_y=theEnsemble.size_y))
+                theEnsemble.test_neighbor_relation()
+                if len(theEnsemble.sphereList) == 2:
+                    theEnsemble.sphereList[0].establish_permanent_link(theEnsemble.sphereList[1])
+                    if use_bond_table:
+                        theEnsemble.enable_bond_table()
+            theEnsemble.sphereList[0].establish_permanent_link(theEnsemble.sphereList[2])
+            theEnsemble.sphereList[1].x = 275
+            theEnsemble.sphereList[2].y = 380
+            theEnsemble.use_contact_kernels = use_bond_table
+            theEnsembles.append(theEnsemble)
+
+        self.assertIs(theEnsembles[0].current_bond_table(), False)
+        for theEnsemble in theEnsembles:
+            theEnsemble.mechanical_simulation_step_calculate_forces()
+        self.assertGreater(abs(theEnsembles[1].sphereList[1].xforce), 1)
+        for ind in range(3):
+            sphere_kernel = theEnsembles[0].sphereList[ind]
+            sphere_reference = theEnsembles[1].sphereList[ind]
+            self.assertClose(sphere_kernel.xforce, sphere_reference.xforce, 1)
+            self.assertClose(sphere_kernel.yforce, sphere_reference.yforce, 1)
+            self.assertClose(sphere_kernel.torque, sphere_reference.torque, sphere_reference.r)
+
+    def test_same_trajectory(self):
+
+        for step in range(10):
+            for theEnsemble in self.theEnsembles:
+                theEnsemble.mechanical_simulation_step(cool_factor=0.9, dt=0.2)
+
+        for ind in range(len(self.theEnsembles[0].sphereList)):
+            sphere_kernel = self.theEnsembles[0].sphereList[ind]
+            sphere_reference = self.theEnsembles[1].sphereList[ind]
+            self.assertClose(sphere_kernel.x, sphere_reference.x, self.size_x)
+            self.assertClose(sphere_kernel.y, sphere_reference.y, self.size_y)
+            self.assertClose(sphere_kernel.phi, sphere_reference.phi, 1)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
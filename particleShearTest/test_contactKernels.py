@@ -0,0 +1,151 @@
+import unittest
+from particleShear import *
+import random
+
+
+
+class TestContactKernels(unittest.TestCase):
+
+    def setUp(self):
+
+        self.size_x = 500
+        self.size_y = 500
+
+        self.theEnsembles = []
+
+        # Two identical, sheared ensembles with some permanent links; the first one will use the contact kernels
+        for use_contact_kernels in [True, False]:
+            random.seed(11)
+            theEnsemble = EnsembleLinkable(self.size_x, self.size_y, 80, 0.95, False, False,
+                                           k=1, nu=0.5, k_t=1, nu_t=0.5, mu=0.5)
+            theEnsemble.mechanical_relaxation(5, cool_factor=0.5, dt=0.2)
+            theEnsemble.test_neighbor_relation()
+            for theSphere in theEnsemble.sphereList[0:20]:
+                for theNeighbor in theSphere.neighbors:
+                    theSphere.establish_permanent_link(theNeighbor.theSphere)
+            theEnsemble.applyingShear = True
+            theEnsemble.setShear(0.37)
+            theEnsemble.setShearRate(0.05)
+            theEnsemble.use_contact_kernels = use_contact_kernels
+            self.theEnsembles.append(theEnsemble)
+
+        self.theEvaluator = StressTensorEvaluation(self.size_x, self.size_y)
+
+    def assertClose(self, a, b, scale):
+        self.assertLess(abs(a - b), 1e-9 * scale)
+
+    def compare_forces(self):
+
+        for theEnsemble in self.theEnsembles:
+            theEnsemble.mechanical_simulation_step_calculate_forces()
+
+        scale = max([abs(theSphere.xforce) + abs(theSphere.yforce) for theSphere in self.theEnsembles[1].sphereList])
+        self.assertGreater(scale, 0)
+
+        for ind in range(len(self.theEnsembles[0].sphereList)):
+            sphere_kernel = self.theEnsembles[0].sphereList[ind]
+            sphere_reference = self.theEnsembles[1].sphereList[ind]
+            self.assertClose(sphere_kernel.xforce, sphere_reference.xforce, scale)
+            self.assertClose(sphere_kernel.yforce, sphere_reference.yforce, scale)
+            self.assertClose(sphere_kernel.torque, sphere_reference.torque, scale * sphere_reference.r)
+
+        stress = []
+        for theEnsemble in self.theEnsembles:
+            theEnsemble.record_total_particle_forces()
+            self.theEvaluator.evaluate_stress_tensors(theEnsemble.force_register, theEnsemble.movableSphereList(),
+                                                      theEnsemble.shear_rate)
+            stress.append([[self.theEvaluator.stress_tensor_LW[i][j] for j in range(2)] for i in range(2)] +
+                          [[self.theEvaluator.stress_tensor_with_external_forces[i][j] for j in range(2)]
+                           for i in range(2)])
+
+        stress_scale = max([abs(stress[1][i][j]) for i in range(4) for j in range(2)])
+        for i in range(4):
+            for j in range(2):
+                self.assertClose(stress[0][i][j], stress[1][i][j], stress_scale)
+
+    def test_central_forces(self):
+        self.compare_forces()
+
+    def test_central_repulsion_and_plateau_law(self):
+
+        for theEnsemble in self.theEnsembles:
+            theEnsemble.set_central_repulsion_coefficient(0.3)
+
+        default_law = CircleBasicElasticity.call_back_elastic_force_law
+        CircleBasicElasticity.call_back_elastic_force_law = elastic_force_law_plateau
+        try:
+            self.compare_forces()
+        finally:
+            CircleBasicElasticity.call_back_elastic_force_law = default_law
+
+    def test_with_state_arrays(self):
+
+        self.theEnsembles[0].enable_state_arrays()
+        self.compare_forces()
+
+    def test_same_trajectory(self):
+
+        for step in range(10):
+            for theEnsemble in self.theEnsembles:
+                theEnsemble.mechanical_simulation_step(cool_factor=0.9, dt=0.2)
+
+        for ind in range(len(self.theEnsembles[0].sphereList)):
+            sphere_kernel = self.theEnsembles[0].sphereList[ind]
+            sphere_reference = self.theEnsembles[1].sphereList[ind]
+            self.assertClose(sphere_kernel.x, sphere_reference.x, self.size_x)
+            self.assertClose(sphere_kernel.y, sphere_reference.y, self.size_y)
+            self.assertClose(sphere_kernel.phi, sphere_reference.phi, 1)
+            for theNeighbor, referenceNeighbor in zip(sphere_kernel.neighbors, sphere_reference.neighbors):
+                self.assertEqual(theNeighbor.interface_type, referenceNeighbor.interface_type)
+
+    def test_single_pass_forces(self):
+
+        self.theEnsembles[0].single_pass_forces = True
+        self.compare_forces()
+
+    def test_single_pass_trajectory(self):
+
+        self.theEnsembles[0].single_pass_forces = True
+        self.test_same_trajectory()
+
+    def test_friction_state(self):
+
+        theEnsemble = self.theEnsembles[0]
+        random.seed(23)
+        theEnsemble.contact_table.build(theEnsemble.sphereList)
+        for row in range(len(theEnsemble.contact_table)):
+            friction_position = random.uniform(-5, 5)
+            theEnsemble.contact_table.relation_ij[row].friction_position = friction_position
+            theEnsemble.contact_table.relation_ji[row].friction_position = friction_position
+
+        theEnsemble.mechanical_simulation_step_calculate_forces()
+        table = theEnsemble.contact_table
+
+        n_stick = 0
+        n_slip = 0
+        for row in range(len(table)):
+            if table.permanent[row]:
+                continue
+            relation_ij = table.relation_ij[row]
+            relation_ji = table.relation_ji[row]
+            self.assertEqual(relation_ij.interface_type, relation_ji.interface_type)
+            self.assertEqual(relation_ij.friction_position, relation_ji.friction_position)
+            if table.distance[row] < theEnsemble.sphereList[table.index_i[row]].r + \
+                    theEnsemble.sphereList[table.index_j[row]].r:
+                if relation_ij.interface_type == "slip":
+                    self.assertEqual(relation_ij.friction_position, 0)
+                    n_slip = n_slip + 1
+                else:
+                    n_stick = n_stick + 1
+        self.assertGreater(n_stick, 0)
+        self.assertGreater(n_slip, 0)
+
+        # Internal force couples only, so no net force
+        scale = max([abs(theSphere.xforce) + abs(theSphere.yforce) for theSphere in theEnsemble.sphereList])
+        self.assertClose(sum([theSphere.xforce for theSphere in theEnsemble.sphereList]), 0, scale)
+        self.assertClose(sum([theSphere.yforce for theSphere in theEnsemble.sphereList]), 0, scale)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from particleShear import *
+import random
+
+
+
+class TestConvergenceTermination(unittest.TestCase):
+
+    def run_experiment(self, convergence_tolerance, periods=5, nu=0.5, packing_fraction=0.95):
+
+        random.seed(5)
+        theEnsemble = EnsembleLinkable(300, 300, 30, packing_fraction, False, False, k=1, nu=nu, k_t=1, nu_t=nu, mu=0.5)
+        theEnsemble.mechanical_relaxation(3, cool_factor=0.5, dt=0.2)
+        theExperiment = OscillatoryShearExperiment(theEnsemble, 0.2, 0.05, 0.05, False, plotStress=False,
+                                                   convergence_tolerance=convergence_tolerance)
+        theExperiment.periods = periods
+        theExperiment.baseline_post_periods = 1
+        G = theExperiment.oscillatory_shear_experiment(cool_factor=1, N_pre_equilibration_fixed_boundaries=5)
+        return theExperiment, G
+
+    def test_early_termination(self):
+
+        # A dense packing settles within a few periods; from the third period on, G' and G'' of successive periods
+        # differ by less than 5 % of |G*|
+        theExperiment, G = self.run_experiment(convergence_tolerance=0.05, periods=8, packing_fraction=1.3)
+        reference, G_reference = self.run_experiment(convergence_tolerance=False, periods=8, packing_fraction=1.3)
+
+        self.assertEqual(reference.periods_used, 8)
+        self.assertEqual(theExperiment.periods_used, 5)
+        self.assertEqual(theExperiment.periods, 5)
+        # Five periods of oscillatory shear followed by the post-baseline, 100 steps per period
+        self.assertEqual(len(theExperiment.plotter.t), 600)
+        self.assertEqual(theExperiment.theEnsemble.shear_rate, 0)
+        self.assertEqual(G, theExperiment.evaluateStressAndG(useExternalForce=True)[2:4])
+        for index in range(2):
+            self.assertGreater(G_reference[index], 0)
+            self.assertLess(abs(G[index] - G_reference[index]), 0.1 * G_reference[index])
+
+    def test_min_periods(self):
+
+        theEnsemble = EnsembleLinkable(300, 300, 0, 0.95, False, False)
+        with self.assertRaises(ValueError):
+            OscillatoryShearExperiment(theEnsemble, 0.2, 0.05, 0.05, False, plotStress=False,
+                                       convergence_tolerance=0.05, min_periods=2)
+        theExperiment = OscillatoryShearExperiment(theEnsemble, 0.2, 0.05, 0.05, False, plotStress=False,
+                                                   min_periods=1)
+        self.assertEqual(theExperiment.min_periods, 1)
+
+    def test_no_convergence(self):
+
+        theExperiment, G = self.run_experiment(convergence_tolerance=1e-12)
+
+        self.assertEqual(theExperiment.periods_used, 5)
+        self.assertEqual(len(theExperiment.plotter.t), 600)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+from particleShear import *
+import random
+import math
+
+
+
+class TestEvaluationHandler(unittest.TestCase):
+
+    def test_running_estimators(self):
+
+        random.seed(31)
+        theEnsemble = EnsembleLinkable(300, 300, 30, 0.95, False, False, k=1, nu=0.5, k_t=1, nu_t=0.5, mu=0.5)
+        theEnsemble.mechanical_relaxation(3, cool_factor=0.5, dt=0.2)
+        theEnsemble.applyingShear = True
+        theEvaluator = StressTensorEvaluation(theEnsemble.size_x, theEnsemble.size_y)
+        theHandler = EvaluationHandler()
+
+        for step in range(40):
+            theEnsemble.setShear(0.2 * math.sin(0.3 * step))
+            theEnsemble.setShearRate(0.06 * math.cos(0.3 * step))
+            theEnsemble.mechanical_simulation_step(cool_factor=0.9, dt=0.2)
+            theEnsemble.record_total_particle_forces()
+            theHandler.record(theEnsemble, theEvaluator)
+
+            # Reference: the estimators evaluated over the whole history
+            sum_strain = 0
+            sum_strain_rate = 0
+            Gprime = 0
+            viscosity = 0
+            for index in range(len(theHandler.t)):
+                sum_strain = sum_strain + theHandler.strain[index] * theHandler.strain[index]
+                sum_strain_rate = sum_strain_rate + theHandler.strain_rate[index] * theHandler.strain_rate[index]
+                Gprime = Gprime - theHandler.strain[index] * theHandler.shear_stress[index]
+                viscosity = viscosity - theHandler.strain_rate[index] * theHandler.shear_stress[index]
+            if sum_strain > 0:
+                Gprime = Gprime / sum_strain
+            if sum_strain_rate > 0:
+                viscosity = viscosity / sum_strain_rate
+
+            self.assertEqual(theHandler.Gprime, Gprime)
+            self.assertEqual(theHandler.viscosity, viscosity)
+        self.assertNotEqual(theHandler.Gprime, 0)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from particleShear import *
+import random
+
+
+
+class TestFireRelaxation(unittest.TestCase):
+
+    def make_ensemble(self, use_fire_minimizer=False, do_pre_equilibration=False):
+
+        random.seed(4)
+        return EnsembleCompactParticlesFromModelParameters(size_x=150, size_y=150, N=30, packing_fraction=1.0, mu=0.5,
+                                                           do_permanent_links=False,
+                                                           do_pre_equilibration=do_pre_equilibration,
+                                                           doDrawing=False, use_fire_minimizer=use_fire_minimizer)
+
+    def test_pre_equilibration(self):
+
+        theEnsemble = self.make_ensemble(use_fire_minimizer=True, do_pre_equilibration=True)
+        max_force = 1e-3 * theEnsemble.model.k * theEnsemble.model.r
+        self.assertLessEqual(theEnsemble.residual_force, max_force)
+        theEnsemble.mechanical_simulation_step_calculate_forces()
+        self.assertLessEqual(theEnsemble.max_residual_force(), 2 * max_force)
+
+    def test_interlocking_pre_equilibration(self):
+
+        random.seed(4)
+        theEnsemble = EnsembleCompactParticlesAdjustableInterfaceStrengthFromModelParameters(
+            size_x=150, size_y=150, N=30, packing_fraction=1.0, mu=0.5, do_permanent_links=False, doDrawing=False,
+            use_fire_minimizer=True)
+        self.assertLessEqual(theEnsemble.residual_force, 1e-3 * theEnsemble.model.k * theEnsemble.model.r)
+
+    def test_time_step_floor(self):
+
+        # Two overlapping spheres pushed apart; once separated, the power vanishes at every step
+        theEnsemble = EnsembleLinkable(500, 500, 0, 0.8, False, False, k=1, nu=0, k_t=1, nu_t=0, mu=0.5)
+        for x in [150, 260]:
+            theEnsemble.sphereList.append(SphereLinkable("GREY", x, 250, 120, m=1, my_index=len(theEnsemble.sphereList),
+                                                         theCanvas=False, doDrawing=False, force_register=theEnsemble,
+                                                         size_x=theEnsemble.size_x, size_y=theEnsemble.size_y))
+        time_steps = []
+        movement = theEnsemble.mechanical_simulation_step_calculate_movement
+
+        def recorded_movement(dt=1):
+            time_steps.append(dt)
+            movement(dt=dt)
+
+        theEnsemble.mechanical_simulation_step_calculate_movement = recorded_movement
+        theEnsemble.fire_relaxation(30, dt=1)
+        self.assertGreater(theEnsemble.sphereList[0].d(theEnsemble.sphereList[1]), 120)
+        self.assertAlmostEqual(min(time_steps), 0.02, delta=1e-12)
+        self.assertAlmostEqual(time_steps[-1], 0.02, delta=1e-12)
+
+        time_steps[:] = []
+        theEnsemble.fire_relaxation(10, dt=1, dt_min=0.3)
+        self.assertAlmostEqual(min(time_steps), 0.3, delta=1e-12)
+
+    def test_fewer_steps_than_damped_relaxation(self):
+
+        theEnsemble = self.make_ensemble()
+        max_force = 1e-3 * theEnsemble.model.k * theEnsemble.model.r
+        dt = theEnsemble.dt
+        steps_fire = theEnsemble.fire_relaxation(3000, dt=dt, dt_max=10 * dt, max_force=max_force, friction_off=True)
+        self.assertLessEqual(theEnsemble.residual_force, max_force)
+        self.assertEqual(theEnsemble.mu, 0.5)
+
+        theEnsemble = self.make_ensemble()
+        steps_damped = theEnsemble.mechanical_relaxation(3000, cool_factor=0.9, dt=2 * dt, max_force=max_force)
+        self.assertLess(steps_fire * 2, steps_damped)
+
+    def test_lees_edwards_shear(self):
+
+        theEnsemble = self.make_ensemble()
+        theEnsemble.applyingShear = True
+        theEnsemble.setShear(0.1)
+        theEnsemble.setShearRate(0.01)
+        t0 = theEnsemble.t
+        dt = theEnsemble.dt
+        steps = theEnsemble.fire_relaxation(100, dt=dt, dt_max=10 * dt)
+        self.assertEqual(steps, 100)
+        self.assertAlmostEqual(theEnsemble.shear, 0.1 + 0.01 * (theEnsemble.t - t0), delta=1e-9)
+        # The spheres on the boundaries keep the speed of the shear flow
+        for theSphere in theEnsemble.sphereList:
+            if not theEnsemble.canMove(theSphere):
+                self.assertEqual(abs(theSphere.xspeed), theEnsemble.shear_rate * theEnsemble.size_y / 2)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
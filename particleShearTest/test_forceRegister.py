@@ -0,0 +1,136 @@
+import unittest
+from particleShear import *
+import random
+
+
+
+class TestForceRegister(unittest.TestCase):
+
+    def setUp(self):
+
+        random.seed(13)
+        self.theEnsemble = EnsembleLinkable(500, 500, 80, 0.95, False, False, k=1, nu=0.5, k_t=1, nu_t=0.5, mu=0.5)
+        self.theEnsemble.applyingShear = True
+        self.theEnsemble.setShearRate(0.05)
+        self.theEnsemble.mechanical_relaxation(3, cool_factor=0.9, dt=0.2)
+
+    def test_rows_and_views(self):
+
+        theRegister = Force_register(capacity=2)
+        spheres = self.theEnsemble.sphereList[0:3]
+        theRegister.record_individual_internal_force(spheres[0], spheres[1], [1.5, -2])
+        theRegister.record_external_force(spheres[2], [0.25, 0.5])
+        theRegister.record_individual_internal_force(spheres[1], spheres[0], [-1.5, 2])
+        theRegister.record_individual_internal_torque(spheres[0], spheres[1], 3.5)
+        theRegister.record_external_torque(spheres[1], -1)
+
+        self.assertEqual(theRegister.force_count, 3)
+        self.assertEqual(theRegister.pair_register, [[spheres[0], spheres[1], [1.5, -2]],
+                                                     [spheres[1], spheres[0], [-1.5, 2]]])
+        self.assertEqual(theRegister.external_force_register, [[spheres[2], [0.25, 0.5]]])
+        self.assertEqual(theRegister.internal_moment_register, [[spheres[0], spheres[1], 3.5]])
+        self.assertEqual(theRegister.external_moment_register, [[spheres[1], -1]])
+        self.assertEqual(list(theRegister.force_source[0:3]), [1, -1, 0])
+
+        for index in range(100):
+            theRegister.record_individual_internal_force(spheres[index % 3], spheres[(index + 1) % 3], [index, 0])
+        self.assertEqual(len(theRegister.pair_register), 102)
+        self.assertEqual(theRegister.pair_register[101][2], [99, 0])
+
+        theRegister.reset_force_register()
+        self.assertEqual(theRegister.pair_register, [])
+        self.assertEqual(theRegister.total_particle_force_register, [])
+        # Without a list of spheres, all slots are released and the spheres numbered again
+        self.assertEqual(theRegister.spheres, [])
+        self.assertEqual(theRegister.index_of(spheres[2]), 0)
+
+    def test_per_particle_slots(self):
+
+        theRegister = Force_register()
+        spheres = self.theEnsemble.sphereList[0:2]
+        theRegister.record_total_particle_force(spheres[1], [1, 2])
+        theRegister.record_total_particle_force(spheres[0], [3, 4])
+        theRegister.record_total_particle_force(spheres[1], [5, 6])
+        theRegister.record_unbalanced_moment(spheres[0], 7)
+        theRegister.record_unbalanced_moment(spheres[0], 8)
+
+        self.assertEqual(theRegister.total_particle_force_register, [[spheres[1], [5, 6]], [spheres[0], [3, 4]]])
+        self.assertEqual(theRegister.unbalanced_moment_register, [[spheres[0], 8]])
+
+        theRegister.reset_force_register()
+        theRegister.record_total_particle_force(spheres[0], [9, 10])
+        self.assertEqual(theRegister.total_particle_force_register, [[spheres[0], [9, 10]]])
+        self.assertEqual(theRegister.unbalanced_moment_register, [])
+
+    def test_slots_follow_sphere_list(self):
+
+        theRegister = self.theEnsemble.force_register
+        self.theEnsemble.mechanical_simulation_step_calculate_forces()
+        self.theEnsemble.record_total_particle_forces()
+        spheres = list(self.theEnsemble.sphereList)
+        self.assertEqual(theRegister.spheres, spheres)
+
+        # A sphere recorded from outside the sphere list keeps its slot for the current step only
+        outsider = SphereLinkable("GREY", 100, 100, 20, theCanvas=False, doDrawing=False, force_register=theRegister)
+        theRegister.record_total_particle_force(outsider, [1, 2])
+        self.assertEqual(theRegister.index_of(outsider), len(spheres))
+        self.theEnsemble.reset_force_register()
+        self.assertEqual(theRegister.spheres, spheres)
+        self.assertNotIn(id(outsider), theRegister.sphere_index)
+
+        # Spheres removed from the canvas release their slots, the others are numbered by their position in the list
+        removed = self.theEnsemble.sphereList.pop(3)
+        self.theEnsemble.reset_force_register()
+        self.assertEqual(theRegister.spheres, self.theEnsemble.sphereList)
+        self.assertNotIn(id(removed), theRegister.sphere_index)
+        self.assertEqual(len(theRegister.total_force_x), len(self.theEnsemble.sphereList))
+        self.theEnsemble.mechanical_simulation_step_calculate_forces()
+        self.theEnsemble.record_total_particle_forces()
+        for index in range(len(self.theEnsemble.sphereList)):
+            self.assertEqual(theRegister.index_of(self.theEnsemble.sphereList[index]), index)
+        self.assertGreater(len(theRegister.total_particle_force_register), 0)
+        for theSphere, force in theRegister.total_particle_force_register:
+            self.assertEqual(force, [theSphere.xforce, theSphere.yforce])
+
+    def test_stress_tensor_from_arrays(self):
+
+        self.theEnsemble.mechanical_simulation_step_calculate_forces()
+        self.theEnsemble.record_total_particle_forces()
+        theRegister = self.theEnsemble.force_register
+        self.assertGreater(len(theRegister.pair_register), 0)
+        self.assertGreater(len(theRegister.external_force_register), 0)
+
+        theEvaluator = StressTensorEvaluation(500, 500)
+        theEvaluator.evaluate_force_stress_tensors(theRegister)
+        theEvaluator.evaluate_rotational_stress_tensors(theRegister, self.theEnsemble.movableSphereList())
+
+        # Reference: the former list-based evaluation on the row views
+        area = 500e-6 * 500e-6
+        stress_LW = [[0, 0], [0, 0]]
+        for target, source, force in theRegister.pair_register:
+            delta_x = [target.x - source.x, target.y - source.y]
+            for i in range(2):
+                for j in range(2):
+                    stress_LW[i][j] = stress_LW[i][j] + force[i] * 1e-12 * delta_x[j] * 1e-6 / 2
+        stress_external = [[0, 0], [0, 0]]
+        for target, force in theRegister.external_force_register:
+            r = [target.x - 250, target.y - 250]
+            for i in range(2):
+                for j in range(2):
+                    stress_external[i][j] = stress_external[i][j] - force[i] * 1e-12 * r[j] * 1e-6
+        torque = sum([moment for target, source, moment in theRegister.internal_moment_register]) * 1e-18
+
+        scale_LW = max([abs(stress_LW[i][j]) for i in range(2) for j in range(2)]) / area
+        scale_external = max([abs(stress_external[i][j]) for i in range(2) for j in range(2)]) / area
+        for i in range(2):
+            for j in range(2):
+                self.assertLessEqual(abs(theEvaluator.stress_tensor_LW[i][j] - stress_LW[i][j] / area),
+                                     1e-12 * scale_LW)
+                self.assertLessEqual(abs(theEvaluator.stress_tensor_with_external_forces[i][j]
+                                         - stress_external[i][j] / area), 1e-12 * scale_external)
+        self.assertAlmostEqual(theEvaluator.stress_tensor_internal_torque[1][0] / (torque / 2 / area), 1, places=9)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+from particleShear import *
+import random
+
+
+
+class TestGeometryCache(unittest.TestCase):
+
+    def setUp(self):
+
+        self.size_x = 500
+        self.size_y = 500
+
+        self.theEnsembles = []
+
+        # Two identical, sheared ensembles with some permanent links; the first one will use the geometry cache
+        for use_geometry_cache in [True, False]:
+            random.seed(17)
+            theEnsemble = EnsembleLinkable(self.size_x, self.size_y, 80, 0.95, False, False,
+                                           k=1, nu=0.5, k_t=1, nu_t=0.5, mu=0.5)
+            theEnsemble.mechanical_relaxation(5, cool_factor=0.5, dt=0.2)
+            theEnsemble.test_neighbor_relation()
+            for theSphere in theEnsemble.sphereList[0:20]:
+                for theNeighbor in theSphere.neighbors:
+                    theSphere.establish_permanent_link(theNeighbor.theSphere)
+            theEnsemble.applyingShear = True
+            theEnsemble.setShear(0.37)
+            theEnsemble.setShearRate(0.05)
+            theEnsemble.use_geometry_cache = use_geometry_cache
+            self.theEnsembles.append(theEnsemble)
+
+        self.theEvaluator = StressTensorEvaluation(self.size_x, self.size_y)
+
+    def test_same_forces(self):
+
+        stress = []
+        for theEnsemble in self.theEnsembles:
+            theEnsemble.mechanical_simulation_step_calculate_forces()
+            theEnsemble.record_total_particle_forces()
+            self.theEvaluator.evaluate_stress_tensors(theEnsemble.force_register, theEnsemble.movableSphereList(),
+                                                      theEnsemble.shear_rate)
+            stress.append([self.theEvaluator.stress_tensor_LW[i][j] for i in range(2) for j in range(2)] +
+                          [self.theEvaluator.stress_tensor_with_external_forces[i][j]
+                           for i in range(2) for j in range(2)])
+
+        self.assertTrue(self.theEnsembles[0].geometry_cache.active)
+        self.assertGreater(len(self.theEnsembles[0].geometry_cache), 0)
+        self.assertFalse(self.theEnsembles[1].geometry_cache.active)
+
+        for ind in range(len(self.theEnsembles[0].sphereList)):
+            sphere_cached = self.theEnsembles[0].sphereList[ind]
+            sphere_reference = self.theEnsembles[1].sphereList[ind]
+            self.assertEqual(sphere_cached.xforce, sphere_reference.xforce)
+            self.assertEqual(sphere_cached.yforce, sphere_reference.yforce)
+            self.assertEqual(sphere_cached.torque, sphere_reference.torque)
+        self.assertEqual(stress[0], stress[1])
+
+    def test_single_pass_forces(self):
+
+        for theEnsemble in self.theEnsembles:
+            theEnsemble.single_pass_forces = True
+        self.test_same_forces()
+
+    def test_cached_geometry(self):
+
+        theEnsemble = self.theEnsembles[0]
+        theEnsemble.mechanical_simulation_step_calculate_forces()
+
+        n_crossing = 0
+        for theSphere in theEnsemble.sphereList:
+            for theNeighbor in theSphere.neighbors:
+                otherSphere = theNeighbor.theSphere
+                cached = [theSphere.lee_edwards_relative_vector(otherSphere), theSphere.d(otherSphere),
+                          theSphere.n(otherSphere), theSphere.crosses_periodic_boundary(otherSphere)]
+                theEnsemble.geometry_cache.active = False
+                direct = [theSphere.lee_edwards_relative_vector(otherSphere), theSphere.d(otherSphere),
+                          theSphere.n(otherSphere), theSphere.crosses_periodic_boundary(otherSphere)]
+                theEnsemble.geometry_cache.active = True
+                self.assertEqual(cached, direct)
+                if direct[3]:
+                    n_crossing = n_crossing + 1
+        self.assertGreater(n_crossing, 0)
+
+    def test_closed_when_spheres_move(self):
+
+        theEnsemble = self.theEnsembles[0]
+        theEnsemble.mechanical_simulation_step(cool_factor=0.9, dt=0.2)
+        self.assertFalse(theEnsemble.geometry_cache.active)
+
+        theEnsemble.mechanical_simulation_step_calculate_forces()
+        theEnsemble.setShear(theEnsemble.shear + 0.1)
+        self.assertFalse(theEnsemble.geometry_cache.active)
+
+        theEnsemble.mechanical_simulation_step_calculate_forces()
+        theSphere = theEnsemble.sphereList[0]
+        otherSphere = theSphere.neighbors[0].theSphere
+        d = theSphere.d(otherSphere)
+        theSphere.x = theSphere.x + 1
+        self.assertEqual(theSphere.d(otherSphere), d)
+        theEnsemble.reset_force_register()
+        self.assertFalse(theEnsemble.geometry_cache.active)
+        self.assertNotEqual(theSphere.d(otherSphere), d)
+
+        theEnsemble.use_geometry_cache = False
+        theEnsemble.mechanical_simulation_step_calculate_forces()
+        self.assertFalse(theSphere.geometry_cache)
+
+    def test_same_trajectory(self):
+
+        for step in range(10):
+            for theEnsemble in self.theEnsembles:
+                theEnsemble.mechanical_simulation_step(cool_factor=0.9, dt=0.2)
+
+        for ind in range(len(self.theEnsembles[0].sphereList)):
+            sphere_cached = self.theEnsembles[0].sphereList[ind]
+            sphere_reference = self.theEnsembles[1].sphereList[ind]
+            for field in ["x", "y", "xspeed", "yspeed", "omega", "phi"]:
+                self.assertEqual(getattr(sphere_cached, field), getattr(sphere_reference, field))
+
+
+
+if __name__ == '__main__':
+    unittest.main()
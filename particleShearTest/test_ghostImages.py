@@ -0,0 +1,113 @@
+import unittest
+from particleShear import *
+import random
+
+
+
+class TestGhostImages(unittest.TestCase):
+
+    def setUp(self):
+
+        self.theEnsembles = []
+
+        # Two identical ensembles; the first one finds the contacts with the replicates through the cell list
+        for use_cell_list in [True, False]:
+            random.seed(7)
+            theEnsemble = EnsembleFriction(300, 300, 60, 0.9, False, False, k=1, nu=0.5, k_t=1, nu_t=0.5, mu=0.5)
+            theEnsemble.use_cell_list = use_cell_list
+            self.theEnsembles.append(theEnsemble)
+
+    def partner_key(self, theEnsemble, theSphere):
+        if theEnsemble.ghost_images.is_ghost(theSphere):
+            return theEnsemble.ghost_images.pooled[id(theSphere)]
+        return theEnsemble.sphereList.index(theSphere)
+
+    def test_entries_follow_sources(self):
+
+        theEnsemble = self.theEnsembles[0]
+        for step in range(3):
+            theEnsemble.mechanical_simulation_step(cool_factor=0.9, dt=0.5)
+            theEnsemble.periodic_boundary_extension()
+
+            table = theEnsemble.ghost_images
+            self.assertGreater(len(table), 0)
+            self.assertEqual(len(table), len(theEnsemble.spheres_boundary))
+            for entry in range(len(table)):
+                theSource = theEnsemble.sphereList[table.source_index[entry]]
+                theGhost = theEnsemble.spheres_boundary[entry]
+                self.assertEqual(theGhost.x, theSource.x + table.offset_x[entry])
+                self.assertEqual(theGhost.y, theSource.y + table.offset_y[entry])
+                self.assertEqual(theGhost.r, theSource.r)
+                self.assertIs(table.pool[(table.source_index[entry], table.offset_x[entry], table.offset_y[entry])],
+                              theGhost)
+
+    def test_replicates_are_reused(self):
+
+        theEnsemble = self.theEnsembles[0]
+        theEnsemble.periodic_boundary_extension()
+        first = dict([(theEnsemble.ghost_images.pooled[id(theGhost)], theGhost)
+                      for theGhost in theEnsemble.spheres_boundary])
+        theEnsemble.periodic_boundary_extension()
+        for theGhost in theEnsemble.spheres_boundary:
+            self.assertIs(first[theEnsemble.ghost_images.pooled[id(theGhost)]], theGhost)
+
+    def test_stale_replicates_dropped(self):
+
+        theEnsemble = self.theEnsembles[0]
+        theEnsemble.mechanical_simulation_step_calculate_forces()
+        theSphere, theNeighbor = [(theSphere, theNeighbor) for theSphere in theEnsemble.sphereList
+                                  for theNeighbor in theSphere.neighbors
+                                  if theEnsemble.ghost_images.is_ghost(theNeighbor.theSphere)][0]
+        theSource = theEnsemble.sphereList[theEnsemble.ghost_images.pooled[id(theNeighbor.theSphere)][0]]
+        theSource.x = theEnsemble.size_x / 2
+        theSource.y = theEnsemble.size_y / 2
+
+        theEnsemble.mechanical_simulation_step_calculate_forces()
+        self.assertFalse(theEnsemble.ghost_images.is_active(theNeighbor.theSphere))
+        self.assertLess(theSphere.findNeighborIndex(theNeighbor.theSphere), 0)
+
+    def test_same_neighbors_and_forces(self):
+
+        for step in range(5):
+            for theEnsemble in self.theEnsembles:
+                theEnsemble.mechanical_simulation_step(cool_factor=0.9, dt=0.5)
+
+        n_ghost_contacts = 0
+        for ind in range(len(self.theEnsembles[0].sphereList)):
+            sphere_cells = self.theEnsembles[0].sphereList[ind]
+            sphere_reference = self.theEnsembles[1].sphereList[ind]
+            self.assertEqual(sorted([str(self.partner_key(self.theEnsembles[0], theNeighbor.theSphere))
+                                     for theNeighbor in sphere_cells.neighbors]),
+                             sorted([str(self.partner_key(self.theEnsembles[1], theNeighbor.theSphere))
+                                     for theNeighbor in sphere_reference.neighbors]))
+            n_ghost_contacts = n_ghost_contacts + len([theNeighbor for theNeighbor in sphere_cells.neighbors if
+                                                       self.theEnsembles[0].ghost_images.is_ghost(
+                                                           theNeighbor.theSphere)])
+            for field in ["x", "y", "xspeed", "yspeed", "omega"]:
+                self.assertAlmostEqual(getattr(sphere_cells, field), getattr(sphere_reference, field), places=9)
+        self.assertGreater(n_ghost_contacts, 0)
+
+    def test_replicate_forces_are_external(self):
+
+        theEnsemble = self.theEnsembles[0]
+        theEnsemble.mechanical_simulation_step_calculate_forces()
+        register = theEnsemble.force_register
+
+        self.assertGreater(len(register.external_force_register), 0)
+        for target, source, force_vector in register.pair_register:
+            self.assertFalse(theEnsemble.ghost_images.is_ghost(source))
+        for target, source, moment in register.internal_moment_register:
+            self.assertFalse(theEnsemble.ghost_images.is_ghost(source))
+
+        # Internal forces come in action-reaction pairs
+        scale = max([abs(force_vector[0]) + abs(force_vector[1]) for target, source, force_vector
+                     in register.pair_register])
+        self.assertLess(abs(sum([force_vector[0] for target, source, force_vector in register.pair_register])),
+                        1e-9 * scale)
+        self.assertLess(abs(sum([force_vector[1] for target, source, force_vector in register.pair_register])),
+                        1e-9 * scale)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+from particleShear import *
+import random
+import math
+
+
+
+class TestImplicitBonds(unittest.TestCase):
+
+    def linked_pair(self, implicit_bonds, k=1, k_t=1):
+
+        # Two permanently linked spheres oscillating around their contact, with viscous damping
+        theEnsemble = EnsembleLinkable(500, 500, 0, 0.8, False, False, k=k, nu=0.1, k_t=k_t, nu_t=0.1, mu=0.5)
+        for x in [150, 269]:
+            theEnsemble.sphereList.append(SphereLinkable("GREY", x, 250, 120, m=1, my_index=len(theEnsemble.sphereList),
+                                                         theCanvas=False, doDrawing=False, force_register=theEnsemble,
+                                                         size_x=theEnsemble.size_x, size_y=theEnsemble.size_y))
+        theEnsemble.test_neighbor_relation()
+        theEnsemble.sphereList[0].establish_permanent_link(theEnsemble.sphereList[1])
+        theEnsemble.sphereList[1].xspeed = 1
+        theEnsemble.sphereList[1].yspeed = 1
+        theEnsemble.sphereList[1].omega = 0.01
+        if implicit_bonds:
+            theEnsemble.set_implicit_bonds()
+        return theEnsemble
+
+    def crosslinked_ensemble(self, implicit_bonds):
+
+        # Crosslinked ensemble under shear, with permanent links 20 times stiffer than the contacts
+        random.seed(29)
+        theEnsemble = EnsembleCompactParticlesAdjustableInterfaceStrength(
+            500, 500, 80, 0.95, False, False, k=1, nu=0.5, k_t=1, nu_t=0.5, mu=0.5,
+            permanent_ratio_central=20, permanent_ratio_tangential=20)
+        theEnsemble.mechanical_relaxation(5, cool_factor=0.5, dt=0.2)
+        theEnsemble.test_neighbor_relation()
+        for theSphere in theEnsemble.sphereList[0:40]:
+            for theNeighbor in theSphere.neighbors:
+                theSphere.establish_permanent_link(theNeighbor.theSphere)
+        theEnsemble.applyingShear = True
+        theEnsemble.setShearRate(0.002)
+        if implicit_bonds:
+            theEnsemble.set_implicit_bonds()
+        return theEnsemble
+
+    def state(self, theEnsemble):
+
+        return [getattr(theSphere, field) for theSphere in theEnsemble.sphereList
+                for field in ["x", "y", "xspeed", "yspeed", "omega"]]
+
+    def max_speed(self, theEnsemble):
+
+        return max([math.sqrt(theSphere.xspeed ** 2 + theSphere.yspeed ** 2) for theSphere in theEnsemble.sphereList])
+
+    def test_default_explicit(self):
+
+        theEnsemble = EnsembleLinkable(500, 500, 0, 0.8, False, False)
+        self.assertFalse(theEnsemble.implicit_bonds)
+        theEnsemble = self.linked_pair(True)
+        self.assertTrue(theEnsemble.implicit_bonds)
+        self.assertIsNot(theEnsemble.current_bond_table(), False)
+
+    def test_consistent_with_explicit(self):
+
+        # Both integrators are first order and converge to the same trajectory
+        def difference(dt):
+            theEnsembles = [self.linked_pair(False), self.linked_pair(True)]
+            for theEnsemble in theEnsembles:
+                for i in range(int(round(2 / dt))):
+                    theEnsemble.mechanical_simulation_step(cool_factor=1, dt=dt)
+            return max([abs(a - b) for a, b in zip(self.state(theEnsembles[0]), self.state(theEnsembles[1]))])
+
+        coarse = difference(0.02)
+        fine = difference(0.01)
+        self.assertLess(fine, 0.01)
+        self.assertGreater(coarse / fine, 1.5)
+
+    def test_momentum_conserved(self):
+
+        theEnsemble = self.linked_pair(True, k=100, k_t=100)
+        for i in range(20):
+            theEnsemble.mechanical_simulation_step(cool_factor=1, dt=0.5)
+            self.assertGreater(theEnsemble.implicit_bond_iterations, 0)
+            self.assertAlmostEqual(sum([theSphere.m * theSphere.xspeed for theSphere in theEnsemble.sphereList]), 1,
+                                   delta=1e-6)
+            self.assertAlmostEqual(sum([theSphere.m * theSphere.yspeed for theSphere in theEnsemble.sphereList]), 1,
+                                   delta=1e-6)
+
+    def test_stiff_link_stable(self):
+
+        # dt=0.5 is beyond the stability limit of the explicit integration of a link with k=100
+        theEnsemble = self.linked_pair(False, k=100, k_t=100)
+        for i in range(3):
+            theEnsemble.mechanical_simulation_step(cool_factor=1, dt=0.5)
+        self.assertGreater(self.max_speed(theEnsemble), 100)
+
+        theEnsemble = self.linked_pair(True, k=100, k_t=100)
+        for i in range(100):
+            theEnsemble.mechanical_simulation_step(cool_factor=1, dt=0.5)
+        self.assertLess(self.max_speed(theEnsemble), 1.5)
+        self.assertAlmostEqual(theEnsemble.sphereList[0].d(theEnsemble.sphereList[1]), 120, delta=1)
+
+    def test_crosslinked_ensemble(self):
+
+        theEnsemble = self.crosslinked_ensemble(False)
+        for i in range(3):
+            theEnsemble.mechanical_simulation_step(cool_factor=1, dt=0.5)
+        self.assertGreater(self.max_speed(theEnsemble), 1000)
+
+        theEnsemble = self.crosslinked_ensemble(True)
+        for i in range(30):
+            theEnsemble.mechanical_simulation_step(cool_factor=1, dt=0.5)
+        self.assertLess(self.max_speed(theEnsemble), 100)
+
+    def test_state_arrays(self):
+
+        theEnsembles = [self.linked_pair(True, k=100, k_t=100), self.linked_pair(True, k=100, k_t=100)]
+        theEnsembles[1].enable_state_arrays()
+        for theEnsemble in theEnsembles:
+            for i in range(10):
+                theEnsemble.mechanical_simulation_step(cool_factor=1, dt=0.5)
+        for a, b in zip(self.state(theEnsembles[0]), self.state(theEnsembles[1])):
+            self.assertAlmostEqual(a, b, delta=1e-9)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
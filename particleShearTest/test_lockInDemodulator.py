@@ -0,0 +1,73 @@
+import unittest
+from particleShear import *
+import random
+import math
+
+
+
+class TestLockInDemodulator(unittest.TestCase):
+
+    def run_experiment(self, keep_history=True):
+
+        random.seed(5)
+        theEnsemble = EnsembleLinkable(300, 300, 30, 0.95, False, False, k=1, nu=0.5, k_t=1, nu_t=0.5, mu=0.5)
+        theEnsemble.mechanical_relaxation(3, cool_factor=0.5, dt=0.2)
+        theExperiment = OscillatoryShearExperiment(theEnsemble, 0.2, 0.05, 0.05, False, plotStress=False,
+                                                   keep_history=keep_history)
+        theExperiment.periods = 2
+        theExperiment.baseline_pre_periods = 1
+        theExperiment.baseline_post_periods = 1
+        G = theExperiment.oscillatory_shear_experiment(cool_factor=1, N_pre_equilibration_fixed_boundaries=5)
+        return theExperiment, G
+
+    def assertVectorClose(self, a, b):
+        scale = max([abs(element) for element in b])
+        self.assertGreater(scale, 0)
+        for element_a, element_b in zip(a, b):
+            self.assertLessEqual(abs(element_a - element_b), 1e-9 * scale)
+
+    def test_same_as_demodulation(self):
+
+        theExperiment, G = self.run_experiment()
+        p = theExperiment.plotter
+        theDemodulator = theExperiment.lock_in
+        self.assertEqual(theDemodulator.count, len(p.t))
+
+        self.assertVectorClose(theDemodulator.result("shear_stress"),
+                               theExperiment.demodulation(p.t, p.shear_stress))
+        self.assertVectorClose(theDemodulator.result("force"), theExperiment.demodulation(p.t, p.force))
+        self.assertVectorClose(theDemodulator.result("stress_tensor_LW_01"),
+                               theExperiment.demodulation(p.t, [tensor[0][1] for tensor in p.stress_tensor_LW]))
+        self.assertVectorClose(theDemodulator.result("overall_stress_tensor_10"),
+                               theExperiment.demodulation(p.t, [tensor[1][0] for tensor in p.overall_stress_tensor]))
+
+    def test_periods(self):
+
+        theDemodulator = LockInDemodulator(f=0.5, amplitude=0.1, periods=3, channels=["a"])
+        dt = 0.01
+        for step in range(int(3 / 0.5 / dt) + 1):
+            t = step * dt
+            # G' = 2, G'' = 1 for a strain amplitude of 0.1
+            theDemodulator.add_sample(t, [0.1 * (2 * math.sin(t * math.pi) + math.cos(t * math.pi))])
+        self.assertEqual(theDemodulator.completed_periods(), 3)
+        for period in range(3):
+            G = theDemodulator.period_result(period, "a")
+            self.assertAlmostEqual(G[2], 2, places=6)
+            self.assertAlmostEqual(G[3], 1, places=6)
+        G = theDemodulator.result("a")
+        self.assertAlmostEqual(G[2], 2, places=6)
+        self.assertAlmostEqual(G[3], 1, places=6)
+
+    def test_without_history(self):
+
+        theExperiment, G = self.run_experiment(keep_history=False)
+        reference, G_reference = self.run_experiment()
+
+        self.assertEqual(len(theExperiment.plotter.t), 0)
+        self.assertEqual(theExperiment.lock_in.completed_periods(), 2)
+        self.assertVectorClose(G, G_reference)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
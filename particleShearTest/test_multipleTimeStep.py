@@ -0,0 +1,183 @@
+import unittest
+from particleShear import *
+import random
+import math
+import copy
+
+
+
+class TestMultipleTimeStep(unittest.TestCase):
+
+    def linked_pair(self, k=1, k_t=1):
+
+        # Two permanently linked spheres oscillating around their contact, with viscous damping
+        theEnsemble = EnsembleLinkable(500, 500, 0, 0.8, False, False, k=k, nu=0.1, k_t=k_t, nu_t=0.1, mu=0.5)
+        for x in [150, 269]:
+            theEnsemble.sphereList.append(SphereLinkable("GREY", x, 250, 120, m=1, my_index=len(theEnsemble.sphereList),
+                                                         theCanvas=False, doDrawing=False, force_register=theEnsemble,
+                                                         size_x=theEnsemble.size_x, size_y=theEnsemble.size_y))
+        theEnsemble.test_neighbor_relation()
+        theEnsemble.sphereList[0].establish_permanent_link(theEnsemble.sphereList[1])
+        theEnsemble.sphereList[1].xspeed = 1
+        theEnsemble.sphereList[1].yspeed = 1
+        theEnsemble.sphereList[1].omega = 0.01
+        return theEnsemble
+
+    def crosslinked_ensemble(self):
+
+        # Crosslinked ensemble under shear, with permanent links 20 times stiffer than the contacts
+        random.seed(29)
+        theEnsemble = EnsembleCompactParticlesAdjustableInterfaceStrength(
+            500, 500, 80, 0.95, False, False, k=1, nu=0.05, k_t=1, nu_t=0.05, mu=0.5,
+            permanent_ratio_central=20, permanent_ratio_tangential=20)
+        theEnsemble.mechanical_relaxation(5, cool_factor=0.5, dt=0.2)
+        theEnsemble.test_neighbor_relation()
+        for theSphere in theEnsemble.sphereList[0:40]:
+            for theNeighbor in theSphere.neighbors:
+                theSphere.establish_permanent_link(theNeighbor.theSphere)
+        theEnsemble.applyingShear = True
+        theEnsemble.setShearRate(0.002)
+        return theEnsemble
+
+    def model_ensemble(self, respa_substeps=1, interface_reenforcement=1):
+
+        # Small crosslinked ensemble of the simulations, pre-equilibrated
+        random.seed(3)
+        return EnsembleCompactParticlesAdjustableInterfaceStrengthFromModelParameters(
+            cut_lines=0, N=8, packing_fraction=1.5, Young_modulus_spheres=8000, density=50, bimodal_factor=1.4,
+            do_permanent_links=True, mu=0.5, relative_viscosity=0.1, anticipated_amplitude=0.2,
+            relative_transversal_link_strength=1, doDrawing=False, respa_substeps=respa_substeps,
+            interface_reenforcement_central=interface_reenforcement,
+            interface_reenforcement_tangential=interface_reenforcement)
+
+    def moduli(self, theEnsemble, respa_substeps):
+
+        # G' and G'' of two periods of oscillatory shear of a copy of theEnsemble, with cooling at every step
+        theEnsemble = copy.deepcopy(theEnsemble)
+        theEnsemble.set_respa_substeps(respa_substeps)
+        theExperiment = OscillatoryShearExperiment(theEnsemble, theEnsemble.dt, 0.2 / theEnsemble.model.time_constant,
+                                                   0.2, False, dt_max=theEnsemble.dt_max, plotStress=False)
+        theExperiment.periods = 2
+        theExperiment.do_preequilibration_with_fixed_boundaries = True
+        return theExperiment.oscillatory_shear_experiment(cool_factor=0.99, N_pre_equilibration_fixed_boundaries=5)
+
+    def max_speed(self, theEnsemble):
+
+        return max([math.sqrt(theSphere.xspeed ** 2 + theSphere.yspeed ** 2) for theSphere in theEnsemble.sphereList])
+
+    def test_default_single_rate(self):
+
+        theEnsemble = self.linked_pair()
+        self.assertEqual(theEnsemble.respa_substeps, 1)
+        theEnsemble.set_respa_substeps(4)
+        self.assertEqual(theEnsemble.respa_substeps, 4)
+        self.assertIsNot(theEnsemble.current_bond_table(), False)
+        theEnsemble.set_implicit_bonds()
+        self.assertIs(theEnsemble.respa_fast_forces(), False)
+
+    def test_fast_forces(self):
+
+        # Without speeds, the forces of a stretched and sheared link are its elastic forces only
+        theEnsemble = self.linked_pair()
+        theEnsemble.sphereList[1].x = 275
+        for theSphere in theEnsemble.sphereList:
+            theSphere.xspeed = 0
+            theSphere.yspeed = 0
+            theSphere.omega = 0
+            for theNeighbor in theSphere.neighbors:
+                theNeighbor.friction_position = 2
+        theEnsemble.set_respa_substeps(2)
+        theEnsemble.mechanical_simulation_step_calculate_forces()
+        fast_forces = theEnsemble.respa_fast_forces()
+        for ind in range(2):
+            theSphere = theEnsemble.sphereList[ind]
+            self.assertAlmostEqual(fast_forces[0][ind], theSphere.xforce, delta=1e-9)
+            self.assertAlmostEqual(fast_forces[1][ind], theSphere.yforce, delta=1e-9)
+            self.assertAlmostEqual(fast_forces[2][ind], theSphere.torque, delta=1e-9)
+        self.assertGreater(abs(fast_forces[0][0]), 1)
+        self.assertGreater(abs(fast_forces[1][0]), 1)
+        self.assertGreater(abs(fast_forces[2][0]), 1)
+
+    def test_stiff_link_stable(self):
+
+        # dt=0.2 is beyond the stability limit of the single rate integration of a link with k=100
+        theEnsemble = self.linked_pair(k=100, k_t=100)
+        for i in range(3):
+            theEnsemble.mechanical_simulation_step(cool_factor=1, dt=0.2)
+        self.assertGreater(self.max_speed(theEnsemble), 100)
+
+        # The sub-cycled link oscillates as with a fine time step, where the largest speed is about 7.6
+        theEnsemble = self.linked_pair(k=100, k_t=100)
+        theEnsemble.set_respa_substeps(4)
+        for i in range(50):
+            theEnsemble.mechanical_simulation_step(cool_factor=1, dt=0.2)
+            self.assertAlmostEqual(sum([theSphere.xspeed for theSphere in theEnsemble.sphereList]), 1, delta=1e-9)
+            self.assertLess(self.max_speed(theEnsemble), 10)
+        self.assertAlmostEqual(theEnsemble.sphereList[0].d(theEnsemble.sphereList[1]), 120, delta=1)
+        self.assertAlmostEqual(theEnsemble.t, 10, delta=1e-9)
+
+    def test_integrate_stage(self):
+
+        # The oscillatory shear experiment steps by stages, which must sub-cycle as the full step does
+        theEnsembles = [self.linked_pair(k=100, k_t=100), self.linked_pair(k=100, k_t=100)]
+        for theEnsemble in theEnsembles:
+            theEnsemble.set_respa_substeps(4)
+        for i in range(20):
+            theEnsembles[0].mechanical_simulation_step(cool_factor=1, dt=0.2)
+            theEnsembles[1].mechanical_simulation_step_calculate_forces()
+            theEnsembles[1].record_total_particle_forces()
+            theEnsembles[1].mechanical_simulation_step_integrate(cool_factor=1, dt=0.2)
+            theEnsembles[1].reset_force()
+        for a, b in zip(theEnsembles[0].sphereList, theEnsembles[1].sphereList):
+            for field in ["x", "y", "xspeed", "yspeed", "omega"]:
+                self.assertAlmostEqual(getattr(a, field), getattr(b, field), delta=1e-9)
+
+    def test_crosslinked_ensemble(self):
+
+        theEnsemble = self.crosslinked_ensemble()
+        for i in range(3):
+            theEnsemble.mechanical_simulation_step(cool_factor=1, dt=0.2)
+        self.assertGreater(self.max_speed(theEnsemble), 1000)
+
+        theEnsemble = self.crosslinked_ensemble()
+        theEnsemble.set_respa_substeps(4)
+        for i in range(25):
+            theEnsemble.mechanical_simulation_step(cool_factor=1, dt=0.2)
+        self.assertLess(self.max_speed(theEnsemble), 400)
+        self.assertAlmostEqual(theEnsemble.shear, 0.01, delta=1e-9)
+
+    def test_model_time_steps(self):
+
+        # Sub-cycling keeps the time step of the contacts and the friction, and relaxes only the maximum time step
+        theEnsemble = self.model_ensemble()
+        theSubcycledEnsemble = self.model_ensemble(respa_substeps=4)
+        self.assertEqual(theSubcycledEnsemble.respa_substeps, 4)
+        self.assertAlmostEqual(theSubcycledEnsemble.dt, theEnsemble.dt, delta=1e-9 * theEnsemble.dt)
+        self.assertGreaterEqual(theSubcycledEnsemble.dt_max, theEnsemble.dt_max)
+
+    def test_soft_interfaces_time_step(self):
+
+        # With interfaces 10 times softer than the links, the sub-cycled ensemble is prepared as the single rate one
+        # and then takes the time step of the contacts
+        theEnsemble = self.model_ensemble(interface_reenforcement=0.1)
+        theSubcycledEnsemble = self.model_ensemble(respa_substeps=4, interface_reenforcement=0.1)
+        self.assertAlmostEqual(theSubcycledEnsemble.dt, math.sqrt(10) * theEnsemble.dt, delta=1e-9 * theEnsemble.dt)
+        for a, b in zip(theEnsemble.sphereList, theSubcycledEnsemble.sphereList):
+            self.assertEqual([a.x, a.y], [b.x, b.y])
+
+    def test_moduli_single_rate_reference(self):
+
+        # At the same time step, the moduli with sub-cycled links agree with the single rate ones (within 0.6% here,
+        # while the time step halved changes G' by 10%)
+        theEnsemble = self.model_ensemble()
+        G = self.moduli(theEnsemble, 1)
+        G_respa = self.moduli(theEnsemble, 4)
+        self.assertGreater(G[0], 0)
+        self.assertGreater(G[1], 0)
+        self.assertAlmostEqual(G_respa[0], G[0], delta=0.02 * G[0])
+        self.assertAlmostEqual(G_respa[1], G[1], delta=0.02 * G[1])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+from particleShear import *
+import random
+
+
+
+class TestNeighborCellList(unittest.TestCase):
+
+    def setUp(self):
+
+        self.size_x = 500
+        self.size_y = 500
+
+        self.theEnsembles = []
+
+        # Two identical ensembles, one using the cell list and the other one testing all pairs
+        for use_cell_list in [True, False]:
+            random.seed(17)
+            theEnsemble = EnsembleLinkable(self.size_x, self.size_y, 150, 0.9, False, False,
+                                           k=1, nu=1, k_t=1, nu_t=1, mu=0.5)
+            theEnsemble.use_cell_list = use_cell_list
+            self.theEnsembles.append(theEnsemble)
+
+    def neighbor_lists(self, theEnsemble):
+        return [[theNeighbor.theSphere.myindex for theNeighbor in theSphere.neighbors]
+                for theSphere in theEnsemble.sphereList]
+
+    def displace(self, shear):
+        # Apply the same random displacement to both ensembles
+        random.seed(int(1000 * abs(shear)) + 3)
+        displacements = [[random.uniform(-30, 30), random.uniform(-30, 30)]
+                         for i in range(len(self.theEnsembles[0].sphereList))]
+        for theEnsemble in self.theEnsembles:
+            theEnsemble.setShear(shear)
+            for ind in range(len(theEnsemble.sphereList)):
+                theSphere = theEnsemble.sphereList[ind]
+                theSphere.x = theSphere.x + displacements[ind][0]
+                theSphere.y = theSphere.y + displacements[ind][1]
+                theSphere.boundary_conditions(self.size_x, self.size_y)
+
+    def test_same_neighbors_under_shear(self):
+
+        for shear in [0, 0.13, 0.5, -0.77, 2.31]:
+            self.displace(shear)
+            for theEnsemble in self.theEnsembles:
+                theEnsemble.test_neighbor_relation()
+            self.assertEqual(self.neighbor_lists(self.theEnsembles[0]),
+                             self.neighbor_lists(self.theEnsembles[1]))
+            self.assertGreater(sum([len(n) for n in self.neighbor_lists(self.theEnsembles[0])]), 0)
+
+    def test_permanent_links_kept(self):
+
+        for theEnsemble in self.theEnsembles:
+            theEnsemble.test_neighbor_relation()
+            theEnsemble.makeAllLinksPermanent()
+
+        for shear in [0.2, 1.7]:
+            self.displace(shear)
+            for theEnsemble in self.theEnsembles:
+                theEnsemble.test_neighbor_relation()
+            self.assertEqual(self.neighbor_lists(self.theEnsembles[0]),
+                             self.neighbor_lists(self.theEnsembles[1]))
+
+        n_permanent = 0
+        for theSphere in self.theEnsembles[0].sphereList:
+            for theNeighbor in theSphere.neighbors:
+                if theNeighbor.interface_type == "permanent":
+                    n_permanent = n_permanent + 1
+        self.assertGreater(n_permanent, 0)
+
+
+    def test_verlet_list(self):
+
+        for theEnsemble in self.theEnsembles:
+            theEnsemble.mechanical_relaxation(60, cool_factor=0.3, dt=0.2)
+            theEnsemble.applyingShear = True
+            theEnsemble.setShearRate(0.002)
+
+        self.theEnsembles[0].set_verlet_skin(10)
+
+        n_steps = 40
+        for step in range(n_steps):
+            for theEnsemble in self.theEnsembles:
+                theEnsemble.mechanical_simulation_step(cool_factor=0.9, dt=0.2)
+                theEnsemble.setShear(theEnsemble.shear)
+            self.assertEqual(self.neighbor_lists(self.theEnsembles[0]),
+                             self.neighbor_lists(self.theEnsembles[1]))
+
+        self.assertGreater(self.theEnsembles[0].verlet_rebuild_count, 1)
+        self.assertLess(self.theEnsembles[0].verlet_rebuild_count, n_steps)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
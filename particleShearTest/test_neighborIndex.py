@@ -0,0 +1,55 @@
+import unittest
+from particleShear import *
+import random
+
+
+
+class TestNeighborIndex(unittest.TestCase):
+
+    def setUp(self):
+
+        random.seed(41)
+        self.theEnsemble = EnsembleLinkable(500, 500, 120, 0.95, False, False, k=1, nu=1, k_t=1, nu_t=1, mu=0.5)
+
+    def assertIndexConsistent(self, theSphere):
+        self.assertEqual(len(theSphere.neighbor_index), len(theSphere.neighbors))
+        for position in range(len(theSphere.neighbors)):
+            theNeighbor = theSphere.neighbors[position]
+            self.assertEqual(theSphere.findNeighborIndex(theNeighbor.theSphere), position)
+
+    def test_index_follows_neighbor_list(self):
+
+        self.theEnsemble.applyingShear = True
+        self.theEnsemble.setShearRate(0.05)
+        for step in range(5):
+            self.theEnsemble.mechanical_simulation_step(cool_factor=0.9, dt=0.5)
+            for theSphere in self.theEnsemble.sphereList:
+                self.assertIndexConsistent(theSphere)
+
+        n_neighbors = sum([len(theSphere.neighbors) for theSphere in self.theEnsemble.sphereList])
+        self.assertGreater(n_neighbors, 0)
+
+        for theSphere in self.theEnsemble.sphereList:
+            for otherSphere in self.theEnsemble.sphereList:
+                found = [theNeighbor.theSphere for theNeighbor in theSphere.neighbors].count(otherSphere) > 0
+                self.assertEqual(theSphere.findNeighborIndex(otherSphere) >= 0, found)
+
+    def test_direct_list_modification(self):
+
+        self.theEnsemble.test_neighbor_relation()
+        theSphere = max(self.theEnsemble.sphereList, key=lambda sphere: len(sphere.neighbors))
+        self.assertGreater(len(theSphere.neighbors), 1)
+
+        removed = theSphere.neighbors[0]
+        del theSphere.neighbors[0]
+        self.assertEqual(theSphere.findNeighborIndex(removed.theSphere), -1)
+        self.assertIndexConsistent(theSphere)
+
+        theSphere.neighbors.append(removed)
+        self.assertEqual(theSphere.findNeighborIndex(removed.theSphere), len(theSphere.neighbors) - 1)
+        self.assertIndexConsistent(theSphere)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
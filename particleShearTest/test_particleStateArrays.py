@@ -0,0 +1,62 @@
+import unittest
+from particleShear import *
+import random
+
+
+
+class TestParticleStateArrays(unittest.TestCase):
+
+    def setUp(self):
+
+        self.theEnsembles = []
+
+        # Two identical ensembles, one of them with the array backend
+        for use_arrays in [True, False]:
+            random.seed(5)
+            theEnsemble = EnsembleLinkable(500, 500, 60, 0.9, False, False, k=1, nu=1, k_t=1, nu_t=1, mu=0.5)
+            if use_arrays:
+                theEnsemble.enable_state_arrays()
+            self.theEnsembles.append(theEnsemble)
+
+    def test_spheres_are_views(self):
+
+        theArrays = self.theEnsembles[0].state_arrays
+        theSphere = self.theEnsembles[0].sphereList[3]
+
+        theSphere.xspeed = 2.5
+        self.assertEqual(theArrays.xspeed[3], 2.5)
+        theArrays.omega[3] = -0.75
+        self.assertEqual(theSphere.omega, -0.75)
+        self.assertEqual(theArrays.r[3], theSphere.r)
+        self.assertEqual(theArrays.inertia[3], theSphere.inertia)
+        self.assertTrue(isinstance(theSphere, SphereLinkable))
+
+    def test_same_trajectory(self):
+
+        self.theEnsembles[0].applyingShear = True
+        self.theEnsembles[1].applyingShear = True
+        for theEnsemble in self.theEnsembles:
+            theEnsemble.setShearRate(0.01)
+            theEnsemble.mechanical_relaxation(20, cool_factor=0.8, dt=0.2)
+
+        for ind in range(len(self.theEnsembles[0].sphereList)):
+            sphere_arrays = self.theEnsembles[0].sphereList[ind]
+            sphere_plain = self.theEnsembles[1].sphereList[ind]
+            for field in ["x", "y", "xspeed", "yspeed", "omega", "phi"]:
+                self.assertEqual(getattr(sphere_arrays, field), getattr(sphere_plain, field))
+            self.assertEqual(self.theEnsembles[0].state_arrays.x[ind], sphere_plain.x)
+
+    def test_detach(self):
+
+        theEnsemble = self.theEnsembles[0]
+        theSphere = theEnsemble.sphereList[0]
+        theSphere.x = 123.5
+        theEnsemble.disable_state_arrays()
+        self.assertEqual(theSphere.x, 123.5)
+        self.assertEqual(type(theSphere), SphereLinkable)
+        self.assertFalse(theEnsemble.current_state_arrays())
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+from particleShear import *
+import random
+import math
+
+
+
+class TestRecordingDecimation(unittest.TestCase):
+
+    def run_experiment(self, record_every=1, samples_per_period=False, baseline_periods=0):
+
+        random.seed(5)
+        theEnsemble = EnsembleLinkable(300, 300, 30, 0.95, False, False, k=1, nu=0.5, k_t=1, nu_t=0.5, mu=0.5)
+        theEnsemble.mechanical_relaxation(3, cool_factor=0.5, dt=0.2)
+        theExperiment = OscillatoryShearExperiment(theEnsemble, 0.2, 0.05, 0.05, False, plotStress=False,
+                                                   record_every=record_every, samples_per_period=samples_per_period)
+        theExperiment.periods = 2
+        theExperiment.baseline_pre_periods = baseline_periods
+        theExperiment.baseline_post_periods = baseline_periods
+        theExperiment.oscillatory_shear_experiment(cool_factor=1, N_pre_equilibration_fixed_boundaries=5)
+        return theExperiment
+
+    def test_decimated_samples(self):
+
+        full = self.run_experiment()
+        decimated = self.run_experiment(record_every=4)
+
+        self.assertEqual(len(full.plotter.t), 200)
+        self.assertEqual(len(decimated.plotter.t), 50)
+        self.assertTrue(decimated.theEnsemble.record_forces)
+
+        # Skipping the bookkeeping does not change the dynamics: the samples are those of the full-rate run
+        for name in ["t", "strain", "shear_stress", "force"]:
+            self.assertEqual(list(getattr(decimated.plotter, name)), getattr(full.plotter, name)[::4])
+
+        G_full = full.evaluateStressAndG()
+        G_decimated = decimated.evaluateStressAndG()
+        for index in [2, 3]:
+            self.assertLess(abs(G_decimated[index] - G_full[index]), 0.1 * abs(G_full[index]))
+
+    def test_samples_per_period(self):
+
+        theExperiment = self.run_experiment(samples_per_period=20)
+        self.assertEqual(theExperiment.recording_interval(), 5)
+        self.assertEqual(len(theExperiment.plotter.t), 40)
+
+    def test_empty_baseline_windows(self):
+
+        # One sample every 1.2 periods: none in the last third of the baseline before the shear nor in the first third
+        # of the baseline after it, so the drift correction falls back to the first and last samples
+        theExperiment = self.run_experiment(record_every=120, baseline_periods=1)
+        f = theExperiment.f
+        t = list(theExperiment.plotter.t)
+        self.assertEqual(len([value for value in t if 2 / f / 3 <= value < 1 / f]), 0)
+        self.assertEqual(len([value for value in t if 3 / f < value <= (3 + 1 / 3) / f]), 0)
+
+        for useExternalForce, channel in [[False, "shear_stress"], [True, "force"]]:
+            G = theExperiment.evaluateStressAndG(useExternalForce=useExternalForce)
+            G_lock_in = theExperiment.lock_in.result(channel)
+            for index in range(4):
+                self.assertTrue(math.isfinite(G[index]))
+                self.assertAlmostEqual(G[index], G_lock_in[index], delta=1e-9 * (abs(G_lock_in[index]) + 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
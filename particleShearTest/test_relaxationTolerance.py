@@ -0,0 +1,59 @@
+import unittest
+from particleShear import *
+import random
+
+
+
+class TestRelaxationTolerance(unittest.TestCase):
+
+    def setUp(self):
+
+        self.theEnsembles = []
+        for ind in range(2):
+            random.seed(11)
+            theEnsemble = EnsembleLinkable(300, 300, 30, 0.95, False, False, k=1, nu=0.5, k_t=1, nu_t=0.5, mu=0.5)
+            self.theEnsembles.append(theEnsemble)
+
+    def test_no_tolerance(self):
+
+        steps = self.theEnsembles[0].mechanical_relaxation(20, cool_factor=0.5, dt=0.2)
+        self.assertEqual(steps, 20)
+
+    def test_same_trajectory_until_stop(self):
+
+        # Huge tolerances: the relaxation stops at the first check, with the same trajectory as without tolerances
+        # (the relaxation steps draw random numbers, hence the seeding)
+        random.seed(3)
+        steps = self.theEnsembles[0].mechanical_relaxation(100, cool_factor=0.5, dt=0.2, max_force=1e30,
+                                                           max_kinetic_energy=1e30, check_every=7)
+        self.assertEqual(steps, 7)
+        random.seed(3)
+        self.theEnsembles[1].mechanical_relaxation(7, cool_factor=0.5, dt=0.2)
+        for ind in range(len(self.theEnsembles[0].sphereList)):
+            for field in ["x", "y", "xspeed", "yspeed", "omega", "phi"]:
+                self.assertEqual(getattr(self.theEnsembles[0].sphereList[ind], field),
+                                 getattr(self.theEnsembles[1].sphereList[ind], field))
+
+    def test_tolerances_met(self):
+
+        theEnsemble = self.theEnsembles[0]
+        max_force = 1e-3
+        max_kinetic_energy = 1e-3
+        steps = theEnsemble.mechanical_relaxation(2000, cool_factor=0.5, dt=0.2, max_force=max_force,
+                                                  max_kinetic_energy=max_kinetic_energy, check_every=5)
+        self.assertLess(steps, 2000)
+        self.assertEqual(steps % 5, 0)
+        self.assertLessEqual(theEnsemble.residual_force, max_force)
+        self.assertLessEqual(theEnsemble.peculiar_kinetic_energy(), max_kinetic_energy)
+        self.assertFalse(theEnsemble.measure_residual_force)
+
+    def test_unreachable_tolerance(self):
+
+        steps = self.theEnsembles[0].mechanical_relaxation(12, cool_factor=0.5, dt=0.2, max_kinetic_energy=-1,
+                                                           check_every=5)
+        self.assertEqual(steps, 12)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from particleShear import *
+import os
+import tempfile
+
+
+
+class TestSimulationSeries(unittest.TestCase):
+
+    def small_series(self, root_folder, N_repetitions, workers):
+
+        # Uncut crosslinked ensemble of a few spheres, a single period at high frequency
+        return doParticleShearSimulationSeries(root_folder, amplitudes=[0.2], mu=[0.5], cut_lines=0, N=8,
+                                               N_repetitions=N_repetitions, relative_frequency=1, pre_periods=0,
+                                               periods=1, post_periods=0, doDrawing=False, plotStress=False,
+                                               saveData=True, saveStressTensorData=False, workers=workers, seed=5)
+
+    def test_failed_run_reported(self):
+
+        table = doParticleShearSimulationSeries(amplitudes=[0.1, 0.2], mu=[0.5], N="x", N_repetitions=2,
+                                                do_uncrosslinked_control=True, workers=2)
+        self.assertEqual([[row[0]["repetition"], row[0]["theAmplitude"], row[0]["run"]] for row in table],
+                         [[repetition, amplitude, run] for repetition in range(2) for amplitude in [0.1, 0.2]
+                          for run in ["biomaterial", "uncrosslinked control"]])
+        for row in table:
+            self.assertEqual(row[1:4], [False, False, False])
+            self.assertIn("TypeError", row[4])
+            self.assertFalse(row[0]["doDrawing"])
+
+    def test_failed_run_raised_in_single_process(self):
+
+        with self.assertRaises(TypeError):
+            doParticleShearSimulationSeries(amplitudes=[0.1], mu=[0.5], N="x", N_repetitions=1, doDrawing=False)
+
+    def test_parallel_series(self):
+
+        with tempfile.TemporaryDirectory() as root_folder:
+            table = self.small_series(root_folder, 2, 2)
+            self.assertEqual(len(table), 2)
+            for row in table:
+                self.assertIs(row[4], False)
+                self.assertGreater(row[1], 0)
+                self.assertTrue(os.path.isfile(row[3]))
+            self.assertNotEqual(table[0][3], table[1][3])
+
+            # The first simulation of the series starts from the same seed in a single process
+            serial_table = self.small_series(root_folder, 1, False)
+            self.assertAlmostEqual(serial_table[0][1], table[0][1], delta=1e-9 * abs(table[0][1]))
+            self.assertAlmostEqual(serial_table[0][2], table[0][2], delta=1e-9 * abs(table[0][2]))
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+from particleShear import *
+import random
+
+
+
+class TestStressAccumulation(unittest.TestCase):
+
+    def setUp(self):
+
+        self.size_x = 500
+        self.size_y = 500
+
+        self.theEnsembles = []
+
+        # Two identical, sheared frictional ensembles; the first one will accumulate the stress while recording
+        for accumulate_stress in [True, False]:
+            random.seed(19)
+            theEnsemble = EnsembleLinkable(self.size_x, self.size_y, 80, 0.95, False, False,
+                                           k=1, nu=0.5, k_t=1, nu_t=0.5, mu=0.5)
+            theEnsemble.mechanical_relaxation(5, cool_factor=0.5, dt=0.2)
+            theEnsemble.test_neighbor_relation()
+            for theSphere in theEnsemble.sphereList[0:20]:
+                for theNeighbor in theSphere.neighbors:
+                    theSphere.establish_permanent_link(theNeighbor.theSphere)
+            theEnsemble.applyingShear = True
+            theEnsemble.setShear(0.37)
+            theEnsemble.setShearRate(0.05)
+            theEnsemble.set_stress_accumulation(accumulate_stress)
+            self.theEnsembles.append(theEnsemble)
+
+        self.theEvaluator = StressTensorEvaluation(self.size_x, self.size_y)
+
+    def evaluate(self):
+
+        stress = []
+        for theEnsemble in self.theEnsembles:
+            theEnsemble.record_total_particle_forces()
+            self.theEvaluator.evaluate_stress_tensors(theEnsemble.force_register, theEnsemble.movableSphereList(),
+                                                      theEnsemble.shear_rate)
+            stress.append([[[getattr(self.theEvaluator, name)[i][j] for j in range(2)] for i in range(2)]
+                           for name in ["stress_tensor_LW", "stress_tensor_with_external_forces",
+                                        "stress_tensor_internal_torque", "stress_tensor_unbalanced_forces",
+                                        "stress_tensor_unbalanced_torque", "overall_stress_tensor"]])
+        return stress
+
+    def assertTensorClose(self, a, b):
+        scale = max([abs(b[i][j]) for i in range(2) for j in range(2)])
+        for i in range(2):
+            for j in range(2):
+                self.assertLessEqual(abs(a[i][j] - b[i][j]), 1e-12 * scale)
+
+    def test_same_stress(self):
+
+        for theEnsemble in self.theEnsembles:
+            theEnsemble.mechanical_simulation_step_calculate_forces()
+        stress = self.evaluate()
+
+        theRegister = self.theEnsembles[0].force_register
+        self.assertEqual(theRegister.force_count, 0)
+        self.assertEqual(theRegister.moment_count, 0)
+        self.assertGreater(theRegister.pair_force_count, 0)
+        self.assertGreater(theRegister.external_force_count, 0)
+        self.assertNotEqual(stress[1][1][0][1], 0)
+        self.assertNotEqual(stress[1][2][0][1], 0)
+
+        # The net force terms are evaluated alike, the pairwise, external and torque terms are regrouped
+        self.assertEqual(stress[0][3], stress[1][3])
+        self.assertEqual(stress[0][4], stress[1][4])
+        for term in [0, 1, 2, 5]:
+            self.assertTensorClose(stress[0][term], stress[1][term])
+
+    def test_record_time_positions(self):
+
+        # Both paths agree when evaluated before the spheres move
+        for theEnsemble in self.theEnsembles:
+            theEnsemble.mechanical_simulation_step_calculate_forces()
+        before = self.evaluate()
+        for term in [0, 1, 5]:
+            self.assertTensorClose(before[0][term], before[1][term])
+
+        # Moving the spheres afterwards changes the evaluation of the stored rows, which uses the current positions,
+        # but not the sums accumulated with the positions at recording time
+        for theEnsemble in self.theEnsembles:
+            for theSphere in theEnsemble.sphereList:
+                theSphere.x = theSphere.x + 0.1 * (theSphere.y - self.size_y / 2)
+        after = self.evaluate()
+        for term in [0, 1]:
+            self.assertTensorClose(after[0][term], before[0][term])
+            self.assertGreater(max([abs(after[1][term][i][j] - before[1][term][i][j])
+                                    for i in range(2) for j in range(2)]),
+                               1e-6 * max([abs(before[1][term][i][j]) for i in range(2) for j in range(2)]))
+
+    def test_reset(self):
+
+        theEnsemble = self.theEnsembles[0]
+        theEnsemble.mechanical_simulation_step_calculate_forces()
+        theEnsemble.reset_force_register()
+        theRegister = theEnsemble.force_register
+        self.assertEqual(theRegister.stress_LW_sum, [[0, 0], [0, 0]])
+        self.assertEqual(theRegister.pair_force_count, 0)
+        self.assertEqual(theRegister.internal_moment_sum, 0)
+
+        theEnsemble.set_stress_accumulation(False)
+        theEnsemble.mechanical_simulation_step_calculate_forces()
+        self.assertGreater(theRegister.force_count, 0)
+
+    def test_same_trajectory(self):
+
+        for step in range(5):
+            for theEnsemble in self.theEnsembles:
+                theEnsemble.mechanical_simulation_step(cool_factor=0.9, dt=0.2)
+
+        for ind in range(len(self.theEnsembles[0].sphereList)):
+            sphere_accumulated = self.theEnsembles[0].sphereList[ind]
+            sphere_reference = self.theEnsembles[1].sphereList[ind]
+            for field in ["x", "y", "xspeed", "yspeed", "omega", "phi"]:
+                self.assertEqual(getattr(sphere_accumulated, field), getattr(sphere_reference, field))
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from particleShear import *
+import random
+import math
+
+
+
+class TestStressHistory(unittest.TestCase):
+
+    def test_growth_and_views(self):
+
+        theHistory = Stress_history(3)
+        self.assertEqual(theHistory.capacity, 3)
+
+        for step in range(10):
+            tensors = [[[step, k], [-k, step * 0.5]] for k in range(9)]
+            theHistory.append([step * 0.1, step * 0.2, step * 0.3, step * 0.4, step * 0.5], tensors)
+
+        self.assertEqual(len(theHistory), 10)
+        self.assertGreaterEqual(theHistory.capacity, 10)
+
+        t = theHistory.view("t")
+        self.assertEqual(len(t), 10)
+        self.assertEqual(t[3], 3 * 0.1)
+        self.assertEqual(t[-1], 9 * 0.1)
+        self.assertEqual(t[2:4], [2 * 0.1, 3 * 0.1])
+        self.assertEqual(list(theHistory.view("shear_stress")), [step * 0.5 for step in range(10)])
+        with self.assertRaises(IndexError):
+            t[10]
+        with self.assertRaises(TypeError):
+            t[0] = 1
+
+        overall = theHistory.view("overall_stress_tensor")
+        self.assertEqual(overall[7], [[7, 8], [-8, 3.5]])
+        # Tensors are returned as copies
+        overall[7][0][0] = 100
+        self.assertEqual(overall[7][0][0], 7)
+
+        # The views follow the history as it grows
+        theHistory.append([1, 2, 3, 4, 5], [[[0, 0], [0, 0]]] * 9)
+        self.assertEqual(len(t), 11)
+        self.assertEqual(t[-1], 1)
+
+    def test_evaluation_handler(self):
+
+        random.seed(37)
+        theEnsemble = EnsembleLinkable(300, 300, 30, 0.95, False, False, k=1, nu=0.5, k_t=1, nu_t=0.5, mu=0.5)
+        theEnsemble.mechanical_relaxation(3, cool_factor=0.5, dt=0.2)
+        theEnsemble.applyingShear = True
+        theEvaluator = StressTensorEvaluation(theEnsemble.size_x, theEnsemble.size_y)
+        theHandler = EvaluationHandler()
+        theHandler.reserve(5)
+
+        recorded = []
+        for step in range(12):
+            theEnsemble.setShear(0.2 * math.sin(0.3 * step))
+            theEnsemble.setShearRate(0.06 * math.cos(0.3 * step))
+            theEnsemble.t = step * 0.2
+            theEnsemble.mechanical_simulation_step_calculate_forces()
+            theEnsemble.record_total_particle_forces()
+            theHandler.record(theEnsemble, theEvaluator)
+            recorded.append([theEvaluator.stress_tensor_LW, theEvaluator.overall_stress_tensor,
+                             theEvaluator.evaluate_quasistatic_shear_stress(), theEnsemble.shear])
+            theEnsemble.mechanical_simulation_step_calculate_acceleration(cool_factor=0.9, dt=0.2)
+            theEnsemble.mechanical_simulation_step_calculate_movement(dt=0.2)
+            theEnsemble.reset_force()
+
+        self.assertEqual(len(theHandler.t), 12)
+        self.assertEqual(list(theHandler.t), [step * 0.2 for step in range(12)])
+        for step in range(12):
+            self.assertEqual(theHandler.stress_tensor_LW[step], recorded[step][0])
+            self.assertEqual(theHandler.overall_stress_tensor[step], recorded[step][1])
+            self.assertEqual(theHandler.shear_stress[step], recorded[step][2])
+            self.assertEqual(theHandler.strain[step], recorded[step][3])
+        with self.assertRaises(AttributeError):
+            theHandler.strain = []
+
+
+
+if __name__ == '__main__':
+    unittest.main()
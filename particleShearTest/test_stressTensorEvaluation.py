@@ -0,0 +1,127 @@
+import unittest
+from particleShear import *
+import random
+
+
+
+class TestStressTensorEvaluation(unittest.TestCase):
+    """Compare the column-wise tensor sums of `particleShear.StressTensorEvaluation` to the element-wise
+    expressions, evaluated here sphere by sphere and row by row"""
+
+    def setUp(self):
+
+        self.size_x = 500
+        self.size_y = 500
+
+        random.seed(29)
+        self.theEnsemble = EnsembleLinkable(self.size_x, self.size_y, 80, 0.95, False, False,
+                                            k=1, nu=0.5, k_t=1, nu_t=0.5, mu=0.5)
+        self.theEnsemble.mechanical_relaxation(5, cool_factor=0.5, dt=0.2)
+        self.theEnsemble.applyingShear = True
+        self.theEnsemble.setShear(0.37)
+        self.theEnsemble.setShearRate(0.05)
+        for step in range(3):
+            self.theEnsemble.mechanical_simulation_step(cool_factor=0.9, dt=0.2)
+        self.theEnsemble.mechanical_simulation_step_calculate_forces()
+        self.theEnsemble.record_total_particle_forces()
+
+        self.theEvaluator = StressTensorEvaluation(self.size_x, self.size_y)
+        self.theEvaluator.evaluate_stress_tensors(self.theEnsemble.force_register,
+                                                  self.theEnsemble.movableSphereList(),
+                                                  self.theEnsemble.shear_rate)
+
+    def reference_tensors(self):
+
+        theRegister = self.theEnsemble.force_register
+        area = (self.size_x * 1e-6) * (self.size_y * 1e-6)
+        center = [self.size_x / 2, self.size_y / 2]
+        reference = {}
+
+        tensor = [[0, 0], [0, 0]]
+        for target, source, force in theRegister.pair_register:
+            delta_x = [target.x - source.x, target.y - source.y]
+            for i in range(2):
+                for j in range(2):
+                    tensor[i][j] = tensor[i][j] + force[i] * 1e-12 * delta_x[j] * 1e-6 / 2
+        reference["stress_tensor_LW"] = tensor
+
+        tensor = [[0, 0], [0, 0]]
+        for target, force in theRegister.total_particle_force_register:
+            delta_x = [target.x - center[0], target.y - center[1]]
+            for i in range(2):
+                for j in range(2):
+                    tensor[i][j] = tensor[i][j] + force[i] * 1e-12 * delta_x[j] * 1e-6
+        reference["stress_tensor_unbalanced_forces"] = tensor
+
+        tensor = [[0, 0], [0, 0]]
+        for target, force in theRegister.external_force_register:
+            r = [target.x - center[0], target.y - center[1]]
+            for i in range(2):
+                for j in range(2):
+                    tensor[i][j] = tensor[i][j] - force[i] * 1e-12 * r[j] * 1e-6
+        reference["stress_tensor_with_external_forces"] = tensor
+
+        tensor = [[0, 0], [0, 0]]
+        for theSphere in self.theEnsemble.movableSphereList():
+            K = theSphere.omega * theSphere.omega / 2 * theSphere.inertia * 1e-18
+            for i in range(2):
+                tensor[i][i] = tensor[i][i] - K
+        reference["stress_tensor_spin_kinetic_energy"] = tensor
+
+        tensor = [[0, 0], [0, 0]]
+        for target, moment in theRegister.unbalanced_moment_register:
+            tensor[0][1] = tensor[0][1] - moment * 1e-18 / 2
+            tensor[1][0] = tensor[1][0] + moment * 1e-18 / 2
+        reference["stress_tensor_unbalanced_torque"] = tensor
+
+        tensor = [[0, 0], [0, 0]]
+        for target, source, moment in theRegister.internal_moment_register:
+            tensor[0][1] = tensor[0][1] - moment * 1e-18 / 2
+            tensor[1][0] = tensor[1][0] + moment * 1e-18 / 2
+        reference["stress_tensor_internal_torque"] = tensor
+
+        tensor = [[0, 0], [0, 0]]
+        shear_rate = self.theEnsemble.shear_rate
+        for theSphere in self.theEnsemble.movableSphereList():
+            p = [(theSphere.xspeed - shear_rate * (theSphere.y - center[1])) * theSphere.m * 1e-12,
+                 theSphere.yspeed * theSphere.m * 1e-12]
+            for i in range(2):
+                for j in range(2):
+                    tensor[i][j] = tensor[i][j] - p[i] * p[j] / theSphere.m * 1e6
+        reference["stress_tensor_linear_acceleration_otsuki"] = tensor
+
+        for name in reference:
+            reference[name] = [[reference[name][i][j] / area for j in range(2)] for i in range(2)]
+        return reference
+
+    def test_same_tensors(self):
+
+        reference = self.reference_tensors()
+        for name in reference:
+            tensor = getattr(self.theEvaluator, name)
+            scale = max([abs(reference[name][i][j]) for i in range(2) for j in range(2)])
+            self.assertGreater(scale, 0, name)
+            for i in range(2):
+                for j in range(2):
+                    self.assertLessEqual(abs(tensor[i][j] - reference[name][i][j]), 1e-12 * scale, name)
+
+        for i in range(2):
+            for j in range(2):
+                self.assertEqual(self.theEvaluator.stress_tensor_linear_acceleration[i][j],
+                                 self.theEvaluator.stress_tensor_unbalanced_forces[i][j])
+
+    def test_empty_register(self):
+
+        self.theEnsemble.reset_force_register()
+        self.theEvaluator.evaluate_force_stress_tensors(self.theEnsemble.force_register)
+        self.theEvaluator.evaluate_rotational_stress_tensors(self.theEnsemble.force_register, [])
+        for name in ["stress_tensor_LW", "stress_tensor_unbalanced_forces", "stress_tensor_with_external_forces",
+                     "stress_tensor_spin_kinetic_energy", "stress_tensor_unbalanced_torque",
+                     "stress_tensor_internal_torque"]:
+            self.assertEqual([abs(element) for row in getattr(self.theEvaluator, name) for element in row],
+                             [0, 0, 0, 0], name)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import unittest
+from particleShear import *
+import random
+import math
+
+
+
+class TestTimeStepController(unittest.TestCase):
+
+    def setUp(self):
+
+        random.seed(5)
+        self.theEnsemble = EnsembleLinkable(300, 300, 30, 0.95, False, False, k=1, nu=0.5, k_t=1, nu_t=0.5, mu=0.5)
+        self.theEnsemble.mechanical_relaxation(3, cool_factor=0.5, dt=0.2)
+
+    def test_growth_and_bounds(self):
+
+        for theSphere in self.theEnsemble.sphereList:
+            theSphere.xspeed = 0
+            theSphere.yspeed = 0
+        theController = Time_step_controller(0.1, dt_max=0.13, growth_factor=1.2)
+        self.theEnsemble.mechanical_simulation_step_calculate_forces()
+        self.assertAlmostEqual(theController.next_dt(self.theEnsemble), 0.12, places=12)
+        self.assertAlmostEqual(theController.next_dt(self.theEnsemble), 0.13, places=12)
+
+    def test_reduction(self):
+
+        for theSphere in self.theEnsemble.sphereList:
+            theSphere.xspeed = 100
+        theController = Time_step_controller(0.1, reduction_factor=0.5, check_every=2)
+        self.theEnsemble.mechanical_simulation_step_calculate_forces()
+        self.assertAlmostEqual(theController.next_dt(self.theEnsemble), 0.05, places=12)
+        # No evaluation until check_every calls have passed
+        self.assertEqual(theController.next_dt(self.theEnsemble), 0.05)
+        self.assertEqual(theController.adjustments, 1)
+
+    def test_overlap_change_target(self):
+
+        theController = Time_step_controller(0.2, max_overlap_change=0.01)
+        self.theEnsemble.time_step_controller = theController
+        t = self.theEnsemble.t
+        for step in range(30):
+            # The dt argument is ignored in favor of the controller
+            self.theEnsemble.mechanical_simulation_step(cool_factor=0.9, dt=1000)
+        self.assertGreater(self.theEnsemble.t - t, 30 * theController.dt_min)
+        self.assertLess(self.theEnsemble.t - t, 30 * theController.dt_max)
+        # Once adapted, the overlap change of a step is about the target
+        self.assertLess(theController.overlap_change(self.theEnsemble, theController.dt), 0.01 * 1.5)
+
+    def test_energy_drift_target(self):
+
+        theController = Time_step_controller(0.4, max_overlap_change=False, max_energy_drift=0.005)
+        self.theEnsemble.time_step_controller = theController
+        for step in range(40):
+            self.theEnsemble.mechanical_simulation_step(cool_factor=1)
+        self.assertLess(theController.dt, 0.4 * theController.reduction_factor)
+        # Once adapted, the drift of a step is about the target
+        theController.max_energy_drift = 1
+        theController.check_every = 1000
+        for step in range(10):
+            self.theEnsemble.mechanical_simulation_step(cool_factor=1)
+        drift = abs(theController.energy_error) / theController.energy_scale / theController.energy_steps
+        self.assertLess(drift, 0.005 * 2)
+        self.assertGreater(drift, 0.005 / 4)
+
+    def test_bounds_from_material_parameters(self):
+
+        # Tangential constants count three times, as the spheres also turn
+        self.assertEqual(self.theEnsemble.interaction_constants(), [3, 1.5])
+        m_min = min([theSphere.m for theSphere in self.theEnsemble.sphereList])
+        z = 1.5 / (2 * math.sqrt(3 * m_min / 2))
+        dt_critical = 2 * (math.sqrt(1 + z * z) - z) / math.sqrt(3 / (m_min / 2))
+        self.assertAlmostEqual(self.theEnsemble.critical_time_step(), dt_critical, places=12)
+        theController = Time_step_controller(10)
+        theController.set_bounds(self.theEnsemble, fraction=0.5, dynamic_range=20)
+        self.assertAlmostEqual(theController.dt_max, dt_critical / 2, places=12)
+        self.assertAlmostEqual(theController.dt_min, dt_critical / 40, places=12)
+        self.assertEqual(theController.dt, theController.dt_max)
+
+    def test_weighted_demodulation(self):
+
+        # Irregular sampling of a signal with G' = 2, G'' = 1 for a strain amplitude of 0.1: the time-weighted
+        # demodulation recovers the moduli, the unweighted one does not
+        theExperiment = OscillatoryShearExperiment(False, 0.01, 0.5, 0.1, False, plotStress=False)
+        theExperiment.periods = 3
+        t = []
+        stress = []
+        time = 0
+        step = 0
+        while time < 6:
+            t.append(time)
+            stress.append(0.1 * (2 * math.sin(time * math.pi) + math.cos(time * math.pi)))
+            dt = 0.002
+            if step % 2 == 1:
+                dt = 0.02
+            time = time + dt * (1.5 + math.sin(time))
+            step = step + 1
+        # End exactly after three periods, as the linear drift is taken from the first and last samples
+        t.append(6)
+        stress.append(0.1)
+
+        # Trapezoidal weights, as given by OscillatoryShearExperiment with a time step controller
+        weights = [(t[1] - t[0]) / 2] + [(t[i + 1] - t[i - 1]) / 2 for i in range(1, len(t) - 1)] + \
+                  [(t[len(t) - 1] - t[len(t) - 2]) / 2]
+        G = theExperiment.demodulation(t, stress, weights)
+        self.assertAlmostEqual(G[2], 2, places=3)
+        self.assertAlmostEqual(G[3], 1, places=3)
+        G_unweighted = theExperiment.demodulation(t, stress)
+        self.assertGreater(abs(G_unweighted[2] - 2) + abs(G_unweighted[3] - 1), 0.05)
+
+        # The online demodulator with the same weights gives the same result
+        theDemodulator = LockInDemodulator(f=0.5, amplitude=0.1, periods=3, channels=["a"])
+        for i in range(len(t)):
+            theDemodulator.add_sample(t[i], [stress[i]], weights[i])
+        G_online = theDemodulator.result("a")
+        for i in range(4):
+            self.assertAlmostEqual(G_online[i], G[i], places=9)
+
+    def test_experiment(self):
+
+        theController = Time_step_controller(0.2, max_overlap_change=0.02, max_force_change=0.2, check_every=5)
+        theExperiment = OscillatoryShearExperiment(self.theEnsemble, 0.2, 0.05, 0.05, False, plotStress=False,
+                                                   time_step_controller=theController)
+        theExperiment.periods = 2
+        theExperiment.baseline_post_periods = 1
+        G = theExperiment.oscillatory_shear_experiment(cool_factor=1, N_pre_equilibration_fixed_boundaries=5)
+        p = theExperiment.plotter
+        self.assertEqual(theExperiment.steps_used, len(p.t))
+        self.assertGreaterEqual(p.t[len(p.t) - 1] + theController.dt, 3 / 0.05)
+        self.assertLess(p.t[len(p.t) - 2], 3 / 0.05)
+        self.assertEqual(self.theEnsemble.shear_rate, 0)
+        # The time step is adjusted at every step; the trapezoidal weights sum to the duration of the records
+        self.assertEqual(theController.calls, theExperiment.steps_used)
+        self.assertEqual(p.weight[0], p.t[1] / 2)
+        last = len(p.t) - 1
+        self.assertAlmostEqual(p.weight[last], (p.t[last] - p.t[last - 1]) / 2, delta=1e-12)
+        self.assertAlmostEqual(sum(p.weight), p.t[last], delta=1e-9)
+        G_online = theExperiment.lock_in.result("force")
+        G_history = theExperiment.evaluateStressAndG(useExternalForce=True)
+        for i in range(4):
+            self.assertAlmostEqual(G_online[i], G_history[i], delta=1e-9 * abs(G_history[i]))
+        self.assertEqual(G, G_history[2:4])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
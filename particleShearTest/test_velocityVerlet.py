@@ -0,0 +1,104 @@
+import unittest
+from particleShear import *
+import random
+
+
+
+class TestVelocityVerlet(unittest.TestCase):
+
+    def linked_pair(self, integrator):
+
+        # Two permanently linked spheres oscillating around their contact, with viscous damping
+        theEnsemble = EnsembleLinkable(500, 500, 0, 0.8, False, False, k=1, nu=0.1, k_t=1, nu_t=0.1, mu=0.5)
+        for x in [150, 269]:
+            theEnsemble.sphereList.append(SphereLinkable("GREY", x, 250, 120, m=1, my_index=len(theEnsemble.sphereList),
+                                                         theCanvas=False, doDrawing=False, force_register=theEnsemble,
+                                                         size_x=theEnsemble.size_x, size_y=theEnsemble.size_y))
+        theEnsemble.test_neighbor_relation()
+        theEnsemble.sphereList[0].establish_permanent_link(theEnsemble.sphereList[1])
+        theEnsemble.sphereList[1].xspeed = 1
+        theEnsemble.sphereList[1].yspeed = 1
+        theEnsemble.set_integrator(integrator)
+        return theEnsemble
+
+    def state(self, theEnsemble):
+
+        return [getattr(theSphere, field) for theSphere in theEnsemble.sphereList
+                for field in ["x", "y", "xspeed", "yspeed", "omega", "phi"]]
+
+    def error(self, integrator, dt, reference, T=10):
+
+        theEnsemble = self.linked_pair(integrator)
+        for i in range(int(round(T / dt))):
+            theEnsemble.mechanical_simulation_step(cool_factor=1, dt=dt)
+        return max([abs(value - reference_value) for value, reference_value in zip(self.state(theEnsemble), reference)])
+
+    def test_default_integrator(self):
+
+        theEnsemble = EnsembleLinkable(500, 500, 0, 0.8, False, False)
+        self.assertEqual(theEnsemble.integrator, INTEGRATOR_EULER)
+
+    def test_second_order(self):
+
+        theEnsemble = self.linked_pair(INTEGRATOR_VELOCITY_VERLET)
+        for i in range(1000):
+            theEnsemble.mechanical_simulation_step(cool_factor=1, dt=0.01)
+        reference = self.state(theEnsemble)
+
+        ratio_verlet = self.error(INTEGRATOR_VELOCITY_VERLET, 0.2, reference) / \
+                       self.error(INTEGRATOR_VELOCITY_VERLET, 0.1, reference)
+        ratio_euler = self.error(INTEGRATOR_EULER, 0.2, reference) / self.error(INTEGRATOR_EULER, 0.1, reference)
+        self.assertGreater(ratio_verlet, 3)
+        self.assertLess(ratio_euler, 3)
+
+    def test_integrate_stage(self):
+
+        # The oscillatory shear experiment steps by stages, which must use the integrator as the full step does
+        theEnsembles = [self.linked_pair(INTEGRATOR_VELOCITY_VERLET), self.linked_pair(INTEGRATOR_VELOCITY_VERLET),
+                        self.linked_pair(INTEGRATOR_EULER)]
+        for i in range(20):
+            theEnsembles[0].mechanical_simulation_step(cool_factor=1, dt=0.2)
+            for theEnsemble in theEnsembles[1:]:
+                theEnsemble.mechanical_simulation_step_calculate_forces()
+                theEnsemble.record_total_particle_forces()
+                theEnsemble.mechanical_simulation_step_integrate(cool_factor=1, dt=0.2)
+                theEnsemble.reset_force()
+        self.assertEqual(self.state(theEnsembles[1]), self.state(theEnsembles[0]))
+        self.assertGreater(max([abs(value - reference_value) for value, reference_value in
+                                zip(self.state(theEnsembles[2]), self.state(theEnsembles[0]))]), 1e-3)
+
+    def test_external_speed_change_kept(self):
+
+        theEnsembles = [self.linked_pair(INTEGRATOR_VELOCITY_VERLET), self.linked_pair(INTEGRATOR_VELOCITY_VERLET)]
+        for theEnsemble in theEnsembles:
+            for i in range(20):
+                theEnsemble.mechanical_simulation_step(cool_factor=1, dt=0.1)
+        # A uniform speed change does not change the forces; it must survive the replacement of the prediction
+        for theSphere in theEnsembles[0].sphereList:
+            theSphere.xspeed = theSphere.xspeed + 5
+        for theEnsemble in theEnsembles:
+            theEnsemble.mechanical_simulation_step(cool_factor=1, dt=0.1)
+        for ind in range(2):
+            self.assertAlmostEqual(theEnsembles[0].sphereList[ind].xspeed - theEnsembles[1].sphereList[ind].xspeed, 5,
+                                   delta=1e-9)
+
+    def test_lees_edwards_shear(self):
+
+        random.seed(8)
+        theEnsemble = EnsembleLinkable(300, 300, 30, 0.95, False, False, k=1, nu=0.5, k_t=1, nu_t=0.5, mu=0.5)
+        theEnsemble.mechanical_relaxation(20, cool_factor=0.5, dt=0.2)
+        theEnsemble.set_integrator(INTEGRATOR_VELOCITY_VERLET)
+        theEnsemble.applyingShear = True
+        theEnsemble.setShearRate(0.01)
+        shear = theEnsemble.shear
+        for i in range(50):
+            theEnsemble.mechanical_simulation_step(cool_factor=0.9, dt=0.2)
+        self.assertAlmostEqual(theEnsemble.shear, shear + 0.01 * 50 * 0.2, delta=1e-9)
+        for theSphere in theEnsemble.sphereList:
+            self.assertTrue(0 <= theSphere.x < theEnsemble.size_x)
+            self.assertTrue(0 <= theSphere.y < theEnsemble.size_y)
+
+
+
+if __name__ == '__main__':
+    unittest.main()